@@ -10,14 +10,21 @@ Usage:
     Then type your task, e.g.:
       "Design a 4-bit ripple carry adder in Verilog, write a testbench,
        simulate it with iverilog, and commit to GitHub."
+
+    python agent.py --resume [SESSION]
+    Continue a session that was interrupted (runtime/checkpoint.py).
 """
 
-import sys
+import argparse
+import importlib
 import json
 import os
-import anthropic
+import threading
+import time
 import config
-from tools import ALL_TOOLS, execute_tool
+from types import SimpleNamespace
+from runtime import checkpoint, compaction, prompt_cache, ratelimit, session, telemetry
+from tools import ALL_TOOLS, execute_tools, remote_jobs
 
 # Load .env if present (provides ANTHROPIC_API_KEY without polluting git)
 try:
@@ -43,7 +50,7 @@ and orchestrate complete RTL-to-GDSII flows (synthesis → place-and-route → s
 ════════════════════════════════════════
 1. Write clean, synthesizable Verilog RTL  → designs/
 2. Write self-checking testbenches         → tb/
-3. Simulate locally: iverilog + vvp        (verify function before silicon)
+3. Simulate locally: run_regression       (iverilog + vvp on every tb/ testbench)
 4. Upload RTL + TCL to remote server
 5. Run DC synthesis:
        dc_shell -f scripts/dc_synthesis.tcl | tee results/synth/dc_run.log
@@ -52,7 +59,7 @@ and orchestrate complete RTL-to-GDSII flows (synthesis → place-and-route → s
 6. Run Innovus P&R:
        innovus -batch -source scripts/innovus_pnr.tcl
    → produces: results/innovus/*.rpt, *.def, *.gds
-7. Download reports to local results/
+7. Download reports to local results/ with download_results (only changed files move)
 8. Commit everything to GitHub
 
 ════════════════════════════════════════
@@ -67,9 +74,11 @@ Always apply this iterative debug loop:
 • Unresolved reference / "cannot find design X":
     Check RTL_FILES list in TCL includes all modules. Fix and rerun.
 • Setup timing violation (WNS < 0):
-    1. Read results/synth/timing.rpt — find critical path
+    1. get_qor on results/synth — find the critical path (read timing.rpt only for detail);
+       query_netlist (cone / depth) on the synthesized netlist shows its logic structure
     2. If WNS > -0.5 ns: add `set_optimize_registers true` + recompile
-    3. If WNS > -1 ns: relax clock period in constraints.sdc by 10%
+    3. If WNS > -1 ns: relax clock period in constraints.sdc by 10% — or run_sweep
+       over several clock_period / compile_effort values and pick the best row
     4. If WNS > -2 ns: consider pipelining the critical path in RTL
     5. Extreme: restructure logic (e.g., carry-lookahead instead of ripple)
 • Area too large: use `compile -area_effort high` instead of compile_ultra
@@ -79,27 +88,43 @@ Always apply this iterative debug loop:
 • "Cannot read netlist" / missing file:
     Verify synthesis step produced designs/<name>_synth.v. Run synthesis first.
 • Floorplan congestion / >90% utilization:
-    Lower `core_utilization` from 0.70 → 0.55 in innovus_pnr.tcl. Rerun.
+    query_def on the final DEF (action density / congestion / rows) to see
+    where it is crowded, then lower `core_utilization` from 0.70 → 0.55 in
+    innovus_pnr.tcl. Rerun.
 • DRC violations after routing:
     1. Read results/innovus/drc_violations.rpt
     2. For spacing/width: adjust routing rules (set_db nanoroute rules)
     3. For antenna: add antenna diodes (add_antenna_diode_cells)
     4. For unrouted nets: increase routing layers (max_route_layer metal5+)
 • Timing not closed post-route:
-    1. Read results/innovus/timing_report.txt — find violating paths
+    1. get_qor on results/innovus — find violating paths
     2. Run `opt_design -post_route -hold -setup` again
     3. If still failing: go back to synthesis with tighter target (add margin)
 • Memory / license errors:
     Note the error and report to user — cannot fix autonomously.
 
 ─── General EDA debugging rules ────────────────────────────────────────────
+• Run synthesis / P&R scripts with run_eda_flow: it syncs, runs, downloads the
+  reports and netlist, returns the QoR, and skips the run when nothing changed
+• Long dc_shell / innovus runs: start them with submit_remote_job, then poll
+  remote_job_status and read new log output with tail_remote_job instead of
+  blocking on run_remote_command
+• EDA output is watched live: a fatal error (license, unresolved reference,
+  syntax error, missing file, aborted script) stops the run within seconds and
+  the [log watch] section names its class and line — start the diagnosis there
+• Long local simulations: run_local_command with background=true, keep working
+  on the remote flow, and read the output with tail_local_job
 • After ANY failed run: use read_file to inspect the log before retrying
 • Never blindly retry the same command — diagnose first
 • For complex designs, plan a fix before making it: "I see WNS = -1.2 ns on
   the carry chain. I will relax the clock to 12 ns and recompile."
 • Max retry attempts per stage: 3. After 3 failures, report to user with
   detailed analysis of what was tried and what the remaining errors are.
-• Always check QoR (quality-of-results): timing, area, power are all goals
+• Always check QoR (quality-of-results): timing, area, power are all goals;
+  use get_qor on the results directory rather than reading raw reports
+• Every parsed result is kept in a QoR history: before a new run of a block,
+  qor_history best / trend shows the best known configuration and the tightest
+  clock period met so far; delta compares this run with the previous one
 
 ════════════════════════════════════════
   DESIGN CONVENTIONS
@@ -111,74 +136,247 @@ Always apply this iterative debug loop:
 """
 
 
-def run_agent(task: str):
-    client = anthropic.Anthropic()
-    messages = [{"role": "user", "content": task}]
+def run_agent(task: str = None, client=None, max_turns: int = None, resume: str = None) -> dict:
+    """
+    Run one agent session on *task* and return its outcome:
+    {"status", "turns", "tool_calls", "final_text", "tokens", "session"}.
+
+    *resume* names a checkpoint (runtime/checkpoint.py: a session id, a path
+    or "latest") to continue instead of starting a new session; *task* is
+    then taken from the checkpoint.
+    """
+    # *client* lets bench/replay.py substitute a recorded session.
+    # Retries are ours (runtime/ratelimit.py), not the SDK's hidden ones.
+    if client is None:
+        # The SDK takes over a second to import; main() starts loading it
+        # in the background while the user types the task (see _preload).
+        import anthropic
+        client = anthropic.Anthropic(max_retries=0)
+    limiter = ratelimit.get_limiter()
+    # System prompt and tool schemas never change within a run: build the
+    # cached versions once.
+    system = prompt_cache.system_blocks(SYSTEM_PROMPT)
+    tools = prompt_cache.tool_schemas(ALL_TOOLS)
+    tokens = prompt_cache.TokenStats()
+    compactor = compaction.Compactor()
+    max_turns = max_turns or config.MAX_AGENT_TURNS
+    outcome = {"status": "max_turns", "turns": 0, "tool_calls": 0, "final_text": ""}
+
+    state = checkpoint.load(checkpoint.find(resume)) if resume else None
+    if state:
+        task = state.task
+        messages = state.messages
+        for usage in state.usages:
+            tokens.record(SimpleNamespace(**usage))
+        tokens.last_prompt = state.prompt_tokens
+        outcome.update(turns=state.turns, tool_calls=state.tool_calls, final_text=state.final_text)
+    else:
+        messages = [{"role": "user", "content": task}]
+    ckpt = None
+    if checkpoint.enabled():
+        ckpt = checkpoint.Checkpoint.reopen(state) if state else checkpoint.Checkpoint.create(task)
+        outcome["session"] = ckpt.session_id
+
+    # In batch mode (runtime/session.py) the batch owns the trace.
+    standalone = session.current() is None
+    if standalone:
+        telemetry.start(task[:80])
 
     print(f"\n{'='*60}")
     print(f"Task: {task}")
+    if state:
+        print(f"Resuming session {state.session_id} after {state.turns} turn(s)")
+    elif ckpt:
+        print(f"Session {ckpt.session_id} (checkpoint: {ckpt.path})")
     print(f"{'='*60}\n")
 
-    for turn in range(config.MAX_AGENT_TURNS):
-        # Call Claude with streaming, retrying on rate-limit errors
-        for attempt in range(6):
-            try:
-                with client.messages.stream(
-                    model=config.MODEL,
-                    max_tokens=8192,
-                    thinking={"type": "adaptive"},
-                    system=SYSTEM_PROMPT,
-                    tools=ALL_TOOLS,
-                    messages=messages,
-                ) as stream:
-                    response = stream.get_final_message()
-                break  # success
-            except anthropic.RateLimitError as e:
-                wait = 30 * (attempt + 1)
-                print(f"\n[rate-limit] Hit API rate limit, retrying in {wait}s... ({e})")
-                import time; time.sleep(wait)
-        else:
-            raise RuntimeError("Exceeded rate-limit retry budget")
-
-        # Show assistant text output
-        for block in response.content:
-            if block.type == "thinking":
-                print(f"\n[thinking] {block.thinking[:200]}{'...' if len(block.thinking) > 200 else ''}")
-            elif block.type == "text":
-                print(f"\n[claude] {block.text}")
-
-        # Done when Claude stops calling tools
-        if response.stop_reason == "end_turn":
-            print(f"\n{'='*60}")
-            print("Task completed.")
-            print(f"{'='*60}\n")
-            break
-
-        # Handle tool calls
-        if response.stop_reason == "tool_use":
-            tool_results = []
+    try:
+        if state and state.status == "completed":
+            print(f"[resume] session {state.session_id} already completed; nothing to do.")
+            outcome["status"] = "completed"
+            max_turns = 0
+        elif state:
+            _resume(state, messages, ckpt, compactor, tokens, outcome)
+
+        first = outcome["turns"]
+        for turn in range(first, first + max_turns):
+            outcome["turns"] = turn + 1
+            # Call Claude with streaming: paced by the shared limiter and retried
+            # with header-driven backoff on 429/529/5xx (runtime/ratelimit.py).
+            attempt = 0
+            while True:
+                if ratelimit.enabled():
+                    paced = limiter.acquire()
+                    if paced:
+                        telemetry.record("api.pacing", paced)
+                try:
+                    start = time.monotonic()
+                    ttft = None
+                    with telemetry.span("api.stream", turn=turn, attempt=attempt) as span, \
+                            client.messages.stream(
+                                model=config.MODEL,
+                                max_tokens=8192,
+                                thinking={"type": "adaptive"},
+                                system=system,
+                                tools=tools,
+                                messages=prompt_cache.request_messages(messages),
+                            ) as stream:
+                        for event in stream:
+                            if ttft is None and event.type == "content_block_delta":
+                                ttft = time.monotonic() - start
+                        response = stream.get_final_message()
+                        span.update(ttft=ttft, stop_reason=response.stop_reason,
+                                    **telemetry.usage_attrs(response.usage))
+                    limiter.observe(getattr(getattr(stream, "response", None), "headers", None), response.usage)
+                    break  # success
+                except Exception as e:
+                    # None for anything but a retryable API error (ratelimit.retryable)
+                    wait = limiter.backoff(e, attempt)
+                    if wait is None:
+                        raise
+                    status = getattr(e, "status_code", None) or type(e).__name__
+                    print(f"\n[retry] API error {status}, retrying in {wait:.1f}s (attempt {attempt + 1})... ({e})")
+                    with telemetry.span("api.backoff", attempt=attempt, status=str(status)):
+                        time.sleep(wait)
+                    attempt += 1
+
+            if ckpt:
+                ckpt.assistant(turn, response)
+            print(tokens.record(response.usage, ttft, time.monotonic() - start))
+            telemetry.record_api(response.usage, ttft)
+
+            # Show assistant text output
             for block in response.content:
-                if block.type == "tool_use":
-                    print(f"\n[tool] {block.name}({_fmt_input(block.input)})")
-                    result = execute_tool(block.name, block.input)
-                    # Truncate long outputs for display
-                    display = result if len(result) <= 500 else result[:500] + "\n...(truncated)"
-                    print(f"[result] {display}")
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": result
-                    })
-
-            # Append assistant turn and tool results
-            messages.append({"role": "assistant", "content": response.content})
-            messages.append({"role": "user", "content": tool_results})
+                if block.type == "thinking":
+                    print(f"\n[thinking] {block.thinking[:200]}{'...' if len(block.thinking) > 200 else ''}")
+                elif block.type == "text":
+                    print(f"\n[claude] {block.text}")
+                    outcome["final_text"] = block.text
+
+            # Done when Claude stops calling tools
+            if response.stop_reason == "end_turn":
+                print(f"\n{'='*60}")
+                print("Task completed.")
+                print(f"{'='*60}\n")
+                outcome["status"] = "completed"
+                break
+
+            # Handle tool calls
+            if response.stop_reason == "tool_use":
+                outcome["tool_calls"] += sum(1 for block in response.content if block.type == "tool_use")
+                tool_results = _run_tools(turn, response.content, ckpt)
+
+                # Append assistant turn and tool results
+                messages.append({"role": "assistant", "content": response.content})
+                messages.append({"role": "user", "content": tool_results})
+                _finish_turn(turn, messages, ckpt, compactor, tokens)
+            else:
+                # Unexpected stop reason
+                print(f"[warn] Unexpected stop_reason: {response.stop_reason}")
+                outcome["status"] = f"stopped ({response.stop_reason})"
+                break
         else:
-            # Unexpected stop reason
-            print(f"[warn] Unexpected stop_reason: {response.stop_reason}")
-            break
-    else:
-        print(f"\n[warn] Reached maximum turns ({config.MAX_AGENT_TURNS}). Stopping.")
+            if max_turns:
+                print(f"\n[warn] Reached maximum turns ({max_turns}). Stopping.")
+        if ckpt and max_turns:
+            ckpt.end(outcome["status"])
+    except BaseException:
+        if ckpt:
+            print(f"\n[checkpoint] session interrupted; continue it with: python agent.py --resume {ckpt.session_id}")
+        raise
+    finally:
+        if ckpt:
+            ckpt.close()
+    print(tokens.summary())
+    outcome["tokens"] = {"input": tokens.input, "cache_read": tokens.cache_read,
+                         "cache_write": tokens.cache_write, "output": tokens.output}
+    if standalone:
+        print(limiter.summary())
+        print(telemetry.summary())
+        telemetry.stop()
+    return outcome
+
+
+def _run_tools(turn: int, content: list, ckpt, done: dict = None) -> list:
+    """
+    Execute the tool_use blocks of *content* and return the tool_result
+    blocks, in order.  Calls whose result is already in *done* (a resumed
+    turn) are not run again.
+    """
+    done = done or {}
+    tool_uses = [block for block in content if _field(block, "type") == "tool_use"]
+    todo = [block for block in tool_uses if _field(block, "id") not in done]
+    for block in tool_uses:
+        note = "  (done before the restart)" if _field(block, "id") in done else ""
+        print(f"\n[tool] {_field(block, 'name')}({_fmt_input(_field(block, 'input'))}){note}")
+
+    def finished(j, result):
+        # Checkpoint each result as it arrives, so a crash later in the
+        # turn does not lose the calls that already completed.
+        if ckpt:
+            ckpt.result(turn, _field(todo[j], "id"), result)
+
+    # Independent calls of one turn run concurrently; results come
+    # back in tool_use order.
+    results = dict(done)
+    results.update(zip(
+        (_field(block, "id") for block in todo),
+        execute_tools([(_field(block, "name"), _field(block, "input")) for block in todo], on_result=finished),
+    ))
+
+    tool_results = []
+    for block in tool_uses:
+        result = results[_field(block, "id")]
+        # Truncate long outputs for display
+        display = result if len(result) <= 500 else result[:500] + "\n...(truncated)"
+        print(f"[result {_field(block, 'name')}] {display}")
+        tool_results.append({
+            "type": "tool_result",
+            "tool_use_id": _field(block, "id"),
+            "content": result
+        })
+    return tool_results
+
+
+def _finish_turn(turn: int, messages: list, ckpt, compactor, tokens):
+    # Keep the request size bounded: spill stale large tool results
+    # to results/.spill/ once the prompt outgrows the budget.
+    note = compactor.maybe_compact(messages, tokens.last_prompt)
+    if note:
+        print(note)
+    if ckpt:
+        jobs = [job for job in remote_jobs.list_jobs() if job["submitted"] >= ckpt.started]
+        ckpt.turn(turn, tokens.last_prompt, jobs)
+
+
+def _resume(state, messages: list, ckpt, compactor, tokens, outcome: dict):
+    """Finish the turn the previous run died in and tell the model about the restart."""
+    if state.jobs:
+        running = remote_jobs.adopt(state.jobs)
+        print(f"[resume] {len(state.jobs)} remote job(s) from this session, {running} running at the last checkpoint")
+    if state.pending:
+        turn = state.pending["turn"]
+        content = state.pending["content"]
+        calls = sum(1 for block in content if block.get("type") == "tool_use")
+        print(f"[resume] finishing turn {turn + 1}: {len(state.pending_results)} of {calls} tool call(s) already done")
+        outcome["tool_calls"] += calls
+        tool_results = _run_tools(turn, content, ckpt, done=state.pending_results)
+        messages.append({"role": "assistant", "content": content})
+        messages.append({"role": "user", "content": tool_results})
+        _finish_turn(turn, messages, ckpt, compactor, tokens)
+        outcome["turns"] = turn + 1
+    if len(messages) > 1:
+        note = ("[The agent process was restarted and this session resumed from its checkpoint. "
+                "Local files are as the earlier tool calls left them; remote jobs kept running "
+                "meanwhile, so check remote_job_status before relying on their state.]")
+        checkpoint.add_note(messages, note)
+        if ckpt:
+            ckpt.note(note)
+
+
+def _field(block, name: str):
+    """Attribute of an SDK content block, or key of one loaded from a checkpoint."""
+    return block.get(name) if isinstance(block, dict) else getattr(block, name)
 
 
 def _fmt_input(inp: dict) -> str:
@@ -192,7 +390,33 @@ def _fmt_input(inp: dict) -> str:
     return ", ".join(parts)
 
 
+def _preload():
+    """
+    Import the Anthropic SDK (~1.3 s) and paramiko (~0.2 s) off the main
+    thread, so the prompt appears at once and both are loaded by the time
+    the first request goes out.
+    """
+    def load():
+        for name in ("anthropic", "paramiko"):
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass          # reported where it is actually needed
+    threading.Thread(target=load, name="preload", daemon=True).start()
+
+
 def main():
+    _preload()
+    parser = argparse.ArgumentParser(description="IC Design Agent — powered by Claude")
+    parser.add_argument("task", nargs="*", help="design task (prompted for when omitted)")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="SESSION",
+                        help="continue a checkpointed session (id or path; default: the latest)")
+    args = parser.parse_args()
+
+    if args.resume:
+        run_agent(resume=args.resume)
+        return
+
     print("IC Design Agent — powered by Claude")
     print("Type your hardware design task and press Enter.")
     print("Examples:")
@@ -201,8 +425,8 @@ def main():
     print("  - Design a D flip-flop with async reset")
     print()
 
-    if len(sys.argv) > 1:
-        task = " ".join(sys.argv[1:])
+    if args.task:
+        task = " ".join(args.task)
     else:
         try:
             task = input("Task> ").strip()
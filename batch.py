@@ -0,0 +1,222 @@
+"""
+Batch mode: run many design tasks concurrently from a manifest.
+
+    python3 batch.py tasks.json [--jobs 4] [--only alu8,fifo16]
+
+The manifest is JSON:
+
+    {"concurrency": 3,                                   # optional
+     "defaults": {"seed": ["designs", "scripts", "tb"], "max_turns": 40},
+     "tasks": [
+        {"name": "alu8", "task": "Design an 8-bit ALU ...", "max_turns": 60},
+        {"name": "fifo16", "task": "Design a 16-deep FIFO ...", "seed": ["scripts"]},
+        "Design a 4-bit ripple carry adder"              # name defaults to task-NN
+     ]}
+
+or a text file with one task per line (# starts a comment).
+
+Each task runs as its own run_agent session (runtime/session.py) in
+
+    BATCH_DIR/<batch_id>/<name>/            its WORK_DIR, seeded with copies of
+                                            the `seed` paths of the project
+    BATCH_DIR/<batch_id>/<name>/session.log everything the session printed
+    REMOTE_WORK_DIR/batch/<batch_id>/<name> its remote work dir
+
+Sessions share the API rate limiter, the SSH connection pool, the remote
+shells and the EDA license pool, so --jobs can be raised until API or
+license capacity — not terminals — is the limit.  When every task is done,
+BATCH_DIR/<batch_id>/summary.json and summary.md hold one row per task:
+status, turns, tool calls, wall time, tokens and the final message.
+
+Configuration in config.py (optional):
+    BATCH_DIR         — default: WORK_DIR/results/batch
+    BATCH_CONCURRENCY — sessions run at once (default: 3)
+"""
+
+import argparse
+import contextvars
+import glob
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import config
+import agent
+from runtime import ratelimit, session, telemetry
+from tools.remote_tools import _remote_base
+
+DEFAULT_SEED = ["designs", "scripts", "tb"]
+
+_SEED_IGNORE = shutil.ignore_patterns(".spill", ".telemetry", "batch", "__pycache__")
+
+
+def load_manifest(path: str) -> dict:
+    """Normalise a JSON or text manifest to {"concurrency", "tasks": [{name, task, seed, max_turns}]}."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".json") or text.lstrip().startswith(("{", "[")):
+        data = json.loads(text)
+    else:
+        data = [line.strip() for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    if isinstance(data, list):
+        data = {"tasks": data}
+    defaults = data.get("defaults", {})
+    tasks, seen = [], set()
+    for i, entry in enumerate(data.get("tasks", []), 1):
+        if isinstance(entry, str):
+            entry = {"task": entry}
+        if not entry.get("task"):
+            raise ValueError(f"task #{i} has no 'task' text")
+        name = re.sub(r"[^\w.-]+", "_", entry.get("name") or f"task-{i:02d}")
+        if name in seen:
+            raise ValueError(f"duplicate task name '{name}'")
+        seen.add(name)
+        tasks.append({
+            "name": name,
+            "task": entry["task"],
+            "seed": entry.get("seed", defaults.get("seed", DEFAULT_SEED)),
+            "max_turns": entry.get("max_turns", defaults.get("max_turns")),
+        })
+    if not tasks:
+        raise ValueError(f"{path}: no tasks")
+    return {"concurrency": data.get("concurrency"), "tasks": tasks}
+
+
+def run_batch(manifest: dict, jobs: int = None) -> dict:
+    """Run every task of *manifest*; return the summary written next to the sessions."""
+    batch_id = time.strftime("%Y%m%d-%H%M%S")
+    root = os.path.join(getattr(config, "BATCH_DIR", "") or os.path.join(config.WORK_DIR, "results", "batch"),
+                        batch_id)
+    remote_root = f"{_remote_base().rstrip('/')}/batch/{batch_id}"
+    jobs = max(1, int(jobs or manifest.get("concurrency") or getattr(config, "BATCH_CONCURRENCY", 3)))
+    os.makedirs(root, exist_ok=True)
+    session.install()
+    trace = telemetry.start(f"batch {batch_id}")
+
+    tasks = manifest["tasks"]
+    print(f"[batch] {batch_id}: {len(tasks)} task(s), {jobs} at a time → {root}")
+    if trace:
+        print(f"[batch] trace: {trace}")
+    start = time.monotonic()
+    rows = []
+    with ThreadPoolExecutor(max_workers=min(jobs, len(tasks)), thread_name_prefix="session") as pool:
+        futures = {
+            pool.submit(contextvars.copy_context().run, _run_task, spec, root, remote_root): spec
+            for spec in tasks
+        }
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            print(f"[batch] {row['name']:<20} {row['status']:<12} {row['turns']:>3} turn(s) "
+                  f"{row['wall_s']:>7.1f}s  ({len(rows)}/{len(tasks)} done)")
+
+    order = {spec["name"]: i for i, spec in enumerate(tasks)}
+    rows.sort(key=lambda r: order[r["name"]])
+    summary = {
+        "batch_id": batch_id,
+        "concurrency": jobs,
+        "wall_s": round(time.monotonic() - start, 1),
+        "tasks": rows,
+    }
+    with open(os.path.join(root, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1)
+    with open(os.path.join(root, "summary.md"), "w", encoding="utf-8") as f:
+        f.write(format_summary(summary) + "\n")
+
+    print()
+    print(format_summary(summary))
+    print(ratelimit.get_limiter().summary())
+    print(telemetry.summary())
+    telemetry.stop()
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    lines = [
+        f"# Batch {summary['batch_id']} — {len(summary['tasks'])} task(s), "
+        f"{summary['concurrency']} at a time, {summary['wall_s']:.0f}s wall",
+        "",
+        "| task | status | turns | tool calls | wall s | tokens in / cached / out | result |",
+        "|------|--------|------:|-----------:|-------:|--------------------------|--------|",
+    ]
+    for row in summary["tasks"]:
+        t = row.get("tokens") or {}
+        result = (row.get("error") or row.get("final_text") or "").replace("\n", " ").replace("|", "\\|")
+        lines.append(
+            f"| {row['name']} | {row['status']} | {row['turns']} | {row['tool_calls']} | {row['wall_s']:.0f} | "
+            f"{t.get('input', 0):,} / {t.get('cache_read', 0):,} / {t.get('output', 0):,} | "
+            f"{result[:160]}{'…' if len(result) > 160 else ''} |"
+        )
+    return "\n".join(lines)
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _run_task(spec: dict, root: str, remote_root: str) -> dict:
+    name = spec["name"]
+    work_dir = os.path.join(root, name)
+    remote_dir = f"{remote_root}/{name}"
+    row = {"name": name, "status": "error", "turns": 0, "tool_calls": 0, "wall_s": 0.0,
+           "work_dir": work_dir, "remote_dir": remote_dir, "log": os.path.join(work_dir, "session.log")}
+    start = time.monotonic()
+    try:
+        _seed(work_dir, spec["seed"])
+        with open(row["log"], "w", encoding="utf-8", buffering=1) as log, \
+                session.activate(session.Session(name, work_dir, remote_dir, log)):
+            outcome = agent.run_agent(_session_task(spec, remote_dir), max_turns=spec["max_turns"])
+        row.update(outcome)
+    except Exception as exc:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    row["wall_s"] = round(time.monotonic() - start, 1)
+    return row
+
+
+def _seed(work_dir: str, seed):
+    """Copy the *seed* paths (globs relative to the project) into a fresh session dir."""
+    os.makedirs(work_dir, exist_ok=True)
+    base = config.WORK_DIR
+    for pattern in seed:
+        for src in sorted(glob.glob(os.path.join(base, pattern))):
+            rel = os.path.relpath(src, base)
+            if rel.startswith(".."):
+                continue
+            dst = os.path.join(work_dir, rel)
+            if os.path.isdir(src):
+                shutil.copytree(src, dst, ignore=_SEED_IGNORE, dirs_exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copy2(src, dst)
+
+
+def _session_task(spec: dict, remote_dir: str) -> str:
+    # The remote location differs per session; say so in the task rather
+    # than the system prompt, which stays identical (and cached) across sessions.
+    return (
+        f"[Batch session '{spec['name']}'. This session's remote work directory is {remote_dir}: "
+        f"sync_to_remote uploads the project there, so cd into it in remote commands.]\n\n{spec['task']}"
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="batch.py", description="Run design tasks concurrently from a manifest.")
+    parser.add_argument("manifest", help="JSON manifest or text file with one task per line")
+    parser.add_argument("--jobs", type=int, help="sessions at once (default: manifest, then BATCH_CONCURRENCY)")
+    parser.add_argument("--only", help="comma-separated task names to run")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    if args.only:
+        wanted = set(args.only.split(","))
+        manifest["tasks"] = [t for t in manifest["tasks"] if t["name"] in wanted]
+        if not manifest["tasks"]:
+            parser.error(f"no task named {args.only}")
+    summary = run_batch(manifest, args.jobs)
+    return 0 if all(row["status"] == "completed" for row in summary["tasks"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""
+Offline benchmarks: the agent loop and the remote tools without the Claude
+API or ieng6.
+
+    bench/ssh_standin.py  in-process SSH/SFTP server standing in for ieng6
+    bench/sandbox.py      scratch project + remote dir wired into config
+    bench/replay.py       record a live session, replay it with a stub client
+    bench/run.py          the benchmark suite and baseline comparison
+"""
@@ -0,0 +1,238 @@
+"""
+Record a live agent session and replay it offline.
+
+A session file is JSON:
+
+    {"task": "...",
+     "turns": [{"stop_reason": "tool_use",
+                "usage": {"input_tokens": ..., "output_tokens": ..., ...},
+                "content": [{"type": "text", "text": "..."},
+                            {"type": "tool_use", "id": "...", "name": "...", "input": {...}}],
+                "ttft": 1.8, "seconds": 6.2}, ...]}
+
+ReplayClient stands in for anthropic.Anthropic(): each messages.stream()
+call serves the next recorded turn.  The tool calls in it are executed for
+real — against the sandbox's SSH stand-in for the remote tools — so a
+replay measures the agent loop and the tools, not the model.  With
+pace=True the recorded time-to-first-token and stream duration are slept
+as well, to reproduce the shape of the original session.
+
+    python -m bench.replay record "Synthesize the ALU" -o bench/sessions/my.json
+    python -m bench.replay play bench/sessions/alu_signoff.json [--pace]
+"""
+
+import argparse
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from bench.sandbox import load_config, sandbox
+
+
+def load_session(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        session = json.load(f)
+    if not session.get("turns"):
+        raise ValueError(f"{path}: no recorded turns")
+    return session
+
+
+def _namespace(value):
+    """JSON → attribute access, the shape agent.py expects of SDK objects."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_namespace(v) for v in value]
+    return value
+
+
+def _plain(block) -> dict:
+    """Convert a content block back to a request-side dict (tool inputs stay dicts)."""
+    if isinstance(block, dict):
+        return block
+    if hasattr(block, "model_dump"):
+        return block.model_dump(exclude_none=True)
+    return {k: v for k, v in vars(block).items() if v is not None}
+
+
+# ── Replay ────────────────────────────────────────────────────────────────────
+
+class _ReplayStream:
+    def __init__(self, turn: dict, pace: bool):
+        self._turn = turn
+        self._pace = pace
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        ttft = self._turn.get("ttft") or 0.0
+        if self._pace:
+            time.sleep(ttft)
+        yield SimpleNamespace(type="content_block_delta")
+        if self._pace:
+            time.sleep(max(0.0, (self._turn.get("seconds") or 0.0) - ttft))
+
+    def get_final_message(self):
+        message = _namespace({k: v for k, v in self._turn.items() if k not in ("content", "ttft", "seconds")})
+        content = []
+        for block in self._turn["content"]:
+            obj = _namespace({k: v for k, v in block.items() if k != "input"})
+            if "input" in block:
+                obj.input = block["input"]     # tool inputs are plain dicts in the SDK too
+            content.append(obj)
+        message.content = content
+        return message
+
+
+class _ReplayMessages:
+    def __init__(self, turns, pace):
+        self._turns = list(turns)
+        self._pace = pace
+        self.requests = []
+
+    def stream(self, **request):
+        if not self._turns:
+            raise RuntimeError("replay session exhausted: the agent asked for more turns than were recorded")
+        self.requests.append(request)
+        return _ReplayStream(self._turns.pop(0), self._pace)
+
+
+class ReplayClient:
+    """Drop-in for anthropic.Anthropic() that serves a recorded session."""
+
+    def __init__(self, session: dict, pace: bool = False):
+        self.messages = _ReplayMessages(session["turns"], pace)
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+class _RecordingStream:
+    def __init__(self, inner, turns):
+        self._inner = inner
+        self._turns = turns
+
+    def __enter__(self):
+        self._stream = self._inner.__enter__()
+        self._start = time.monotonic()
+        self._ttft = None
+        return self
+
+    def __exit__(self, *exc):
+        return self._inner.__exit__(*exc)
+
+    def __iter__(self):
+        for event in self._stream:
+            if self._ttft is None and event.type == "content_block_delta":
+                self._ttft = time.monotonic() - self._start
+            yield event
+
+    def get_final_message(self):
+        message = self._stream.get_final_message()
+        self._turns.append({
+            "stop_reason": message.stop_reason,
+            "usage": message.usage.model_dump(exclude_none=True),
+            "content": [_plain(block) for block in message.content],
+            "ttft": round(self._ttft or 0.0, 3),
+            "seconds": round(time.monotonic() - self._start, 3),
+        })
+        return message
+
+
+class _RecordingMessages:
+    def __init__(self, inner, turns):
+        self._inner = inner
+        self._turns = turns
+
+    def stream(self, **request):
+        return _RecordingStream(self._inner.stream(**request), self._turns)
+
+
+class RecordingClient:
+    """Wrap a real client and keep every response for save()."""
+
+    def __init__(self, client, task: str):
+        self.session = {"task": task, "turns": []}
+        self.messages = _RecordingMessages(client.messages, self.session["turns"])
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.session, f, indent=1)
+
+
+# ── Entry points ──────────────────────────────────────────────────────────────
+
+def replay(path: str, pace: bool = False) -> dict:
+    """Replay the session at *path* in a sandbox; return timing figures."""
+    session = load_session(path)
+    load_config()
+    import agent
+    from runtime import telemetry
+
+    # Time each turn's tool batch as a whole: calls overlap, so the sum of
+    # the individual tool spans would overstate it.
+    batches = []
+    execute_tools = agent.execute_tools
+
+    def timed_execute_tools(calls, on_result=None):
+        start = time.monotonic()
+        try:
+            return execute_tools(calls, on_result)
+        finally:
+            batches.append(time.monotonic() - start)
+
+    with sandbox():
+        client = ReplayClient(session, pace=pace)
+        agent.execute_tools = timed_execute_tools
+        start = time.monotonic()
+        try:
+            agent.run_agent(session["task"], client=client)
+        finally:
+            agent.execute_tools = execute_tools
+        wall = time.monotonic() - start
+        api_seconds = telemetry.total("api.stream")
+    turns = len(client.messages.requests)
+    tool_seconds = sum(batches)
+    return {
+        "turns": turns,
+        "tool_calls": sum(1 for t in session["turns"][:turns] for b in t["content"] if b.get("type") == "tool_use"),
+        "wall_s": wall,
+        "tool_s": tool_seconds,
+        "api_s": api_seconds,
+        "loop_overhead_ms_per_turn": 1000 * max(0.0, wall - tool_seconds - api_seconds) / max(1, turns),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.replay", description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="run a live session and save it")
+    rec.add_argument("task")
+    rec.add_argument("-o", "--output", required=True)
+    play = sub.add_parser("play", help="replay a recorded session offline")
+    play.add_argument("session")
+    play.add_argument("--pace", action="store_true", help="sleep the recorded API latencies too")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        load_config()
+        import anthropic
+        import agent
+
+        client = RecordingClient(anthropic.Anthropic(), args.task)
+        try:
+            agent.run_agent(args.task, client=client)
+        finally:
+            client.save(args.output)
+            print(f"[replay] recorded {len(client.session['turns'])} turn(s) → {args.output}")
+    else:
+        stats = replay(args.session, pace=args.pace)
+        print(json.dumps(stats, indent=1))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+"""
+Benchmark suite: repeatable numbers for the agent loop and the remote tools
+without the Claude API or ieng6.
+
+    python -m bench.run                       # every benchmark
+    python -m bench.run sync command          # a subset
+    python -m bench.run --save bench/baseline.json
+    python -m bench.run --baseline bench/baseline.json --tolerance 0.25
+
+Benchmarks (see BENCHMARKS):
+    sync      sync_to_remote throughput over the stand-in: full upload via
+              SFTP and via the archive stream, and a no-op resync; the
+              download_results mirror back: full fetch and a no-op re-mirror
+    command   per-command overhead of run_remote_command: persistent shell,
+              one-shot script, and a cold shell (connect + env load)
+    dispatch  speedup of the concurrent tool dispatcher over serial
+              execution for one turn of report reads, a remote and a local
+              command
+    parse     report-parsing speed on the bundled results/ files: get_qor,
+              DEF and gate-level netlist parsing, read_file grep of a log
+    replay    bench/sessions/*.json replayed through the stubbed client:
+              wall time and agent-loop overhead per turn
+    startup   fresh interpreters: time until `agent.py` shows its task
+              prompt, until `batch.py --help` exits, and to import agent
+
+Each benchmark runs in a fresh sandbox (bench/sandbox.py), repeats its
+measurement --repeat times and reports the median.  With --baseline every
+metric is compared to a saved run and the exit status is 1 when any of them
+got worse by more than --tolerance (a fraction), so the suite can gate a
+deployment.  --latency adds a fixed delay to every exec request on the
+stand-in to approximate the round trip to ieng6.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from bench.sandbox import REPO, load_config, sandbox
+
+# Synthetic tree for the sync benchmark: (count, bytes per file).
+_SYNC_SMALL = (300, 4096)
+_SYNC_LARGE = (4, 2 * 1024 * 1024)
+
+
+class Metric:
+    def __init__(self, name: str, value: float, unit: str, better: str = "lower"):
+        self.name = name
+        self.value = value
+        self.unit = unit
+        self.better = better          # "lower" or "higher"
+
+    def to_dict(self) -> dict:
+        return {"value": self.value, "unit": self.unit, "better": self.better}
+
+
+def _median_time(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Tools and the agent loop print progress; keep the report readable."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ── Benchmarks ────────────────────────────────────────────────────────────────
+
+def bench_sync(repeat: int, latency: float) -> list:
+    import config
+    from tools import result_mirror, sync_engine
+
+    with sandbox(latency=latency, dirs=()) as sb:
+        line = b"assign y = a & b; // padding padding padding padding padding\n"
+        for prefix, (count, size) in (("small", _SYNC_SMALL), ("large", _SYNC_LARGE)):
+            folder = os.path.join(sb.work_dir, "designs", prefix)
+            os.makedirs(folder, exist_ok=True)
+            body = (line * (size // len(line) + 1))[:size]
+            for i in range(count):
+                with open(os.path.join(folder, f"m{i:04d}.v"), "wb") as f:
+                    f.write(body)
+        total_mb = sum(count * size for count, size in (_SYNC_SMALL, _SYNC_LARGE)) / 1e6
+        files = _SYNC_SMALL[0] + _SYNC_LARGE[0]
+
+        def full(mode):
+            result = sync_engine.sync(config.REMOTE_WORK_DIR, force=True, mode=mode)
+            if result.failed:
+                raise RuntimeError(f"sync failed: {next(iter(result.failed.values()))}")
+
+        full("sftp")                  # warm the pool and the hash cache
+        sftp = _median_time(lambda: full("sftp"), repeat)
+        archive = _median_time(lambda: full("archive"), repeat)
+        noop = _median_time(lambda: sync_engine.sync(config.REMOTE_WORK_DIR), repeat)
+
+        local = os.path.join(sb.work_dir, "results", "mirror")
+        remote = config.REMOTE_WORK_DIR + "/designs"
+
+        def fetch_all():
+            shutil.rmtree(local, ignore_errors=True)
+            result_mirror.mirror(remote, local)
+
+        fetch = _median_time(fetch_all, repeat)
+        mirror_noop = _median_time(lambda: result_mirror.mirror(remote, local), repeat)
+    return [
+        Metric("sftp_MB_per_s", total_mb / sftp, "MB/s", "higher"),
+        Metric("sftp_files_per_s", files / sftp, "files/s", "higher"),
+        Metric("archive_MB_per_s", total_mb / archive, "MB/s", "higher"),
+        Metric("noop_resync_ms", 1000 * noop, "ms"),
+        Metric("mirror_MB_per_s", total_mb / fetch, "MB/s", "higher"),
+        Metric("noop_mirror_ms", 1000 * mirror_noop, "ms"),
+    ]
+
+
+def bench_command(repeat: int, latency: float) -> list:
+    import config
+    from tools import remote_shell, remote_tools
+
+    runs = max(5, 10 * repeat)
+    with sandbox(latency=latency, dirs=()):
+        def cold():
+            remote_shell.close_all()
+            remote_tools._run_remote_command("true")
+
+        with _quiet():
+            cold_s = _median_time(cold, repeat)
+            remote_tools._run_remote_command("true")
+            shell_s = _median_time(lambda: remote_tools._run_remote_command("true"), runs)
+            config.REMOTE_PERSISTENT_SHELL = False
+            try:
+                script_s = _median_time(lambda: remote_tools._run_remote_command("true"), max(3, repeat * 3))
+            finally:
+                config.REMOTE_PERSISTENT_SHELL = True
+    return [
+        Metric("shell_cmd_ms", 1000 * shell_s, "ms"),
+        Metric("script_cmd_ms", 1000 * script_s, "ms"),
+        Metric("cold_shell_cmd_ms", 1000 * cold_s, "ms"),
+    ]
+
+
+def bench_dispatch(repeat: int, latency: float) -> list:
+    import config
+    from tools import execute_tools
+
+    # A typical turn: reads of the last run's reports, then a remote EDA step
+    # and a local simulation.  Remote commands all write the remote work dir,
+    # so the dispatcher (correctly) never overlaps two of them.
+    calls = [
+        ("get_qor", {"directory": "results/synth_alu"}),
+        ("get_qor", {"directory": "results/innovus_alu"}),
+        ("read_file", {"path": "results/innovus_alu/innovus_run.log", "grep": "(?i)warn", "max_matches": 5}),
+        ("list_files", {"directory": "results"}),
+        ("run_remote_command", {"command": "sleep 0.3"}),
+        ("run_local_command", {"command": "sleep 0.3"}),
+    ]
+    with sandbox(latency=latency, TOOL_CONCURRENCY={"local": 4, "remote": 4}):
+        with _quiet():
+            execute_tools(calls)          # start the shell, warm the caches
+            config.PARALLEL_TOOL_CALLS = False
+            serial = _median_time(lambda: execute_tools(calls), repeat)
+            config.PARALLEL_TOOL_CALLS = True
+            parallel = _median_time(lambda: execute_tools(calls), repeat)
+    return [
+        Metric("serial_turn_s", serial, "s"),
+        Metric("parallel_turn_s", parallel, "s"),
+        Metric("speedup", serial / parallel, "x", "higher"),
+    ]
+
+
+def bench_parse(repeat: int, latency: float) -> list:
+    from tools import def_parser, execute_tool, line_index, netlist_graph, qor_parsers
+
+    repeat = max(3, repeat * 3)
+    with sandbox(latency=latency, dirs=("results",)) as sb:
+        results = os.path.join(sb.work_dir, "results")
+        log = "results/innovus_alu/innovus_run.log"
+
+        def grep_log():
+            line_index.invalidate(os.path.join(sb.work_dir, log))
+            execute_tool("read_file", {"path": log, "grep": "(?i)error|warn"})
+
+        return [
+            Metric("get_qor_synth_ms", 1000 * _median_time(
+                lambda: qor_parsers.parse_directory(os.path.join(results, "synth_alu")), repeat), "ms"),
+            Metric("get_qor_innovus_ms", 1000 * _median_time(
+                lambda: qor_parsers.parse_directory(os.path.join(results, "innovus_alu")), repeat), "ms"),
+            Metric("parse_def_ms", 1000 * _median_time(
+                lambda: def_parser.parse_def(os.path.join(results, "innovus_alu", "alu_8bit_final.def")), repeat), "ms"),
+            Metric("parse_netlist_ms", 1000 * _median_time(
+                lambda: netlist_graph.parse_netlist(os.path.join(results, "innovus_alu", "alu_8bit_postroute.v")),
+                repeat), "ms"),
+            Metric("grep_log_ms", 1000 * _median_time(grep_log, repeat), "ms"),
+        ]
+
+
+def bench_replay(repeat: int, latency: float) -> list:
+    from bench import replay
+
+    metrics = []
+    for path in sorted(glob.glob(os.path.join(REPO, "bench", "sessions", "*.json"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        runs = []
+        for _ in range(repeat):
+            with _quiet():
+                runs.append(replay.replay(path))
+        metrics.append(Metric(f"{name}_wall_s", statistics.median(r["wall_s"] for r in runs), "s"))
+        metrics.append(Metric(f"{name}_loop_ms_per_turn",
+                              statistics.median(r["loop_overhead_ms_per_turn"] for r in runs), "ms"))
+    return metrics
+
+
+# Child bootstrap: config.py may be missing (see bench/sandbox.py), so load
+# it the same way before running the script under test.
+_BOOT = (
+    "import sys, runpy; sys.path.insert(0, {repo!r}); "
+    "from bench.sandbox import load_config; load_config(); "
+    "sys.argv = {argv!r}; runpy.run_path(sys.argv[0], run_name='__main__')"
+)
+
+
+def _spawn(argv: list, **kwargs):
+    code = _BOOT.format(repo=REPO, argv=[os.path.join(REPO, argv[0])] + argv[1:])
+    return subprocess.Popen([sys.executable, "-u", "-c", code], cwd=REPO, **kwargs)
+
+
+def _time_to_prompt(prompt: bytes = b"Task> ", timeout: float = 60.0) -> float:
+    """Seconds from spawning `agent.py` until *prompt* is on its stdout."""
+    start = time.perf_counter()
+    proc = _spawn(["agent.py"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    seen = b""
+    try:
+        while prompt not in seen:
+            chunk = os.read(proc.stdout.fileno(), 4096)
+            if not chunk or time.perf_counter() - start > timeout:
+                raise RuntimeError(f"agent.py exited or hung before its prompt: {seen[-200:]!r}")
+            seen += chunk
+        return time.perf_counter() - start
+    finally:
+        proc.stdin.close()           # EOF at the prompt: the agent exits
+        proc.stdout.close()
+        proc.wait(timeout=timeout)
+
+
+def _time_to_exit(argv: list) -> float:
+    start = time.perf_counter()
+    proc = _spawn(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if proc.wait(timeout=60) != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited {proc.returncode}")
+    return time.perf_counter() - start
+
+
+def bench_startup(repeat: int, latency: float) -> list:
+    runs = max(3, repeat * 2)
+    import_code = ("import sys, time; sys.path.insert(0, {!r}); from bench.sandbox import load_config; "
+                   "load_config(); t = time.perf_counter(); import agent; print(time.perf_counter() - t)").format(REPO)
+
+    def import_agent() -> float:
+        out = subprocess.run([sys.executable, "-c", import_code], cwd=REPO, capture_output=True, text=True,
+                             check=True, timeout=60).stdout
+        return float(out.strip().splitlines()[-1])
+
+    return [
+        Metric("cli_prompt_ms", 1000 * statistics.median(_time_to_prompt() for _ in range(runs)), "ms"),
+        Metric("batch_help_ms", 1000 * statistics.median(_time_to_exit(["batch.py", "--help"])
+                                                         for _ in range(runs)), "ms"),
+        Metric("import_agent_ms", 1000 * statistics.median(import_agent() for _ in range(runs)), "ms"),
+    ]
+
+
+BENCHMARKS = {
+    "sync": bench_sync,
+    "command": bench_command,
+    "dispatch": bench_dispatch,
+    "parse": bench_parse,
+    "replay": bench_replay,
+    "startup": bench_startup,
+}
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────────
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Return "bench.metric: old → new" lines for metrics worse than *tolerance*."""
+    regressions = []
+    for key, metric in current.items():
+        old = baseline.get(key)
+        if not old or not old.get("value"):
+            continue
+        ratio = metric["value"] / old["value"]
+        worse = ratio < 1 - tolerance if metric["better"] == "higher" else ratio > 1 + tolerance
+        if worse:
+            regressions.append(f"{key}: {old['value']:.3g} → {metric['value']:.3g} {metric['unit']}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCH",
+                        help=f"subset to run ({', '.join(BENCHMARKS)}; default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="measurements per metric (median reported)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every stand-in exec")
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--baseline", help="compare with a saved run; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown fraction (default 0.25)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    load_config()
+    current = {}
+    print(f"{'benchmark':<34} {'value':>12}  unit")
+    for name in args.benchmarks or list(BENCHMARKS):
+        start = time.monotonic()
+        metrics = BENCHMARKS[name](max(1, args.repeat), args.latency)
+        for m in metrics:
+            current[f"{name}.{m.name}"] = m.to_dict()
+            print(f"{name + '.' + m.name:<34} {m.value:>12.3f}  {m.unit}")
+        print(f"{'':<34} {'':>12}  ({name}: {time.monotonic() - start:.1f}s)")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "latency": args.latency,
+                       "metrics": current}, f, indent=1, sort_keys=True)
+        print(f"saved → {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["metrics"]
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nno regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
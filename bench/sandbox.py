@@ -0,0 +1,99 @@
+"""
+Offline environment for the benchmarks: a scratch copy of the project, a
+scratch "remote" work dir and the in-process SSH stand-in, wired into
+config for the duration of a `with sandbox():` block.
+
+config.py holds real credentials and may not exist on a CI box, so
+load_config() falls back to config.example.py; everything a benchmark
+depends on is overridden inside the sandbox anyway.
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Project directories copied into the scratch work dir.
+PROJECT_DIRS = ("designs", "scripts", "tb", "results")
+
+
+def load_config():
+    """Import config, falling back to config.example.py when config.py is absent."""
+    if REPO not in sys.path:
+        sys.path.insert(0, REPO)
+    try:
+        import config
+    except ImportError:
+        spec = importlib.util.spec_from_file_location("config", os.path.join(REPO, "config.example.py"))
+        config = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(config)
+        sys.modules["config"] = config
+    return config
+
+
+class Sandbox:
+    def __init__(self, server, work_dir, remote_dir):
+        self.server = server
+        self.work_dir = work_dir
+        self.remote_dir = remote_dir
+
+
+@contextmanager
+def sandbox(latency: float = 0.0, dirs=PROJECT_DIRS, **overrides):
+    """
+    Point config at a fresh stand-in server and scratch directories.
+
+    *latency* delays every exec request on the stand-in (a crude model of
+    the round trip to ieng6); *overrides* are extra config values.  The
+    previous config values are restored and pooled connections and remote
+    shells closed on exit.
+    """
+    config = load_config()
+    from bench.ssh_standin import SSHStandIn
+    from tools import remote_shell, ssh_pool
+
+    root = tempfile.mkdtemp(prefix="ic_bench_")
+    work_dir = os.path.join(root, "work")
+    remote_dir = os.path.join(root, "remote")
+    os.makedirs(work_dir)
+    os.makedirs(remote_dir)
+    for name in dirs:
+        src = os.path.join(REPO, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(work_dir, name),
+                            ignore=shutil.ignore_patterns(".spill", ".telemetry"))
+
+    server = SSHStandIn(latency=latency, cwd=remote_dir)
+    values = {
+        "WORK_DIR": work_dir,
+        "REMOTE_HOST": "127.0.0.1",
+        "REMOTE_PORT": server.port,
+        "REMOTE_USER": "bench",
+        "REMOTE_PASSWORD": "bench",
+        "REMOTE_KEY": "",
+        "REMOTE_WORK_DIR": remote_dir,
+        "TELEMETRY": True,
+        "TELEMETRY_DIR": os.path.join(root, "telemetry"),
+        **overrides,
+    }
+    missing = object()
+    saved = {key: getattr(config, key, missing) for key in values}
+    for key, value in values.items():
+        setattr(config, key, value)
+    try:
+        yield Sandbox(server, work_dir, remote_dir)
+    finally:
+        remote_shell.close_all()
+        ssh_pool.get_pool().close_all()
+        server.close()
+        for key, value in saved.items():
+            if value is missing:
+                delattr(config, key)
+            else:
+                setattr(config, key, value)
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(server.home, ignore_errors=True)
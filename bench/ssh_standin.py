@@ -0,0 +1,213 @@
+"""
+In-process SSH/SFTP server standing in for ieng6.
+
+Good enough for everything tools/remote_tools.py, remote_shell.py,
+sync_engine.py and archive_transfer.py do: password auth, exec channels
+(with or without a PTY request), stdin/stdout/stderr streaming, exit
+statuses and the SFTP subsystem on the local filesystem.  Exec commands
+run under local bash with HOME pointed at a scratch directory, which holds
+a stub ~/.eda_env so the EDA-environment step of every remote command is
+cheap and identical from run to run.  They start in *cwd* (default: that
+home), so recorded commands with project-relative paths still resolve.
+
+    server = SSHStandIn(latency=0.02, cwd=remote_dir)
+    server.port, server.home, server.stats
+    server.close()
+"""
+
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+import paramiko
+from paramiko import SFTP_OK, SFTPAttributes, SFTPHandle, SFTPServer, SFTPServerInterface
+
+EDA_ENV_STUB = "export EDA_STANDIN=1\n"
+
+
+class _Handle(SFTPHandle):
+    def stat(self):
+        try:
+            return SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as exc:
+            return SFTPServer.convert_errno(exc.errno)
+
+    def chattr(self, attr):
+        return SFTP_OK
+
+
+class _SFTP(SFTPServerInterface):
+    """SFTP subsystem backed directly by the local filesystem."""
+
+    def list_folder(self, path):
+        try:
+            out = []
+            for name in os.listdir(path):
+                attr = SFTPAttributes.from_stat(os.stat(os.path.join(path, name)))
+                attr.filename = name
+                out.append(attr)
+            return out
+        except OSError as exc:
+            return SFTPServer.convert_errno(exc.errno)
+
+    def stat(self, path):
+        try:
+            return SFTPAttributes.from_stat(os.stat(path))
+        except OSError as exc:
+            return SFTPServer.convert_errno(exc.errno)
+
+    def lstat(self, path):
+        try:
+            return SFTPAttributes.from_stat(os.lstat(path))
+        except OSError as exc:
+            return SFTPServer.convert_errno(exc.errno)
+
+    def open(self, path, flags, attr):
+        try:
+            fd = os.open(path, flags, 0o644)
+        except OSError as exc:
+            return SFTPServer.convert_errno(exc.errno)
+        if flags & os.O_WRONLY:
+            mode = "ab" if flags & os.O_APPEND else "wb"
+        elif flags & os.O_RDWR:
+            mode = "a+b" if flags & os.O_APPEND else "r+b"
+        else:
+            mode = "rb"
+        handle = _Handle(flags)
+        handle.filename = path
+        handle.readfile = handle.writefile = os.fdopen(fd, mode)
+        return handle
+
+    def remove(self, path):
+        return self._call(os.remove, path)
+
+    def rename(self, old, new):
+        return self._call(os.replace, old, new)
+
+    posix_rename = rename
+
+    def mkdir(self, path, attr):
+        return self._call(os.mkdir, path)
+
+    def rmdir(self, path):
+        return self._call(os.rmdir, path)
+
+    def chattr(self, path, attr):
+        if attr.st_mtime is None:
+            return SFTP_OK
+        return self._call(os.utime, path, (attr.st_atime or attr.st_mtime, attr.st_mtime))
+
+    def canonicalize(self, path):
+        return os.path.normpath(path if os.path.isabs(path) else os.path.join("/", path))
+
+    @staticmethod
+    def _call(func, *args):
+        try:
+            func(*args)
+        except OSError as exc:
+            return SFTPServer.convert_errno(exc.errno)
+        return SFTP_OK
+
+
+class _Server(paramiko.ServerInterface):
+    def __init__(self, standin):
+        self.standin = standin
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        self.standin.stats["exec"] += 1
+        threading.Thread(target=self.standin._exec, args=(channel, command.decode()), daemon=True).start()
+        return True
+
+
+class SSHStandIn:
+    """Listen on a free localhost port until close(); see the module docstring."""
+
+    def __init__(self, latency: float = 0.0, cwd: str = None):
+        self.latency = latency
+        self.home = tempfile.mkdtemp(prefix="ssh_standin_home_")
+        with open(os.path.join(self.home, ".eda_env"), "w") as f:
+            f.write(EDA_ENV_STUB)
+        self.cwd = cwd or self.home
+        self.env = dict(os.environ, HOME=self.home)
+        self.stats = {"connections": 0, "exec": 0}
+        self._key = paramiko.RSAKey.generate(2048)
+        self._transports = []
+        self._sock = socket.socket()
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(64)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept, name="ssh-standin", daemon=True).start()
+
+    def close(self):
+        self._sock.close()
+        for transport in self._transports:
+            transport.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.stats["connections"] += 1
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self._key)
+            transport.set_subsystem_handler("sftp", SFTPServer, _SFTP)
+            transport.start_server(server=_Server(self))
+            self._transports.append(transport)
+
+    def _exec(self, channel, command):
+        if self.latency:
+            time.sleep(self.latency)
+        proc = subprocess.Popen(["bash", "-c", command], cwd=self.cwd, env=self.env,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        def pump_in():
+            try:
+                while True:
+                    data = channel.recv(32768)
+                    if not data:
+                        break
+                    proc.stdin.write(data)
+                    proc.stdin.flush()
+            except Exception:
+                pass
+            finally:
+                try:
+                    proc.stdin.close()
+                except Exception:
+                    pass
+
+        def pump(src, send):
+            for chunk in iter(lambda: src.read1(32768), b""):
+                try:
+                    send(chunk)
+                except (OSError, EOFError):
+                    proc.kill()          # the client closed the channel first
+                    return
+
+        threading.Thread(target=pump_in, daemon=True).start()
+        err = threading.Thread(target=pump, args=(proc.stderr, channel.sendall_stderr), daemon=True)
+        err.start()
+        pump(proc.stdout, channel.sendall)
+        err.join()
+        channel.send_exit_status(proc.wait())
+        channel.shutdown_write()
+        time.sleep(0.05)
+        channel.close()
@@ -15,9 +15,97 @@ REMOTE_PASSWORD = "YOUR_PASSWORD"     # leave empty if using SSH key
 REMOTE_KEY  = ""                      # path to SSH key, or leave empty for password auth
 REMOTE_WORK_DIR = "/home/linux/ieng6/YOUR_USERNAME/ic_agent"
 REMOTE_PREP_COURSE = "ECE260B_WI26_A00"  # course label passed to `prep -l <COURSE>` on ieng6
+REMOTE_PORT = 22
+
+# ── SSH connection pool (tools/ssh_pool.py) ──────────────────────────────────
+SSH_POOL_MAX_CONNECTIONS = 4      # connections per host
+SSH_KEEPALIVE_INTERVAL   = 30     # seconds between keepalive packets
+SSH_IDLE_TIMEOUT         = 600    # close connections idle this long (seconds)
+
+# ── Persistent remote shell (tools/remote_shell.py) ────────────────────────
+REMOTE_PERSISTENT_SHELL = True    # load the EDA environment once per session
+REMOTE_SHELL_MAX        = 2       # concurrent remote shells
+
+# ── Transfers (tools/sync_engine.py, tools/archive_transfer.py) ──────────────
+SYNC_PARALLEL_CHANNELS = 4        # concurrent SFTP transfers
+ARCHIVE_MIN_FILES      = 8        # stream a tar.gz instead from this many files on
+
+# ── Synthesis / P&R result cache (tools/run_cache.py) ───────────────────────
+RUN_CACHE             = True       # reuse results when script, inputs and tool version match
+RUN_CACHE_MAX_ENTRIES = 32
+RUN_CACHE_MAX_BYTES   = 1 << 30    # 1 GB
+# EDA_TOOL_VERSIONS = {"dc": "K-2015.06-SP1", "innovus": "v21.10-p004_1"}  # skip the version probe
+
+# ── EDA licenses (tools/licenses.py) ─────────────────────────────────────────
+MAX_PARALLEL_LICENSES = 2     # licensed runs at once across commands, jobs, sweeps and sessions
+# LICENSED_TOOLS = ["dc_shell", "innovus", "vcs"]   # executables that check out a license
+LICENSE_POLL_INTERVAL = 15    # seconds between checks of detached jobs while waiting
+LICENSE_WAIT_TIMEOUT  = 900   # longest wait for a slot when submitting a job
+
+# ── EDA log watcher (tools/log_watch.py) ─────────────────────────────────────
+LOG_WATCH       = True        # classify DC / Innovus output as it arrives
+LOG_WATCH_ABORT = True        # stop a command or job at its first fatal error
+# LOG_WATCH_RULES = [("lib_missing", "fatal", r"^Error: .*no such library", "check link_library")]
+
+# ── Design-space sweeps (tools/sweep.py) ─────────────────────────────────────
+SWEEP_MAX_VARIANTS    = 16
+SWEEP_POLL_INTERVAL   = 15    # seconds
+
+# ── QoR history (tools/qor_history.py) ───────────────────────────────────────
+QOR_HISTORY = True            # record every parsed synthesis / P&R result
+# QOR_HISTORY_DB = "/path/to/qor_history.sqlite"   # default: results/.qor_history.sqlite
+
+# ── DEF queries (tools/def_parser.py) ────────────────────────────────────────
+# DEF_LEF_FILES   = ["pdk/lef/*.lef"]   # cell footprints; default: summaryReport area / row height
+DEF_CACHE_DESIGNS = 4                   # parsed DEFs kept in memory
+
+# ── Netlist queries (tools/netlist_graph.py) ─────────────────────────────────
+# NETLIST_OUTPUT_PINS = ["QB1"]        # library output pins beyond Z/ZN/Q/QN/S/CO/...
+NETLIST_CACHE_GRAPHS = 4               # parsed netlists kept in memory
+
+# ── Local jobs (tools/local_jobs.py) ──────────────────────────────────────────
+LOCAL_JOB_BUFFER = 256 * 1024   # output bytes kept in memory per command; older output spills to disk
+LOCAL_JOB_KEEP   = 50           # finished jobs whose output stays readable
+
+# ── Local regression (tools/regression.py) ───────────────────────────────────
+# SIM_JOBS       = 8          # parallel iverilog/vvp processes (default: all cores)
+SIM_TIMEOUT    = 120          # per-simulation timeout (seconds)
+IVERILOG_FLAGS = "-g2012"
 
 # ── Claude model ─────────────────────────────────────────────────────────────
 MODEL = "claude-opus-4-6"
+PROMPT_CACHE     = True   # cache breakpoints on system prompt, tools and history
+PROMPT_CACHE_TTL = "5m"   # or "1h" for sessions with long remote runs between turns
+
+# ── API pacing and retries (runtime/ratelimit.py) ──────────────────────────
+RATE_LIMIT            = True   # pace requests with buckets learned from rate-limit headers
+RATE_LIMIT_INPUT_TPM  = 0      # starting guesses until headers arrive (0 = unknown)
+RATE_LIMIT_OUTPUT_TPM = 0
+RATE_LIMIT_RPM        = 0
+API_MAX_RETRIES       = 8      # retries on 429 / 529 / 5xx / connection errors
+API_BACKOFF_MAX       = 120    # longest single wait (seconds)
+
+# ── Conversation compaction (runtime/compaction.py) ─────────────────────────
+COMPACT_TOKEN_BUDGET = 80000   # spill old tool results once the prompt exceeds this (0 = off)
+COMPACT_KEEP_TURNS   = 4       # most recent turns are never compacted
+COMPACT_MIN_CHARS    = 2000    # only spill tool results at least this long
+
+# ── Session checkpoints (runtime/checkpoint.py) ──────────────────────────────
+CHECKPOINT     = True   # append each turn to a JSONL log so `agent.py --resume` can continue it
+CHECKPOINT_DIR = ""     # default: WORK_DIR/results/.sessions
+
+# ── Telemetry (runtime/telemetry.py) ─────────────────────────────────────────
+TELEMETRY     = True   # JSONL timing trace + end-of-run summary table
+TELEMETRY_DIR = ""     # default: WORK_DIR/results/.telemetry
+
+# ── Tool dispatch (tools/__init__.py) ───────────────────────────────────────
+PARALLEL_TOOL_CALLS = True                     # overlap independent calls of one turn
+TOOL_CONCURRENCY    = {"local": 4, "remote": 4}  # max concurrent calls per backend
+READ_FILE_MAX_LINES = 400                      # read_file page size for large files
+
+# ── Batch mode (batch.py) ────────────────────────────────────────────────────
+BATCH_DIR         = ""   # default: WORK_DIR/results/batch
+BATCH_CONCURRENCY = 3    # sessions running at once
 
 # ── Safety limits ────────────────────────────────────────────────────────────
 MAX_AGENT_TURNS = 40
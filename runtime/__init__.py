@@ -0,0 +1,4 @@
+"""
+Agent-loop runtime support: everything around the Claude API call in
+agent.py that is not a tool (prompt caching, context management, ...).
+"""
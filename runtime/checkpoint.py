@@ -0,0 +1,245 @@
+"""
+Append-only session checkpoints, so a crashed run can be resumed.
+
+A run that dies at turn 35 — a dropped connection, an SDK error, a killed
+terminal — used to lose its whole conversation, and the rerun repeated
+every synthesis and P&R step.  run_agent now appends one compact JSON line
+per event to CHECKPOINT_DIR/<session_id>.jsonl as it happens:
+
+    {"k":"start","id":...,"task":...,"ts":...}         once
+    {"k":"assistant","turn":3,"stop":"tool_use","content":[...],"usage":{...}}
+    {"k":"result","turn":3,"id":"toolu_...","content":"..."}   per finished tool call
+    {"k":"turn","turn":3,"prompt":41230,"jobs":[...]}  turn complete
+    {"k":"note","text":"..."}                          text added to the last user message
+    {"k":"end","status":"completed"}
+
+Each line is written with one write() and flushed; the file is fsynced at
+every "turn" record.  A torn last line (the process died mid-write) is
+ignored on load.  "jobs" holds the records of the remote jobs submitted
+during the session (tools/remote_jobs.py) and is only written when they
+changed since the last turn.
+
+`load()` rebuilds the message list up to the last complete turn.  When the
+run died in the middle of a turn, the assistant message and the results of
+the tool calls that had finished are kept, so resuming runs only the calls
+that never completed — a finished synthesis is not started again.
+
+    python agent.py --resume                 # latest session
+    python agent.py --resume 20261017-1412-a3f9
+
+Configuration in config.py (optional):
+    CHECKPOINT     — set False to write no checkpoints
+    CHECKPOINT_DIR — default: WORK_DIR/results/.sessions
+"""
+
+import glob
+import json
+import os
+import secrets
+import time
+
+import config
+
+_SUFFIX = ".jsonl"
+
+
+def enabled() -> bool:
+    return bool(getattr(config, "CHECKPOINT", True))
+
+
+def checkpoint_dir() -> str:
+    return getattr(config, "CHECKPOINT_DIR", "") or os.path.join(config.WORK_DIR, "results", ".sessions")
+
+
+def find(ref: str = None) -> str:
+    """Path of the checkpoint named by *ref*: a path, a session id, or None for the latest."""
+    if ref and os.path.isfile(ref):
+        return ref
+    if ref and ref != "latest":
+        path = os.path.join(checkpoint_dir(), ref + ("" if ref.endswith(_SUFFIX) else _SUFFIX))
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"no checkpoint '{ref}' in {checkpoint_dir()}")
+        return path
+    paths = glob.glob(os.path.join(checkpoint_dir(), "*" + _SUFFIX))
+    if not paths:
+        raise FileNotFoundError(f"no checkpoints in {checkpoint_dir()}")
+    return max(paths, key=os.path.getmtime)
+
+
+class Checkpoint:
+    """Writer for one session's checkpoint file."""
+
+    def __init__(self, path: str, session_id: str, started: float):
+        self.path = path
+        self.session_id = session_id
+        self.started = started
+        self._jobs = None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def create(cls, task: str) -> "Checkpoint":
+        session_id = time.strftime("%Y%m%d-%H%M") + "-" + secrets.token_hex(2)
+        ckpt = cls(os.path.join(checkpoint_dir(), session_id + _SUFFIX), session_id, time.time())
+        ckpt._write({"k": "start", "id": session_id, "task": task, "ts": round(ckpt.started, 3),
+                     "model": getattr(config, "MODEL", "")})
+        return ckpt
+
+    @classmethod
+    def reopen(cls, state: "State") -> "Checkpoint":
+        # Cut a torn final line so the next record starts on a line of its own.
+        with open(state.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+        ckpt = cls(state.path, state.session_id, state.started)
+        ckpt._jobs = state.jobs
+        return ckpt
+
+    def assistant(self, turn: int, response):
+        self._write({
+            "k": "assistant", "turn": turn, "stop": response.stop_reason,
+            "content": [plain(block) for block in response.content],
+            "usage": plain(response.usage),
+        })
+
+    def result(self, turn: int, tool_use_id: str, content: str):
+        self._write({"k": "result", "turn": turn, "id": tool_use_id, "content": content})
+
+    def turn(self, turn: int, prompt_tokens: int, jobs: list):
+        line = {"k": "turn", "turn": turn, "prompt": prompt_tokens}
+        if jobs != self._jobs:
+            line["jobs"] = jobs
+            self._jobs = jobs
+        self._write(line, sync=True)
+
+    def note(self, text: str):
+        self._write({"k": "note", "text": text})
+
+    def end(self, status: str):
+        self._write({"k": "end", "status": status}, sync=True)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def _write(self, line: dict, sync: bool = False):
+        self._file.write(json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+
+# ── Loading ───────────────────────────────────────────────────────────────────
+
+class State:
+    """A session rebuilt from its checkpoint."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.session_id = os.path.basename(path)[:-len(_SUFFIX)]
+        self.task = ""
+        self.started = 0.0
+        self.messages = []
+        self.turns = 0               # complete turns
+        self.usages = []             # usage dict of every recorded response
+        self.prompt_tokens = 0
+        self.jobs = None
+        self.status = None           # set once the session ended
+        self.final_text = ""
+        # An interrupted turn: its assistant content and the results that
+        # were recorded before the process died ({tool_use_id: content}).
+        self.pending = None
+        self.pending_results = {}
+
+    @property
+    def tool_calls(self) -> int:
+        return sum(1 for msg in self.messages if msg["role"] == "assistant"
+                   for block in msg["content"] if block.get("type") == "tool_use")
+
+
+def load(path: str) -> State:
+    """Rebuild the conversation recorded in *path* up to its last complete turn."""
+    state = State(path)
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    for i, raw in enumerate(lines):
+        if not raw.strip():
+            continue
+        try:
+            line = json.loads(raw)
+        except ValueError:
+            if i >= len(lines) - 2:
+                break                # torn final write
+            raise ValueError(f"{path}:{i + 1}: corrupt checkpoint line")
+        kind = line.get("k")
+        if kind == "start":
+            state.session_id = line["id"]
+            state.task = line["task"]
+            state.started = line["ts"]
+            state.messages = [{"role": "user", "content": line["task"]}]
+        elif kind == "assistant":
+            state.status = None      # an earlier run hit max_turns; this one went on
+            state.pending = line
+            state.pending_results = {}
+            state.usages.append(line.get("usage") or {})
+            for block in line["content"]:
+                if block.get("type") == "text":
+                    state.final_text = block["text"]
+        elif kind == "result":
+            state.pending_results[line["id"]] = line["content"]
+        elif kind == "turn":
+            _commit_turn(state)
+            state.turns = line["turn"] + 1
+            state.prompt_tokens = line.get("prompt", 0)
+            if "jobs" in line:
+                state.jobs = line["jobs"]
+        elif kind == "note":
+            add_note(state.messages, line["text"])
+        elif kind == "end":
+            state.status = line["status"]
+    if not state.messages:
+        raise ValueError(f"{path}: not a session checkpoint")
+    if state.pending is not None and state.pending["stop"] != "tool_use":
+        if state.pending["stop"] == "end_turn":
+            state.status = "completed"   # final answer recorded, end marker lost
+        # Any other stop (max_tokens, refusal) is asked again on resume.
+        state.pending = None
+    return state
+
+
+def add_note(messages: list, text: str):
+    """Append *text* to the last user message (tool results stay first)."""
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    messages[-1] = {**last, "content": list(content) + [{"type": "text", "text": text}]}
+
+
+def plain(value):
+    """SDK objects (or the SimpleNamespaces bench/replay.py uses) → JSON-ready dicts."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    if isinstance(value, dict):
+        return {k: plain(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    if hasattr(value, "__dict__"):
+        return {k: plain(v) for k, v in vars(value).items() if v is not None}
+    return value
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _commit_turn(state: State):
+    if state.pending is None:
+        return
+    content = state.pending["content"]
+    state.messages.append({"role": "assistant", "content": content})
+    state.messages.append({"role": "user", "content": [
+        {"type": "tool_result", "tool_use_id": block["id"], "content": state.pending_results.get(block["id"], "")}
+        for block in content if block.get("type") == "tool_use"
+    ]})
+    state.pending = None
+    state.pending_results = {}
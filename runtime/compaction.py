@@ -0,0 +1,181 @@
+"""
+Conversation compaction with spill-to-disk for old tool results.
+
+run_agent keeps every assistant turn (thinking included) and every tool
+result in `messages`, and re-sends all of it each turn.  Once the prompt
+grows past COMPACT_TOKEN_BUDGET, the Compactor rewrites the stale part of
+the history in place:
+
+  * tool results older than the last COMPACT_KEEP_TURNS turns and longer
+    than COMPACT_MIN_CHARS are written to results/.spill/<tool_use_id>.txt
+    and replaced by their first and last lines plus a handle.  A result
+    that already is such a stub is left alone, and an existing spill file
+    is never overwritten, so compacting again cannot lose the original;
+  * thinking blocks of those old assistant turns are dropped.
+
+The model gets the original back with the `fetch_spilled_output` tool
+(tools/spill_tools.py), which pages and greps the spill file like read_file.
+
+Compaction runs in one sweep rather than a little every turn: each rewrite
+invalidates the prompt cache from that point on, so it is worth paying that
+once for a large reduction.
+
+Configuration in config.py (optional):
+    COMPACT_TOKEN_BUDGET — prompt size (tokens) that triggers compaction
+                           (default: 80000; 0 disables)
+    COMPACT_KEEP_TURNS   — most recent turns never compacted (default: 4)
+    COMPACT_MIN_CHARS    — only spill tool results at least this long
+                           (default: 2000)
+"""
+
+import os
+
+import config
+
+SPILL_DIR = os.path.join("results", ".spill")
+
+# Rough characters-per-token ratio for reports, logs and Verilog.
+_CHARS_PER_TOKEN = 3.5
+
+_HEAD_LINES = 12
+_TAIL_LINES = 8
+_MAX_LINE = 200
+_MARKER = "[compacted: "
+
+
+def spill_path(handle: str) -> str:
+    """Absolute path of the spill file behind *handle*."""
+    safe = "".join(c for c in handle if c.isalnum() or c in "_-")
+    return os.path.join(config.WORK_DIR, SPILL_DIR, f"{safe}.txt")
+
+
+class Compactor:
+    def __init__(self, budget: int = None, keep_turns: int = None, min_chars: int = None):
+        self.budget = int(budget if budget is not None else getattr(config, "COMPACT_TOKEN_BUDGET", 80000))
+        self.keep_turns = max(1, int(keep_turns if keep_turns is not None
+                                     else getattr(config, "COMPACT_KEEP_TURNS", 4)))
+        self.min_chars = int(min_chars if min_chars is not None else getattr(config, "COMPACT_MIN_CHARS", 2000))
+        self.spilled = 0
+        self.chars_saved = 0
+
+    def maybe_compact(self, messages: list, last_prompt_tokens: int):
+        """
+        Compact *messages* in place if the next request is likely to exceed
+        the budget.  *last_prompt_tokens* is the prompt size the API reported
+        for the previous request; the newest message (not yet sent) is added
+        as an estimate.  Returns a one-line report, or None.
+        """
+        if self.budget <= 0:
+            return None
+        estimate = last_prompt_tokens + _approx_tokens(messages[-1]) if messages else 0
+        if estimate <= self.budget:
+            return None
+        spilled, saved, thinking = self.compact(messages)
+        if not spilled and not thinking:
+            return (f"[compact] prompt ~{estimate:,} tokens is over the {self.budget:,} budget, "
+                    "but nothing old enough to compact")
+        return (
+            f"[compact] prompt ~{estimate:,} tokens > {self.budget:,}: spilled {spilled} tool result(s), "
+            f"dropped {thinking} thinking block(s), ~{int(saved / _CHARS_PER_TOKEN):,} tokens freed"
+        )
+
+    def compact(self, messages: list):
+        """Compact everything before the last keep_turns turns; return (spilled, chars saved, thinking dropped)."""
+        cutoff = _turn_cutoff(messages, self.keep_turns)
+        spilled = saved = thinking = 0
+        for i in range(cutoff):
+            msg = messages[i]
+            content = msg["content"]
+            if isinstance(content, str):
+                continue
+            if msg["role"] == "assistant":
+                kept = [b for b in content if _block_type(b) not in ("thinking", "redacted_thinking")]
+                if len(kept) != len(content) and kept:
+                    thinking += len(content) - len(kept)
+                    saved += sum(len(_block_text(b)) for b in content if b not in kept)
+                    messages[i] = {**msg, "content": kept}
+                continue
+            new_content = []
+            changed = False
+            for block in content:
+                if (isinstance(block, dict) and block.get("type") == "tool_result"
+                        and isinstance(block.get("content"), str)
+                        and len(block["content"]) >= self.min_chars
+                        and not _is_stub(block["content"])):
+                    text = block["content"]
+                    stub = self._spill(block["tool_use_id"], text)
+                    new_content.append({**block, "content": stub})
+                    saved += len(text) - len(stub)
+                    spilled += 1
+                    changed = True
+                else:
+                    new_content.append(block)
+            if changed:
+                messages[i] = {**msg, "content": new_content}
+        self.spilled += spilled
+        self.chars_saved += saved
+        return spilled, saved, thinking
+
+    def _spill(self, handle: str, text: str) -> str:
+        path = spill_path(handle)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(path, "x", encoding="utf-8") as f:
+                f.write(text)
+        except FileExistsError:
+            pass                       # tool_use ids are unique: it already holds this output
+        lines = text.splitlines()
+        if len(lines) <= _HEAD_LINES + _TAIL_LINES:
+            head, tail = lines[:_HEAD_LINES], []
+        else:
+            head, tail = lines[:_HEAD_LINES], lines[-_TAIL_LINES:]
+        clip = [ln if len(ln) <= _MAX_LINE else ln[:_MAX_LINE] + "..." for ln in head]
+        parts = clip
+        if tail:
+            parts = clip + [f"... ({len(lines) - len(head) - len(tail)} lines omitted) ..."] + [
+                ln if len(ln) <= _MAX_LINE else ln[:_MAX_LINE] + "..." for ln in tail
+            ]
+        return (
+            "\n".join(parts)
+            + f"\n{_MARKER}{len(text):,} chars / {len(lines):,} lines stored as handle '{handle}'; "
+            f"use fetch_spilled_output to read it]"
+        )
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _turn_cutoff(messages: list, keep_turns: int) -> int:
+    """Index of the first message of the last *keep_turns* assistant turns."""
+    seen = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i]["role"] == "assistant":
+            seen += 1
+            if seen == keep_turns:
+                return i
+    return 0
+
+
+def _is_stub(text: str) -> bool:
+    return text[text.rfind("\n") + 1:].startswith(_MARKER)
+
+
+def _block_type(block) -> str:
+    return block.get("type") if isinstance(block, dict) else getattr(block, "type", "")
+
+
+def _block_text(block) -> str:
+    if isinstance(block, dict):
+        value = block.get("content") or block.get("text") or block.get("thinking") or ""
+        return value if isinstance(value, str) else str(value)
+    for attr in ("text", "thinking", "data", "input"):
+        value = getattr(block, attr, None)
+        if value:
+            return value if isinstance(value, str) else str(value)
+    return ""
+
+
+def _approx_tokens(message) -> int:
+    content = message["content"]
+    if isinstance(content, str):
+        return int(len(content) / _CHARS_PER_TOKEN)
+    return int(sum(len(_block_text(b)) for b in content) / _CHARS_PER_TOKEN)
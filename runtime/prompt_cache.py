@@ -0,0 +1,122 @@
+"""
+Prompt-cache breakpoints and per-turn token accounting.
+
+Every turn re-sends SYSTEM_PROMPT, all tool schemas and the whole message
+history.  Marking cache breakpoints lets the API reuse that prefix instead
+of re-processing it, so time-to-first-token and cost stay roughly flat as a
+session grows.  Four breakpoints are available per request; they go on
+
+    1. the last tool schema        (tools render before the system prompt)
+    2. the system prompt
+    3. the newest user message     (writes the cache for the next turn)
+    4. the previous user message   (reads what the last turn wrote, even if
+                                    this turn added many tool_result blocks)
+
+The message list kept by agent.py is never modified — `request_messages`
+returns a copy with the breakpoints attached, so they roll forward each turn.
+
+Configuration in config.py (optional):
+    PROMPT_CACHE     — set False to send requests without breakpoints
+    PROMPT_CACHE_TTL — "5m" (default) or "1h"
+"""
+
+import config
+
+
+def enabled() -> bool:
+    return bool(getattr(config, "PROMPT_CACHE", True))
+
+
+def _marker() -> dict:
+    ttl = getattr(config, "PROMPT_CACHE_TTL", "5m")
+    return {"type": "ephemeral", "ttl": ttl} if ttl and ttl != "5m" else {"type": "ephemeral"}
+
+
+def system_blocks(system_prompt: str):
+    """The system prompt as a text block carrying a breakpoint."""
+    if not enabled():
+        return system_prompt
+    return [{"type": "text", "text": system_prompt, "cache_control": _marker()}]
+
+
+def tool_schemas(tools: list) -> list:
+    """Copy of *tools* with a breakpoint on the last schema."""
+    if not enabled() or not tools:
+        return tools
+    return tools[:-1] + [{**tools[-1], "cache_control": _marker()}]
+
+
+def request_messages(messages: list, breakpoints: int = 2) -> list:
+    """
+    Copy of *messages* with breakpoints on the last *breakpoints* user
+    messages.  Only those messages are copied; the rest are shared.
+    """
+    if not enabled():
+        return messages
+    out = list(messages)
+    placed = 0
+    for i in range(len(out) - 1, -1, -1):
+        if placed >= breakpoints:
+            break
+        msg = out[i]
+        if msg["role"] != "user":
+            continue
+        content = msg["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        if not content:
+            continue
+        last = content[-1]
+        if not isinstance(last, dict):
+            continue
+        content = list(content[:-1]) + [{**last, "cache_control": _marker()}]
+        out[i] = {**msg, "content": content}
+        placed += 1
+    return out
+
+
+# ── Token accounting ──────────────────────────────────────────────────────────
+
+class TokenStats:
+    """Accumulates usage across turns and formats one line per turn."""
+
+    def __init__(self):
+        self.turns = 0
+        self.input = 0
+        self.cache_read = 0
+        self.cache_write = 0
+        self.output = 0
+        self.last_prompt = 0
+
+    def record(self, usage, ttft: float = None, elapsed: float = None) -> str:
+        uncached = getattr(usage, "input_tokens", 0) or 0
+        read = getattr(usage, "cache_read_input_tokens", 0) or 0
+        write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        output = getattr(usage, "output_tokens", 0) or 0
+        self.turns += 1
+        self.input += uncached
+        self.cache_read += read
+        self.cache_write += write
+        self.output += output
+
+        prompt = uncached + read + write
+        self.last_prompt = prompt
+        hit = f"{100 * read / prompt:.0f}%" if prompt else "-"
+        line = (
+            f"[tokens] prompt {prompt:,} (cached {read:,}, written {write:,}, uncached {uncached:,}; "
+            f"hit {hit}), output {output:,}"
+        )
+        if ttft is not None:
+            line += f", first token {ttft:.1f}s"
+        if elapsed is not None:
+            line += f", total {elapsed:.1f}s"
+        return line
+
+    def summary(self) -> str:
+        prompt = self.input + self.cache_read + self.cache_write
+        hit = f"{100 * self.cache_read / prompt:.0f}%" if prompt else "-"
+        return (
+            f"[tokens] {self.turns} turn(s): prompt {prompt:,} (cached {self.cache_read:,}, "
+            f"written {self.cache_write:,}, uncached {self.input:,}; hit {hit}), "
+            f"output {self.output:,}"
+        )
@@ -0,0 +1,286 @@
+"""
+Client-side pacing and retry policy for Claude API calls.
+
+A fixed `30 * (attempt + 1)` sleep on every 429 wastes minutes and does
+nothing to avoid the next one.  Instead, one process-wide RateLimiter keeps
+a token bucket per API limit — requests, input tokens and output tokens per
+minute — and:
+
+  * paces ahead of time: acquire() debits the expected cost of the next
+    request (a running average of what earlier requests really cost) and
+    sleeps only as long as the bucket needs to refill;
+  * learns the limits: observe() reads the anthropic-ratelimit-*-limit,
+    -remaining and -reset headers of every response, so capacity and level
+    track what the server reports rather than a guess;
+  * backs off from the headers: backoff() honours retry-after, else waits
+    for the reset of the exhausted limit, else uses exponential backoff
+    with full jitter.  429, 529 (overloaded), other 5xx, 408/409, timeouts
+    and dropped connections are retried; anything else is raised.
+
+Buckets are shared by every thread and every session in the process, so
+concurrent sessions (batch mode) pace against one budget.
+
+Input tokens are counted the way the input-tokens limit counts them:
+uncached input plus cache writes; cache reads are not charged.
+
+Configuration in config.py (optional):
+    RATE_LIMIT            — set False to disable pacing (retries still apply)
+    RATE_LIMIT_RPM        — initial requests/min before headers are seen (0 = unknown)
+    RATE_LIMIT_INPUT_TPM  — initial input tokens/min (0 = unknown)
+    RATE_LIMIT_OUTPUT_TPM — initial output tokens/min (0 = unknown)
+    API_MAX_RETRIES       — retries per request on retryable errors (default 8)
+    API_BACKOFF_BASE      — first backoff step in seconds (default 2)
+    API_BACKOFF_MAX       — longest single wait in seconds (default 120)
+"""
+
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+import config
+
+_HEADER = "anthropic-ratelimit-{}-{}"
+_LIMITS = ("requests", "input-tokens", "output-tokens")
+_RETRY_STATUS = {408, 409, 429}
+_EWMA = 0.3
+
+
+class _Bucket:
+    """Token bucket refilled continuously at capacity per minute."""
+
+    def __init__(self, per_minute: float = 0.0):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.stamp = time.monotonic()
+        self.blocked_until = 0.0          # monotonic time of a server-reported reset
+
+    @property
+    def known(self) -> bool:
+        return self.capacity > 0
+
+    def refill(self, now: float):
+        if self.known:
+            self.level = min(self.capacity, self.level + (now - self.stamp) * self.capacity / 60.0)
+        self.stamp = now
+
+    def wait_for(self, cost: float, now: float) -> float:
+        """Seconds until *cost* can be debited (0 when unknown or affordable)."""
+        wait = max(0.0, self.blocked_until - now)
+        if self.known and self.level < cost:
+            # Never ask for more than a full bucket: an oversized request
+            # goes through once the bucket is full rather than never.
+            wait = max(wait, (min(cost, self.capacity) - self.level) * 60.0 / self.capacity)
+        return wait
+
+
+class RateLimiter:
+    def __init__(self, rpm: float = 0, input_tpm: float = 0, output_tpm: float = 0):
+        self._lock = threading.Lock()
+        self._buckets = {
+            "requests": _Bucket(rpm),
+            "input-tokens": _Bucket(input_tpm),
+            "output-tokens": _Bucket(output_tpm),
+        }
+        # Expected cost of the next request, learned from usage.
+        self._expect = {"input-tokens": 0.0, "output-tokens": 0.0}
+        self.stats = {"requests": 0, "paced": 0, "paced_seconds": 0.0, "retries": 0, "backoff_seconds": 0.0}
+
+    # ── Pacing ───────────────────────────────────────────────────────────────
+
+    def acquire(self) -> float:
+        """Wait until the next request fits every known limit; return seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                cost = {"requests": 1.0, **self._expect}
+                wait = 0.0
+                for name, bucket in self._buckets.items():
+                    bucket.refill(now)
+                    wait = max(wait, bucket.wait_for(cost[name], now))
+                if wait <= 0:
+                    for name, bucket in self._buckets.items():
+                        if bucket.known:
+                            bucket.level -= cost[name]
+                    self.stats["requests"] += 1
+                    if waited:
+                        self.stats["paced"] += 1
+                        self.stats["paced_seconds"] += waited
+                    return waited
+            # Re-check after sleeping: another thread may have taken the room.
+            wait = min(wait, _max_wait())
+            time.sleep(wait)
+            waited += wait
+
+    def observe(self, headers, usage=None):
+        """Fold a response's rate-limit headers and token usage into the buckets."""
+        with self._lock:
+            now = time.monotonic()
+            if usage is not None:
+                charged = {
+                    "input-tokens": (getattr(usage, "input_tokens", 0) or 0)
+                    + (getattr(usage, "cache_creation_input_tokens", 0) or 0),
+                    "output-tokens": getattr(usage, "output_tokens", 0) or 0,
+                }
+                for name, actual in charged.items():
+                    bucket = self._buckets[name]
+                    bucket.refill(now)
+                    if bucket.known:
+                        bucket.level += self._expect[name] - actual   # replace the estimate
+                    prev = self._expect[name]
+                    self._expect[name] = actual if not prev else (1 - _EWMA) * prev + _EWMA * actual
+            for name in _LIMITS:
+                self._apply_headers(name, headers, now)
+
+    def _apply_headers(self, name: str, headers, now: float):
+        if headers is None:
+            return
+        bucket = self._buckets[name]
+        limit = _number(headers.get(_HEADER.format(name, "limit")))
+        remaining = _number(headers.get(_HEADER.format(name, "remaining")))
+        if limit:
+            bucket.refill(now)
+            if not bucket.known:
+                bucket.level = limit          # first sighting; remaining refines it below
+            bucket.capacity = limit
+        if remaining is not None and bucket.known:
+            # The server's count is authoritative, but it does not include
+            # requests other threads have started since; keep the lower one.
+            bucket.level = min(bucket.level, remaining)
+            bucket.stamp = now
+            if remaining <= 0:
+                reset = _reset_in(headers.get(_HEADER.format(name, "reset")))
+                if reset:
+                    bucket.blocked_until = max(bucket.blocked_until, now + reset)
+
+    # ── Retries ──────────────────────────────────────────────────────────────
+
+    def backoff(self, exc: BaseException, attempt: int) -> float:
+        """
+        Seconds to wait before retrying after *exc* (attempt counts from 0),
+        or None when the error is not worth retrying or the retry budget is spent.
+        """
+        if attempt >= int(getattr(config, "API_MAX_RETRIES", 8)) or not retryable(exc):
+            return None
+        headers = _headers(exc)
+        wait = _retry_after(headers)
+        if wait is None and headers is not None:
+            resets = [_reset_in(headers.get(_HEADER.format(name, "reset")))
+                      for name in _LIMITS
+                      if _number(headers.get(_HEADER.format(name, "remaining"))) == 0]
+            resets = [r for r in resets if r]
+            if resets:
+                wait = max(resets)
+        if wait is None:
+            base = float(getattr(config, "API_BACKOFF_BASE", 2.0))
+            wait = random.uniform(0, base * 2 ** attempt)        # full jitter
+        else:
+            wait += random.uniform(0, min(1.0, 0.1 * wait))      # spread synchronized retries
+        wait = min(wait, _max_wait())
+        with self._lock:
+            if getattr(exc, "status_code", None) == 429:
+                # Whatever the buckets believed, the server says we are out:
+                # hold every thread until the wait is over.
+                until = time.monotonic() + wait
+                for bucket in self._buckets.values():
+                    bucket.blocked_until = max(bucket.blocked_until, until)
+            self.stats["retries"] += 1
+            self.stats["backoff_seconds"] += wait
+        return wait
+
+    def summary(self) -> str:
+        s = self.stats
+        limits = ", ".join(
+            f"{name} {int(b.capacity):,}/min" for name, b in self._buckets.items() if b.known
+        ) or "limits not yet known"
+        return (
+            f"[rate-limit] {s['requests']} request(s); paced {s['paced']} ({s['paced_seconds']:.1f}s), "
+            f"retried {s['retries']} ({s['backoff_seconds']:.1f}s backoff); {limits}"
+        )
+
+
+def retryable(exc: BaseException) -> bool:
+    """429, overloaded, 5xx, 408/409 and transport failures are worth retrying."""
+    # The SDK is imported lazily (agent.py); until it is, nothing can have raised its errors.
+    anthropic = sys.modules.get("anthropic")
+    if anthropic is None:
+        return False
+    if isinstance(exc, anthropic.APIConnectionError):        # includes timeouts
+        return True
+    if isinstance(exc, anthropic.APIStatusError):
+        return exc.status_code in _RETRY_STATUS or exc.status_code >= 500
+    return False
+
+
+# ── Process-wide limiter ──────────────────────────────────────────────────────
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """Return the process-wide limiter, creating it on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                rpm=getattr(config, "RATE_LIMIT_RPM", 0),
+                input_tpm=getattr(config, "RATE_LIMIT_INPUT_TPM", 0),
+                output_tpm=getattr(config, "RATE_LIMIT_OUTPUT_TPM", 0),
+            )
+        return _limiter
+
+
+def enabled() -> bool:
+    return bool(getattr(config, "RATE_LIMIT", True))
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _max_wait() -> float:
+    return float(getattr(config, "API_BACKOFF_MAX", 120.0))
+
+
+def _headers(exc):
+    response = getattr(exc, "response", None)
+    return getattr(response, "headers", None)
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after(headers):
+    """retry-after-ms / retry-after (seconds or HTTP date) in seconds, or None."""
+    if headers is None:
+        return None
+    ms = _number(headers.get("retry-after-ms"))
+    if ms is not None:
+        return max(0.0, ms / 1000.0)
+    value = headers.get("retry-after")
+    seconds = _number(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    if value:
+        import email.utils    # rare (HTTP-date form); keeps startup light
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def _reset_in(value):
+    """Seconds until an RFC 3339 reset timestamp, or None."""
+    if not value:
+        return None
+    try:
+        reset = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, reset.timestamp() - time.time())
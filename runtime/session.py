@@ -0,0 +1,106 @@
+"""
+Per-session state for running several agent sessions in one process.
+
+Every tool reads its paths from the config module (config.WORK_DIR,
+getattr(config, "REMOTE_WORK_DIR", ...)).  Rather than thread a session
+object through sixty call sites, install() gives the config module a
+context-local override layer: inside `with activate(session):` the
+session's WORK_DIR and REMOTE_WORK_DIR shadow the global values for that
+thread and for everything it starts through contextvars-aware executors
+(execute_tools and ContextExecutor copy the caller's context).  Outside a
+session, config behaves exactly as before.
+
+Console output is routed the same way: while a session is active, print()
+goes to the session's log file instead of the shared terminal.
+
+Everything else — the API rate limiter, the SSH pool, remote shells and
+the license pool — stays process-wide and is shared by all sessions.
+"""
+
+import contextvars
+import sys
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import config
+
+_current = contextvars.ContextVar("agent_session", default=None)
+_install_lock = threading.Lock()
+
+
+class Session:
+    def __init__(self, name: str, work_dir: str, remote_dir: str, log=None):
+        self.name = name
+        self.overrides = {"WORK_DIR": work_dir, "REMOTE_WORK_DIR": remote_dir}
+        self.log = log                # text stream for this session's output, or None
+
+    @property
+    def work_dir(self) -> str:
+        return self.overrides["WORK_DIR"]
+
+    @property
+    def remote_dir(self) -> str:
+        return self.overrides["REMOTE_WORK_DIR"]
+
+
+def current():
+    """The active Session, or None outside batch mode."""
+    return _current.get()
+
+
+@contextmanager
+def activate(session: Session):
+    install()
+    token = _current.set(session)
+    try:
+        yield session
+    finally:
+        _current.reset(token)
+
+
+class ContextExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose workers run in a copy of the submitter's context."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# ── Installation ──────────────────────────────────────────────────────────────
+
+class _SessionConfig(types.ModuleType):
+    def __getattribute__(self, name):
+        session = _current.get()
+        if session is not None and name in session.overrides:
+            return session.overrides[name]
+        return super().__getattribute__(name)
+
+
+class _SessionStdout:
+    """sys.stdout stand-in that writes to the active session's log."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def _target(self):
+        session = _current.get()
+        return session.log if session is not None and session.log is not None else self._stream
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def install():
+    """Enable the per-session layers (idempotent)."""
+    with _install_lock:
+        if not isinstance(config, _SessionConfig):
+            config.__class__ = _SessionConfig
+        if not isinstance(sys.stdout, _SessionStdout):
+            sys.stdout = _SessionStdout(sys.stdout)
@@ -0,0 +1,216 @@
+"""
+Latency and token telemetry: a JSONL trace plus an end-of-run summary.
+
+The console only shows truncated text, so a slow session gives no hint
+whether the time went into API streaming, rate-limit sleeps, the SSH
+handshake, the project upload, loading the EDA environment or the EDA tool
+itself.  Code paths that can be slow are wrapped in spans:
+
+    with telemetry.span("remote.command", mode="shell") as attrs:
+        ...
+        attrs["exit_code"] = code              # extra fields for the trace
+
+    telemetry.record("api.pacing", waited)           # already-measured time
+
+Each finished span becomes one JSON line — name, start time, duration,
+thread, its own id and the id of the enclosing span (tracked with
+contextvars, so a remote phase inside a tool call running on a dispatcher
+thread still points at that call) plus any attributes.  `summary()` turns
+the same data into a table of calls, total / mean / p95 / max seconds and
+share of the session's wall time per span name.  Nested spans overlap
+(`tool` contains `remote.command`), so the shares do not add up to 100%.
+In batch mode one trace covers every session; each line names its session.
+
+Span names in use:
+    api.stream, api.pacing, api.backoff       agent.py
+    tool                                      tools/__init__.py execute_tool
+    ssh.connect                               tools/ssh_pool.py
+    remote.upload                             tools/sync_engine.py
+    remote.env_load, remote.command           tools/remote_shell.py, remote_tools.py
+    remote.download                           tools/remote_tools.py
+    license.wait                              tools/licenses.py
+
+Configuration in config.py (optional):
+    TELEMETRY     — set False to record nothing
+    TELEMETRY_DIR — trace directory (default: WORK_DIR/results/.telemetry)
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+from runtime import session
+
+_current = contextvars.ContextVar("telemetry_span", default=None)
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_trace = None                   # open trace file, or None
+_trace_path = None
+_started = None                 # (wall clock, monotonic) of start()
+_durations = {}                 # span name -> [seconds]
+_api = {"input": 0, "output": 0, "cache_read": 0, "cache_write": 0, "ttft": []}
+
+
+def enabled() -> bool:
+    return bool(getattr(config, "TELEMETRY", True))
+
+
+def trace_dir() -> str:
+    return getattr(config, "TELEMETRY_DIR", "") or os.path.join(config.WORK_DIR, "results", ".telemetry")
+
+
+def start(label: str = "session") -> str:
+    """Open a new trace file and reset the aggregates; return the trace path ("" when disabled)."""
+    global _trace, _trace_path, _started
+    stop()
+    with _lock:
+        _durations.clear()
+        _api.update({"input": 0, "output": 0, "cache_read": 0, "cache_write": 0, "ttft": []})
+        _started = (time.time(), time.monotonic())
+        if not enabled():
+            return ""
+        os.makedirs(trace_dir(), exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(_started[0]))
+        _trace_path = os.path.join(trace_dir(), f"{stamp}-{os.getpid()}.jsonl")
+        _trace = open(_trace_path, "a", encoding="utf-8", buffering=1)
+    _write({"ts": _started[0], "event": "start", "label": label, "pid": os.getpid()})
+    return _trace_path
+
+
+def stop():
+    """Write the closing record and close the trace file."""
+    global _trace
+    with _lock:
+        trace, _trace = _trace, None
+    if trace is not None:
+        line = {"ts": time.time(), "event": "stop", "wall": round(_wall(), 6)}
+        trace.write(json.dumps(line) + "\n")
+        trace.close()
+
+
+def trace_path() -> str:
+    return _trace_path or ""
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block as *name*; yields a dict of attributes the block may extend."""
+    if not enabled():
+        yield attrs
+        return
+    sid = next(_ids)
+    parent = _current.get()
+    token = _current.set(sid)
+    wall = time.time()
+    t0 = time.monotonic()
+    try:
+        yield attrs
+    except BaseException as exc:
+        attrs["error"] = type(exc).__name__
+        raise
+    finally:
+        _current.reset(token)
+        _finish(name, wall, time.monotonic() - t0, sid, parent, attrs)
+
+
+def record(name: str, seconds: float, **attrs):
+    """Record an interval measured elsewhere, as a child of the current span."""
+    if enabled():
+        _finish(name, time.time() - seconds, seconds, next(_ids), _current.get(), attrs)
+
+
+def record_api(usage, ttft: float = None):
+    """Fold one response's token usage and time-to-first-token into the API totals."""
+    with _lock:
+        _api["input"] += getattr(usage, "input_tokens", 0) or 0
+        _api["output"] += getattr(usage, "output_tokens", 0) or 0
+        _api["cache_read"] += getattr(usage, "cache_read_input_tokens", 0) or 0
+        _api["cache_write"] += getattr(usage, "cache_creation_input_tokens", 0) or 0
+        if ttft is not None:
+            _api["ttft"].append(ttft)
+
+
+def usage_attrs(usage) -> dict:
+    """Token counts of *usage* as span attributes."""
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+    }
+
+
+def total(name: str) -> float:
+    """Seconds spent in spans called *name* since start()."""
+    with _lock:
+        return sum(_durations.get(name, ()))
+
+
+def summary() -> str:
+    """Table of where the session's time went, one row per span name."""
+    if not enabled():
+        return ""
+    wall = _wall()
+    with _lock:
+        rows = sorted(_durations.items(), key=lambda kv: -sum(kv[1]))
+        api = dict(_api, ttft=list(_api["ttft"]))
+    lines = [f"[telemetry] {wall:.1f}s wall" + (f"; trace {_trace_path}" if _trace_path else "")]
+    if not rows:
+        return lines[0]
+    lines.append(f"  {'span':<24} {'calls':>6} {'total s':>9} {'mean s':>8} {'p95 s':>8} {'max s':>8} {'% wall':>7}")
+    for name, values in rows:
+        total = sum(values)
+        lines.append(
+            f"  {name:<24} {len(values):>6} {total:>9.2f} {total / len(values):>8.2f} "
+            f"{_percentile(values, 0.95):>8.2f} {max(values):>8.2f} "
+            f"{100 * total / wall if wall else 0:>6.0f}%"
+        )
+    if api["ttft"]:
+        lines.append(
+            f"  api: first token mean {sum(api['ttft']) / len(api['ttft']):.2f}s, "
+            f"p95 {_percentile(api['ttft'], 0.95):.2f}s; tokens in {api['input']:,} "
+            f"(+{api['cache_read']:,} cached, +{api['cache_write']:,} written), out {api['output']:,}"
+        )
+    lines.append("  (nested spans overlap: 'tool' includes the remote.* phases it ran)")
+    return "\n".join(lines)
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _finish(name, wall, seconds, sid, parent, attrs):
+    with _lock:
+        _durations.setdefault(name, []).append(seconds)
+    line = {
+        "ts": round(wall, 6),
+        "span": name,
+        "dur": round(seconds, 6),
+        "id": sid,
+        "parent": parent,
+        "thread": threading.current_thread().name,
+    }
+    active = session.current()
+    if active is not None:
+        line["session"] = active.name
+    for key, value in attrs.items():
+        line[key] = value if isinstance(value, (int, float, str, bool, type(None))) else str(value)
+    _write(line)
+
+
+def _write(line: dict):
+    with _lock:
+        if _trace is not None:
+            _trace.write(json.dumps(line) + "\n")
+
+
+def _wall() -> float:
+    return time.monotonic() - _started[1] if _started else 0.0
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -1,16 +1,177 @@
-from tools.file_tools import FILE_TOOLS, execute_file_tool
-from tools.command_tools import COMMAND_TOOLS, execute_command_tool
-from tools.remote_tools import REMOTE_TOOLS, execute_remote_tool
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-ALL_TOOLS = FILE_TOOLS + COMMAND_TOOLS + REMOTE_TOOLS
+import config
+from runtime import telemetry
+from tools.file_tools import FILE_TOOLS, FILE_TOOL_ACCESS, execute_file_tool
+from tools.command_tools import COMMAND_TOOLS, COMMAND_TOOL_ACCESS, execute_command_tool
+from tools.local_jobs import LOCAL_JOB_TOOLS, LOCAL_JOB_TOOL_ACCESS, execute_local_job_tool
+from tools.remote_tools import REMOTE_TOOLS, REMOTE_TOOL_ACCESS, execute_remote_tool
+from tools.remote_jobs import REMOTE_JOB_TOOLS, REMOTE_JOB_TOOL_ACCESS, execute_remote_job_tool
+from tools.qor_tools import QOR_TOOLS, QOR_TOOL_ACCESS, execute_qor_tool
+from tools.qor_history import QOR_HISTORY_TOOLS, QOR_HISTORY_TOOL_ACCESS, execute_qor_history_tool
+from tools.def_tools import DEF_TOOLS, DEF_TOOL_ACCESS, execute_def_tool
+from tools.netlist_tools import NETLIST_TOOLS, NETLIST_TOOL_ACCESS, execute_netlist_tool
+from tools.spill_tools import SPILL_TOOLS, SPILL_TOOL_ACCESS, execute_spill_tool
+from tools.flow_tools import FLOW_TOOLS, FLOW_TOOL_ACCESS, execute_flow_tool
+from tools.regression import REGRESSION_TOOLS, REGRESSION_TOOL_ACCESS, execute_regression_tool
+from tools.sweep import SWEEP_TOOLS, SWEEP_TOOL_ACCESS, execute_sweep_tool
+
+# (schemas, access, handler) per tool module.  Adding a module means adding
+# one row here; everything below is derived from this table once, at import.
+_MODULES = (
+    (FILE_TOOLS,       FILE_TOOL_ACCESS,       execute_file_tool),
+    (COMMAND_TOOLS,    COMMAND_TOOL_ACCESS,    execute_command_tool),
+    (LOCAL_JOB_TOOLS,  LOCAL_JOB_TOOL_ACCESS,  execute_local_job_tool),
+    (REMOTE_TOOLS,     REMOTE_TOOL_ACCESS,     execute_remote_tool),
+    (REMOTE_JOB_TOOLS, REMOTE_JOB_TOOL_ACCESS, execute_remote_job_tool),
+    (QOR_TOOLS,        QOR_TOOL_ACCESS,        execute_qor_tool),
+    (QOR_HISTORY_TOOLS, QOR_HISTORY_TOOL_ACCESS, execute_qor_history_tool),
+    (DEF_TOOLS,        DEF_TOOL_ACCESS,        execute_def_tool),
+    (NETLIST_TOOLS,    NETLIST_TOOL_ACCESS,    execute_netlist_tool),
+    (SPILL_TOOLS,      SPILL_TOOL_ACCESS,      execute_spill_tool),
+    (FLOW_TOOLS,       FLOW_TOOL_ACCESS,       execute_flow_tool),
+    (REGRESSION_TOOLS, REGRESSION_TOOL_ACCESS, execute_regression_tool),
+    (SWEEP_TOOLS,      SWEEP_TOOL_ACCESS,      execute_sweep_tool),
+)
+
+ALL_TOOLS = [schema for schemas, _, _ in _MODULES for schema in schemas]
+
+# Tool name -> handler: one dict lookup per call.
+_HANDLERS = {schema["name"]: handler for schemas, _, handler in _MODULES for schema in schemas}
+
+_ACCESS = {name: access for _, table, _ in _MODULES for name, access in table.items()}
+
+# Concurrency limit per backend: tools that touch the remote work dir share
+# the SSH pool ("remote"), the others the local disk and CPU ("local").
+_BACKENDS = {name: "remote" if "remote" in access else "local" for name, access in _ACCESS.items()}
+
+_DEFAULT_LIMITS = {"local": 4, "remote": 4}
+_semaphores = {}
+_semaphores_lock = threading.Lock()
 
 
 def execute_tool(tool_name: str, tool_input: dict) -> str:
-    if tool_name in [t["name"] for t in FILE_TOOLS]:
-        return execute_file_tool(tool_name, tool_input)
-    elif tool_name in [t["name"] for t in COMMAND_TOOLS]:
-        return execute_command_tool(tool_name, tool_input)
-    elif tool_name in [t["name"] for t in REMOTE_TOOLS]:
-        return execute_remote_tool(tool_name, tool_input)
-    else:
+    with telemetry.span("tool", tool=tool_name) as span:
+        result = _dispatch(tool_name, tool_input)
+        span.update(chars=len(result), failed=result.startswith("ERROR"))
+    return result
+
+
+def _dispatch(tool_name: str, tool_input: dict) -> str:
+    handler = _HANDLERS.get(tool_name)
+    if handler is None:
         return f"ERROR: Unknown tool '{tool_name}'"
+    return handler(tool_name, tool_input)
+
+
+def execute_tools(calls: list, on_result=None) -> list:
+    """
+    Run the (tool_name, tool_input) *calls* of one agent turn and return their
+    results in the same order.  *on_result(index, result)*, if given, is
+    called on this thread as each call finishes.
+
+    Calls overlap unless they conflict: a call waits for every earlier call
+    that writes a resource it touches ("local" project tree, "remote" work
+    dir), or that touches a resource it writes.  Accesses declared on a path
+    only conflict where the paths overlap, so downloads into different
+    directories run side by side.  Unknown tools are treated as writing
+    everything, so they run strictly in order.  Set
+    PARALLEL_TOOL_CALLS = False in config.py to run everything serially.
+    """
+    if len(calls) <= 1 or not getattr(config, "PARALLEL_TOOL_CALLS", True):
+        results = []
+        for j, (name, tool_input) in enumerate(calls):
+            results.append(execute_tool(name, tool_input))
+            if on_result:
+                on_result(j, results[j])
+        return results
+
+    deps = [_dependencies(calls, j) for j in range(len(calls))]
+    results = [None] * len(calls)
+    pending = set(range(len(calls)))
+    done = set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        while pending or running:
+            for j in sorted(pending):
+                if deps[j] <= done:
+                    pending.discard(j)
+                    name, tool_input = calls[j]
+                    # Each call gets its own copy of the caller's context.
+                    ctx = contextvars.copy_context()
+                    running[executor.submit(ctx.run, _run_limited, name, tool_input)] = j
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                j = running.pop(fut)
+                try:
+                    results[j] = fut.result()
+                except Exception as exc:
+                    results[j] = f"ERROR: {exc}"
+                done.add(j)
+                if on_result:
+                    on_result(j, results[j])
+    return results
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _dependencies(calls: list, j: int) -> set:
+    """Indices of earlier calls that call *j* must wait for."""
+    mine = _claims(*calls[j])
+    deps = set()
+    for i in range(j):
+        theirs = _claims(*calls[i])
+        if mine is None or theirs is None:
+            deps.add(i)
+            continue
+        for resource, (mode, path) in mine.items():
+            other = theirs.get(resource)
+            if (other is not None and "write" in (mode, other[0])
+                    and _overlap(path, other[1])):
+                deps.add(i)
+                break
+    return deps
+
+
+def _claims(tool_name: str, tool_input: dict):
+    """{resource: (mode, path or None for all of it)} for one call, or None if unknown."""
+    access = _ACCESS.get(tool_name)
+    if access is None:
+        return None
+    claims = {}
+    for resource, spec in access.items():
+        mode, _, key = spec.partition(":")
+        path = tool_input.get(key) if key else None
+        if isinstance(path, str):
+            path = os.path.normpath(path.strip()).replace(os.sep, "/")
+            if path == "." or path.startswith("../") or path.startswith("/"):
+                path = None            # the whole tree, or outside it: assume the worst
+        else:
+            path = None
+        claims[resource] = (mode, path)
+    return claims
+
+
+def _overlap(a: str, b: str) -> bool:
+    if a is None or b is None:
+        return True
+    return a == b or a.startswith(b + "/") or b.startswith(a + "/")
+
+
+def _run_limited(tool_name: str, tool_input: dict) -> str:
+    with _semaphore(_BACKENDS.get(tool_name, "local")):
+        return execute_tool(tool_name, tool_input)
+
+
+def _semaphore(backend: str) -> threading.Semaphore:
+    with _semaphores_lock:
+        sem = _semaphores.get(backend)
+        if sem is None:
+            limits = {**_DEFAULT_LIMITS, **getattr(config, "TOOL_CONCURRENCY", {})}
+            sem = threading.Semaphore(max(1, int(limits.get(backend, 1))))
+            _semaphores[backend] = sem
+        return sem
@@ -0,0 +1,128 @@
+"""
+Compressed single-stream transfers over one SSH channel.
+
+Per-file SFTP pays at least one round-trip per file (open, write, close),
+which dominates when a first-time sync or a results fetch moves dozens of
+small reports.  These helpers instead stream a gzip'd tar through a single
+exec channel and unpack it on the other side:
+
+    upload:    local tarfile  ──► ssh "tar -xzf - -C <dir>"
+    download:  ssh "tar -czf - -C <dir> ."  ──► local tarfile
+
+`prefer_archive` decides when that beats per-file SFTP.
+
+Configuration in config.py (optional):
+    ARCHIVE_MIN_FILES     — use an archive from this many files on (default: 8)
+    ARCHIVE_COMPRESSLEVEL — gzip level for uploads (default: 6)
+"""
+
+import os
+import shlex
+
+import config
+
+
+def prefer_archive(file_count: int) -> bool:
+    """True when *file_count* files are better sent as one archive."""
+    return file_count >= int(getattr(config, "ARCHIVE_MIN_FILES", 8))
+
+
+def upload_archive(ssh, remote_base: str, entries, timeout: int = 600) -> int:
+    """
+    Stream (rel_path, abs_path) *entries* as one tar.gz into *remote_base*.
+
+    Returns the number of compressed bytes sent.
+    """
+    import gzip
+    import tarfile
+
+    cmd = f"mkdir -p {shlex.quote(remote_base)} && tar -xzf - -C {shlex.quote(remote_base)}"
+    stdin, stdout, stderr = ssh.exec_command(cmd, timeout=timeout)
+    counter = _CountingWriter(stdin)
+    level = int(getattr(config, "ARCHIVE_COMPRESSLEVEL", 6))
+    with gzip.GzipFile(fileobj=counter, mode="wb", compresslevel=level, mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+            for rel, abs_path in entries:
+                info = tar.gettarinfo(abs_path, arcname=rel)
+                info.uid = info.gid = 0
+                info.uname = info.gname = ""
+                with open(abs_path, "rb") as f:
+                    tar.addfile(info, f)
+    stdin.flush()
+    stdin.channel.shutdown_write()
+    status = stdout.channel.recv_exit_status()
+    if status != 0:
+        err = stderr.read().decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"remote tar exited {status}: {err}")
+    return counter.count
+
+
+def download_archive(ssh, remote_dir: str, local_dir: str, timeout: int = 600):
+    """
+    Fetch all of *remote_dir* as one tar.gz and unpack it under *local_dir*.
+
+    Returns (files, compressed_bytes) where files is a list of
+    (rel_path, size).  Members that would land outside *local_dir* are
+    refused.
+    """
+    import tarfile
+
+    cmd = f"tar -czf - -C {shlex.quote(remote_dir)} ."
+    _, stdout, stderr = ssh.exec_command(cmd, timeout=timeout)
+    counter = _CountingReader(stdout)
+    files = []
+    local_real = os.path.realpath(local_dir)
+    os.makedirs(local_real, exist_ok=True)
+
+    with tarfile.open(fileobj=counter, mode="r|gz") as tar:
+        for member in tar:
+            rel = os.path.normpath(member.name)
+            if rel in (".", ""):
+                continue
+            dest = os.path.realpath(os.path.join(local_real, rel))
+            if not dest.startswith(local_real + os.sep):
+                raise RuntimeError(f"refusing archive member outside target: {member.name}")
+            if member.isdir():
+                os.makedirs(dest, exist_ok=True)
+            elif member.isfile():
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                src = tar.extractfile(member)
+                with open(dest, "wb") as out:
+                    for chunk in iter(lambda: src.read(1 << 20), b""):
+                        out.write(chunk)
+                os.utime(dest, (member.mtime, member.mtime))
+                files.append((rel.replace(os.sep, "/"), member.size))
+            # Links, devices and fifos are skipped on purpose.
+
+    status = stdout.channel.recv_exit_status()
+    if status != 0:
+        err = stderr.read().decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"remote tar exited {status}: {err}")
+    return files, counter.count
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+class _CountingWriter:
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def write(self, data):
+        self.raw.write(data)
+        self.count += len(data)
+        return len(data)
+
+    def flush(self):
+        self.raw.flush()
+
+
+class _CountingReader:
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.count += len(data)
+        return data
@@ -1,6 +1,11 @@
-import subprocess
 import os
 import config
+from tools import local_jobs
+
+# Foreground output beyond this is cut to its head and tail; the rest stays
+# readable with tail_local_job.
+_HEAD_BYTES = 4000
+_TAIL_BYTES = 12000
 
 COMMAND_TOOLS = [
     {
@@ -10,7 +15,10 @@ COMMAND_TOOLS = [
             "iverilog/vvp simulation, git add/commit/push, "
             "file inspection, or any local operation. "
             "The command runs inside the project work directory by default. "
-            "Returns stdout, stderr, and exit code."
+            "Returns the output (stdout and stderr merged) and exit code; very long output "
+            "is cut to its head and tail. Set background=true for long simulations: the "
+            "job id comes back at once and local_job_status / tail_local_job / "
+            "cancel_local_job follow it while you do other work."
         ),
         "input_schema": {
             "type": "object",
@@ -22,6 +30,17 @@ COMMAND_TOOLS = [
                 "cwd": {
                     "type": "string",
                     "description": "Working directory relative to project root. Defaults to project root ('.')."
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": (
+                        "Seconds before the command is killed (default: 120 in the foreground, "
+                        "no limit in the background)."
+                    )
+                },
+                "background": {
+                    "type": "boolean",
+                    "description": "Start the command as a background job and return its job id. Default false."
                 }
             },
             "required": ["command"]
@@ -29,35 +48,61 @@ COMMAND_TOOLS = [
     }
 ]
 
+# See FILE_TOOL_ACCESS in tools/file_tools.py.
+COMMAND_TOOL_ACCESS = {
+    # A shell command may touch any file: ordered against every local call.
+    "run_local_command": {"local": "write"},
+}
+
 
 def execute_command_tool(tool_name: str, tool_input: dict) -> str:
     if tool_name == "run_local_command":
         return _run_local_command(
             tool_input["command"],
-            tool_input.get("cwd", ".")
+            tool_input.get("cwd", "."),
+            tool_input.get("timeout"),
+            bool(tool_input.get("background", False)),
         )
     return f"ERROR: Unknown command tool '{tool_name}'"
 
 
-def _run_local_command(command: str, cwd: str = ".") -> str:
+def _run_local_command(command: str, cwd: str = ".", timeout: int = None, background: bool = False) -> str:
     work_dir = os.path.join(config.WORK_DIR, cwd)
+    if timeout is None and not background:
+        timeout = 120
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            cwd=work_dir,
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        parts = []
-        if result.stdout:
-            parts.append(f"[stdout]\n{result.stdout.rstrip()}")
-        if result.stderr:
-            parts.append(f"[stderr]\n{result.stderr.rstrip()}")
-        parts.append(f"[exit code] {result.returncode}")
-        return "\n".join(parts) if parts else f"[exit code] {result.returncode}"
-    except subprocess.TimeoutExpired:
-        return "ERROR: Command timed out after 120 seconds"
+        job = local_jobs.start(command, work_dir, timeout=timeout, background=background)
     except Exception as e:
         return f"ERROR: {e}"
+    if background:
+        limit = f", killed after {timeout}s" if timeout else ""
+        return (
+            f"OK: Started local job {job.job_id} in {cwd}{limit}\n"
+            f"Use tail_local_job / local_job_status with job_id='{job.job_id}'."
+        )
+
+    job.done.wait()
+    size = job.output.size
+    if size <= _HEAD_BYTES + _TAIL_BYTES:
+        output = job.output.read(0, size).decode("utf-8", errors="replace").rstrip()
+    else:
+        # Cut at line boundaries so neither side starts or ends mid-line.
+        head = job.output.read(0, _HEAD_BYTES)
+        head = head[:head.rfind(b"\n") + 1] or head
+        tail = job.output.read(size - _TAIL_BYTES, _TAIL_BYTES)
+        tail = tail[tail.find(b"\n") + 1:] or tail
+        omitted = size - len(head) - len(tail)
+        output = (
+            f"{head.decode('utf-8', errors='replace')}... [{omitted} bytes omitted: tail_local_job "
+            f"job_id='{job.job_id}' offset={len(head)} reads them] ...\n"
+            f"{tail.decode('utf-8', errors='replace').rstrip()}"
+        )
+    job.offset = size
+    parts = []
+    if job.state == "timeout":
+        parts.append(f"ERROR: Command timed out after {timeout} seconds and was killed "
+                     "(pass a larger timeout, or background=true for long runs)")
+    if output:
+        parts.append(f"[output]\n{output}")
+    parts.append(f"[exit code] {job.exit_code}")
+    return "\n".join(parts)
@@ -0,0 +1,702 @@
+"""
+Streaming DEF reader with array-backed tables and a uniform-grid spatial index.
+
+A routed DEF for a real block is hundreds of MB; reading it through
+read_file is hopeless and even a dict-per-instance parser runs out of memory
+long before the end.  `parse_def` streams the file statement by statement
+and keeps only what placement/routing queries need, in flat arrays:
+
+    components  name, cell type, x, y, orientation, status   (+ w, h once sized)
+    IO pins     name, net, x, y, placed flag
+    nets        name, connections in CSR form (start offsets + member ids)
+    rows        site, origin, orientation, repeat count and step
+    tracks      per-layer pitch (routing supply for the congestion estimate)
+
+Names live in one newline-joined string per table (`NameTable`) rather than
+a million Python str objects; lookups and glob matches run as C-level
+string/regex scans over that blob.  Routing (the wiring after `+ ROUTED`)
+and SPECIALNETS are skipped without being tokenised into the net record.
+
+Cell footprints are not in the DEF.  `size_cells` takes them from LEF
+MACRO SIZE statements when DEF_LEF_FILES is configured, otherwise from the
+per-type area in the summaryReport next to the DEF (area / row height), and
+falls back to one site wide.
+
+    design = load("results/innovus_alu/alu_8bit_final.def")   # cached
+    design.cells_in((x0, y0, x1, y1))     # DBU rectangle -> component ids
+    design.net_bbox(i), design.hpwl(i)    # DBU
+    density_map(design, 16, 16), rudy_map(design, 16, 16), row_utilization(design)
+
+Configuration in config.py (optional):
+    DEF_LEF_FILES     — LEF files/globs (relative to WORK_DIR) with MACRO SIZEs
+    DEF_CACHE_DESIGNS — parsed designs kept in memory (default: 4)
+"""
+
+import glob
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+import config
+
+UNPLACED, PLACED, FIXED, COVER = 0, 1, 2, 3
+STATUS_NAMES = ("UNPLACED", "PLACED", "FIXED", "COVER")
+ORIENTS = ("N", "S", "E", "W", "FN", "FS", "FE", "FW")
+_ORIENT = {name: i for i, name in enumerate(ORIENTS)}
+_ROTATED = {_ORIENT["E"], _ORIENT["W"], _ORIENT["FE"], _ORIENT["FW"]}
+_STATUS = {"PLACED": PLACED, "FIXED": FIXED, "COVER": COVER}
+
+# Sections whose statements are never needed; skipped up to their END line.
+_SKIP_SECTIONS = {
+    "PROPERTYDEFINITIONS", "VIAS", "SPECIALNETS", "BLOCKAGES", "REGIONS", "GROUPS",
+    "NONDEFAULTRULES", "FILLS", "STYLES", "SCANCHAINS", "SLOTS", "PINPROPERTIES",
+}
+
+
+class NameTable:
+    """Append-only list of names stored as one newline-joined string."""
+
+    def __init__(self):
+        self._parts = []
+        self._blob = None
+        self._offsets = None
+
+    def append(self, name: str):
+        self._parts.append(name)
+
+    def freeze(self):
+        parts, self._parts = self._parts, None
+        self._blob = "\n" + "\n".join(parts) + "\n"
+        offsets = array("Q")
+        pos = 1
+        for name in parts:
+            offsets.append(pos)
+            pos += len(name) + 1
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) if self._offsets is not None else len(self._parts)
+
+    def __getitem__(self, i: int) -> str:
+        if self._offsets is None:
+            return self._parts[i]
+        start = self._offsets[i]
+        return self._blob[start:self._blob.index("\n", start)]
+
+    def index(self, name: str) -> int:
+        """Position of *name* (exact, or with DEF bus-bit escapes added), or -1."""
+        for candidate in (name, _escape(name)):
+            pos = self._blob.find("\n" + candidate + "\n")
+            if pos >= 0:
+                return bisect_right(self._offsets, pos + 1) - 1
+        return -1
+
+    def match(self, pattern: str, limit: int = None) -> list:
+        """Indexes of names matching the glob *pattern* ('*', '?'), in file order."""
+        parts = []
+        for c in _unescape(pattern):
+            if c == "*":
+                parts.append("[^\n]*")
+            elif c == "?":
+                parts.append("[^\n]")
+            elif c in "[]":
+                parts.append(r"\\?" + re.escape(c))      # names may carry DEF escapes
+            else:
+                parts.append(re.escape(c))
+        regex = re.compile("^" + "".join(parts) + "$", re.M)
+        hits = []
+        for m in regex.finditer(self._blob):
+            hits.append(bisect_right(self._offsets, m.start()) - 1)
+            if limit is not None and len(hits) >= limit:
+                break
+        return hits
+
+    def nbytes(self) -> int:
+        return (len(self._blob) if self._blob else 0) + (self._offsets.itemsize * len(self._offsets)
+                                                        if self._offsets is not None else 0)
+
+
+class DefDesign:
+    def __init__(self, path: str):
+        self.path = path
+        self.name = ""
+        self.dbu = 1000
+        self.die = (0, 0, 0, 0)
+        self.has_nets_section = False
+        self.parse_seconds = 0.0
+
+        self.cell_types = []                    # type id -> cell type name
+        self.comp_names = NameTable()
+        self.comp_type = array("i")
+        self.comp_x = array("i")
+        self.comp_y = array("i")
+        self.comp_orient = array("b")
+        self.comp_status = array("b")
+        self.comp_w = array("i")
+        self.comp_h = array("i")
+        self.size_source = "unsized"
+
+        self.pin_names = NameTable()
+        self.pin_net = NameTable()
+        self.pin_x = array("i")
+        self.pin_y = array("i")
+        self.pin_placed = array("b")
+
+        self.net_names = NameTable()
+        self.net_start = array("Q", [0])
+        self.net_members = array("i")           # component id, or -(pin id + 1) for an IO pin
+
+        self.row_names = []
+        self.row_site = []
+        self.row_x = array("i")
+        self.row_y = array("i")
+        self.row_orient = array("b")
+        self.row_nx = array("i")
+        self.row_ny = array("i")
+        self.row_sx = array("i")
+        self.row_sy = array("i")
+
+        self.track_pitch = {}                   # layer -> smallest TRACKS step (DBU)
+        self._grid = None
+
+    # ── Sizes and geometry ────────────────────────────────────────────────────
+
+    @property
+    def component_count(self) -> int:
+        return len(self.comp_type)
+
+    @property
+    def net_count(self) -> int:
+        return len(self.net_start) - 1
+
+    def row_height(self) -> int:
+        ys = sorted(set(self.row_y))
+        steps = [b - a for a, b in zip(ys, ys[1:]) if b > a]
+        return min(steps) if steps else 0
+
+    def core_box(self):
+        """Bounding box of the placement rows, or the die area without rows."""
+        if not len(self.row_x):
+            return self.die
+        x0 = min(self.row_x)
+        y0 = min(self.row_y)
+        x1 = max(x + max(nx * sx, sx) for x, nx, sx in zip(self.row_x, self.row_nx, self.row_sx))
+        h = self.row_height() or 0
+        y1 = max(y + max((ny - 1) * sy, 0) for y, ny, sy in zip(self.row_y, self.row_ny, self.row_sy)) + h
+        return (x0, y0, x1, y1)
+
+    def center(self, i: int):
+        return self.comp_x[i] + self.comp_w[i] // 2, self.comp_y[i] + self.comp_h[i] // 2
+
+    def um(self, dbu_value) -> float:
+        return dbu_value / self.dbu
+
+    # ── Nets ──────────────────────────────────────────────────────────────────
+
+    def net_points(self, n: int):
+        """(x, y) of every placed member of net *n*: cell centres and IO pin locations."""
+        points = []
+        for k in range(self.net_start[n], self.net_start[n + 1]):
+            m = self.net_members[k]
+            if m >= 0:
+                if self.comp_status[m] != UNPLACED:
+                    points.append(self.center(m))
+            elif self.pin_placed[-m - 1]:
+                points.append((self.pin_x[-m - 1], self.pin_y[-m - 1]))
+        return points
+
+    def net_bbox(self, n: int):
+        """DBU bounding box of net *n*'s placed members, or None."""
+        lo_x = lo_y = hi_x = hi_y = None
+        cx, cy, cw, ch, status = self.comp_x, self.comp_y, self.comp_w, self.comp_h, self.comp_status
+        for k in range(self.net_start[n], self.net_start[n + 1]):
+            m = self.net_members[k]
+            if m >= 0:
+                if status[m] == UNPLACED:
+                    continue
+                x, y = cx[m] + cw[m] // 2, cy[m] + ch[m] // 2
+            elif self.pin_placed[-m - 1]:
+                x, y = self.pin_x[-m - 1], self.pin_y[-m - 1]
+            else:
+                continue
+            if lo_x is None:
+                lo_x = hi_x = x
+                lo_y = hi_y = y
+            else:
+                lo_x, hi_x = min(lo_x, x), max(hi_x, x)
+                lo_y, hi_y = min(lo_y, y), max(hi_y, y)
+        return None if lo_x is None else (lo_x, lo_y, hi_x, hi_y)
+
+    def hpwl(self, n: int) -> int:
+        box = self.net_bbox(n)
+        return (box[2] - box[0]) + (box[3] - box[1]) if box else 0
+
+    # ── Spatial index ─────────────────────────────────────────────────────────
+
+    def cells_in(self, box) -> list:
+        """Ids of placed components whose footprint intersects the DBU rectangle *box*."""
+        grid = self._grid or self._build_grid()
+        x0, y0, x1, y1 = box
+        gx0, gy0, bw, bh, nbx, nby, start, items, max_w, max_h = grid
+        # Components are binned by origin, so widen the search by the largest footprint.
+        bx0 = max(0, (x0 - max_w - gx0) // bw)
+        by0 = max(0, (y0 - max_h - gy0) // bh)
+        bx1 = min(nbx - 1, (x1 - gx0) // bw)
+        by1 = min(nby - 1, (y1 - gy0) // bh)
+        hits = []
+        cx, cy, cw, ch = self.comp_x, self.comp_y, self.comp_w, self.comp_h
+        for by in range(by0, by1 + 1):
+            row = by * nbx
+            for bx in range(bx0, bx1 + 1):
+                b = row + bx
+                for k in range(start[b], start[b + 1]):
+                    i = items[k]
+                    if cx[i] < x1 and cx[i] + cw[i] > x0 and cy[i] < y1 and cy[i] + ch[i] > y0:
+                        hits.append(i)
+        hits.sort()
+        return hits
+
+    def _build_grid(self):
+        placed = [i for i in range(self.component_count) if self.comp_status[i] != UNPLACED]
+        x0, y0, x1, y1 = self.die
+        if placed:
+            x0 = min(x0, min(self.comp_x[i] for i in placed))
+            y0 = min(y0, min(self.comp_y[i] for i in placed))
+            x1 = max(x1, max(self.comp_x[i] for i in placed) + 1)
+            y1 = max(y1, max(self.comp_y[i] for i in placed) + 1)
+        # About eight components per bin on average.
+        side = max(1, int(math.sqrt(len(placed) / 8)))
+        bw = max(1, -(-(x1 - x0) // side))
+        bh = max(1, -(-(y1 - y0) // side))
+        nbx = max(1, -(-(x1 - x0) // bw))
+        nby = max(1, -(-(y1 - y0) // bh))
+        bins = array("i", [0]) * len(placed)
+        counts = array("Q", [0]) * (nbx * nby + 1)
+        for k, i in enumerate(placed):
+            b = min(nby - 1, (self.comp_y[i] - y0) // bh) * nbx + min(nbx - 1, (self.comp_x[i] - x0) // bw)
+            bins[k] = b
+            counts[b + 1] += 1
+        for b in range(nbx * nby):
+            counts[b + 1] += counts[b]
+        fill = array("Q", counts)
+        items = array("i", [0]) * len(placed)
+        for k, i in enumerate(placed):
+            b = bins[k]
+            items[fill[b]] = i
+            fill[b] += 1
+        max_w = max(self.comp_w) if len(self.comp_w) else 0
+        max_h = max(self.comp_h) if len(self.comp_h) else 0
+        self._grid = (x0, y0, bw, bh, nbx, nby, counts, items, max_w, max_h)
+        return self._grid
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the tables."""
+        total = 0
+        for value in vars(self).values():
+            if isinstance(value, array):
+                total += value.itemsize * len(value)
+            elif isinstance(value, NameTable):
+                total += value.nbytes()
+        if self._grid:
+            total += sum(a.itemsize * len(a) for a in self._grid if isinstance(a, array))
+        return total
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+
+def parse_def(path: str, sizes: dict = None) -> DefDesign:
+    """Stream *path* into a DefDesign.  *sizes* (type -> (w, h) in DBU) overrides size_cells."""
+    started = time.monotonic()
+    d = DefDesign(path)
+    ids = {"comp": {}, "pin": {}, "type": {}}
+    section = None
+    stmt = []
+    skipping = False            # rest of the statement is not needed (routing, skipped section)
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            toks = line.split()
+            if not toks or toks[0].startswith("#"):
+                continue
+            if not stmt and toks[0] == "END" and (section not in _SKIP_SECTIONS or toks[1:2] == [section]):
+                section, skipping = None, False
+                continue
+            while True:
+                try:
+                    end = toks.index(";")
+                except ValueError:
+                    end = -1
+                head = toks if end < 0 else toks[:end]
+                if not skipping and section not in _SKIP_SECTIONS:
+                    if section == "NETS" and "+" in head:
+                        plus = head.index("+")
+                        if head[plus - 1:plus] != ["("] and "(" not in head[_last(head, ")", plus) + 1:plus]:
+                            head = head[:plus]
+                            skipping = True
+                    stmt.extend(head)
+                if end < 0:
+                    break
+                if stmt:
+                    section = _statement(d, section, stmt, ids)
+                stmt = []
+                skipping = False
+                toks = toks[end + 1:]
+                if not toks:
+                    break
+
+    d.comp_names.freeze()
+    d.pin_names.freeze()
+    d.pin_net.freeze()
+    d.net_names.freeze()
+    d.parse_seconds = time.monotonic() - started
+    size_cells(d, sizes)
+    return d
+
+
+def _statement(d: DefDesign, section, s: list, ids: dict):
+    """Apply one ';'-terminated statement; return the section that follows it."""
+    if section == "COMPONENTS" and s[0] == "-" and len(s) >= 3:
+        ids["comp"][s[1]] = len(d.comp_type)
+        d.comp_names.append(s[1])
+        tid = ids["type"].get(s[2])
+        if tid is None:
+            tid = ids["type"][s[2]] = len(d.cell_types)
+            d.cell_types.append(s[2])
+        d.comp_type.append(tid)
+        status, x, y, orient = _placement(s)
+        d.comp_status.append(status)
+        d.comp_x.append(x)
+        d.comp_y.append(y)
+        d.comp_orient.append(orient)
+        return section
+    if section == "NETS" and s[0] == "-" and len(s) >= 2:
+        d.net_names.append(s[1])
+        comps, pins = ids["comp"], ids["pin"]
+        i = 2
+        while i < len(s):
+            if s[i] == "(" and i + 2 < len(s):
+                owner = s[i + 1]
+                if owner == "PIN":
+                    m = pins.get(s[i + 2])
+                    if m is not None:
+                        d.net_members.append(-m - 1)
+                elif owner != "*":
+                    m = comps.get(owner)
+                    if m is not None:
+                        d.net_members.append(m)
+                i += 3
+            else:
+                i += 1
+        d.net_start.append(len(d.net_members))
+        return section
+    if section == "PINS" and s[0] == "-" and len(s) >= 2:
+        ids["pin"][s[1]] = len(d.pin_x)
+        d.pin_names.append(s[1])
+        d.pin_net.append(s[s.index("NET") + 1] if "NET" in s[:-1] else s[1])
+        status, x, y, _ = _placement(s)
+        d.pin_placed.append(status != UNPLACED)
+        d.pin_x.append(x)
+        d.pin_y.append(y)
+        return section
+    if section is not None:
+        return section
+
+    key = s[0]
+    if key in ("COMPONENTS", "PINS", "NETS"):
+        if key == "NETS":
+            d.has_nets_section = True
+        return key
+    if key in _SKIP_SECTIONS:
+        return key
+    if key == "DESIGN" and len(s) > 1:
+        d.name = s[1]
+    elif key == "UNITS" and len(s) >= 4:
+        d.dbu = int(float(s[3]))
+    elif key == "DIEAREA":
+        xs = [_int(v) for v in _coords(s)[0::2]]
+        ys = [_int(v) for v in _coords(s)[1::2]]
+        if xs and ys:
+            d.die = (min(xs), min(ys), max(xs), max(ys))
+    elif key == "ROW" and len(s) >= 6:
+        d.row_names.append(s[1])
+        d.row_site.append(s[2])
+        d.row_x.append(_int(s[3]))
+        d.row_y.append(_int(s[4]))
+        d.row_orient.append(_ORIENT.get(s[5], 0))
+        nx = ny = 1
+        sx = sy = 0
+        if "DO" in s:
+            i = s.index("DO")
+            nx, ny = _int(s[i + 1]), _int(s[i + 3])
+        if "STEP" in s:
+            i = s.index("STEP")
+            sx, sy = _int(s[i + 1]), _int(s[i + 2])
+        d.row_nx.append(nx)
+        d.row_ny.append(ny)
+        d.row_sx.append(sx)
+        d.row_sy.append(sy)
+    elif key == "TRACKS" and "STEP" in s and "LAYER" in s:
+        step = _int(s[s.index("STEP") + 1])
+        for layer in s[s.index("LAYER") + 1:]:
+            if step > 0 and (layer not in d.track_pitch or step < d.track_pitch[layer]):
+                d.track_pitch[layer] = step
+    return None
+
+
+def _placement(s: list):
+    for keyword, status in _STATUS.items():
+        if keyword in s:
+            i = s.index(keyword)
+            if i + 5 < len(s) and s[i + 1] == "(":
+                return status, _int(s[i + 2]), _int(s[i + 3]), _ORIENT.get(s[i + 5], 0)
+    return UNPLACED, 0, 0, 0
+
+
+def _coords(s: list) -> list:
+    return [t for t in s if t not in ("(", ")", "DIEAREA")]
+
+
+def _int(text: str) -> int:
+    try:
+        return int(text)
+    except ValueError:
+        return int(float(text))
+
+
+def _last(toks: list, value: str, before: int) -> int:
+    for i in range(before - 1, -1, -1):
+        if toks[i] == value:
+            return i
+    return -1
+
+
+def _escape(name: str) -> str:
+    return re.sub(r"(?<!\\)([\[\]])", r"\\\1", name)
+
+
+def _unescape(name: str) -> str:
+    return name.replace("\\[", "[").replace("\\]", "]")
+
+
+def display_name(name: str) -> str:
+    return _unescape(name)
+
+
+# ── Cell footprints ───────────────────────────────────────────────────────────
+
+def size_cells(d: DefDesign, sizes: dict = None):
+    """Fill comp_w / comp_h (DBU, orientation applied) from *sizes*, LEF, summaryReport or the site width."""
+    row_h = d.row_height() or (d.dbu * 2)
+    site_w = min((sx for sx in d.row_sx if sx > 0), default=row_h // 4 or 1)
+    if sizes is None:
+        sizes, d.size_source = _lef_sizes(d.dbu), "LEF"
+        if not sizes:
+            sizes, d.size_source = _report_sizes(d, row_h), "summaryReport area / row height"
+    else:
+        d.size_source = "given"
+    if not sizes:
+        d.size_source = "one site per cell (no LEF or summaryReport found)"
+    by_type = [sizes.get(t, (site_w, row_h)) for t in d.cell_types]
+    w = array("i", [0]) * d.component_count
+    h = array("i", [0]) * d.component_count
+    for i in range(d.component_count):
+        cw, ch = by_type[d.comp_type[i]]
+        if d.comp_orient[i] in _ROTATED:
+            cw, ch = ch, cw
+        w[i] = cw
+        h[i] = ch
+    d.comp_w, d.comp_h = w, h
+    d._grid = None
+
+
+def _lef_sizes(dbu: int) -> dict:
+    sizes = {}
+    for pattern in getattr(config, "DEF_LEF_FILES", []) or []:
+        for path in sorted(glob.glob(os.path.join(config.WORK_DIR, pattern))):
+            macro = None
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    toks = line.split()
+                    if len(toks) >= 2 and toks[0] == "MACRO":
+                        macro = toks[1]
+                    elif macro and len(toks) >= 4 and toks[0] == "SIZE" and toks[2] == "BY":
+                        sizes[macro] = (round(float(toks[1]) * dbu), round(float(toks[3]) * dbu))
+                    elif macro and toks[:1] == ["END"] and toks[1:2] == [macro]:
+                        macro = None
+    return sizes
+
+
+def _report_sizes(d: DefDesign, row_h: int) -> dict:
+    from tools import qor_parsers
+
+    directory = os.path.dirname(d.path)
+    candidates = [os.path.join(directory, "area_report.txt")] + sorted(glob.glob(os.path.join(directory, "*summary*")))
+    for path in candidates:
+        if not os.path.isfile(path):
+            continue
+        qor = qor_parsers.parse_innovus_summary(path, qor_parsers.QoR())
+        if qor.cell_types:
+            row_um = row_h / d.dbu
+            return {
+                name: (max(1, round(area / count / row_um * d.dbu)), row_h)
+                for name, (count, area) in qor.cell_types.items() if count
+            }
+    return {}
+
+
+# ── Maps ──────────────────────────────────────────────────────────────────────
+
+def bin_grid(d: DefDesign, nx: int, ny: int, box=None):
+    """(x0, y0, bin width, bin height) of an nx x ny grid over *box* (default: the core)."""
+    x0, y0, x1, y1 = box or d.core_box()
+    return x0, y0, max(1, -(-(x1 - x0) // nx)), max(1, -(-(y1 - y0) // ny))
+
+
+def density_map(d: DefDesign, nx: int, ny: int, box=None) -> list:
+    """ny x nx list of cell area / bin area (bottom row first)."""
+    x0, y0, bw, bh = bin_grid(d, nx, ny, box)
+    diff = _diff_grid(nx, ny)
+    for i in range(d.component_count):
+        if d.comp_status[i] == UNPLACED:
+            continue
+        _spread(diff, x0, y0, bw, bh, nx, ny,
+                d.comp_x[i], d.comp_y[i], d.comp_x[i] + d.comp_w[i], d.comp_y[i] + d.comp_h[i], 1.0)
+    return _integrate(diff, nx, ny, 1.0 / (bw * bh))
+
+
+def rudy_map(d: DefDesign, nx: int, ny: int, box=None) -> list:
+    """
+    ny x nx list of estimated routing demand / track supply (RUDY: each net
+    spreads wirelength (w + h) uniformly over its bounding box).  Supply is
+    one track per smallest TRACKS pitch on every layer; without TRACKS the
+    raw demand (DBU of wire per DBU^2) is returned.
+    """
+    x0, y0, bw, bh = bin_grid(d, nx, ny, box)
+    diff = _diff_grid(nx, ny)
+    floor = max(1, d.row_height() or d.dbu)
+    for n in range(d.net_count):
+        if d.net_start[n + 1] - d.net_start[n] < 2:
+            continue
+        box_n = d.net_bbox(n)
+        if box_n is None:
+            continue
+        bx0, by0, bx1, by1 = box_n
+        w = max(bx1 - bx0, floor)
+        h = max(by1 - by0, floor)
+        _spread(diff, x0, y0, bw, bh, nx, ny, bx0, by0, bx0 + w, by0 + h, (w + h) / float(w * h))
+    supply = sum(1.0 / p for p in d.track_pitch.values()) * bw * bh
+    return _integrate(diff, nx, ny, 1.0 / supply if supply else 1.0 / (bw * bh))
+
+
+def row_utilization(d: DefDesign):
+    """
+    ([(row id, used DBU, capacity DBU, cells), ...], cells off every row).
+    Cells are assigned to the row whose origin y matches and whose span starts left of them.
+    """
+    rows_at = {}
+    for r in range(len(d.row_x)):
+        for k in range(max(1, d.row_ny[r])):
+            y = d.row_y[r] + k * d.row_sy[r]
+            rows_at.setdefault(y, []).append(r)
+    for rs in rows_at.values():
+        rs.sort(key=lambda r: d.row_x[r])
+    starts = {y: [d.row_x[r] for r in rs] for y, rs in rows_at.items()}
+    used = [0] * len(d.row_x)
+    cells = [0] * len(d.row_x)
+    off_row = 0
+    for i in range(d.component_count):
+        if d.comp_status[i] == UNPLACED:
+            continue
+        rs = rows_at.get(d.comp_y[i])
+        if rs is None:
+            off_row += 1
+            continue
+        k = bisect_right(starts[d.comp_y[i]], d.comp_x[i]) - 1
+        if k < 0:
+            off_row += 1
+            continue
+        r = rs[k]
+        used[r] += d.comp_w[i]
+        cells[r] += 1
+    result = [(r, used[r], max(1, d.row_nx[r]) * max(d.row_sx[r], 1) * max(1, d.row_ny[r]), cells[r])
+              for r in range(len(d.row_x))]
+    return result, off_row
+
+
+def _diff_grid(nx: int, ny: int) -> list:
+    return [[0.0] * (nx + 1) for _ in range(ny + 1)]
+
+
+def _spread(diff, x0, y0, bw, bh, nx, ny, rx0, ry0, rx1, ry1, weight):
+    """
+    Add weight * (overlap of rectangle r with each bin) into the difference
+    grid *diff*.  The overlap is separable into x and y runs of equal
+    overlap (partial first bin, full middle bins, partial last bin), so any
+    rectangle costs at most nine O(1) updates however many bins it covers.
+    """
+    for a0, a1, ox in _runs(rx0, rx1, x0, bw, nx):
+        for b0, b1, oy in _runs(ry0, ry1, y0, bh, ny):
+            v = weight * ox * oy
+            diff[b0][a0] += v
+            diff[b0][a1 + 1] -= v
+            diff[b1 + 1][a0] -= v
+            diff[b1 + 1][a1 + 1] += v
+
+
+def _runs(r0, r1, g0, step, count):
+    """[(first bin, last bin, overlap per bin)] of the span [r0, r1) on a grid."""
+    r0, r1 = max(r0, g0), min(r1, g0 + count * step)
+    if r1 <= r0:
+        return ()
+    i0, i1 = (r0 - g0) // step, (r1 - 1 - g0) // step
+    if i0 == i1:
+        return ((i0, i0, r1 - r0),)
+    runs = [(i0, i0, g0 + (i0 + 1) * step - r0)]
+    if i1 > i0 + 1:
+        runs.append((i0 + 1, i1 - 1, step))
+    runs.append((i1, i1, r1 - (g0 + i1 * step)))
+    return runs
+
+
+def _integrate(diff, nx: int, ny: int, scale: float) -> list:
+    grid = [[0.0] * nx for _ in range(ny)]
+    above = [0.0] * nx
+    for iy in range(ny):
+        acc = 0.0
+        row, src = grid[iy], diff[iy]
+        for ix in range(nx):
+            acc += src[ix]
+            above[ix] += acc
+            row[ix] = above[ix] * scale
+    return grid
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def load(path: str) -> DefDesign:
+    """Parsed design for *path*, reparsed whenever the file's size or mtime changes."""
+    key = os.path.realpath(path)
+    st = os.stat(key)
+    stamp = (st.st_size, st.st_mtime_ns)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            _cache.move_to_end(key)
+            return entry[1]
+    design = parse_def(key)
+    with _lock:
+        _cache.pop(key, None)
+        _cache[key] = (stamp, design)
+        limit = max(1, int(getattr(config, "DEF_CACHE_DESIGNS", 4)))
+        while len(_cache) > limit:
+            _cache.popitem(last=False)
+    return design
@@ -0,0 +1,335 @@
+"""
+Placement and routing queries over a DEF, built on tools/def_parser.py.
+
+`query_def` answers the questions the model would otherwise try to answer by
+reading a multi-megabyte DEF through read_file: which cells sit in a region,
+how long a net is, where the placement is dense or the routing congested,
+how full the rows are.  The DEF is parsed once into array-backed tables and
+kept in memory until it changes on disk.
+"""
+
+import fnmatch
+import glob
+import heapq
+import os
+import time
+
+import config
+
+DEF_TOOLS = [
+    {
+        "name": "query_def",
+        "description": (
+            "Query a placed/routed DEF (e.g. 'results/innovus_alu/alu_8bit_final.def', or its directory). "
+            "Actions: 'summary' (die/core, cell, pin, net and row counts, utilization, total HPWL); "
+            "'cells' (instances in a region and/or matching a name or cell-type glob); "
+            "'net' (bounding box, HPWL and members of a net or glob of nets); "
+            "'top_nets' (longest nets by half-perimeter wirelength); "
+            "'density' (per-bin cell-area heatmap); 'congestion' (per-bin RUDY routing demand / track "
+            "supply heatmap); 'rows' (per-row utilization). Coordinates are in microns. "
+            "Use this instead of reading DEF files."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "def_file": {
+                    "type": "string",
+                    "description": "DEF file, or a results directory containing one, relative to the project"
+                },
+                "action": {
+                    "type": "string",
+                    "enum": ["summary", "cells", "net", "top_nets", "density", "congestion", "rows"],
+                    "description": "Query to run (default: summary)"
+                },
+                "region": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "[x1, y1, x2, y2] in microns, for 'cells', 'density' and 'congestion'"
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "Instance-name glob for 'cells', or net name/glob for 'net', e.g. 'u_alu/*'"
+                },
+                "cell_type": {
+                    "type": "string",
+                    "description": "Cell-type glob for 'cells', e.g. 'DF*'"
+                },
+                "bins": {
+                    "type": "integer",
+                    "description": "Heatmap bins per side for 'density' / 'congestion' (default: 16)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Rows of detail to list (default: 20)"
+                }
+            },
+            "required": ["def_file"]
+        }
+    }
+]
+
+DEF_TOOL_ACCESS = {
+    "query_def": {"local": "read"},
+}
+
+_MAX_BINS = 64
+
+
+def execute_def_tool(tool_name: str, tool_input: dict) -> str:
+    if tool_name == "query_def":
+        return _query_def(
+            tool_input["def_file"],
+            tool_input.get("action", "summary"),
+            tool_input.get("region"),
+            tool_input.get("pattern"),
+            tool_input.get("cell_type"),
+            int(tool_input.get("bins", 16)),
+            int(tool_input.get("limit", 20)),
+        )
+    return f"ERROR: Unknown DEF tool '{tool_name}'"
+
+
+def _query_def(def_file: str, action: str = "summary", region=None, pattern: str = None,
+               cell_type: str = None, bins: int = 16, limit: int = 20) -> str:
+    from tools import def_parser
+    work = os.path.realpath(config.WORK_DIR)
+    full = os.path.realpath(os.path.join(config.WORK_DIR, def_file))
+    if not full.startswith(work):
+        return f"ERROR: Path '{def_file}' escapes the work directory"
+    if os.path.isdir(full):
+        found = _find_def(full)
+        if found is None:
+            return f"ERROR: No .def file in '{def_file}'"
+        full = found
+    elif not os.path.isfile(full):
+        return f"ERROR: DEF file '{def_file}' not found"
+    rel = os.path.relpath(full, work)
+
+    if region is not None and (len(region) != 4 or region[0] >= region[2] or region[1] >= region[3]):
+        return "ERROR: region must be [x1, y1, x2, y2] in microns with x1 < x2 and y1 < y2"
+    limit = max(1, limit)
+    bins = max(1, min(bins, _MAX_BINS))
+
+    try:
+        start = time.monotonic()
+        d = def_parser.load(full)
+        loaded = time.monotonic() - start
+        box = None if region is None else tuple(round(v * d.dbu) for v in region)
+        if action == "summary":
+            body = _summary(d)
+        elif action == "cells":
+            body = _cells(d, box, pattern, cell_type, limit)
+        elif action == "net":
+            if not pattern:
+                return "ERROR: action 'net' needs pattern (a net name or glob)"
+            body = _nets(d, pattern, limit)
+        elif action == "top_nets":
+            body = _top_nets(d, limit)
+        elif action == "density":
+            body = _heatmap(d, "density", box, bins, limit)
+        elif action == "congestion":
+            body = _heatmap(d, "congestion", box, bins, limit)
+        elif action == "rows":
+            body = _rows(d, limit)
+        else:
+            return f"ERROR: Unknown action '{action}'"
+    except Exception as e:
+        return f"ERROR (query_def): {e}"
+    cached = "cached" if loaded < d.parse_seconds / 2 else f"parsed in {d.parse_seconds:.2f}s"
+    return f"[{rel}: design {d.name or '?'}, {cached}]\n{body}"
+
+
+# ── Actions ───────────────────────────────────────────────────────────────────
+
+def _summary(d) -> str:
+    from tools import def_parser
+    um = d.um
+    x0, y0, x1, y1 = d.die
+    c0, c1, c2, c3 = d.core_box()
+    status = [0, 0, 0, 0]
+    for s in d.comp_status:
+        status[s] += 1
+    cell_area = sum(d.comp_w[i] * d.comp_h[i] for i in range(d.component_count) if d.comp_status[i])
+    core_area = (c2 - c0) * (c3 - c1)
+    lines = [
+        f"die {um(x1 - x0):.2f} x {um(y1 - y0):.2f} um, core {um(c2 - c0):.2f} x {um(c3 - c1):.2f} um "
+        f"at ({um(c0):.2f}, {um(c1):.2f}); {d.dbu} DBU/um",
+        f"components {d.component_count:,} ({', '.join(f'{n.lower()} {status[i]:,}' for i, n in enumerate(def_parser.STATUS_NAMES) if status[i])}), "
+        f"{len(d.cell_types):,} cell type(s)",
+        f"IO pins {len(d.pin_x):,} ({sum(d.pin_placed):,} placed), rows {len(d.row_x):,} "
+        f"(height {um(d.row_height()):.2f} um), routing layers {len(d.track_pitch)}",
+    ]
+    if core_area:
+        lines.append(f"cell area {um(um(cell_area)):,.2f} um^2, utilization {100 * cell_area / core_area:.1f}% "
+                     f"(footprints from {d.size_source})")
+    if d.has_nets_section:
+        total = sum(d.hpwl(n) for n in range(d.net_count))
+        lines.append(f"nets {d.net_count:,} ({len(d.net_members):,} connections), total HPWL {um(total):,.1f} um")
+    else:
+        lines.append("nets: none (the DEF was written without a NETS section; net/congestion queries need one)")
+    lines.append(f"tables {d.nbytes() / 1e6:.1f} MB")
+    return "\n".join(lines)
+
+
+def _cells(d, box, pattern, cell_type, limit) -> str:
+    from tools import def_parser
+    if box is None and not pattern and not cell_type:
+        return "ERROR: action 'cells' needs a region, pattern or cell_type"
+    if box is not None:
+        ids = d.cells_in(box)
+    elif pattern:
+        ids = d.comp_names.match(pattern)
+    else:
+        ids = range(d.component_count)
+    if pattern and box is not None:
+        wanted = set(d.comp_names.match(pattern))
+        ids = [i for i in ids if i in wanted]
+    if cell_type:
+        types = {t for t, name in enumerate(d.cell_types) if fnmatch.fnmatchcase(name, cell_type)}
+        ids = [i for i in ids if d.comp_type[i] in types]
+    ids = list(ids)
+
+    by_type = {}
+    area = 0
+    inside = 0
+    for i in ids:
+        by_type[d.comp_type[i]] = by_type.get(d.comp_type[i], 0) + 1
+        area += d.comp_w[i] * d.comp_h[i]
+        if box is not None:
+            inside += (max(0, min(box[2], d.comp_x[i] + d.comp_w[i]) - max(box[0], d.comp_x[i]))
+                       * max(0, min(box[3], d.comp_y[i] + d.comp_h[i]) - max(box[1], d.comp_y[i])))
+    where = ""
+    if box is not None:
+        where = f" in ({d.um(box[0]):.2f}, {d.um(box[1]):.2f})-({d.um(box[2]):.2f}, {d.um(box[3]):.2f})"
+        region_area = (box[2] - box[0]) * (box[3] - box[1])
+        where += f" covering {100 * inside / region_area:.1f}% of it"
+    lines = [f"{len(ids):,} cell(s){where}, area {d.um(d.um(area)):,.2f} um^2"]
+    if by_type:
+        top = sorted(by_type.items(), key=lambda kv: -kv[1])[:8]
+        lines.append("types: " + ", ".join(f"{d.cell_types[t]} {n}" for t, n in top)
+                     + (f", ... {len(by_type) - 8} more" if len(by_type) > 8 else ""))
+    for i in ids[:limit]:
+        lines.append(
+            f"  {def_parser.display_name(d.comp_names[i]):<40} {d.cell_types[d.comp_type[i]]:<14} "
+            f"({d.um(d.comp_x[i]):.2f}, {d.um(d.comp_y[i]):.2f}) {def_parser.ORIENTS[d.comp_orient[i]]:<2} "
+            f"{def_parser.STATUS_NAMES[d.comp_status[i]].lower()}"
+        )
+    if len(ids) > limit:
+        lines.append(f"  ... {len(ids) - limit:,} more (raise limit or narrow the query)")
+    return "\n".join(lines)
+
+
+def _nets(d, pattern, limit) -> str:
+    from tools import def_parser
+    if not d.has_nets_section:
+        return "ERROR: this DEF has no NETS section (written without nets)"
+    exact = d.net_names.index(pattern) if not any(c in pattern for c in "*?") else -1
+    ids = [exact] if exact >= 0 else d.net_names.match(pattern)
+    if not ids:
+        return f"No net matches '{pattern}'"
+    lines = [f"{len(ids):,} net(s) match '{pattern}'"] if len(ids) > 1 else []
+    for n in ids[:limit]:
+        lines.append(_net_line(d, n))
+        if len(ids) == 1:
+            members = list(range(d.net_start[n], d.net_start[n + 1]))
+            for k in members[:limit]:
+                m = d.net_members[k]
+                if m >= 0:
+                    lines.append(f"    {def_parser.display_name(d.comp_names[m]):<40} {d.cell_types[d.comp_type[m]]:<14} "
+                                 f"({d.um(d.center(m)[0]):.2f}, {d.um(d.center(m)[1]):.2f})")
+                else:
+                    p = -m - 1
+                    loc = f"({d.um(d.pin_x[p]):.2f}, {d.um(d.pin_y[p]):.2f})" if d.pin_placed[p] else "(unplaced)"
+                    lines.append(f"    PIN {def_parser.display_name(d.pin_names[p]):<36} {'':<14} {loc}")
+            if len(members) > limit:
+                lines.append(f"    ... {len(members) - limit:,} more member(s)")
+    if len(ids) > limit:
+        lines.append(f"... {len(ids) - limit:,} more net(s)")
+    return "\n".join(lines)
+
+
+def _top_nets(d, limit) -> str:
+    if not d.has_nets_section:
+        return "ERROR: this DEF has no NETS section (written without nets)"
+    lengths = ((d.hpwl(n), n) for n in range(d.net_count))
+    top = heapq.nlargest(limit, lengths)
+    total = sum(d.hpwl(n) for n in range(d.net_count))
+    lines = [f"{d.net_count:,} nets, total HPWL {d.um(total):,.1f} um; longest {len(top)}:"]
+    lines += [_net_line(d, n) for _, n in top]
+    return "\n".join(lines)
+
+
+def _net_line(d, n) -> str:
+    from tools import def_parser
+    box = d.net_bbox(n)
+    degree = d.net_start[n + 1] - d.net_start[n]
+    name = def_parser.display_name(d.net_names[n])
+    if box is None:
+        return f"  {name:<32} degree {degree:<4} (no placed members)"
+    return (f"  {name:<32} degree {degree:<4} HPWL {d.um(box[2] - box[0] + box[3] - box[1]):9.2f} um  "
+            f"bbox ({d.um(box[0]):.2f}, {d.um(box[1]):.2f})-({d.um(box[2]):.2f}, {d.um(box[3]):.2f})")
+
+
+def _heatmap(d, kind, box, bins, limit) -> str:
+    from tools import def_parser
+    if kind == "congestion":
+        if not d.has_nets_section:
+            return "ERROR: this DEF has no NETS section (written without nets), so congestion cannot be estimated"
+        grid = def_parser.rudy_map(d, bins, bins, box)
+        what = ("RUDY routing demand as % of track supply" if d.track_pitch
+                else "RUDY routing demand (no TRACKS in the DEF, relative units x100)")
+    else:
+        grid = def_parser.density_map(d, bins, bins, box)
+        what = f"cell area as % of bin area (footprints from {d.size_source})"
+    x0, y0, bw, bh = def_parser.bin_grid(d, bins, bins, box)
+    values = [v for row in grid for v in row]
+    lines = [
+        f"{what}; {bins}x{bins} bins of {d.um(bw):.2f} x {d.um(bh):.2f} um from ({d.um(x0):.2f}, {d.um(y0):.2f})",
+        f"mean {100 * sum(values) / len(values):.0f}%, max {100 * max(values):.0f}%, "
+        f"bins over 100%: {sum(1 for v in values if v > 1.0)}",
+        "(top row = highest y)",
+    ]
+    for row in reversed(grid):
+        lines.append(" ".join(f"{min(999, round(100 * v)):3d}" for v in row))
+    hottest = sorted(((v, ix, iy) for iy, row in enumerate(grid) for ix, v in enumerate(row)), reverse=True)
+    lines.append("hottest bins:")
+    for v, ix, iy in hottest[:min(limit, 5)]:
+        lines.append(f"  {100 * v:5.0f}%  ({d.um(x0 + ix * bw):.2f}, {d.um(y0 + iy * bh):.2f})-"
+                     f"({d.um(x0 + (ix + 1) * bw):.2f}, {d.um(y0 + (iy + 1) * bh):.2f})")
+    return "\n".join(lines)
+
+
+def _rows(d, limit) -> str:
+    from tools import def_parser
+    rows, off_row = def_parser.row_utilization(d)
+    if not rows:
+        return "No ROW statements in this DEF"
+    utils = sorted(((used / cap, r, used, cap, n) for r, used, cap, n in rows), reverse=True)
+    used_total = sum(u for _, _, u, _, _ in utils)
+    cap_total = sum(c for _, _, _, c, _ in utils)
+    lines = [
+        f"{len(rows):,} rows: utilization {100 * used_total / cap_total:.1f}% overall, "
+        f"max {100 * utils[0][0]:.1f}%, min {100 * utils[-1][0]:.1f}%; "
+        f"{sum(1 for u in utils if u[0] > 1.0)} over-full, {sum(1 for u in utils if u[4] == 0)} empty; "
+        f"{off_row} cell(s) off every row",
+        "fullest rows:",
+    ]
+    half = max(1, limit // 2)
+    for u, r, used, cap, n in utils[:half]:
+        lines.append(f"  {d.row_names[r]:<20} y {d.um(d.row_y[r]):8.2f}  {100 * u:5.1f}%  {n} cell(s)")
+    if len(utils) > half:
+        lines.append("emptiest rows:")
+        for u, r, used, cap, n in utils[-min(half, len(utils) - half):]:
+            lines.append(f"  {d.row_names[r]:<20} y {d.um(d.row_y[r]):8.2f}  {100 * u:5.1f}%  {n} cell(s)")
+    return "\n".join(lines)
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _find_def(directory: str):
+    defs = glob.glob(os.path.join(directory, "*.def"))
+    if not defs:
+        return None
+    final = [p for p in defs if "final" in os.path.basename(p)]
+    return max(final or defs, key=os.path.getmtime)
+
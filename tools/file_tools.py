@@ -1,5 +1,11 @@
 import os
+import re
 import config
+from tools import line_index
+
+# read_file returns at most this many lines per call unless a window is given;
+# override with READ_FILE_MAX_LINES in config.py.
+_DEFAULT_MAX_LINES = 400
 
 FILE_TOOLS = [
     {
@@ -27,8 +33,11 @@ FILE_TOOLS = [
     {
         "name": "read_file",
         "description": (
-            "Read and return the content of a file. "
-            "Path is relative to the project work directory."
+            "Read a file. Path is relative to the project work directory. "
+            "Small files are returned whole; large logs and reports are returned one page at a time "
+            "with line numbers and a hint for the next page. Use start_line/end_line for a window, "
+            "tail for the last N lines, or grep (regex) with context to find the relevant part "
+            "of a big report instead of paging through it."
         ),
         "input_schema": {
             "type": "object",
@@ -36,6 +45,34 @@ FILE_TOOLS = [
                 "path": {
                     "type": "string",
                     "description": "Relative file path to read"
+                },
+                "start_line": {
+                    "type": "integer",
+                    "description": "First line to return (1-based). Also where a grep starts searching."
+                },
+                "end_line": {
+                    "type": "integer",
+                    "description": "Last line to return (inclusive)"
+                },
+                "tail": {
+                    "type": "integer",
+                    "description": "Return only the last N lines"
+                },
+                "grep": {
+                    "type": "string",
+                    "description": "Regex; return only matching lines (with line numbers)"
+                },
+                "context": {
+                    "type": "integer",
+                    "description": "Lines of context around each grep match (default: 0)"
+                },
+                "ignore_case": {
+                    "type": "boolean",
+                    "description": "Case-insensitive grep (default: false)"
+                },
+                "max_matches": {
+                    "type": "integer",
+                    "description": "Maximum grep matches to return (default: 50)"
                 }
             },
             "required": ["path"]
@@ -57,12 +94,33 @@ FILE_TOOLS = [
     }
 ]
 
+# Shared state each tool touches, used by the concurrent dispatcher in
+# tools/__init__.py: "read" calls may overlap, a "write" call is ordered
+# against every other call in the same turn that touches the same part of
+# that resource.  "mode:key" narrows the access to the path in the tool
+# input *key* (relative to WORK_DIR); a bare mode, or a call without that
+# input, touches the whole resource.
+FILE_TOOL_ACCESS = {
+    "write_file": {"local": "write:path"},
+    "read_file":  {"local": "read:path"},
+    "list_files": {"local": "read:directory"},
+}
+
 
 def execute_file_tool(tool_name: str, tool_input: dict) -> str:
     if tool_name == "write_file":
         return _write_file(tool_input["path"], tool_input["content"])
     elif tool_name == "read_file":
-        return _read_file(tool_input["path"])
+        return _read_file(
+            tool_input["path"],
+            start_line=tool_input.get("start_line"),
+            end_line=tool_input.get("end_line"),
+            tail=tool_input.get("tail"),
+            grep=tool_input.get("grep"),
+            context=int(tool_input.get("context", 0)),
+            ignore_case=bool(tool_input.get("ignore_case", False)),
+            max_matches=int(tool_input.get("max_matches", 50)),
+        )
     elif tool_name == "list_files":
         return _list_files(tool_input["directory"])
     return f"ERROR: Unknown file tool '{tool_name}'"
@@ -84,22 +142,90 @@ def _write_file(path: str, content: str) -> str:
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         with open(full_path, "w", encoding="utf-8") as f:
             f.write(content)
+        line_index.invalidate(full_path)
         return f"OK: Written {len(content)} bytes to '{path}'"
     except Exception as e:
         return f"ERROR: {e}"
 
 
-def _read_file(path: str) -> str:
+def _read_file(path: str, start_line=None, end_line=None, tail=None, grep=None,
+               context: int = 0, ignore_case: bool = False, max_matches: int = 50) -> str:
     try:
         full_path = _resolve(path)
-        with open(full_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        return content if content else "(empty file)"
+        idx = line_index.get_index(full_path)
     except FileNotFoundError:
         return f"ERROR: File '{path}' not found"
+    except IsADirectoryError:
+        return f"ERROR: '{path}' is a directory"
     except Exception as e:
         return f"ERROR: {e}"
 
+    total = idx.line_count
+    if total == 0:
+        return "(empty file)"
+    max_lines = max(1, int(getattr(config, "READ_FILE_MAX_LINES", _DEFAULT_MAX_LINES)))
+
+    try:
+        if grep:
+            return _grep(path, idx, grep, start_line or 1, context, ignore_case, max_matches)
+    except re.error as e:
+        return f"ERROR: Invalid grep pattern: {e}"
+
+    windowed = start_line is not None or end_line is not None or tail is not None
+    if not windowed and total <= max_lines:
+        # Small file: unchanged behaviour, the whole content without numbering.
+        return "\n".join(idx.lines(1, total))
+
+    if tail is not None:
+        if int(tail) < 1:
+            return f"ERROR: tail must be at least 1 (got {tail})"
+        # The last lines, even when more were asked for than one read returns.
+        start = max(1, total - min(int(tail), max_lines) + 1)
+        end = total
+    else:
+        start = max(1, int(start_line or 1))
+        end = int(end_line) if end_line is not None else start + max_lines - 1
+        end = min(end, total, start + max_lines - 1)
+    if start > total:
+        return f"ERROR: start_line {start} is past the end of '{path}' ({total} lines)"
+
+    lines = idx.lines(start, end)
+    width = len(str(end))
+    body = "\n".join(f"{n:>{width}}  {text}" for n, text in zip(range(start, end + 1), lines))
+    header = f"[{path}: lines {start}-{end} of {total}]"
+    if end < total:
+        return f"{header}\n{body}\n[more: start_line={end + 1}]"
+    return f"{header}\n{body}"
+
+
+def _grep(path, idx, pattern, start_line, context, ignore_case, max_matches) -> str:
+    hits, count = idx.grep(pattern, ignore_case=ignore_case, max_matches=max(1, max_matches),
+                           start_line=max(1, int(start_line)))
+    if not hits:
+        return f"(no lines matching /{pattern}/ in '{path}')"
+
+    # Merge overlapping context windows into blocks separated by "--".
+    context = max(0, context)
+    blocks = []
+    for n in hits:
+        lo, hi = max(1, n - context), min(idx.line_count, n + context)
+        if blocks and lo <= blocks[-1][1] + 1:
+            blocks[-1][1] = max(blocks[-1][1], hi)
+        else:
+            blocks.append([lo, hi])
+
+    matched = set(hits)
+    width = len(str(blocks[-1][1]))
+    out = [f"[{path}: {count} matching line(s) for /{pattern}/ of {idx.line_count} lines]"]
+    for i, (lo, hi) in enumerate(blocks):
+        if i:
+            out.append("--")
+        for n, text in zip(range(lo, hi + 1), idx.lines(lo, hi)):
+            out.append(f"{n:>{width}}{':' if n in matched else ' '} {text}")
+    if count > len(hits):
+        out.append(f"[{count - len(hits)} more match(es): grep again with start_line={hits[-1] + 1}]")
+    return "\n".join(out)
+
 
 def _list_files(directory: str) -> str:
     try:
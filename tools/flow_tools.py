@@ -0,0 +1,249 @@
+"""
+Cached synthesis / P&R runs.
+
+`run_eda_flow` runs a dc_shell or innovus TCL script on the remote server
+end to end — sync, run, download the reports and netlists it writes, parse
+the QoR — and records the artifacts in the content-addressed run cache
+(tools/run_cache.py).  Rerunning a script whose inputs are unchanged
+restores the cached artifacts and QoR immediately instead of re-running.
+
+Tool versions are part of the cache key.  They are probed once per session
+(`dc_shell -version`, `innovus -version`) unless EDA_TOOL_VERSIONS in
+config.py provides them, e.g. {"dc": "K-2015.06", "innovus": "21.10"}.
+"""
+
+import os
+import re
+import shlex
+import threading
+import time
+
+import config
+from tools.remote_tools import (
+    _check_config, _download_directory, _download_file, _remote_base,
+    _run_remote_command, _sync_to_remote,
+)
+
+FLOW_TOOLS = [
+    {
+        "name": "run_eda_flow",
+        "description": (
+            "Run a Design Compiler or Innovus TCL script on the remote server and bring its results "
+            "back: syncs the project, runs the script under the EDA environment, downloads the "
+            "report directory and any netlist/SDC it writes, and returns the QoR summary. "
+            "Results are cached by the content of the script, every RTL/netlist/SDC file it reads and "
+            "the tool version — rerunning with unchanged inputs returns the cached results at once. "
+            "Prefer this over hand-written dc_shell / innovus run_remote_command calls."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "script": {
+                    "type": "string",
+                    "description": "TCL script relative to the project, e.g. 'scripts/dc_synthesis_alu.tcl'"
+                },
+                "force": {
+                    "type": "boolean",
+                    "description": "Run even if a cached result exists (the cache entry is then replaced). Default false."
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": "Seconds to wait for the run (default: 1800)"
+                }
+            },
+            "required": ["script"]
+        }
+    },
+    {
+        "name": "manage_run_cache",
+        "description": (
+            "List or evict entries of the synthesis/P&R result cache used by run_eda_flow."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["list", "evict", "clear"],
+                    "description": "'list' entries, 'evict' by key or script, or 'clear' everything"
+                },
+                "key": {"type": "string", "description": "Cache key (or prefix) to evict"},
+                "script": {"type": "string", "description": "Evict every entry for this script"}
+            },
+            "required": ["action"]
+        }
+    }
+]
+
+FLOW_TOOL_ACCESS = {
+    "run_eda_flow":     {"local": "write", "remote": "write", "qor_history": "write"},
+    "manage_run_cache": {"local": "write"},
+}
+
+_TOOL_COMMANDS = {
+    "dc": ("dc_shell -f {script}", "dc_run.log", "dc_shell -version"),
+    "innovus": ("innovus -batch -no_gui -source {script}", "innovus_run.log", "innovus -version"),
+}
+_OUTPUT_TAIL_LINES = 40
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def execute_flow_tool(tool_name: str, tool_input: dict) -> str:
+    if tool_name == "run_eda_flow":
+        return _run_eda_flow(
+            tool_input["script"],
+            bool(tool_input.get("force", False)),
+            int(tool_input.get("timeout", 1800)),
+        )
+    elif tool_name == "manage_run_cache":
+        return _manage_run_cache(tool_input["action"], tool_input.get("key"), tool_input.get("script"))
+    return f"ERROR: Unknown flow tool '{tool_name}'"
+
+
+def _run_eda_flow(script: str, force: bool = False, timeout: int = 1800) -> str:
+    from tools import run_cache
+    try:
+        spec = run_cache.analyze_script(script)
+    except FileNotFoundError:
+        return f"ERROR: Script '{script}' not found"
+    except Exception as exc:
+        return f"ERROR (run_eda_flow): cannot analyse '{script}': {exc}"
+
+    if not _check_config():
+        return "ERROR: Remote server not configured. Fill in REMOTE_HOST and REMOTE_USER in config.py."
+
+    try:
+        version = _tool_version(spec.tool)
+        key = run_cache.cache_key(spec, version)
+    except Exception as exc:
+        return f"ERROR (run_eda_flow): {exc}"
+
+    if run_cache.enabled() and not force and run_cache.lookup(key) is not None:
+        meta = run_cache.lookup(key)
+        restored = run_cache.restore(key)
+        lines = [
+            f"[cache hit] {script} ({spec.tool} {version}) key {key}: inputs unchanged since "
+            f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(meta['created']))}; "
+            f"restored {len(restored)} file(s), skipped a {meta.get('seconds', 0):.0f}s run. "
+            "Pass force=true to rerun anyway.",
+        ]
+        return "\n".join(lines + _qor_sections(spec, key, version))
+
+    start = time.monotonic()
+    sync = _sync_to_remote()
+    if sync.startswith("ERROR"):
+        return sync
+
+    command, log_name, _ = _TOOL_COMMANDS[spec.tool]
+    log_dir = spec.output_dirs[0] if spec.output_dirs else "results"
+    log = f"{log_dir}/{log_name}"
+    mkdirs = " ".join(shlex.quote(d) for d in spec.output_dirs + [log_dir])
+    output = _run_remote_command(
+        f"cd {shlex.quote(_remote_base())} && mkdir -p {mkdirs} && "
+        f"{command.format(script=shlex.quote(script))} 2>&1 | tee {shlex.quote(log)}; "
+        "exit ${PIPESTATUS[0]}",
+        timeout=timeout,
+    )
+    match = re.search(r"\[EXIT_CODE:(-?\d+)\]", output)
+    exit_code = int(match.group(1)) if match else None
+
+    fetched = []
+    for rel_dir in sorted(set(spec.output_dirs + [log_dir])):
+        fetched.append(_download_directory(rel_dir, rel_dir))
+    for rel in spec.output_files:
+        fetched.append(_download_file(f"{_remote_base()}/{rel}", rel))
+    elapsed = time.monotonic() - start
+
+    complete = exit_code == 0 and all(
+        os.path.isfile(os.path.join(config.WORK_DIR, rel)) for rel in spec.output_files
+    )
+    lines = [f"[run] {script} ({spec.tool} {version}) exit code {exit_code}, {elapsed:.0f}s"]
+    lines.append(_tail(output))
+    lines.append("[downloads]\n" + "\n".join(fetched))
+    if run_cache.enabled():
+        if complete:
+            meta = run_cache.store(key, spec, version, extra={"seconds": elapsed, "exit_code": exit_code})
+            lines.append(f"[cache] stored key {key} ({len(meta['outputs'])} file(s))")
+        else:
+            lines.append("[cache] not stored: the run failed or did not produce all expected outputs")
+    return "\n".join(lines + _qor_sections(spec, key, version))
+
+
+def _manage_run_cache(action: str, key: str = None, script: str = None) -> str:
+    from tools import run_cache
+    try:
+        if action == "list":
+            entries = run_cache.list_entries()
+            if not entries:
+                return "(run cache is empty)"
+            total = sum(m.get("bytes", 0) for m in entries)
+            lines = [f"{len(entries)} entr{'y' if len(entries) == 1 else 'ies'}, {total / 1e6:.1f} MB "
+                     f"in {run_cache.cache_dir()}"]
+            for m in entries:
+                lines.append(
+                    f"  {m['key']}  {m['script']:<32} {m['tool']} {m['tool_version']:<12} "
+                    f"{len(m['outputs'])} file(s)  hits {m.get('hits', 0)}  "
+                    f"used {time.strftime('%Y-%m-%d %H:%M', time.localtime(m['last_used']))}"
+                )
+            return "\n".join(lines)
+        if action == "evict":
+            if not key and not script:
+                return "ERROR: evict needs a key or a script"
+            return f"OK: evicted {run_cache.evict(key=key, script=script)} entr(ies)"
+        if action == "clear":
+            return f"OK: evicted {run_cache.evict()} entr(ies)"
+        return f"ERROR: Unknown action '{action}'"
+    except Exception as exc:
+        return f"ERROR (manage_run_cache): {exc}"
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _tool_version(tool: str) -> str:
+    configured = getattr(config, "EDA_TOOL_VERSIONS", {}).get(tool)
+    if configured:
+        return configured
+    with _versions_lock:
+        if tool in _versions:
+            return _versions[tool]
+    probe = _TOOL_COMMANDS[tool][2]
+    output = _run_remote_command(f"{probe} 2>&1 | head -20", timeout=120)
+    if "[EXIT_CODE:0]" not in output or "command not found" in output:
+        raise RuntimeError(f"could not determine the {tool} version:\n{output[-1000:]}")
+    body = output.split("[command output]", 1)[-1]
+    match = re.search(r"\b([A-Z]-\d{4}\.\d{2}[\w.-]*|v?\d+\.\d+[\w.-]*)", body)
+    version = match.group(1) if match else "unknown"
+    with _versions_lock:
+        _versions[tool] = version
+    return version
+
+
+def _tail(output: str) -> str:
+    lines = output.rstrip().splitlines()
+    if len(lines) <= _OUTPUT_TAIL_LINES:
+        return output.rstrip()
+    return (f"... ({len(lines) - _OUTPUT_TAIL_LINES} earlier line(s); full log in the downloaded *_run.log)\n"
+            + "\n".join(lines[-_OUTPUT_TAIL_LINES:]))
+
+
+def _qor_sections(spec, key: str, version: str) -> list:
+    """Parse the QoR of every report directory the script writes and record it in the history."""
+    from tools import qor_history, qor_parsers
+    sections = []
+    for rel_dir in spec.output_dirs:
+        full = os.path.join(config.WORK_DIR, rel_dir)
+        if os.path.isdir(full) and qor_parsers.detect_stage(full):
+            try:
+                qor = qor_parsers.parse_directory(full)
+                qor.source = rel_dir
+                sections.append(qor_parsers.format_qor(qor))
+            except Exception as exc:
+                sections.append(f"(QoR for {rel_dir} unavailable: {exc})")
+                continue
+            run_id = qor_history.record(qor, full, "run_eda_flow", script=spec.script,
+                                        config_key=key, tool_version=version)
+            if run_id is not None:
+                sections.append(qor_history.brief_delta(run_id))
+    return sections
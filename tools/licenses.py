@@ -0,0 +1,155 @@
+"""
+Process-wide cap on concurrent licensed EDA runs.
+
+DC and Innovus licenses are finite, and everything this process starts
+competes for them: blocking run_remote_command / run_eda_flow calls,
+detached jobs, sweep variants — and, in batch mode, all of that times the
+number of sessions.  One LicensePool holds MAX_PARALLEL_LICENSES slots:
+
+  * a blocking command that invokes a licensed tool holds a slot for the
+    duration of the call (hold());
+  * a detached job holds one from submit until remote_jobs.poll or cancel
+    sees it end (acquire_job() / release()).  Nobody may be polling such a
+    job — its session may be blocked, or finished — so a waiter re-polls
+    the detached holders itself every LICENSE_POLL_INTERVAL seconds, in
+    the context of the session that started them, and reclaims the slots
+    of jobs that have ended.
+
+A command counts as licensed when it names one of LICENSED_TOOLS as a word.
+
+Configuration in config.py (optional):
+    MAX_PARALLEL_LICENSES — slots (default: 2)
+    LICENSED_TOOLS        — executables that check out a license
+    LICENSE_POLL_INTERVAL — seconds between detached-job checks while waiting (default: 15)
+    LICENSE_WAIT_TIMEOUT  — longest wait for a slot when submitting a job (default: 900)
+"""
+
+import contextvars
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import config
+from runtime import telemetry
+
+DEFAULT_LICENSED_TOOLS = (
+    "dc_shell", "dc_shell-t", "design_vision", "fm_shell", "pt_shell", "icc2_shell", "vcs",
+    "innovus", "encounter", "genus", "tempus", "voltus", "xrun",
+)
+
+
+class Unavailable(RuntimeError):
+    """No license slot became free in time."""
+
+
+class LicensePool:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._holders = {}             # key -> {"label", "since", "check"}
+        self._last_reclaim = 0.0
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(getattr(config, "MAX_PARALLEL_LICENSES", 2)))
+
+    def acquire(self, key: str, label: str = "", check=None, timeout: float = None, wait: bool = True) -> float:
+        """
+        Take a slot for *key*; return the seconds spent waiting.
+
+        *check*, for detached holders, is called (in the caller's context)
+        by later waiters and returns True once the holder has finished.
+        Raises Unavailable when *wait* is False and no slot is free, or
+        when *timeout* passes first.
+        """
+        holder = {"label": label, "since": time.time(),
+                  "check": (contextvars.copy_context(), check) if check else None}
+        start = time.monotonic()
+        poll = float(getattr(config, "LICENSE_POLL_INTERVAL", 15))
+        while True:
+            with self._cond:
+                if len(self._holders) < self.limit:
+                    self._holders[key] = holder
+                    break
+            waited = time.monotonic() - start
+            if not wait or (timeout is not None and waited >= timeout):
+                raise Unavailable(
+                    f"no EDA license free{f' within {timeout:.0f}s' if wait else ''} "
+                    f"({self.limit} in use: {self.describe()})"
+                )
+            self.reclaim(poll)
+            with self._cond:
+                if len(self._holders) >= self.limit:
+                    left = poll if timeout is None else min(poll, timeout - waited)
+                    self._cond.wait(max(0.05, left))
+        waited = time.monotonic() - start
+        if waited > 0.01:
+            telemetry.record("license.wait", waited, label=label)
+        return waited
+
+    def release(self, key: str):
+        with self._cond:
+            if self._holders.pop(key, None) is not None:
+                self._cond.notify_all()
+
+    def reclaim(self, min_interval: float = 0.0):
+        """Free the slots of detached holders whose check reports them finished."""
+        with self._cond:
+            if time.monotonic() - self._last_reclaim < min_interval:
+                return
+            self._last_reclaim = time.monotonic()
+            detached = [(key, h["check"]) for key, h in self._holders.items() if h["check"]]
+        for key, (ctx, check) in detached:
+            try:
+                done = ctx.run(check)
+            except Exception:
+                continue           # unreachable host etc.: keep the slot
+            if done:
+                self.release(key)
+
+    def describe(self) -> str:
+        with self._cond:
+            holders = list(self._holders.values())
+        now = time.time()
+        return ", ".join(f"{h['label'] or 'command'} ({now - h['since']:.0f}s)" for h in holders) or "none"
+
+
+_pool = LicensePool()
+
+
+def get_pool() -> LicensePool:
+    return _pool
+
+
+def licensed(command: str) -> bool:
+    tools = getattr(config, "LICENSED_TOOLS", DEFAULT_LICENSED_TOOLS)
+    pattern = r"(?<![\w.-])(?:" + "|".join(re.escape(t) for t in tools) + r")(?![\w.-])"
+    return re.search(pattern, command) is not None
+
+
+@contextmanager
+def hold(command: str, timeout: float = None):
+    """Hold a slot around a blocking run of *command* if it uses a licensed tool."""
+    if not licensed(command):
+        yield
+        return
+    key = uuid.uuid4().hex
+    _pool.acquire(key, label=command.strip().splitlines()[0][:60], timeout=timeout)
+    try:
+        yield
+    finally:
+        _pool.release(key)
+
+
+def acquire_job(job_id: str, command: str, check, wait: bool = True) -> bool:
+    """Take a slot for detached job *job_id* if *command* is licensed; True if one was taken."""
+    if not licensed(command):
+        return False
+    _pool.acquire(job_id, label=f"job {job_id}", check=check, wait=wait,
+                  timeout=float(getattr(config, "LICENSE_WAIT_TIMEOUT", 900)))
+    return True
+
+
+def release(key: str):
+    _pool.release(key)
@@ -0,0 +1,137 @@
+"""
+Memory-mapped line-offset index for large local text files.
+
+read_file used to return whole files; for a 17k-line summaryReport or a
+long innovus_run.log that floods the context.  The windowed read_file modes
+(line range, tail, grep) go through a LineIndex instead:
+
+    idx = get_index(path)
+    idx.line_count
+    idx.lines(100, 140)            # 1-based, inclusive
+    idx.grep(r"ERROR|Violat")      # -> (line numbers, total)
+
+The first access maps the file and records the byte offset of every line
+start in a compact array; later slices seek straight to those offsets, so
+they cost O(slice) rather than O(file).  Indexes are cached per path and
+rebuilt whenever the file's size or mtime changes.
+
+Configuration in config.py (optional):
+    LINE_INDEX_CACHE_FILES — indexes kept in memory (default: 32)
+"""
+
+import mmap
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+import config
+
+
+class LineIndex:
+    def __init__(self, path: str):
+        self.path = path
+        st = os.stat(path)
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        self._offsets = array("Q", [0])
+        self._mm = None
+        if self.size:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            find = self._mm.find
+            pos = find(b"\n")
+            append = self._offsets.append
+            while pos != -1:
+                append(pos + 1)
+                pos = find(b"\n", pos + 1)
+            # A trailing newline does not start another line.
+            if self._offsets[-1] == self.size:
+                self._offsets.pop()
+        else:
+            self._offsets = array("Q")
+
+    @property
+    def line_count(self) -> int:
+        return len(self._offsets)
+
+    def is_current(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        return st.st_size == self.size and st.st_mtime_ns == self.mtime_ns
+
+    def lines(self, start: int, end: int) -> list:
+        """Lines *start*..*end* (1-based, inclusive, clamped to the file)."""
+        start = max(1, start)
+        end = min(self.line_count, end)
+        if start > end:
+            return []
+        lo = self._offsets[start - 1]
+        hi = self._offsets[end] if end < self.line_count else self.size
+        text = self._mm[lo:hi].decode("utf-8", errors="replace")
+        return text.splitlines()
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number containing byte *offset*."""
+        return bisect_right(self._offsets, offset)
+
+    def grep(self, pattern: str, ignore_case: bool = False, max_matches: int = 50,
+             start_line: int = 1):
+        """
+        Return (matching line numbers, total match count) for *pattern*.
+
+        The regex runs over the mapped bytes directly; only the lines that
+        match are decoded.  At most *max_matches* line numbers are returned,
+        but every matching line from *start_line* on is counted.
+        """
+        if not self.size:
+            return [], 0
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        regex = re.compile(pattern.encode("utf-8"), flags)
+        pos = self._offsets[start_line - 1] if 1 <= start_line <= self.line_count else self.size
+        hits, total, last = [], 0, 0
+        for m in regex.finditer(self._mm, pos):
+            line = self.line_of(m.start())
+            if line == last:
+                continue
+            last = line
+            total += 1
+            if len(hits) < max_matches:
+                hits.append(line)
+        return hits, total
+
+
+# ── Per-file cache ────────────────────────────────────────────────────────────
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_index(path: str) -> LineIndex:
+    """Return a current LineIndex for *path*, rebuilding it if the file changed."""
+    key = os.path.realpath(path)
+    with _lock:
+        idx = _cache.get(key)
+        if idx is not None and idx.is_current():
+            _cache.move_to_end(key)
+            return idx
+    fresh = LineIndex(key)
+    with _lock:
+        _cache.pop(key, None)
+        _cache[key] = fresh
+        limit = max(1, int(getattr(config, "LINE_INDEX_CACHE_FILES", 32)))
+        while len(_cache) > limit:
+            # Not closed explicitly: a concurrent reader may still hold it;
+            # the map is released when the last reference goes away.
+            _cache.popitem(last=False)
+    return fresh
+
+
+def invalidate(path: str):
+    """Drop the cached index for *path* (e.g. after write_file rewrote it)."""
+    with _lock:
+        _cache.pop(os.path.realpath(path), None)
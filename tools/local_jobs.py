@@ -0,0 +1,357 @@
+"""
+Local jobs: commands run by run_local_command, in the foreground or the
+background.
+
+`run_local_command` used to call subprocess.run with a fixed 120 s timeout
+and hold all of stdout/stderr in memory: a long vvp simulation was killed,
+and a chatty one returned megabytes of text.  Every command now runs as a
+LocalJob in its own process group:
+
+  * output (stdout and stderr merged, in order) is pumped by a thread into
+    an OutputBuffer — the last LOCAL_JOB_BUFFER bytes in memory, everything
+    older appended to results/.spill/jobs/<job_id>.out — so memory stays
+    bounded while every byte can still be read back by offset;
+  * a per-call timeout kills the whole process group;
+  * background=true returns a job id at once, so a simulation can run while
+    the agent works on the remote flow; local_job_status, tail_local_job
+    (new output since the last read, or from any offset) and
+    cancel_local_job follow it, like the remote job tools.
+
+Jobs live in this process only: running ones are killed at exit.  The
+newest LOCAL_JOB_KEEP finished jobs stay readable; older ones are dropped
+with their spill files.
+
+Configuration in config.py (optional):
+    LOCAL_JOB_BUFFER — output bytes kept in memory per job (default: 256 KB)
+    LOCAL_JOB_KEEP   — finished jobs kept for reading (default: 50)
+"""
+
+import atexit
+import os
+import secrets
+import signal
+import subprocess
+import threading
+import time
+
+import config
+
+LOCAL_JOB_TOOLS = [
+    {
+        "name": "local_job_status",
+        "description": (
+            "Check local background jobs started with run_local_command(background=true): "
+            "state, exit code, runtime and unread output. Omit job_id to list all jobs."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id from run_local_command"}
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "tail_local_job",
+        "description": (
+            "Return only the output a local job has written since the last tail_local_job "
+            "call for that job (at most max_bytes). Also works for foreground commands whose "
+            "output was cut, using the job id in their result."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id from run_local_command"},
+                "max_bytes": {
+                    "type": "integer",
+                    "description": "Maximum bytes to return (default 16000)."
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Read from this byte offset instead of the last position (0 = start)."
+                },
+                "latest": {
+                    "type": "boolean",
+                    "description": (
+                        "If more than max_bytes are unread, skip ahead and return the most "
+                        "recent max_bytes instead of the oldest. Default false."
+                    )
+                }
+            },
+            "required": ["job_id"]
+        }
+    },
+    {
+        "name": "cancel_local_job",
+        "description": "Stop a running local job (SIGTERM to its process group, then SIGKILL).",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id from run_local_command"}
+            },
+            "required": ["job_id"]
+        }
+    }
+]
+
+# See FILE_TOOL_ACCESS in tools/file_tools.py.
+LOCAL_JOB_TOOL_ACCESS = {
+    "local_job_status": {"local": "read"},
+    "tail_local_job":   {"local": "read"},
+    "cancel_local_job": {"local": "write"},
+}
+
+DEFAULT_TAIL_BYTES = 16000
+SPILL_DIR = os.path.join("results", ".spill", "jobs")
+
+_lock = threading.Lock()
+_jobs = {}            # job_id -> LocalJob, in start order
+
+
+def execute_local_job_tool(tool_name: str, tool_input: dict) -> str:
+    if tool_name == "local_job_status":
+        return _status(tool_input.get("job_id"))
+    elif tool_name == "tail_local_job":
+        return _tail(
+            tool_input["job_id"],
+            tool_input.get("max_bytes", DEFAULT_TAIL_BYTES),
+            tool_input.get("offset"),
+            tool_input.get("latest", False),
+        )
+    elif tool_name == "cancel_local_job":
+        return _cancel(tool_input["job_id"])
+    return f"ERROR: Unknown local job tool '{tool_name}'"
+
+
+class OutputBuffer:
+    """
+    Append-only byte stream with absolute offsets: the newest *capacity*
+    bytes in memory, older bytes appended to *spill_path* as they fall out.
+    """
+
+    def __init__(self, capacity: int, spill_path: str):
+        self.capacity = max(4096, int(capacity))
+        self.spill_path = spill_path
+        self.size = 0                  # bytes written in total
+        self._ring = bytearray()       # bytes [size - len(_ring), size)
+        self._spill = None
+        self._lock = threading.Lock()
+
+    @property
+    def spilled(self) -> int:
+        return self.size - len(self._ring)
+
+    def write(self, data: bytes):
+        with self._lock:
+            self._ring += data
+            self.size += len(data)
+            excess = len(self._ring) - self.capacity
+            if excess > 0:
+                if self._spill is None:
+                    os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+                    self._spill = open(self.spill_path, "ab")
+                self._spill.write(self._ring[:excess])
+                self._spill.flush()
+                del self._ring[:excess]
+
+    def read(self, offset: int, max_bytes: int) -> bytes:
+        """Up to *max_bytes* from absolute *offset*."""
+        with self._lock:
+            offset = max(0, min(offset, self.size))
+            end = min(self.size, offset + max_bytes)
+            ring_start = self.size - len(self._ring)
+            head = b""
+            if offset < ring_start:
+                with open(self.spill_path, "rb") as f:
+                    f.seek(offset)
+                    head = f.read(min(end, ring_start) - offset)
+                offset = ring_start
+            return head + bytes(self._ring[offset - ring_start:end - ring_start])
+
+    def close(self):
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+    def discard(self):
+        self.close()
+        try:
+            os.remove(self.spill_path)
+        except OSError:
+            pass
+
+
+class LocalJob:
+    def __init__(self, command: str, cwd: str, timeout: float = None, background: bool = False):
+        self.job_id = time.strftime("%H%M%S") + "-" + secrets.token_hex(2)
+        self.command = command
+        self.cwd = cwd
+        self.timeout = timeout
+        self.background = background
+        self.state = "running"         # running, finished, timeout, cancelled
+        self.exit_code = None
+        self.offset = 0                # read position of tail_local_job
+        self.started = time.time()
+        self.finished = None
+        self.output = OutputBuffer(getattr(config, "LOCAL_JOB_BUFFER", 256 * 1024),
+                                   os.path.join(config.WORK_DIR, SPILL_DIR, self.job_id + ".out"))
+        self.done = threading.Event()
+        self._stop_reason = None
+        self._proc = subprocess.Popen(
+            command, shell=True, cwd=cwd,
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            start_new_session=True,    # own process group: cancel reaches every child
+        )
+        self._timer = None
+        if timeout:
+            self._timer = threading.Timer(timeout, self.stop, args=("timeout",))
+            self._timer.daemon = True
+            self._timer.start()
+        threading.Thread(target=self._pump, name=f"local-job-{self.job_id}", daemon=True).start()
+
+    @property
+    def runtime(self) -> float:
+        return (self.finished or time.time()) - self.started
+
+    def stop(self, reason: str = "cancelled"):
+        """SIGTERM the process group, SIGKILL it if still alive after 5 s."""
+        if self.done.is_set():
+            return
+        self._stop_reason = reason
+        try:
+            os.killpg(self._proc.pid, signal.SIGTERM)
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                os.killpg(self._proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def _pump(self):
+        fd = self._proc.stdout.fileno()
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            self.output.write(data)
+        self._proc.stdout.close()
+        self.exit_code = self._proc.wait()
+        if self._timer is not None:
+            self._timer.cancel()
+        self.output.close()
+        self.finished = time.time()
+        self.state = self._stop_reason or "finished"
+        self.done.set()
+
+
+# ── Public helpers (used by other tools) ──────────────────────────────────────
+
+def start(command: str, cwd: str, timeout: float = None, background: bool = False) -> LocalJob:
+    job = LocalJob(command, cwd, timeout, background)
+    with _lock:
+        _jobs[job.job_id] = job
+        _prune()
+    return job
+
+
+def get(job_id: str) -> LocalJob:
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        raise KeyError(f"unknown local job '{job_id}'")
+    return job
+
+
+def read(job_id: str, offset: int = None, max_bytes: int = DEFAULT_TAIL_BYTES, latest: bool = False):
+    """
+    Read job output from *offset* (default: last position) and advance it.
+
+    Returns (text, start, end, size).
+    """
+    job = get(job_id)
+    size = job.output.size
+    start = job.offset if offset is None else max(0, int(offset))
+    max_bytes = max(1, int(max_bytes))
+    if latest and size - start > max_bytes:
+        start = size - max_bytes
+    start = min(start, size)
+    data = job.output.read(start, max_bytes)
+    end = start + len(data)
+    job.offset = end
+    return data.decode("utf-8", errors="replace"), start, end, size
+
+
+def list_jobs() -> list:
+    with _lock:
+        return list(_jobs.values())
+
+
+def stop_all():
+    for job in list_jobs():
+        job.stop()
+
+
+atexit.register(stop_all)
+
+
+# ── Tool handlers ─────────────────────────────────────────────────────────────
+
+def _status(job_id: str = None) -> str:
+    try:
+        jobs = [get(job_id)] if job_id else [j for j in list_jobs() if j.background]
+        if not jobs:
+            return "No local background jobs."
+        return "\n".join(_format_status(job) for job in jobs)
+    except Exception as exc:
+        return f"ERROR (local_job_status): {exc}"
+
+
+def _tail(job_id: str, max_bytes: int, offset: int = None, latest: bool = False) -> str:
+    try:
+        job = get(job_id)
+        text, start, end, size = read(job_id, offset, max_bytes, latest)
+        header = f"[{job_id}: {job.state}"
+        if job.exit_code is not None:
+            header += f", exit {job.exit_code}"
+        header += f"; output bytes {start}-{end} of {size}"
+        if size > end:
+            header += f", {size - end} more unread"
+        header += "]"
+        if not text:
+            return header + "\n(no new output)"
+        return header + "\n" + text
+    except Exception as exc:
+        return f"ERROR (tail_local_job): {exc}"
+
+
+def _cancel(job_id: str) -> str:
+    try:
+        job = get(job_id)
+        job.stop()
+        job.done.wait(10)
+        return f"OK: Job {job_id} is {job.state}"
+    except Exception as exc:
+        return f"ERROR (cancel_local_job): {exc}"
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _format_status(job: LocalJob) -> str:
+    parts = [f"{job.job_id}: {job.state}"]
+    if job.exit_code is not None:
+        parts.append(f"exit {job.exit_code}")
+    parts.append(f"{job.runtime:.0f}s")
+    size = job.output.size
+    parts.append(f"output {size} bytes ({max(0, size - job.offset)} unread)")
+    label = job.command if len(job.command) <= 80 else job.command[:80] + "..."
+    return ", ".join(parts) + f" — {label}"
+
+
+def _prune():
+    """Drop the oldest finished jobs beyond LOCAL_JOB_KEEP (caller holds _lock)."""
+    keep = max(1, int(getattr(config, "LOCAL_JOB_KEEP", 50)))
+    finished = [j for j in _jobs.values() if j.done.is_set()]
+    for job in finished[:max(0, len(finished) - keep)]:
+        del _jobs[job.job_id]
+        job.output.discard()
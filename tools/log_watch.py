@@ -0,0 +1,213 @@
+"""
+Streaming classification of DC / Innovus output, with early abort.
+
+A synthesis or P&R run that cannot succeed usually says so in its first
+seconds — a license checkout failure, an unresolved reference, a netlist
+that cannot be read — and then keeps going (or sits at a Tcl prompt) until
+it exits or its timeout fires.  A LogWatcher is fed the output as it
+arrives, one chunk at a time, and classifies every line that mentions an
+error, warning, license or memory problem against RULES:
+
+  * fatal classes stop the run: run_remote_command kills the command in the
+    persistent shell (tools/remote_shell.py), and remote_jobs.poll cancels
+    a detached job, which is then reported as "aborted";
+  * other errors and warnings are counted per message code (IMPLF-223,
+    LINK-5, ...) with the line of their first occurrence, so the benign
+    errors every Innovus run prints do not bury the one that matters.
+
+Rules only match at the start of a line (optionally after `**`), the way
+the tools print their messages; `puts "ERROR: ..."` lines that dc_shell
+echoes from the script it is sourcing are not mistaken for errors.  Only
+commands that start a licensed EDA tool (tools/licenses.py) are watched, so
+`cat` or `grep` of an old log never aborts anything.
+
+Configuration in config.py (optional):
+    LOG_WATCH       — set False to disable the watcher
+    LOG_WATCH_ABORT — set False to report fatal errors without stopping the run
+    LOG_WATCH_RULES — extra (class, severity, regex[, hint]) rules, checked
+                      before the built-in ones; severity is "fatal",
+                      "error", "warning" or "ignore"
+"""
+
+import re
+
+import config
+from tools import licenses
+
+FATAL, ERROR, WARNING, IGNORE = "fatal", "error", "warning", "ignore"
+
+_MSG = r"^(?:\*\*)?"                  # DC "Error: ...", Innovus "**ERROR: (IMPxx-nnn): ..."
+
+# (class, severity, pattern, hint) — first match wins, so the specific
+# classes come before the generic error / warning catch-alls.
+RULES = [
+    # Innovus's per-code message table after loading: already counted line by line.
+    ("message_summary", IGNORE, r"^(?:error|warning)\s+[A-Z][A-Z0-9]*-\d+\s+\d+\s", ""),
+    ("license", FATAL,
+     _MSG + r"(?:error|fatal)\b.*licen[cs]e|cannot connect to license server"
+            r"|licensed number of users already reached|flexnet licensing error",
+     "no EDA license could be checked out — report to the user; editing the design will not fix it"),
+    ("out_of_memory", FATAL,
+     r"out of memory|std::bad_alloc|cannot allocate memory",
+     "the tool ran out of memory — report to the user"),
+    ("unresolved_reference", FATAL,
+     _MSG + r"(?:error|warning)\b.*(?:unable to resolve reference|can(?:'|no)t find (?:the )?design)",
+     "add the missing module's file to RTL_FILES / read_verilog and rerun"),
+    ("syntax_error", FATAL,
+     _MSG + r"error\b.*syntax error",
+     "fix the RTL or Tcl at the file:line given in the message"),
+    ("missing_file", FATAL,
+     _MSG + r"error\b.*(?:(?:can(?:'|no)t|unable to|could ?n[o']t|failed to) (?:open|read|load)\b"
+            r".*\b(?:file|netlist|verilog|lef|lib|db|sdc|def)\b|no such file)",
+     "check the path; run synthesis first if the netlist or SDC is missing"),
+    ("script_aborted", FATAL,
+     _MSG + r"error\b.*\(IMPSYT-7114\)",
+     "Innovus stopped sourcing the script — the Tcl error just before this line is the cause"),
+    ("tcl_error", ERROR,
+     _MSG + r"error\b.*(?:invalid command name|is not a legal option|unknown command|wrong # args)",
+     ""),
+    ("error", ERROR, _MSG + r"error\b", ""),
+    ("warning", WARNING, _MSG + r"warn(?:ing)?\b", ""),
+]
+
+# Every rule needs one of these words, so only lines containing one are classified.
+_TRIGGER = re.compile(r"err|warn|licen|memory|bad_alloc", re.IGNORECASE)
+_CODE = re.compile(r"\(([A-Z][A-Z0-9]*-\d+)\)")
+_ANSI = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+_MAX_ENTRIES = 60          # distinct (class, code) entries kept
+_MAX_PARTIAL = 4096        # an unterminated line longer than this is cut
+_SHOW_WARNINGS = 8         # warning codes listed by format()
+
+
+def watches(command: str) -> bool:
+    """True when *command* starts a licensed EDA tool and watching is enabled."""
+    return bool(getattr(config, "LOG_WATCH", True)) and licenses.licensed(command)
+
+
+def abort_enabled() -> bool:
+    return bool(getattr(config, "LOG_WATCH_ABORT", True))
+
+
+class LogWatcher:
+    """
+    Incremental classifier for one command's output.
+
+    *state* is a dict from state(), to continue watching a log across
+    polls (remote_jobs keeps it in the job record).
+    """
+
+    def __init__(self, state: dict = None):
+        state = state or {}
+        self.lines = state.get("lines", 0)               # complete lines seen
+        self.entries = state.get("entries", [])          # {"cls","severity","code","line","text","count"}
+        self.fatal = state.get("fatal")                  # first fatal entry, or None
+        self.dropped = state.get("dropped", 0)
+        self._partial = state.get("partial", "")
+        self._index = {self._key(e["cls"], e["code"], e["text"]): e for e in self.entries}
+        self._rules = [
+            (rule[0], rule[1], re.compile(rule[2], re.IGNORECASE), rule[3] if len(rule) > 3 else "")
+            for rule in list(getattr(config, "LOG_WATCH_RULES", ())) + RULES
+        ]
+
+    def feed(self, text: str):
+        """Classify the complete lines in *text*; return the first fatal entry if this chunk produced it."""
+        text = self._partial + text
+        cut = text.rfind("\n") + 1
+        self._partial = text[cut:][-_MAX_PARTIAL:]
+        return self._scan(text[:cut])
+
+    def close(self):
+        """Classify a final line that had no newline."""
+        text, self._partial = self._partial, ""
+        return self._scan(text + "\n") if text else None
+
+    @property
+    def errors(self) -> int:
+        return sum(e["count"] for e in self.entries if e["severity"] == ERROR)
+
+    @property
+    def warnings(self) -> int:
+        return sum(e["count"] for e in self.entries if e["severity"] == WARNING)
+
+    def brief(self) -> str:
+        parts = []
+        if self.fatal:
+            parts.append(f"FATAL {self.fatal['cls']} at line {self.fatal['line']}")
+        parts.append(f"{self.errors} error(s), {self.warnings} warning(s)")
+        return "; ".join(parts)
+
+    def format(self) -> str:
+        fatals = sorted((e for e in self.entries if e["severity"] == FATAL), key=lambda e: e["line"])
+        errors = sorted((e for e in self.entries if e["severity"] == ERROR), key=lambda e: e["line"])
+        warnings = sorted((e for e in self.entries if e["severity"] == WARNING), key=lambda e: -e["count"])
+        lines = [f"[log watch] {len(fatals)} fatal, {self.errors} error(s), {self.warnings} warning(s) "
+                 f"in {self.lines} line(s)"]
+        hints = {rule[0]: rule[3] for rule in self._rules}
+        for e in fatals + errors + warnings[:_SHOW_WARNINGS]:
+            label = e["code"] or e["cls"]
+            if e["cls"] not in (ERROR, WARNING) and e["code"]:
+                label = f"{e['cls']} {e['code']}"
+            if e["count"] > 1:
+                label += f" x{e['count']}"
+            lines.append(f"  {e['severity']:<7} line {e['line']:<6} {label:<28} {e['text']}")
+            if e["severity"] == FATAL and hints.get(e["cls"]):
+                lines.append(f"          hint: {hints[e['cls']]}")
+        if len(warnings) > _SHOW_WARNINGS:
+            lines.append(f"  ... {len(warnings) - _SHOW_WARNINGS} more warning code(s)")
+        if self.dropped:
+            lines.append(f"  ... {self.dropped} message(s) with other codes not listed")
+        return "\n".join(lines)
+
+    def state(self) -> dict:
+        return {"lines": self.lines, "entries": self.entries, "fatal": self.fatal,
+                "dropped": self.dropped, "partial": self._partial}
+
+    # ── Internal helpers ─────────────────────────────────────────────────────
+
+    def _scan(self, block: str):
+        first_fatal = None
+        counted, pos = 0, 0
+        match = _TRIGGER.search(block)
+        while match:
+            start = block.rfind("\n", 0, match.start()) + 1
+            end = block.find("\n", match.start())
+            counted += block.count("\n", pos, start)
+            pos = start
+            entry = self._classify(block[start:end], self.lines + counted + 1)
+            if entry is not None and entry["severity"] == FATAL and self.fatal is None:
+                self.fatal = first_fatal = entry
+            match = _TRIGGER.search(block, end + 1)      # next line with a trigger word
+        self.lines += block.count("\n")
+        return first_fatal
+
+    def _classify(self, line: str, number: int):
+        line = _ANSI.sub("", line).rstrip("\r")
+        for cls, severity, pattern, _ in self._rules:
+            if pattern.search(line):
+                break
+        else:
+            return None
+        if severity == IGNORE:
+            return None
+        code = _CODE.search(line)
+        code = code.group(1) if code else ""
+        text = " ".join(line.split())
+        text = text if len(text) <= 120 else text[:117] + "..."
+        key = self._key(cls, code, text)
+        entry = self._index.get(key)
+        if entry is not None:
+            entry["count"] += 1
+            return entry
+        if len(self.entries) >= _MAX_ENTRIES and severity != FATAL:
+            self.dropped += 1
+            return None
+        entry = {"cls": cls, "severity": severity, "code": code, "line": number, "text": text, "count": 1}
+        self.entries.append(entry)
+        self._index[key] = entry
+        return entry
+
+    @staticmethod
+    def _key(cls: str, code: str, text: str) -> str:
+        # Coded messages group by code; uncoded ones only repeat verbatim.
+        return f"{cls}|{code}" if code else f"{cls}||{text}"
@@ -0,0 +1,741 @@
+"""
+Gate-level netlist graph for structural Verilog.
+
+The synthesized and post-route netlists are plain structural Verilog: module
+headers, port/wire declarations, cell instances with named pin connections
+and the odd `assign`.  `parse_netlist` streams the file statement by
+statement into a per-module template (integer net ids, cell types, pins),
+then elaborates the top module into one flat, integer-indexed graph:
+
+    cells   hierarchical name, cell type, owning hierarchy instance,
+            pins in CSR form (pin name id, net id, is-output flag)
+    nets    name (from the highest level that sees it), pins in CSR form
+    ports   top-level port bits with direction and net id
+    hier    hierarchy instances (path, module, parent) — submodule
+            instances are kept as hierarchy, not flattened away
+
+Library cells are black boxes: an output pin is recognised by name (Z, ZN,
+Q, QN, S, CO, ... plus NETLIST_OUTPUT_PINS), a sequential cell by a clock
+pin (CP, CK, CLK, ...) or a flop/latch cell-type prefix.  Sequential cells
+cut cones and logic-depth paths, like timing startpoints and endpoints.
+
+    g = load("designs/alu_8bit_synth.v")                  # cached
+    g.net_index("n137"); g.drivers(n); g.loads(n)
+    g.cone(n, "fanin", max_depth=None)                     # -> cells, boundary
+    g.logic_depth(sources=None, sinks=None)                # -> depth, path
+
+Configuration in config.py (optional):
+    NETLIST_OUTPUT_PINS  — extra library output pin names
+    NETLIST_CACHE_GRAPHS — parsed netlists kept in memory (default: 4)
+"""
+
+import os
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+
+import config
+from tools.def_parser import NameTable
+
+IN, OUT, INOUT = 0, 1, 2
+_DIRS = {"input": IN, "output": OUT, "inout": INOUT}
+_DECLS = {"input", "output", "inout", "wire", "tri", "wand", "wor", "reg", "supply0", "supply1"}
+_SKIP = {"parameter", "localparam", "defparam", "specparam", "timeunit", "timeprecision", "genvar"}
+
+_OUTPUT_PINS = {"Z", "ZN", "Q", "QN", "QB", "S", "CO", "CON", "Y", "YN", "SO", "O", "ON", "X"}
+_CLOCK_PINS = {"CP", "CPN", "CK", "CKN", "CLK", "CLKN", "GCK"}
+_SEQ_PREFIXES = ("DF", "SDF", "EDF", "LH", "LN", "LATCH", "FF", "SDN", "DFF")
+CONSTANTS = ("1'b0", "1'b1", "1'bx", "1'bz")
+
+_ID = r"(?:\\\S+|[A-Za-z_][\w$]*)"
+_INSTANCE = re.compile(
+    rf"^({_ID})\s*(?:#\s*\((?:[^()]|\([^()]*\))*\)\s*)?({_ID})\s*(?:\[[^\]]*\]\s*)?\((.*)\)\s*$", re.S
+)
+_NAMED_PIN = re.compile(rf"\.\s*({_ID})\s*\(\s*((?:\\\S+\s|[^()\\])*?)\s*\)")
+_RANGE = re.compile(r"^\[\s*(-?\d+)\s*:\s*(-?\d+)\s*\]\s*")
+_SIZED = re.compile(r"^(\d*)\s*'\s*[sS]?([bBoOdDhH])\s*([0-9a-fA-FxXzZ_?]+)$")
+
+
+class _Module:
+    """Parse-time template of one module, with module-local net ids."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.port_order = []
+        self.port_dir = {}
+        self.widths = {}                    # bus name -> (msb, lsb)
+        self.net_ids = {}                   # local bit name -> local id
+        self.net_names = []
+        self.cell_names = []
+        self.cell_type = array("i")
+        self.cell_pin_start = array("Q", [0])
+        self.pin_name = array("i")
+        self.pin_net = array("i")           # local net id, -1 unconnected
+        self.subs = []                      # submodule instances: (module, instance, [(port, bits)])
+        self.assigns = array("i")           # lhs, rhs local id pairs
+
+    def net(self, bit: str) -> int:
+        i = self.net_ids.get(bit)
+        if i is None:
+            i = self.net_ids[bit] = len(self.net_names)
+            self.net_names.append(bit)
+        return i
+
+    def port_bits(self, port: str) -> list:
+        return [self.net(b) for b in _expand_name(port, self.widths)]
+
+
+class NetlistGraph:
+    def __init__(self, path: str):
+        self.path = path
+        self.top = ""
+        self.parse_seconds = 0.0
+        self.modules = []                   # module names, hierarchy order
+
+        self.hier_names = [""]
+        self.hier_module = array("i", [0])
+        self.hier_parent = array("i", [-1])
+
+        self.types = []
+        self.pin_names = []
+        self.cell_names = NameTable()
+        self.cell_type = array("i")
+        self.cell_hier = array("i")
+        self.cell_pin_start = array("Q", [0])
+        self.pin_name = array("i")
+        self.pin_net = array("i")
+        self.pin_out = array("b")
+        self.pin_cell = array("i")
+
+        self.net_names = NameTable()
+        self.net_pin_start = array("Q", [0])
+        self.net_pins = array("i")
+
+        self.port_names = []
+        self.port_dir = array("b")
+        self.port_net = array("i")
+
+        self.type_seq = []                  # type id -> is sequential
+        self._net_ports = None
+        self._order = None
+
+    # ── Basic accessors ───────────────────────────────────────────────────────
+
+    @property
+    def cell_count(self) -> int:
+        return len(self.cell_type)
+
+    @property
+    def net_count(self) -> int:
+        return len(self.net_pin_start) - 1
+
+    def is_seq(self, c: int) -> bool:
+        return self.type_seq[self.cell_type[c]]
+
+    def cell_pins(self, c: int):
+        return range(self.cell_pin_start[c], self.cell_pin_start[c + 1])
+
+    def net_index(self, name: str) -> int:
+        return self.net_names.index(name)
+
+    def drivers(self, n: int) -> list:
+        return [p for p in self._pins_of(n) if self.pin_out[p]]
+
+    def loads(self, n: int) -> list:
+        return [p for p in self._pins_of(n) if not self.pin_out[p]]
+
+    def net_ports(self, n: int) -> list:
+        """Top-level port bits on net *n*."""
+        if self._net_ports is None:
+            mapping = {}
+            for k, net in enumerate(self.port_net):
+                mapping.setdefault(net, []).append(k)
+            self._net_ports = mapping
+        return self._net_ports.get(n, [])
+
+    def fanout(self, n: int) -> int:
+        return len(self.loads(n)) + sum(1 for k in self.net_ports(n) if self.port_dir[k] != IN)
+
+    def is_clock_net(self, n: int) -> bool:
+        loads = self.loads(n)
+        return bool(loads) and all(self.pin_names[self.pin_name[p]] in _CLOCK_PINS for p in loads)
+
+    def pin_label(self, p: int) -> str:
+        return f"{self.cell_names[self.pin_cell[p]]}/{self.pin_names[self.pin_name[p]]}"
+
+    def _pins_of(self, n: int):
+        return self.net_pins[self.net_pin_start[n]:self.net_pin_start[n + 1]]
+
+    # ── Cones ─────────────────────────────────────────────────────────────────
+
+    def cone(self, n: int, direction: str = "fanin", max_depth: int = None):
+        """
+        Breadth-first cone from net *n* through combinational cells.
+        Returns (cells with their level, boundary) where boundary lists the
+        sequential pins and top-level ports the cone stops at.
+        """
+        seen_nets = {n}
+        cells = {}
+        boundary = []
+        frontier = deque([(n, 0)])
+        while frontier:
+            net, level = frontier.popleft()
+            for k in self.net_ports(net):
+                if (direction == "fanin") == (self.port_dir[k] != OUT):
+                    boundary.append(("port", k))
+            pins = self.drivers(net) if direction == "fanin" else self.loads(net)
+            for p in pins:
+                c = self.pin_cell[p]
+                if self.is_seq(c):
+                    boundary.append(("pin", p))
+                    continue
+                if c in cells or (max_depth is not None and level >= max_depth):
+                    continue
+                cells[c] = level + 1
+                for q in self.cell_pins(c):
+                    if bool(self.pin_out[q]) == (direction == "fanout"):
+                        nxt = self.pin_net[q]
+                        if nxt >= 0 and nxt not in seen_nets:
+                            seen_nets.add(nxt)
+                            frontier.append((nxt, level + 1))
+        return cells, boundary
+
+    # ── Logic depth ───────────────────────────────────────────────────────────
+
+    def comb_order(self) -> array:
+        """Combinational cells in topological order (cells on loops are left out)."""
+        if self._order is not None:
+            return self._order
+        indeg = array("i", [0]) * self.cell_count
+        for c in range(self.cell_count):
+            if self.is_seq(c):
+                continue
+            for p in self.cell_pins(c):
+                if not self.pin_out[p] and self.pin_net[p] >= 0:
+                    indeg[c] += sum(1 for d in self.drivers(self.pin_net[p]) if not self.is_seq(self.pin_cell[d]))
+        order = array("i")
+        ready = deque(c for c in range(self.cell_count) if not self.is_seq(c) and indeg[c] == 0)
+        while ready:
+            c = ready.popleft()
+            order.append(c)
+            for p in self.cell_pins(c):
+                if self.pin_out[p] and self.pin_net[p] >= 0:
+                    for q in self.loads(self.pin_net[p]):
+                        d = self.pin_cell[q]
+                        if not self.is_seq(d):
+                            indeg[d] -= 1
+                            if indeg[d] == 0:
+                                ready.append(d)
+        self._order = order
+        return order
+
+    def logic_depth(self, sources=None, sinks=None):
+        """
+        Longest combinational path, in cells, from *sources* to *sinks* (net
+        ids; default: input ports and sequential outputs to output ports and
+        sequential data inputs).  Returns (depth, [cells on the path], sink
+        net, {sink net: depth}).
+        """
+        if sources is None:
+            sources = [self.port_net[k] for k in range(len(self.port_net)) if self.port_dir[k] != OUT]
+            sources += [self.pin_net[p] for c in range(self.cell_count) if self.is_seq(c)
+                        for p in self.cell_pins(c) if self.pin_out[p]]
+        if sinks is None:
+            sinks = [self.port_net[k] for k in range(len(self.port_net)) if self.port_dir[k] != IN]
+            sinks += [self.pin_net[p] for c in range(self.cell_count) if self.is_seq(c)
+                      for p in self.cell_pins(c)
+                      if not self.pin_out[p] and self.pin_names[self.pin_name[p]] not in _CLOCK_PINS]
+        level = {n: 0 for n in sources if n >= 0}
+        via = {}                                # net -> cell that set its level
+        for c in self.comb_order():
+            best, arg = -1, -1
+            for p in self.cell_pins(c):
+                if not self.pin_out[p]:
+                    lv = level.get(self.pin_net[p], -1)
+                    if lv > best:
+                        best, arg = lv, self.pin_net[p]
+            if best < 0:
+                continue
+            for p in self.cell_pins(c):
+                n = self.pin_net[p]
+                if self.pin_out[p] and n >= 0 and level.get(n, -1) < best + 1:
+                    level[n] = best + 1
+                    via[n] = (c, arg)
+        reached = {n: level[n] for n in sinks if n in level}
+        if not reached:
+            return 0, [], -1, {}
+        end = max(reached, key=reached.get)
+        path, n = [], end
+        while n in via:
+            c, n = via[n]
+            path.append(c)
+        path.reverse()
+        return reached[end], path, end, reached
+
+    def nbytes(self) -> int:
+        total = 0
+        for value in vars(self).values():
+            if isinstance(value, array):
+                total += value.itemsize * len(value)
+            elif isinstance(value, NameTable):
+                total += value.nbytes()
+        return total
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+
+def parse_netlist(path: str, top: str = None) -> NetlistGraph:
+    """Stream the structural Verilog in *path* and elaborate *top* (default: the uninstantiated module)."""
+    started = time.monotonic()
+    defined = _module_names(path)
+    modules = OrderedDict()
+    types, pin_ids = {}, {}
+    mod = None
+    for stmt in _statements(path):
+        while stmt.startswith("endmodule"):
+            mod = None
+            stmt = stmt[len("endmodule"):].lstrip()
+        if not stmt:
+            continue
+        word = stmt.split(None, 1)[0].split("(", 1)[0]
+        if word in ("module", "macromodule"):
+            mod = _module_header(stmt)
+            modules[mod.name] = mod
+        elif mod is None or word in _SKIP:
+            continue
+        elif word in _DECLS:
+            _declaration(mod, word, stmt[len(word):])
+        elif word == "assign":
+            for lhs, rhs in _assignments(stmt[len("assign"):]):
+                lbits, rbits = _bits(mod, lhs), _bits(mod, rhs)
+                for l, r in zip(reversed(lbits), reversed(rbits)):
+                    mod.assigns.append(l)
+                    mod.assigns.append(r)
+        else:
+            _instance(mod, stmt, types, pin_ids, defined)
+
+    if top is None:
+        used = {child for m in modules.values() for child, _, _ in m.subs}
+        roots = [m for m in modules.values() if m.name not in used]
+        if not roots:
+            raise ValueError("no module definitions found")
+        top = max(roots, key=lambda m: (len(m.subs) + len(m.cell_type), list(modules).index(m.name))).name
+    elif top not in modules:
+        raise ValueError(f"module '{top}' is not defined in the netlist")
+
+    g = NetlistGraph(path)
+    g.top = top
+    g.types = [None] * len(types)
+    for name, i in types.items():
+        g.types[i] = name
+    g.pin_names = [None] * len(pin_ids)
+    for name, i in pin_ids.items():
+        g.pin_names[i] = name
+    _elaborate(g, modules)
+    g.parse_seconds = time.monotonic() - started
+    return g
+
+
+def _module_names(path: str) -> set:
+    """Names of every module defined in *path* (cheap line scan before the real parse)."""
+    pattern = re.compile(rf"^\s*(?:macro)?module\s+({_ID})")
+    names = set()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if "module" in line:
+                m = pattern.match(line)
+                if m:
+                    names.add(_name(m.group(1)))
+    return names
+
+
+def _statements(path: str):
+    """';'-terminated statements with comments and directives removed; 'endmodule' kept as a prefix."""
+    buf = []
+    in_comment = False
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if in_comment:
+                end = line.find("*/")
+                if end < 0:
+                    continue
+                line = line[end + 2:]
+                in_comment = False
+            if "/*" in line or "//" in line:
+                line, in_comment = _strip_comments(line)
+            s = line.strip()
+            if not s or s.startswith("`"):
+                continue
+            while ";" in s:
+                part, s = s.split(";", 1)
+                buf.append(part)
+                yield " ".join(buf).strip()
+                buf = []
+            if s.startswith("endmodule") and not buf:
+                yield s
+                continue
+            if s:
+                buf.append(s)
+    if buf:
+        yield " ".join(buf).strip()
+
+
+def _strip_comments(line: str):
+    out = []
+    i = 0
+    while i < len(line):
+        if line.startswith("//", i):
+            break
+        if line.startswith("/*", i):
+            end = line.find("*/", i + 2)
+            if end < 0:
+                return "".join(out), True
+            i = end + 2
+            continue
+        if line[i] == "\\":                       # escaped identifier: copy up to whitespace
+            j = i
+            while j < len(line) and not line[j].isspace():
+                j += 1
+            out.append(line[i:j])
+            i = j
+            continue
+        out.append(line[i])
+        i += 1
+    return "".join(out), False
+
+
+def _module_header(stmt: str) -> _Module:
+    m = re.match(rf"^(?:macro)?module\s+({_ID})\s*(?:#\s*\((?:[^()]|\([^()]*\))*\)\s*)?(?:\((.*)\))?\s*$", stmt, re.S)
+    if not m:
+        raise ValueError(f"cannot parse module header: {stmt[:80]}")
+    mod = _Module(_name(m.group(1)))
+    body = m.group(2) or ""
+    if re.search(r"\b(input|output|inout)\b", body):
+        # ANSI header: "input [7:0] a, b, output y"
+        for chunk in re.split(r"\b(?=input\b|output\b|inout\b)", body):
+            chunk = chunk.strip().rstrip(",")
+            if chunk:
+                word = chunk.split(None, 1)[0]
+                _declaration(mod, word, chunk[len(word):], header=True)
+    else:
+        mod.port_order = [_name(p) for p in _split_top(body) if p.strip()]
+    return mod
+
+
+def _declaration(mod: _Module, word: str, rest: str, header: bool = False):
+    rest = rest.strip()
+    rest = re.sub(r"^(wire|reg|logic|signed)\b\s*", "", rest)
+    widths = None
+    m = _RANGE.match(rest)
+    if m:
+        widths = (int(m.group(1)), int(m.group(2)))
+        rest = rest[m.end():]
+    for name in _split_top(rest):
+        name = _name(name.split("=", 1)[0].strip())
+        if not name:
+            continue
+        if widths is not None:
+            mod.widths[name] = widths
+        if word in _DIRS:
+            mod.port_dir[name] = _DIRS[word]
+            if header and name not in mod.port_order:
+                mod.port_order.append(name)
+        for bit in _expand_name(name, mod.widths):
+            mod.net(bit)
+
+
+def _assignments(rest: str):
+    for part in _split_top(rest):
+        if "=" in part:
+            lhs, rhs = part.split("=", 1)
+            yield lhs.strip(), rhs.strip()
+
+
+def _instance(mod: _Module, stmt: str, types: dict, pin_ids: dict, defined: set):
+    m = _INSTANCE.match(stmt)
+    if not m:
+        return
+    cell_type, inst, body = _name(m.group(1)), _name(m.group(2)), m.group(3)
+    if body.lstrip().startswith("."):
+        conns = [(_name(p), expr) for p, expr in _NAMED_PIN.findall(body)]
+    else:
+        conns = [(None, expr.strip()) for expr in _split_top(body)]
+    if cell_type in defined:
+        mod.subs.append((cell_type, inst, [(pin, _bits(mod, expr)) for pin, expr in conns]))
+        return
+    # Library cell: straight into the module's compact tables.  Pins are
+    # scalar, so a multi-bit connection keeps its LSB; positional
+    # connections cannot be named without the library and are dropped.
+    tid = types.get(cell_type)
+    if tid is None:
+        tid = types[cell_type] = len(types)
+    mod.cell_names.append(inst)
+    mod.cell_type.append(tid)
+    for pin, expr in conns:
+        if pin is None:
+            continue
+        pid = pin_ids.get(pin)
+        if pid is None:
+            pid = pin_ids[pin] = len(pin_ids)
+        bits = _bits(mod, expr)
+        mod.pin_name.append(pid)
+        mod.pin_net.append(bits[-1] if bits else -1)
+    mod.cell_pin_start.append(len(mod.pin_net))
+
+
+def _bits(mod: _Module, expr: str) -> list:
+    """Local net ids of *expr*, MSB first."""
+    expr = expr.strip()
+    known = mod.net_ids.get(expr)
+    if known is not None and expr not in mod.widths:
+        return [known]
+    if not expr:
+        return []
+    if expr.startswith("{"):
+        inner = expr[1:-1].strip()
+        rep = re.match(r"^(\d+)\s*\{(.*)\}$", inner, re.S)
+        if rep:
+            return _bits(mod, "{" + rep.group(2) + "}") * int(rep.group(1))
+        out = []
+        for part in _split_top(inner):
+            out += _bits(mod, part)
+        return out
+    m = _SIZED.match(expr)
+    if m:
+        return [mod.net(CONSTANTS[_const_bit(b)]) for b in _const_bits(m.group(1), m.group(2), m.group(3))]
+    if expr.isdigit():
+        return [mod.net(CONSTANTS[0 if expr == "0" else 1])]
+    if expr.startswith("\\"):
+        return [mod.net(_name(expr))]
+    m = re.match(r"^([A-Za-z_][\w$]*)\s*\[\s*(-?\d+)\s*(?::\s*(-?\d+)\s*)?\]$", expr)
+    if m:
+        base, hi = m.group(1), int(m.group(2))
+        lo = int(m.group(3)) if m.group(3) is not None else hi
+        step = -1 if hi >= lo else 1
+        return [mod.net(f"{base}[{i}]") for i in range(hi, lo + step, step)]
+    return [mod.net(b) for b in _expand_name(expr, mod.widths)]
+
+
+def _expand_name(name: str, widths: dict) -> list:
+    if name in widths:
+        hi, lo = widths[name]
+        step = -1 if hi >= lo else 1
+        return [f"{name}[{i}]" for i in range(hi, lo + step, step)]
+    return [name]
+
+
+def _const_bits(width: str, base: str, digits: str) -> str:
+    digits = digits.replace("_", "").lower()
+    base = base.lower()
+    if base == "b":
+        bits = digits
+    elif base in "oh":
+        per = 3 if base == "o" else 4
+        bits = "".join(c * per if c in "xz?" else format(int(c, 16 if per == 4 else 8), f"0{per}b")
+                       for c in digits)
+    else:
+        bits = format(int(digits), "b") if digits.isdigit() else "x"
+    if width:
+        n = int(width)
+        bits = bits[-n:].rjust(n, "0")
+    return bits
+
+
+def _const_bit(b: str) -> int:
+    return {"0": 0, "1": 1, "x": 2}.get(b, 3)
+
+
+def _split_top(text: str) -> list:
+    """Split on commas outside braces/brackets/parentheses."""
+    if not any(c in text for c in "({[\\"):
+        parts = [p.strip() for p in text.split(",")]
+        if parts and not parts[-1]:
+            parts.pop()
+        return parts
+    parts, depth, cur = [], 0, []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\":
+            j = i
+            while j < len(text) and not text[j].isspace():
+                j += 1
+            cur.append(text[i:j])
+            i = j
+            continue
+        if ch in "({[":
+            depth += 1
+        elif ch in ")}]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append("".join(cur).strip())
+            cur = []
+            i += 1
+            continue
+        cur.append(ch)
+        i += 1
+    if cur and "".join(cur).strip():
+        parts.append("".join(cur).strip())
+    return parts
+
+
+def _name(token: str) -> str:
+    token = token.strip()
+    return token[1:] if token[:1] == "\\" else token
+
+
+# ── Elaboration ───────────────────────────────────────────────────────────────
+
+def _elaborate(g: NetlistGraph, modules: "OrderedDict[str, _Module]"):
+    extra_out = set(getattr(config, "NETLIST_OUTPUT_PINS", []) or [])
+    out_pin = [name in _OUTPUT_PINS or name in extra_out for name in g.pin_names]
+    type_ids = {name: i for i, name in enumerate(g.types)}
+    pin_ids = {name: i for i, name in enumerate(g.pin_names)}
+    g.modules = [g.top]
+    parent = array("i")                         # union-find over global nets
+    net_names = []
+    consts = {}
+
+    def new_net(name: str) -> int:
+        if name in CONSTANTS:
+            if name not in consts:
+                consts[name] = len(parent)
+                parent.append(len(parent))
+                net_names.append(name)
+            return consts[name]
+        parent.append(len(parent))
+        net_names.append(name)
+        return len(parent) - 1
+
+    def find(n: int) -> int:
+        root = n
+        while parent[root] != root:
+            root = parent[root]
+        while parent[n] != root:
+            parent[n], n = root, parent[n]
+        return root
+
+    cell_names = []
+    seq_types = {}
+    clock_pin = [name in _CLOCK_PINS for name in g.pin_names]
+
+    def elab(mod: _Module, prefix: str, hier: int, bound: dict):
+        gid = array("i", [-1]) * len(mod.net_names)
+        for local, net in bound.items():
+            gid[local] = net
+        for local, name in enumerate(mod.net_names):
+            if gid[local] < 0:
+                gid[local] = new_net(name if name in CONSTANTS else prefix + name)
+        for cell_type, inst, conns in mod.subs:
+            child = modules[cell_type]
+            h = len(g.hier_names)
+            g.hier_names.append(prefix + inst)
+            if cell_type not in g.modules:
+                g.modules.append(cell_type)
+            g.hier_module.append(g.modules.index(cell_type))
+            g.hier_parent.append(hier)
+            child_bound = {}
+            for k, (pin, bits) in enumerate(conns):
+                port = pin if pin is not None else (child.port_order[k] if k < len(child.port_order) else None)
+                if port is None:
+                    continue
+                for cb, pb in zip(reversed(child.port_bits(port)), reversed(bits)):
+                    child_bound[cb] = gid[pb]
+            elab(child, prefix + inst + "/", h, child_bound)
+        for lc in range(len(mod.cell_type)):
+            c = len(g.cell_type)
+            cell_names.append(prefix + mod.cell_names[lc])
+            tid = mod.cell_type[lc]
+            g.cell_type.append(tid)
+            g.cell_hier.append(hier)
+            has_clock = False
+            for k in range(mod.cell_pin_start[lc], mod.cell_pin_start[lc + 1]):
+                pid = mod.pin_name[k]
+                local = mod.pin_net[k]
+                has_clock = has_clock or clock_pin[pid]
+                g.pin_name.append(pid)
+                g.pin_net.append(gid[local] if local >= 0 else -1)
+                g.pin_out.append(out_pin[pid])
+                g.pin_cell.append(c)
+            g.cell_pin_start.append(len(g.pin_net))
+            if tid not in seq_types:
+                seq_types[tid] = has_clock or g.types[tid].upper().startswith(_SEQ_PREFIXES)
+        for k in range(0, len(mod.assigns), 2):
+            a, b = find(gid[mod.assigns[k]]), find(gid[mod.assigns[k + 1]])
+            if a != b:
+                parent[max(a, b)] = min(a, b)   # the earlier (higher-level) name wins
+        if hier == 0:
+            for port in mod.port_order:
+                for bit in _expand_name(port, mod.widths):
+                    g.port_names.append(bit)
+                    g.port_dir.append(mod.port_dir.get(port, INOUT))
+                    g.port_net.append(gid[mod.net(bit)])
+
+    elab(modules[g.top], "", 0, {})
+
+    # Collapse assign aliases into dense net ids.
+    dense = array("i", [-1]) * len(parent)
+    names = NameTable()
+    for n in range(len(parent)):
+        r = find(n)
+        if dense[r] < 0:
+            dense[r] = len(names)
+            names.append(net_names[r])
+        dense[n] = dense[r]
+    names.freeze()
+    g.net_names = names
+    for k in range(len(g.pin_net)):
+        if g.pin_net[k] >= 0:
+            g.pin_net[k] = dense[g.pin_net[k]]
+    for k in range(len(g.port_net)):
+        g.port_net[k] = dense[g.port_net[k]]
+
+    cells = NameTable()
+    for name in cell_names:
+        cells.append(name)
+    cells.freeze()
+    g.cell_names = cells
+    g.type_seq = [seq_types.get(t, name.upper().startswith(_SEQ_PREFIXES)) for t, name in enumerate(g.types)]
+
+    # Net -> pins (CSR), by counting sort.
+    count = array("Q", [0]) * (len(names) + 1)
+    for n in g.pin_net:
+        if n >= 0:
+            count[n + 1] += 1
+    for n in range(len(names)):
+        count[n + 1] += count[n]
+    fill = array("Q", count)
+    pins = array("i", [0]) * count[-1]
+    for p, n in enumerate(g.pin_net):
+        if n >= 0:
+            pins[fill[n]] = p
+            fill[n] += 1
+    g.net_pin_start, g.net_pins = count, pins
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def load(path: str, top: str = None) -> NetlistGraph:
+    """Graph for *path*, re-parsed whenever the file's size or mtime changes."""
+    key = (os.path.realpath(path), top)
+    st = os.stat(key[0])
+    stamp = (st.st_size, st.st_mtime_ns)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            _cache.move_to_end(key)
+            return entry[1]
+    graph = parse_netlist(key[0], top)
+    with _lock:
+        _cache.pop(key, None)
+        _cache[key] = (stamp, graph)
+        limit = max(1, int(getattr(config, "NETLIST_CACHE_GRAPHS", 4)))
+        while len(_cache) > limit:
+            _cache.popitem(last=False)
+    return graph
@@ -0,0 +1,286 @@
+"""
+Structural queries over gate-level netlists, built on tools/netlist_graph.py.
+
+`query_netlist` answers fan-in/fan-out, high-fanout, cell-usage and
+logic-depth questions about a synthesized or post-route netlist without the
+model reading the Verilog.  The graph is built once per file and kept in
+memory until the file changes, so follow-up questions cost milliseconds.
+"""
+
+import fnmatch
+import heapq
+import os
+import time
+
+import config
+
+NETLIST_TOOLS = [
+    {
+        "name": "query_netlist",
+        "description": (
+            "Query the connectivity of a gate-level Verilog netlist (e.g. 'designs/alu_8bit_synth.v' or "
+            "'results/innovus_alu/alu_8bit_postroute.v'). Actions: 'summary' (hierarchy, cell/net/port "
+            "counts, registers, deepest path); 'histogram' (cell-type usage, optionally within a "
+            "hierarchy scope); 'fanout' (highest-fanout nets); 'net' (driver and loads of a net); "
+            "'cone' (fan-in or fan-out cone of a net up to registers/ports); 'depth' (longest "
+            "combinational path in cells between ports/registers). Use this instead of reading netlists."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "netlist": {
+                    "type": "string",
+                    "description": "Structural Verilog file relative to the project"
+                },
+                "action": {
+                    "type": "string",
+                    "enum": ["summary", "histogram", "fanout", "net", "cone", "depth"],
+                    "description": "Query to run (default: summary)"
+                },
+                "net": {
+                    "type": "string",
+                    "description": "Net name for 'net' and 'cone', e.g. 'n137', 'result[3]', 'fa_stage[1].u_fa/n1'"
+                },
+                "direction": {
+                    "type": "string",
+                    "enum": ["fanin", "fanout"],
+                    "description": "Cone direction (default: fanin)"
+                },
+                "max_depth": {
+                    "type": "integer",
+                    "description": "Stop a cone after this many cell levels (default: unlimited)"
+                },
+                "scope": {
+                    "type": "string",
+                    "description": "Instance-path glob limiting 'histogram', e.g. 'fa_stage[1].u_fa/*'"
+                },
+                "from_ports": {
+                    "type": "string",
+                    "description": "Port glob for 'depth' start points (default: all inputs and register outputs)"
+                },
+                "to_ports": {
+                    "type": "string",
+                    "description": "Port glob for 'depth' end points (default: all outputs and register inputs)"
+                },
+                "top": {
+                    "type": "string",
+                    "description": "Top module (default: the module nothing instantiates)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Rows of detail to list (default: 20)"
+                }
+            },
+            "required": ["netlist"]
+        }
+    }
+]
+
+NETLIST_TOOL_ACCESS = {
+    "query_netlist": {"local": "read"},
+}
+
+
+def execute_netlist_tool(tool_name: str, tool_input: dict) -> str:
+    if tool_name == "query_netlist":
+        return _query_netlist(
+            tool_input["netlist"],
+            tool_input.get("action", "summary"),
+            tool_input.get("net"),
+            tool_input.get("direction", "fanin"),
+            tool_input.get("max_depth"),
+            tool_input.get("scope"),
+            tool_input.get("from_ports"),
+            tool_input.get("to_ports"),
+            tool_input.get("top"),
+            int(tool_input.get("limit", 20)),
+        )
+    return f"ERROR: Unknown netlist tool '{tool_name}'"
+
+
+def _query_netlist(netlist: str, action: str = "summary", net: str = None, direction: str = "fanin",
+                   max_depth=None, scope: str = None, from_ports: str = None, to_ports: str = None,
+                   top: str = None, limit: int = 20) -> str:
+    from tools import netlist_graph
+    work = os.path.realpath(config.WORK_DIR)
+    full = os.path.realpath(os.path.join(config.WORK_DIR, netlist))
+    if not full.startswith(work):
+        return f"ERROR: Path '{netlist}' escapes the work directory"
+    if not os.path.isfile(full):
+        return f"ERROR: Netlist '{netlist}' not found"
+    limit = max(1, limit)
+
+    try:
+        start = time.monotonic()
+        g = netlist_graph.load(full, top)
+        loaded = time.monotonic() - start
+        if action == "summary":
+            body = _summary(g, limit)
+        elif action == "histogram":
+            body = _histogram(g, scope, limit)
+        elif action == "fanout":
+            body = _fanout(g, limit)
+        elif action in ("net", "cone"):
+            if not net:
+                return f"ERROR: action '{action}' needs net"
+            n = g.net_index(net)
+            if n < 0:
+                return f"ERROR: Net '{net}' not found in {netlist}"
+            if action == "net":
+                body = _net(g, n, limit)
+            else:
+                depth = int(max_depth) if max_depth is not None else None
+                body = _cone(g, n, direction, depth, limit)
+        elif action == "depth":
+            body = _depth(g, from_ports, to_ports, limit)
+        else:
+            return f"ERROR: Unknown action '{action}'"
+    except Exception as e:
+        return f"ERROR (query_netlist): {e}"
+    cached = "cached" if loaded < g.parse_seconds / 2 else f"parsed in {g.parse_seconds:.2f}s"
+    return f"[{netlist}: top {g.top}, {cached}]\n{body}"
+
+
+# ── Actions ───────────────────────────────────────────────────────────────────
+
+def _summary(g, limit) -> str:
+    from tools.netlist_graph import IN, OUT
+    seq = sum(1 for c in range(g.cell_count) if g.is_seq(c))
+    inputs = sum(1 for d in g.port_dir if d == IN)
+    outputs = sum(1 for d in g.port_dir if d == OUT)
+    lines = [
+        f"{g.cell_count:,} cells ({seq:,} sequential) of {len(g.types):,} types, {g.net_count:,} nets, "
+        f"{len(g.port_names):,} port bits ({inputs} in, {outputs} out)",
+    ]
+    if len(g.hier_names) > 1:
+        per_hier = [0] * len(g.hier_names)
+        for h in g.cell_hier:
+            per_hier[h] += 1
+        lines.append(f"hierarchy: {len(g.hier_names) - 1:,} submodule instance(s) of {len(g.modules) - 1} module(s)")
+        shown = sorted(range(len(g.hier_names)), key=lambda h: -per_hier[h])[:limit]
+        for h in shown:
+            lines.append(f"  {g.hier_names[h] or '(top)':<40} {g.modules[g.hier_module[h]]:<24} {per_hier[h]:,} cell(s)")
+    if g.net_count:
+        n = max(range(g.net_count), key=lambda n: g.net_pin_start[n + 1] - g.net_pin_start[n])
+        lines.append(f"highest fanout: {g.net_names[n]} ({g.fanout(n)}{', clock' if g.is_clock_net(n) else ''})")
+    depth, path, end, _ = g.logic_depth()
+    if path:
+        lines.append(f"deepest combinational path: {depth} cell(s) ending at {g.net_names[end]}")
+    lines.append(f"graph {g.nbytes() / 1e6:.1f} MB")
+    return "\n".join(lines)
+
+
+def _histogram(g, scope, limit) -> str:
+    cells = g.cell_names.match(scope) if scope else range(g.cell_count)
+    counts = {}
+    for c in cells:
+        counts[g.cell_type[c]] = counts.get(g.cell_type[c], 0) + 1
+    total = sum(counts.values())
+    if not total:
+        return f"No cells match scope '{scope}'"
+    lines = [f"{total:,} cell(s){f' under {scope}' if scope else ''}, {len(counts)} type(s)"]
+    for t, n in sorted(counts.items(), key=lambda kv: (-kv[1], g.types[kv[0]]))[:limit]:
+        lines.append(f"  {g.types[t]:<20} {n:>8,}  {100 * n / total:5.1f}%{'  (sequential)' if g.type_seq[t] else ''}")
+    if len(counts) > limit:
+        lines.append(f"  ... {len(counts) - limit} more type(s)")
+    return "\n".join(lines)
+
+
+def _fanout(g, limit) -> str:
+    from tools import netlist_graph
+    from tools.netlist_graph import OUT
+    top = heapq.nlargest(limit, range(g.net_count), key=g.fanout)
+    lines = [f"highest-fanout nets of {g.net_count:,}:"]
+    for n in top:
+        drivers = g.drivers(n)
+        driver = (g.pin_label(drivers[0]) if drivers
+                  else "port" if any(g.port_dir[k] != OUT for k in g.net_ports(n)) else "undriven")
+        tags = []
+        if g.is_clock_net(n):
+            tags.append("clock")
+        if g.net_names[n] in netlist_graph.CONSTANTS:
+            tags.append("constant")
+        lines.append(f"  {g.net_names[n]:<32} fanout {g.fanout(n):>6,}  driver {driver}"
+                     + (f"  ({', '.join(tags)})" if tags else ""))
+    return "\n".join(lines)
+
+
+def _net(g, n, limit) -> str:
+    drivers = g.drivers(n)
+    loads = g.loads(n)
+    ports = g.net_ports(n)
+    lines = [f"net {g.net_names[n]}: {len(drivers)} driver(s), {len(loads)} load pin(s), {len(ports)} port(s)"]
+    for k in ports:
+        lines.append(f"  port {g.port_names[k]} ({('input', 'output', 'inout')[g.port_dir[k]]})")
+    for p in drivers:
+        lines.append(f"  driver {g.pin_label(p):<40} {g.types[g.cell_type[g.pin_cell[p]]]}")
+    for p in loads[:limit]:
+        lines.append(f"  load   {g.pin_label(p):<40} {g.types[g.cell_type[g.pin_cell[p]]]}")
+    if len(loads) > limit:
+        lines.append(f"  ... {len(loads) - limit:,} more load(s)")
+    return "\n".join(lines)
+
+
+def _cone(g, n, direction, max_depth, limit) -> str:
+    cells, boundary = g.cone(n, direction, max_depth)
+    levels = max(cells.values()) if cells else 0
+    counts = {}
+    for c in cells:
+        counts[g.cell_type[c]] = counts.get(g.cell_type[c], 0) + 1
+    ports = sorted({g.port_names[k] for kind, k in boundary if kind == "port"})
+    regs = sorted({g.pin_label(p) for kind, p in boundary if kind == "pin"})
+    lines = [
+        f"{direction} cone of {g.net_names[n]}: {len(cells):,} combinational cell(s), farthest {levels} level(s) away"
+        + (f" (stopped at depth {max_depth})" if max_depth is not None else ""),
+    ]
+    if counts:
+        top = sorted(counts.items(), key=lambda kv: -kv[1])[:8]
+        lines.append("types: " + ", ".join(f"{g.types[t]} {k}" for t, k in top)
+                     + (f", ... {len(counts) - 8} more" if len(counts) > 8 else ""))
+    kind = "start" if direction == "fanin" else "end"
+    lines.append(f"{kind}points: {len(ports)} port(s), {len(regs)} register pin(s)")
+    for label in (ports + regs)[:limit]:
+        lines.append(f"  {label}")
+    if len(ports) + len(regs) > limit:
+        lines.append(f"  ... {len(ports) + len(regs) - limit:,} more")
+    nearest = sorted(cells.items(), key=lambda kv: kv[1])[:limit]
+    if nearest:
+        lines.append("cells by level:")
+        for c, lv in nearest:
+            lines.append(f"  L{lv:<3} {g.cell_names[c]:<40} {g.types[g.cell_type[c]]}")
+        if len(cells) > limit:
+            lines.append(f"  ... {len(cells) - limit:,} more")
+    return "\n".join(lines)
+
+
+def _depth(g, from_ports, to_ports, limit) -> str:
+    from tools.netlist_graph import IN, OUT
+    sources = sinks = None
+    if from_ports:
+        sources = [g.port_net[k] for k, name in enumerate(g.port_names)
+                   if g.port_dir[k] != OUT and _port_match(name, from_ports)]
+        if not sources:
+            return f"ERROR: No input port matches '{from_ports}'"
+    if to_ports:
+        sinks = [g.port_net[k] for k, name in enumerate(g.port_names)
+                 if g.port_dir[k] != IN and _port_match(name, to_ports)]
+        if not sinks:
+            return f"ERROR: No output port matches '{to_ports}'"
+    depth, path, end, reached = g.logic_depth(sources, sinks)
+    if not path:
+        return "No combinational path between the selected start and end points"
+    frm = from_ports or "inputs/register outputs"
+    to = to_ports or "outputs/register inputs"
+    lines = [f"longest path {frm} -> {to}: {depth} cell(s), ending at {g.net_names[end]}"]
+    for i, c in enumerate(path, 1):
+        lines.append(f"  {i:>3}. {g.cell_names[c]:<40} {g.types[g.cell_type[c]]}")
+    deepest = heapq.nlargest(min(limit, 10), reached.items(), key=lambda kv: kv[1])
+    lines.append("deepest endpoints: " + ", ".join(f"{g.net_names[n]} {d}" for n, d in deepest))
+    return "\n".join(lines)
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _port_match(name: str, pattern: str) -> bool:
+    # Bus bits are literal brackets, not glob character classes.
+    return fnmatch.fnmatchcase(name, pattern.replace("[", "[[]"))
@@ -0,0 +1,446 @@
+"""
+Persistent QoR history: every parsed synthesis / P&R result, queryable
+across iterations.
+
+Each run overwrites results/synth*/ and results/innovus*/, so comparing
+with an earlier iteration meant reading old reports again — if they still
+existed.  Every QoR record parsed by run_eda_flow, get_qor or a sweep is
+now also appended to an SQLite database, once per distinct set of reports:
+
+    runs(id, design, stage, created, origin, source, script, script_hash,
+         config_key, tool_version, params, clock_period, wns, tns,
+         violating_paths, hold_wns, cell_area, utilization, power_total,
+         drc_violations, cell_count, fingerprint)
+
+indexed on (design, stage, created) and (design, stage, config_key).
+`config_key` is the run-cache key of the flow — script, every input file
+and the tool version (tools/run_cache.py) — so runs of one configuration
+group together; `params` holds a sweep variant's knob values; and
+`fingerprint` hashes the report files, so parsing the same directory
+again or restoring a cached run adds nothing.
+
+`qor_history` answers from it in one call:
+    summary — one line per design and stage
+    trend   — the last runs of a design, with the change over the window
+    best    — the best run that met timing by an objective, and the
+              tightest clock period met: where to start a new run
+    delta   — metric-by-metric difference between two runs
+
+Configuration in config.py (optional):
+    QOR_HISTORY    — set False to record nothing
+    QOR_HISTORY_DB — database path (default: WORK_DIR/results/.qor_history.sqlite)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import closing
+
+import config
+
+QOR_HISTORY_TOOLS = [
+    {
+        "name": "qor_history",
+        "description": (
+            "Query the history of every synthesis / P&R QoR result recorded by run_eda_flow, "
+            "get_qor and run_sweep — no reports are re-read. action 'summary' lists designs; "
+            "'trend' shows the last runs of a design; 'best' returns the best run that met "
+            "timing (by objective) with its script, clock period and sweep parameters, and the "
+            "tightest clock period met — a good starting point for a new run of the same block; "
+            "'delta' compares two runs metric by metric (default: the last two)."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["summary", "trend", "best", "delta"],
+                    "description": "Default: summary"
+                },
+                "design": {
+                    "type": "string",
+                    "description": "Top design name, e.g. 'alu_8bit' (optional when only one design is recorded)"
+                },
+                "stage": {
+                    "type": "string",
+                    "enum": ["synth", "pnr"],
+                    "description": "Restrict to synthesis or P&R runs (default for best/delta: the stage of the latest run)"
+                },
+                "objective": {
+                    "type": "string",
+                    "enum": ["area", "power", "wns", "clock"],
+                    "description": "What 'best' minimises (area, power, clock period) or maximises (wns). Default area."
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Runs shown by 'trend' (default 10)"
+                },
+                "run_ids": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "Two run ids for 'delta' (older first)"
+                }
+            },
+            "required": []
+        }
+    }
+]
+
+QOR_HISTORY_TOOL_ACCESS = {
+    "qor_history": {"local": "read", "qor_history": "read"},
+}
+
+METRICS = (
+    # (column, label, format, better: "lower" / "higher")
+    ("clock_period", "clock ns", "{:.3f}", "lower"),
+    ("wns", "WNS ns", "{:+.3f}", "higher"),
+    ("tns", "TNS ns", "{:+.3f}", "higher"),
+    ("violating_paths", "viol paths", "{:.0f}", "lower"),
+    ("hold_wns", "hold WNS", "{:+.3f}", "higher"),
+    ("cell_area", "area um2", "{:.1f}", "lower"),
+    ("utilization", "util", "{:.3f}", "lower"),
+    ("power_total", "power mW", "{:.4g}", "lower"),
+    ("drc_violations", "DRC", "{:.0f}", "lower"),
+    ("cell_count", "cells", "{:.0f}", "lower"),
+)
+_COLUMNS = [m[0] for m in METRICS]
+
+_OBJECTIVES = {
+    "area": "cell_area ASC",
+    "power": "power_total ASC",
+    "wns": "wns DESC",
+    "clock": "clock_period ASC",
+}
+_MET = "wns >= 0 AND (drc_violations IS NULL OR drc_violations = 0)"
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id           INTEGER PRIMARY KEY,
+    design       TEXT NOT NULL,
+    stage        TEXT NOT NULL,
+    created      REAL NOT NULL,
+    origin       TEXT,
+    source       TEXT,
+    script       TEXT,
+    script_hash  TEXT,
+    config_key   TEXT,
+    tool_version TEXT,
+    params       TEXT,
+    {", ".join(f"{c} REAL" for c in _COLUMNS)},
+    fingerprint  TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS runs_by_design ON runs (design, stage, created);
+CREATE INDEX IF NOT EXISTS runs_by_config ON runs (design, stage, config_key);
+"""
+
+_lock = threading.Lock()
+_initialized = set()      # database paths whose schema exists
+
+
+def execute_qor_history_tool(tool_name: str, tool_input: dict) -> str:
+    if tool_name == "qor_history":
+        return _qor_history(
+            tool_input.get("action", "summary"),
+            tool_input.get("design"),
+            tool_input.get("stage"),
+            tool_input.get("objective", "area"),
+            int(tool_input.get("limit", 10)),
+            tool_input.get("run_ids"),
+        )
+    return f"ERROR: Unknown QoR history tool '{tool_name}'"
+
+
+def enabled() -> bool:
+    return bool(getattr(config, "QOR_HISTORY", True))
+
+
+def db_path() -> str:
+    return getattr(config, "QOR_HISTORY_DB", "") or os.path.join(config.WORK_DIR, "results", ".qor_history.sqlite")
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+def record(qor, directory: str, origin: str, script: str = "", config_key: str = "",
+           tool_version: str = "", params: dict = None):
+    """
+    Append *qor*, parsed from the reports in *directory* (absolute), to the
+    history.  Returns the new run id, or None when these reports are
+    already recorded or history is disabled.  Never raises: a broken
+    database must not fail the tool that parsed the reports.
+    """
+    if not enabled():
+        return None
+    try:
+        script_hash = ""
+        if script and os.path.isfile(os.path.join(config.WORK_DIR, script)):
+            script_hash = _hash_files([os.path.join(config.WORK_DIR, script)])[:16]
+        row = {
+            "design": qor.design or os.path.basename(os.path.normpath(directory)),
+            "stage": qor.stage,
+            "created": time.time(),
+            "origin": origin,
+            "source": qor.source,
+            "script": script,
+            "script_hash": script_hash,
+            "config_key": config_key,
+            "tool_version": tool_version,
+            "params": json.dumps(params, sort_keys=True) if params else "",
+            **{c: getattr(qor, c) for c in _COLUMNS},
+            "fingerprint": qor.stage + ":" + _hash_files(
+                [os.path.join(directory, name) for name in sorted(qor.reports)]),
+        }
+        with closing(_connect()) as db, db:
+            cur = db.execute(
+                f"INSERT OR IGNORE INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                list(row.values()),
+            )
+            return cur.lastrowid if cur.rowcount else None
+    except Exception as exc:
+        print(f"[qor_history] run not recorded: {exc}")
+        return None
+
+
+def brief_delta(run_id: int) -> str:
+    """One line placing run *run_id* against the previous run of its design and stage."""
+    try:
+        with closing(_connect()) as db:
+            run = db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+            prev = db.execute(
+                "SELECT * FROM runs WHERE design = ? AND stage = ? AND id < ? ORDER BY created DESC, id DESC LIMIT 1",
+                (run["design"], run["stage"], run_id),
+            ).fetchone()
+            count = db.execute("SELECT COUNT(*) FROM runs WHERE design = ? AND stage = ?",
+                               (run["design"], run["stage"])).fetchone()[0]
+    except Exception:
+        return ""
+    line = f"[history] recorded run #{run_id} ({run['design']} {run['stage']}, {count} run(s) so far)"
+    if prev is None:
+        return line
+    changes = [_change(m, prev[m[0]], run[m[0]]) for m in METRICS
+               if m[0] in ("clock_period", "wns", "tns", "cell_area", "power_total", "drc_violations")]
+    changes = [c for c in changes if c]
+    return line + f"; vs #{prev['id']}: " + (", ".join(changes) if changes else "no metric changed")
+
+
+# ── Tool handler ──────────────────────────────────────────────────────────────
+
+def _qor_history(action: str, design: str = None, stage: str = None, objective: str = "area",
+                 limit: int = 10, run_ids=None) -> str:
+    try:
+        if not os.path.isfile(db_path()):
+            return "No QoR history yet: run_eda_flow, get_qor and run_sweep record every result they parse."
+        with closing(_connect()) as db:
+            if action == "summary":
+                return _summary(db)
+            if action == "delta" and run_ids:
+                if len(run_ids) != 2:
+                    return "ERROR: delta needs exactly two run_ids"
+                return _delta(db, *run_ids)
+            design = _resolve_design(db, design)
+            if action == "trend":
+                return _trend(db, design, stage, max(1, limit))
+            stage = stage or _latest_stage(db, design)
+            if action == "best":
+                if objective not in _OBJECTIVES:
+                    return f"ERROR: Unknown objective '{objective}'"
+                return _best(db, design, stage, objective)
+            if action == "delta":
+                last = db.execute(
+                    "SELECT id FROM runs WHERE design = ? AND stage = ? ORDER BY created DESC, id DESC LIMIT 2",
+                    (design, stage),
+                ).fetchall()
+                if len(last) < 2:
+                    return f"Only one {stage} run of {design} recorded; nothing to compare."
+                return _delta(db, last[1]["id"], last[0]["id"])
+            return f"ERROR: Unknown action '{action}'"
+    except LookupError as exc:
+        return f"ERROR (qor_history): {exc.args[0]}"
+    except Exception as exc:
+        return f"ERROR (qor_history): {exc}"
+
+
+def _summary(db) -> str:
+    rows = db.execute(
+        f"SELECT design, stage, COUNT(*) AS n, MAX(created) AS last, MAX(wns) AS best_wns, "
+        f"SUM({_MET}) AS met, MIN(CASE WHEN {_MET} THEN cell_area END) AS best_area, "
+        f"MIN(CASE WHEN {_MET} THEN clock_period END) AS best_clock "
+        "FROM runs GROUP BY design, stage ORDER BY last DESC"
+    ).fetchall()
+    if not rows:
+        return "QoR history is empty."
+    lines = [f"{'design':<28} {'stage':<5} {'runs':>4} {'met':>4} {'best WNS':>9} {'min area met':>12} "
+             f"{'min clock met':>13}  last run"]
+    for r in rows:
+        lines.append(
+            f"{r['design']:<28} {r['stage']:<5} {r['n']:>4} {r['met'] or 0:>4} {_fmt(r['best_wns'], '{:+.3f}'):>9} "
+            f"{_fmt(r['best_area'], '{:.1f}'):>12} {_fmt(r['best_clock'], '{:.3f}'):>13}  {_when(r['last'])}"
+        )
+    return "\n".join(lines)
+
+
+def _trend(db, design: str, stage: str, limit: int) -> str:
+    sql, args = "SELECT * FROM runs WHERE design = ?", [design]
+    if stage:
+        sql, args = sql + " AND stage = ?", args + [stage]
+    rows = db.execute(sql + " ORDER BY created DESC, id DESC LIMIT ?", args + [limit]).fetchall()[::-1]
+    shown = [m for m in METRICS if any(r[m[0]] is not None for r in rows)]
+    lines = [f"{design}: last {len(rows)} run(s){' (' + stage + ')' if stage else ''}, oldest first",
+             f"{'run':>5} {'when':<11} {'stage':<5} " + " ".join(f"{m[1]:>10}" for m in shown) + "  config"]
+    for r in rows:
+        lines.append(f"{'#' + str(r['id']):>5} {_when(r['created']):<11} {r['stage']:<5} "
+                     + " ".join(f"{_fmt(r[m[0]], m[2]):>10}" for m in shown) + f"  {_config(r)}")
+    for st in sorted({r["stage"] for r in rows}):
+        runs = [r for r in rows if r["stage"] == st]
+        if len(runs) > 1:
+            changes = [c for c in (_change(m, runs[0][m[0]], runs[-1][m[0]]) for m in shown) if c]
+            lines.append(f"{st} #{runs[0]['id']} → #{runs[-1]['id']}: " + (", ".join(changes) or "no change"))
+    return "\n".join(lines)
+
+
+def _best(db, design: str, stage: str, objective: str) -> str:
+    column = _OBJECTIVES[objective].split()[0]
+    total = db.execute("SELECT COUNT(*) FROM runs WHERE design = ? AND stage = ?", (design, stage)).fetchone()[0]
+    best = db.execute(
+        f"SELECT * FROM runs WHERE design = ? AND stage = ? AND {_MET} AND {column} IS NOT NULL "
+        f"ORDER BY {_OBJECTIVES[objective]}, created DESC LIMIT 1",
+        (design, stage),
+    ).fetchone()
+    met = db.execute(f"SELECT COUNT(*) FROM runs WHERE design = ? AND stage = ? AND {_MET}",
+                     (design, stage)).fetchone()[0]
+    if best is None:
+        closest = db.execute(
+            "SELECT * FROM runs WHERE design = ? AND stage = ? AND wns IS NOT NULL ORDER BY wns DESC LIMIT 1",
+            (design, stage),
+        ).fetchone()
+        lines = [f"No {stage} run of {design} met timing (0 of {total})."]
+        if closest is not None:
+            lines.append("Closest (best WNS):")
+            lines += _describe(closest)
+        return "\n".join(lines)
+    lines = [f"Best {stage} run of {design} by {objective} among {met} of {total} run(s) that met timing:"]
+    lines += _describe(best)
+    tightest = db.execute(
+        f"SELECT id, clock_period, wns FROM runs WHERE design = ? AND stage = ? AND {_MET} "
+        "AND clock_period IS NOT NULL ORDER BY clock_period ASC, wns DESC LIMIT 1",
+        (design, stage),
+    ).fetchone()
+    if tightest is not None:
+        lines.append(f"Tightest clock that met timing: {tightest['clock_period']:.3f} ns "
+                     f"(run #{tightest['id']}, WNS {tightest['wns']:+.3f})")
+    failed = db.execute(
+        f"SELECT MAX(clock_period) FROM runs WHERE design = ? AND stage = ? AND NOT ({_MET}) "
+        "AND clock_period < ?",
+        (design, stage, tightest["clock_period"] if tightest is not None else 0),
+    ).fetchone()[0]
+    if failed is not None:
+        lines.append(f"Loosest clock that failed: {failed:.3f} ns — the limit lies between the two")
+    return "\n".join(lines)
+
+
+def _delta(db, old_id: int, new_id: int) -> str:
+    old = db.execute("SELECT * FROM runs WHERE id = ?", (old_id,)).fetchone()
+    new = db.execute("SELECT * FROM runs WHERE id = ?", (new_id,)).fetchone()
+    for run_id, row in ((old_id, old), (new_id, new)):
+        if row is None:
+            raise LookupError(f"no run #{run_id}")
+    lines = [f"#{old_id} ({old['design']} {old['stage']}, {_when(old['created'])}) → "
+             f"#{new_id} ({new['design']} {new['stage']}, {_when(new['created'])})"]
+    for column, label, spec, better in METRICS:
+        a, b = old[column], new[column]
+        if a is None and b is None:
+            continue
+        line = f"  {label:<11} {_fmt(a, spec):>10} → {_fmt(b, spec):>10}"
+        if a is not None and b is not None and a != b:
+            diff = b - a
+            line += f"  {diff:+.4g}"
+            if a:
+                line += f" ({100 * diff / abs(a):+.1f}%)"
+            line += "  better" if (diff < 0) == (better == "lower") else "  worse"
+        lines.append(line)
+    for column in ("script", "script_hash", "config_key", "tool_version", "params"):
+        if old[column] != new[column]:
+            lines.append(f"  {column:<11} {old[column] or '-'} → {new[column] or '-'}")
+    return "\n".join(lines)
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _connect():
+    import sqlite3
+    path = db_path()
+    if path not in _initialized:
+        with _lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with closing(sqlite3.connect(path, timeout=30)) as db, db:
+                db.executescript(_SCHEMA)
+            _initialized.add(path)
+    db = sqlite3.connect(path, timeout=30)
+    db.row_factory = sqlite3.Row
+    return db
+
+
+def _resolve_design(db, design: str = None) -> str:
+    names = [r[0] for r in db.execute("SELECT DISTINCT design FROM runs ORDER BY design")]
+    if design:
+        for name in names:
+            if name.lower() == design.lower():
+                return name
+        raise LookupError(f"no runs of '{design}' (recorded: {', '.join(names) or 'none'})")
+    if len(names) == 1:
+        return names[0]
+    raise LookupError(f"pass design= one of: {', '.join(names) or 'none recorded'}")
+
+
+def _latest_stage(db, design: str) -> str:
+    return db.execute("SELECT stage FROM runs WHERE design = ? ORDER BY created DESC, id DESC LIMIT 1",
+                      (design,)).fetchone()[0]
+
+
+def _describe(row) -> list:
+    lines = [f"  run #{row['id']}  {_when(row['created'])}  from {row['origin']}  {row['source']}"]
+    lines.append("  " + ", ".join(f"{label} {_fmt(row[c], spec)}" for c, label, spec, _ in METRICS
+                                  if row[c] is not None))
+    if row["script"]:
+        lines.append(f"  script {row['script']} (sha {row['script_hash'] or '?'})"
+                     + (f", {row['tool_version']}" if row["tool_version"] else ""))
+    if row["params"]:
+        lines.append(f"  sweep params {row['params']}")
+    if row["config_key"]:
+        lines.append(f"  config key {row['config_key']} (manage_run_cache)")
+    return lines
+
+
+def _config(row) -> str:
+    if row["params"]:
+        return row["params"]
+    if row["script"]:
+        return f"{row['script']}@{row['script_hash'][:8]}" if row["script_hash"] else row["script"]
+    return row["origin"] or ""
+
+
+def _change(metric, old, new) -> str:
+    column, label, spec, better = metric
+    if old is None or new is None or old == new:
+        return ""
+    mark = "better" if (new < old) == (better == "lower") else "worse"
+    return f"{label} {_fmt(old, spec)} → {_fmt(new, spec)} ({mark})"
+
+
+def _fmt(value, spec: str) -> str:
+    return "-" if value is None else spec.format(value)
+
+
+def _when(ts: float) -> str:
+    return time.strftime("%m-%d %H:%M", time.localtime(ts))
+
+
+def _hash_files(paths) -> str:
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode() + b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
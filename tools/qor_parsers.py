@@ -0,0 +1,558 @@
+"""
+Streaming parsers for Design Compiler and Innovus QoR reports.
+
+Each parser reads its report line by line and keeps only the numbers it
+needs, so memory stays bounded even for the 17k-line Innovus summaryReport
+(area_report.txt).  Timing parsers hold at most one timing path's points at
+a time and keep only the worst one.
+
+    parse_directory("results/synth_alu")   -> QoR
+    parse_directory("results/innovus_alu") -> QoR
+
+Reports recognised in a directory:
+    DC       timing.rpt  qor.rpt  area.rpt  power.rpt
+    Innovus  timing_report.txt  area_report.txt  power_report.txt
+             final_drc.rpt (or drc_violations.rpt)
+             final_connectivity.rpt (or connectivity.rpt)
+
+All times are in ns, areas in um^2 and power in mW.
+"""
+
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+# How many points of the critical path to keep in the record.
+MAX_PATH_POINTS = 40
+
+_NUM = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_POWER_SCALE = {"w": 1e3, "mw": 1.0, "uw": 1e-3, "nw": 1e-6, "pw": 1e-9}
+
+
+@dataclass
+class PathPoint:
+    pin: str
+    cell: str
+    incr: Optional[float]
+    arrival: Optional[float]
+
+
+@dataclass
+class TimingPath:
+    startpoint: str = ""
+    endpoint: str = ""
+    group: str = ""
+    slack: Optional[float] = None
+    arrival: Optional[float] = None
+    required: Optional[float] = None
+    points: List[PathPoint] = field(default_factory=list)
+
+
+@dataclass
+class QoR:
+    design: str = ""
+    stage: str = ""                      # "synth" or "pnr"
+    source: str = ""
+    reports: List[str] = field(default_factory=list)
+
+    # Timing
+    clock_period: Optional[float] = None
+    wns: Optional[float] = None          # worst setup slack (positive = met)
+    tns: Optional[float] = None
+    violating_paths: Optional[int] = None
+    hold_wns: Optional[float] = None
+    hold_tns: Optional[float] = None
+    logic_levels: Optional[float] = None
+    paths_reported: int = 0
+    critical_path: Optional[TimingPath] = None
+
+    # Area / cells
+    cell_area: Optional[float] = None
+    combinational_area: Optional[float] = None
+    noncombinational_area: Optional[float] = None
+    buf_inv_area: Optional[float] = None
+    core_area: Optional[float] = None
+    chip_area: Optional[float] = None
+    utilization: Optional[float] = None  # 0..1
+    cell_count: Optional[int] = None
+    sequential_cells: Optional[int] = None
+    cell_types: Dict[str, List[float]] = field(default_factory=dict)  # type -> [count, area]
+    wirelength: Optional[float] = None
+
+    # Power
+    power_internal: Optional[float] = None
+    power_switching: Optional[float] = None
+    power_leakage: Optional[float] = None
+    power_total: Optional[float] = None
+
+    # Rule checks
+    drc_violations: Optional[int] = None
+    drc_by_type: Dict[str, int] = field(default_factory=dict)
+    connectivity_problems: Optional[int] = None
+    design_rule_violations: Optional[int] = None   # DC max-trans/cap nets
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# ── Directory entry point ─────────────────────────────────────────────────────
+
+_DC_PARSERS = [
+    ("qor.rpt", "parse_dc_qor"),
+    ("timing.rpt", "parse_dc_timing"),
+    ("area.rpt", "parse_dc_area"),
+    ("power.rpt", "parse_dc_power"),
+]
+_INNOVUS_PARSERS = [
+    ("timing_report.txt", "parse_innovus_timing"),
+    ("area_report.txt", "parse_innovus_summary"),
+    ("power_report.txt", "parse_innovus_power"),
+    (("final_drc.rpt", "drc_violations.rpt"), "parse_innovus_drc"),
+    (("final_connectivity.rpt", "connectivity.rpt"), "parse_innovus_connectivity"),
+]
+
+
+def detect_stage(directory: str) -> str:
+    names = set(os.listdir(directory))
+    if names & {"timing_report.txt", "area_report.txt", "power_report.txt", "final_drc.rpt"}:
+        return "pnr"
+    if names & {"timing.rpt", "qor.rpt", "area.rpt", "power.rpt"}:
+        return "synth"
+    return ""
+
+
+def parse_directory(directory: str) -> QoR:
+    """Parse every recognised report in *directory* into one QoR record."""
+    qor = QoR(source=directory, stage=detect_stage(directory))
+    if not qor.stage:
+        raise ValueError(f"no DC or Innovus reports found in '{directory}'")
+    table = _DC_PARSERS if qor.stage == "synth" else _INNOVUS_PARSERS
+    for names, func in table:
+        for name in (names if isinstance(names, tuple) else (names,)):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                globals()[func](path, qor)
+                qor.reports.append(name)
+                break
+    return qor
+
+
+# ── Design Compiler ───────────────────────────────────────────────────────────
+
+def parse_dc_qor(path: str, qor: QoR) -> QoR:
+    """report_qor: slack/TNS per path group, cell counts, areas, design rules."""
+    slacks, tns, viol, hold_wns, hold_tns = [], 0.0, 0, [], 0.0
+    seen_group = False
+    for line in _lines(path):
+        key, _, value = line.partition(":")
+        key = key.strip()
+        value = value.strip()
+        if key == "Design" and not qor.design:
+            qor.design = value
+        elif key == "Critical Path Slack":
+            slacks.append(_f(value))
+            seen_group = True
+        elif key == "Critical Path Clk Period":
+            period = _f(value)
+            if period:
+                qor.clock_period = period if qor.clock_period is None else min(qor.clock_period, period)
+        elif key == "Total Negative Slack":
+            tns += _f(value) or 0.0
+        elif key == "No. of Violating Paths":
+            viol += int(_f(value) or 0)
+        elif key == "Worst Hold Violation":
+            hold_wns.append(_f(value))
+        elif key == "Total Hold Violation":
+            hold_tns += _f(value) or 0.0
+        elif key == "Levels of Logic":
+            levels = _f(value)
+            qor.logic_levels = levels if qor.logic_levels is None else max(qor.logic_levels, levels)
+        elif key == "Leaf Cell Count":
+            qor.cell_count = int(_f(value))
+        elif key == "Sequential Cell Count":
+            qor.sequential_cells = int(_f(value))
+        elif key == "Combinational Area":
+            qor.combinational_area = _f(value)
+        elif key == "Noncombinational Area":
+            qor.noncombinational_area = _f(value)
+        elif key == "Buf/Inv Area":
+            qor.buf_inv_area = _f(value)
+        elif key == "Cell Area":
+            qor.cell_area = _f(value)
+        elif key == "Nets With Violations":
+            qor.design_rule_violations = int(_f(value))
+    if seen_group:
+        qor.wns = min(s for s in slacks if s is not None)
+        qor.tns = tns
+        qor.violating_paths = viol
+    if hold_wns:
+        qor.hold_wns = min(h for h in hold_wns if h is not None)
+        qor.hold_tns = hold_tns
+    return qor
+
+
+_DC_POINT = re.compile(rf"^\s+(\S+)\s+\(([^()\s]+)\)\s+({_NUM})\s*\*?\s+({_NUM})")
+
+
+def parse_dc_timing(path: str, qor: QoR) -> QoR:
+    """report_timing: keep the worst path's points; count paths."""
+    best = None
+    cur = None
+    in_points = False
+    for line in _lines(path):
+        s = line.strip()
+        if s.startswith("Design :") and not qor.design:
+            qor.design = s.split(":", 1)[1].strip()
+        elif s.startswith("Startpoint:"):
+            cur = TimingPath(startpoint=s.split(":", 1)[1].split("(")[0].strip())
+            in_points = False
+        elif cur is None:
+            continue
+        elif s.startswith("Endpoint:"):
+            cur.endpoint = s.split(":", 1)[1].split("(")[0].strip()
+        elif s.startswith("Path Group:"):
+            cur.group = s.split(":", 1)[1].strip()
+        elif s.startswith("Point") and "Incr" in s:
+            in_points = True
+        elif s.startswith("data arrival time"):
+            if in_points:
+                cur.arrival = _last_num(s)
+            in_points = False
+        elif s.startswith("data required time"):
+            cur.required = _last_num(s)
+        elif s.startswith("clock") and "(rise edge)" in s and cur.arrival is not None and qor.clock_period is None:
+            period = _last_num(s)
+            if period:
+                qor.clock_period = period
+        elif s.startswith("slack"):
+            cur.slack = _last_num(s)
+            qor.paths_reported += 1
+            if best is None or (cur.slack is not None and cur.slack < best.slack):
+                best = cur
+            cur = None
+        elif in_points:
+            m = _DC_POINT.match(line)
+            if m and len(cur.points) < MAX_PATH_POINTS * 2:
+                cur.points.append(PathPoint(m.group(1), m.group(2), float(m.group(3)), float(m.group(4))))
+    if best is not None:
+        # DC lists input pin and output pin per cell; keep the output pins.
+        outputs = [p for p in best.points if not _is_input_pin(p, best.points)]
+        best.points = (outputs or best.points)[:MAX_PATH_POINTS]
+        qor.critical_path = best
+        if qor.wns is None:
+            qor.wns = best.slack
+    return qor
+
+
+def parse_dc_area(path: str, qor: QoR) -> QoR:
+    for line in _lines(path):
+        key, _, value = line.partition(":")
+        key = key.strip()
+        v = _f(value)
+        if key == "Total cell area" and v is not None:
+            qor.cell_area = v
+        elif key == "Combinational area" and v is not None:
+            qor.combinational_area = v
+        elif key == "Noncombinational area" and v is not None:
+            qor.noncombinational_area = v
+        elif key == "Buf/Inv area" and v is not None:
+            qor.buf_inv_area = v
+        elif key == "Number of cells" and v is not None:
+            qor.cell_count = int(v)
+        elif key == "Number of sequential cells" and v is not None:
+            qor.sequential_cells = int(v)
+        elif key == "Design" and not qor.design:
+            qor.design = value.strip()
+    return qor
+
+
+_DC_POWER = re.compile(rf"^\s*(Cell Internal Power|Net Switching Power|Total Dynamic Power|Cell Leakage Power)\s*=\s*({_NUM})\s*(\w+)")
+
+
+def parse_dc_power(path: str, qor: QoR) -> QoR:
+    dynamic = None
+    for line in _lines(path):
+        m = _DC_POWER.match(line)
+        if not m:
+            continue
+        value = _to_mw(float(m.group(2)), m.group(3))
+        name = m.group(1)
+        if name == "Cell Internal Power":
+            qor.power_internal = value
+        elif name == "Net Switching Power":
+            qor.power_switching = value
+        elif name == "Total Dynamic Power":
+            dynamic = value
+        elif name == "Cell Leakage Power":
+            qor.power_leakage = value
+    if dynamic is not None:
+        qor.power_total = dynamic + (qor.power_leakage or 0.0)
+    return qor
+
+
+# ── Innovus ───────────────────────────────────────────────────────────────────
+
+def parse_innovus_timing(path: str, qor: QoR) -> QoR:
+    """report_timing (Innovus table format)."""
+    best = None
+    cur = None
+    tns = 0.0
+    violating = 0
+    for line in _lines(path):
+        s = line.strip()
+        if s.startswith("#  Design:") and not qor.design:
+            qor.design = s.split(":", 1)[1].strip()
+        elif s.startswith("Path ") and ":" in s and ("MET" in s or "VIOLATED" in s):
+            cur = TimingPath()
+        elif cur is None:
+            continue
+        elif s.startswith("Endpoint:"):
+            cur.endpoint = s.split(":", 1)[1].split("(")[0].strip()
+        elif s.startswith("Beginpoint:"):
+            cur.startpoint = s.split(":", 1)[1].split("(")[0].strip()
+        elif s.startswith("Path Groups:"):
+            cur.group = s.split(":", 1)[1].strip().strip("{}").strip()
+        elif s.startswith("+ Phase Shift") and qor.clock_period is None:
+            qor.clock_period = _last_num(s)
+        elif s.startswith("= Required Time"):
+            cur.required = _last_num(s)
+        elif s.startswith("- Arrival Time"):
+            cur.arrival = _last_num(s)
+        elif s.startswith("= Slack Time"):
+            cur.slack = _last_num(s)
+            qor.paths_reported += 1
+            if cur.slack is not None and cur.slack < 0:
+                tns += cur.slack
+                violating += 1
+            if best is None or (cur.slack is not None and cur.slack < best.slack):
+                best = cur
+        elif s.startswith("|") and cur is not None and cur.slack is not None:
+            cols = [c.strip() for c in s.strip("|").split("|")]
+            if (len(cols) >= 5 and cols[0] and cols[2] and _f(cols[3]) is not None
+                    and cur is best and len(cur.points) < MAX_PATH_POINTS):
+                arc = cols[1].split("->")[-1].split()[0] if "->" in cols[1] else cols[1].split()[0]
+                cur.points.append(PathPoint(f"{cols[0]}/{arc}", cols[2], _f(cols[3]), _f(cols[4])))
+    if best is not None:
+        qor.critical_path = best
+        qor.wns = best.slack
+        # Only the reported paths are visible, so TNS is a lower bound.
+        qor.tns = tns
+        qor.violating_paths = violating
+    return qor
+
+
+_STD_CELL_ROW = re.compile(rf"^\s+(\S+)\s+(\d+)\s+({_NUM})\s*$")
+
+
+def parse_innovus_summary(path: str, qor: QoR) -> QoR:
+    """summaryReport: instance counts, cell-type histogram, core area, utilization."""
+    in_cells = False
+    for line in _lines(path):
+        s = line.strip()
+        if in_cells:
+            m = _STD_CELL_ROW.match(line)
+            if m:
+                qor.cell_types[m.group(1)] = [int(m.group(2)), float(m.group(3))]
+                continue
+            if s.startswith("Cell Type") or s.startswith("---"):
+                continue
+            in_cells = False
+        if s.startswith("Standard Cells in Netlist"):
+            in_cells = True
+        elif s.startswith("Design Name:") and not qor.design:
+            qor.design = s.split(":", 1)[1].strip()
+        elif s.startswith("# Instances:"):
+            qor.cell_count = int(_f(s.split(":", 1)[1]))
+        elif s.startswith("Total area of Standard cells:"):
+            qor.cell_area = _f(s.split(":", 1)[1])
+        elif s.startswith("Total area of Core:"):
+            qor.core_area = _f(s.split(":", 1)[1])
+        elif s.startswith("Total area of Chip:"):
+            qor.chip_area = _f(s.split(":", 1)[1])
+        elif s.startswith("Effective Utilization:"):
+            qor.utilization = _f(s.split(":", 1)[1])
+        elif s.startswith("Total wire length:"):
+            qor.wirelength = _f(s.split(":", 1)[1])
+    if qor.cell_types:
+        qor.sequential_cells = sum(
+            int(c) for name, (c, _) in qor.cell_types.items() if name.startswith(("DF", "SDF", "LH", "LN", "ED"))
+        )
+    return qor
+
+
+def parse_innovus_power(path: str, qor: QoR) -> QoR:
+    unit = "mw"
+    for line in _lines(path):
+        s = line.strip("* \t\n")
+        if s.startswith("Power Units"):
+            m = re.search(r"=\s*1\s*(\w+)", s)
+            if m:
+                unit = m.group(1)
+        elif s.startswith("Total Internal Power:"):
+            qor.power_internal = _to_mw(_first_num(s), unit)
+        elif s.startswith("Total Switching Power:"):
+            qor.power_switching = _to_mw(_first_num(s), unit)
+        elif s.startswith("Total Leakage Power:"):
+            qor.power_leakage = _to_mw(_first_num(s), unit)
+        elif s.startswith("Total Power:"):
+            qor.power_total = _to_mw(_first_num(s), unit)
+    return qor
+
+
+_DRC_TYPE = re.compile(r"^\s*(\w[\w ]*?)\s*:\s*\(\s*([^)]+?)\s*\)")
+_DRC_TOTAL = re.compile(r"(?:Total Violations|Verification Complete)\s*:\s*(\d+)\s*Viols", re.I)
+
+
+def parse_innovus_drc(path: str, qor: QoR) -> QoR:
+    total = None
+    counted = 0
+    by_type = {}
+    for line in _lines(path):
+        if "No DRC violations were found" in line:
+            total = 0
+            continue
+        m = _DRC_TOTAL.search(line)
+        if m:
+            total = int(m.group(1))
+            continue
+        m = _DRC_TYPE.match(line)
+        if m and not line.lstrip().startswith("#"):
+            kind = m.group(2)
+            by_type[kind] = by_type.get(kind, 0) + 1
+            counted += 1
+    qor.drc_violations = total if total is not None else counted
+    qor.drc_by_type = by_type
+    return qor
+
+
+def parse_innovus_connectivity(path: str, qor: QoR) -> QoR:
+    problems = None
+    for line in _lines(path):
+        if "Found no problems or warnings" in line:
+            problems = 0
+        else:
+            m = re.search(r"(\d+)\s+Problem\(s\)", line)
+            if m:
+                problems = (problems or 0) + int(m.group(1))
+    qor.connectivity_problems = problems
+    return qor
+
+
+# ── Formatting ────────────────────────────────────────────────────────────────
+
+def format_qor(qor: QoR, max_points: int = 12, max_cell_types: int = 8) -> str:
+    """Compact multi-line summary suitable for a tool result."""
+    lines = [f"QoR {qor.design or '?'} — {qor.stage} ({qor.source}; {', '.join(qor.reports)})"]
+
+    t = []
+    if qor.wns is not None:
+        t.append(f"WNS {qor.wns:+.3f} ns ({'MET' if qor.wns >= 0 else 'VIOLATED'})")
+    if qor.tns is not None:
+        t.append(f"TNS {qor.tns:.3f} ns")
+    if qor.violating_paths is not None:
+        t.append(f"{qor.violating_paths} violating path(s)")
+    if qor.clock_period is not None:
+        t.append(f"clock {qor.clock_period:g} ns")
+    if qor.hold_wns is not None:
+        t.append(f"hold WNS {qor.hold_wns:+.3f} ns")
+    if qor.logic_levels is not None:
+        t.append(f"{qor.logic_levels:g} logic levels")
+    if t:
+        lines.append("  Timing : " + ", ".join(t))
+
+    cp = qor.critical_path
+    if cp is not None:
+        lines.append(
+            f"  Critical path ({cp.group or '-'}): {cp.startpoint} → {cp.endpoint}, "
+            f"arrival {_fmt(cp.arrival)} / required {_fmt(cp.required)} ns, {len(cp.points)} point(s)"
+        )
+        shown = cp.points if len(cp.points) <= max_points else cp.points[: max_points - 1] + cp.points[-1:]
+        for i, p in enumerate(shown):
+            if i == max_points - 1 and len(cp.points) > max_points:
+                lines.append(f"      ... {len(cp.points) - max_points + 1} more")
+            lines.append(f"      {p.pin:<28} {p.cell:<16} +{_fmt(p.incr)} → {_fmt(p.arrival)}")
+
+    a = []
+    if qor.cell_area is not None:
+        a.append(f"cell {qor.cell_area:.2f} um^2")
+    if qor.combinational_area is not None:
+        a.append(f"comb {qor.combinational_area:.2f}")
+    if qor.noncombinational_area is not None:
+        a.append(f"seq {qor.noncombinational_area:.2f}")
+    if qor.core_area is not None:
+        a.append(f"core {qor.core_area:.2f}")
+    if qor.utilization is not None:
+        a.append(f"util {qor.utilization * 100:.1f}%")
+    if qor.cell_count is not None:
+        a.append(f"{qor.cell_count} cells")
+    if qor.sequential_cells is not None:
+        a.append(f"{qor.sequential_cells} sequential")
+    if qor.wirelength is not None:
+        a.append(f"wire {qor.wirelength:.1f} um")
+    if a:
+        lines.append("  Area   : " + ", ".join(a))
+    if qor.cell_types:
+        top = sorted(qor.cell_types.items(), key=lambda kv: -kv[1][1])[:max_cell_types]
+        lines.append("           top cells: " + ", ".join(f"{n} {int(c)}x/{ar:.1f}" for n, (c, ar) in top))
+
+    if qor.power_total is not None or qor.power_leakage is not None:
+        lines.append(
+            f"  Power  : total {_fmt(qor.power_total, 5)} mW (internal {_fmt(qor.power_internal, 5)}, "
+            f"switching {_fmt(qor.power_switching, 5)}, leakage {_fmt(qor.power_leakage, 6)})"
+        )
+
+    r = []
+    if qor.drc_violations is not None:
+        r.append(f"{qor.drc_violations} DRC violation(s)")
+        if qor.drc_by_type:
+            r[-1] += " [" + ", ".join(f"{k}: {v}" for k, v in sorted(qor.drc_by_type.items())) + "]"
+    if qor.connectivity_problems is not None:
+        r.append(f"{qor.connectivity_problems} connectivity problem(s)")
+    if qor.design_rule_violations is not None:
+        r.append(f"{qor.design_rule_violations} net(s) with max-trans/cap violations")
+    if r:
+        lines.append("  Checks : " + ", ".join(r))
+    return "\n".join(lines)
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _lines(path: str):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield line
+
+
+def _f(text) -> Optional[float]:
+    m = re.search(_NUM, str(text))
+    return float(m.group(0)) if m else None
+
+
+_first_num = _f
+
+
+def _last_num(text: str) -> Optional[float]:
+    nums = re.findall(_NUM, text)
+    return float(nums[-1]) if nums else None
+
+
+def _to_mw(value, unit: str) -> Optional[float]:
+    if value is None:
+        return None
+    return value * _POWER_SCALE.get(unit.lower(), 1.0)
+
+
+def _is_input_pin(point: PathPoint, points: List[PathPoint]) -> bool:
+    """DC lists U1/A then U1/ZN; the input pin has zero incr and the same instance follows."""
+    inst = point.pin.rsplit("/", 1)[0]
+    idx = points.index(point)
+    return (
+        "/" in point.pin
+        and idx + 1 < len(points)
+        and points[idx + 1].pin.rsplit("/", 1)[0] == inst
+    )
+
+
+def _fmt(value, digits: int = 3) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
@@ -0,0 +1,81 @@
+"""
+QoR summary tool built on tools/qor_parsers.py.
+
+`get_qor` turns a results directory (e.g. results/synth_alu or
+results/innovus_alu) into a compact record — WNS/TNS, the critical path,
+area breakdown, power and DRC counts — instead of the model reading the raw
+timing/area/power reports through read_file.  Every record it parses is
+also added to the QoR history (tools/qor_history.py).
+"""
+
+import json
+import os
+
+import config
+
+QOR_TOOLS = [
+    {
+        "name": "get_qor",
+        "description": (
+            "Summarise the QoR of a synthesis or place-and-route run from its report directory "
+            "(e.g. 'results/synth_alu' or 'results/innovus_alu'). Returns WNS/TNS, the critical "
+            "path, area breakdown and cell counts, power components (mW) and DRC/connectivity counts. "
+            "Use this instead of reading timing.rpt / area_report.txt / power_report.txt directly."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "directory": {
+                    "type": "string",
+                    "description": "Results directory relative to the project work directory, e.g. 'results/synth_alu'"
+                },
+                "format": {
+                    "type": "string",
+                    "enum": ["text", "json"],
+                    "description": "'text' (default) for a compact summary, 'json' for the full record"
+                },
+                "max_path_points": {
+                    "type": "integer",
+                    "description": "Critical-path points to show in text format (default: 12)"
+                }
+            },
+            "required": ["directory"]
+        }
+    }
+]
+
+# get_qor also records what it parses in the QoR history database.
+QOR_TOOL_ACCESS = {
+    "get_qor": {"local": "read:directory", "qor_history": "write"},
+}
+
+
+def execute_qor_tool(tool_name: str, tool_input: dict) -> str:
+    if tool_name == "get_qor":
+        return _get_qor(
+            tool_input["directory"],
+            tool_input.get("format", "text"),
+            int(tool_input.get("max_path_points", 12)),
+        )
+    return f"ERROR: Unknown QoR tool '{tool_name}'"
+
+
+def _get_qor(directory: str, fmt: str = "text", max_points: int = 12) -> str:
+    from tools import qor_history, qor_parsers
+    full = os.path.realpath(os.path.join(config.WORK_DIR, directory))
+    if not full.startswith(os.path.realpath(config.WORK_DIR)):
+        return f"ERROR: Path '{directory}' escapes the work directory"
+    if not os.path.isdir(full):
+        return f"ERROR: Directory '{directory}' not found"
+    if not qor_parsers.detect_stage(full):
+        return f"ERROR: No DC or Innovus reports found in '{directory}'"
+    try:
+        qor = qor_parsers.parse_directory(full)
+    except Exception as e:
+        return f"ERROR (get_qor): {e}"
+    qor.source = directory
+    run_id = qor_history.record(qor, full, "get_qor")
+    if fmt == "json":
+        return json.dumps(qor.to_dict(), indent=1)
+    text = qor_parsers.format_qor(qor, max_points=max(2, max_points))
+    return text + "\n" + qor_history.brief_delta(run_id) if run_id is not None else text
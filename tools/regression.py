@@ -0,0 +1,345 @@
+"""
+Parallel local regression runner for the testbenches in tb/.
+
+`run_regression` replaces one-at-a-time `iverilog` + `vvp` calls through
+run_local_command:
+
+  1. Discovery — every module declared in designs/ and tb/ is indexed; each
+     testbench (a tb/ file with a port-less top module) is compiled with the
+     transitive closure of the modules it instantiates, so tb/alu_8bit_tb.v
+     pairs with designs/alu_8bit.v without any naming convention.
+     Gate-level netlists (*_synth.v) are left out unless netlist=true.
+  2. Compile cache — the compiled vvp image is stored in .sim_cache/ under a
+     SHA-256 of the iverilog version, flags and source contents, so
+     unchanged testbenches are never recompiled.
+  3. Parallel run — compiles and simulations run as separate processes,
+     SIM_JOBS at a time (default: all cores), so the whole regression takes
+     about as long as its slowest test.
+  4. Verdicts — [PASS]/[FAIL] lines, "N passed, M failed" summaries,
+     "ALL TESTS PASSED" / "SOME TESTS FAILED" banners, mismatch and $error
+     lines are parsed into a summary table.  Full logs go to
+     results/regression/<test>.log.
+
+Configuration in config.py (optional):
+    SIM_JOBS        — concurrent compile/simulation processes (default: cores)
+    SIM_TIMEOUT     — per-simulation timeout in seconds (default: 120)
+    IVERILOG_FLAGS  — extra iverilog flags (default: "-g2012")
+"""
+
+import fnmatch
+import hashlib
+import os
+import re
+import shlex
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import config
+from runtime.session import ContextExecutor
+
+REGRESSION_TOOLS = [
+    {
+        "name": "run_regression",
+        "description": (
+            "Compile and simulate every testbench in tb/ with iverilog/vvp in parallel and return a "
+            "PASS/FAIL summary per test (pass/fail counts, mismatches, first failure lines). "
+            "Each testbench is compiled with the design modules it instantiates, found automatically "
+            "in designs/; unchanged sources reuse a cached compile. Use this instead of running "
+            "iverilog and vvp by hand."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "tests": {
+                    "type": "string",
+                    "description": "Glob on testbench names, e.g. 'alu*' (default: all testbenches)"
+                },
+                "netlist": {
+                    "type": "boolean",
+                    "description": "Prefer gate-level *_synth.v netlists over RTL (default: false)"
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": "Per-simulation timeout in seconds (default: 120)"
+                },
+                "force_compile": {
+                    "type": "boolean",
+                    "description": "Recompile even if a cached compile exists (default: false)"
+                }
+            },
+            "required": []
+        }
+    }
+]
+
+REGRESSION_TOOL_ACCESS = {
+    "run_regression": {"local": "write"},
+}
+
+CACHE_NAME = ".sim_cache"
+LOG_DIR = os.path.join("results", "regression")
+_FAIL_LINES_SHOWN = 5
+
+_KEYWORDS = {
+    "module", "endmodule", "begin", "end", "if", "else", "for", "while", "case", "endcase",
+    "assign", "always", "initial", "wire", "reg", "integer", "input", "output", "inout",
+    "parameter", "localparam", "function", "task", "generate", "endgenerate", "genvar",
+}
+
+_iverilog_version = None
+_version_lock = threading.Lock()
+
+
+@dataclass
+class TestResult:
+    name: str
+    files: List[str] = field(default_factory=list)
+    verdict: str = "UNKNOWN"       # PASS, FAIL, COMPILE_ERROR, TIMEOUT, ERROR, UNKNOWN
+    passed: Optional[int] = None
+    failed: Optional[int] = None
+    mismatches: int = 0
+    failures: List[str] = field(default_factory=list)
+    cached_compile: bool = False
+    compile_seconds: float = 0.0
+    sim_seconds: float = 0.0
+    log: str = ""
+    detail: str = ""
+
+
+def execute_regression_tool(tool_name: str, tool_input: dict) -> str:
+    if tool_name == "run_regression":
+        return _run_regression(
+            tool_input.get("tests") or "*",
+            bool(tool_input.get("netlist", False)),
+            int(tool_input.get("timeout", getattr(config, "SIM_TIMEOUT", 120))),
+            bool(tool_input.get("force_compile", False)),
+        )
+    return f"ERROR: Unknown regression tool '{tool_name}'"
+
+
+def _run_regression(pattern: str = "*", netlist: bool = False, timeout: int = 120,
+                    force_compile: bool = False) -> str:
+    start = time.monotonic()
+    try:
+        version = _iverilog()
+    except FileNotFoundError:
+        return "ERROR: iverilog not found on PATH"
+    try:
+        benches = discover(pattern, netlist)
+    except Exception as exc:
+        return f"ERROR (run_regression): {exc}"
+    if not benches:
+        return f"(no testbenches in tb/ match '{pattern}')"
+
+    jobs = max(1, int(getattr(config, "SIM_JOBS", 0) or os.cpu_count() or 1))
+    with ContextExecutor(max_workers=min(jobs, len(benches))) as pool:
+        results = list(pool.map(
+            lambda item: _run_one(item[0], item[1], version, timeout, force_compile),
+            benches.items(),
+        ))
+    return format_results(results, time.monotonic() - start)
+
+
+# ── Discovery ─────────────────────────────────────────────────────────────────
+
+def discover(pattern: str = "*", netlist: bool = False) -> dict:
+    """Map testbench name -> ordered list of source files (relative to WORK_DIR)."""
+    modules = {}           # module name -> file
+    instances = {}         # file -> set of instantiated identifiers
+    tops = {}              # testbench module -> file
+    for folder in ("designs", "tb"):
+        base = os.path.join(config.WORK_DIR, folder)
+        if not os.path.isdir(base):
+            continue
+        for name in sorted(os.listdir(base)):
+            if not name.endswith((".v", ".sv")):
+                continue
+            rel = f"{folder}/{name}"
+            with open(os.path.join(base, name), "r", encoding="utf-8", errors="replace") as f:
+                text = _strip_comments(f.read())
+            declared, used = _scan(text)
+            instances[rel] = used
+            for mod, has_ports in declared:
+                synth = name.endswith("_synth.v")
+                existing = modules.get(mod)
+                # RTL wins over the netlist unless netlist=True (and vice versa).
+                if existing is None or (synth == netlist and existing.endswith("_synth.v") != netlist):
+                    modules[mod] = rel
+                if folder == "tb" and not has_ports:
+                    tops[mod] = rel
+
+    benches = {}
+    for top, rel in sorted(tops.items()):
+        if not fnmatch.fnmatch(top, pattern) and not fnmatch.fnmatch(os.path.basename(rel), pattern):
+            continue
+        files, queue = [], [rel]
+        while queue:
+            cur = queue.pop(0)
+            if cur in files:
+                continue
+            files.append(cur)
+            for ident in sorted(instances.get(cur, ())):
+                dep = modules.get(ident)
+                if dep and dep not in files:
+                    queue.append(dep)
+        benches[top] = files
+    return benches
+
+
+def _strip_comments(text: str) -> str:
+    text = re.sub(r"/\*.*?\*/", " ", text, flags=re.S)
+    return re.sub(r"//[^\n]*", "", text)
+
+
+_MODULE = re.compile(r"\bmodule\s+(\w+)\s*(#\s*\(.*?\)\s*)?(\(|;)", re.S)
+_INSTANCE = re.compile(r"^\s*(\w+)\s*(?:#\s*\(.*?\)\s*)?\s+\w+\s*(?:\[[^\]]*\]\s*)?\(", re.M | re.S)
+
+
+def _scan(text: str):
+    """(declared [(module, has_ports)], instantiated identifiers) of one source."""
+    declared = [(m.group(1), m.group(3) == "(") for m in _MODULE.finditer(text)]
+    used = {m.group(1) for m in _INSTANCE.finditer(text)} - _KEYWORDS
+    used -= {name for name, _ in declared}
+    return declared, used
+
+
+# ── Compile and run ───────────────────────────────────────────────────────────
+
+def _iverilog() -> str:
+    global _iverilog_version
+    with _version_lock:
+        if _iverilog_version is None:
+            out = subprocess.run(["iverilog", "-V"], capture_output=True, text=True, timeout=30)
+            _iverilog_version = (out.stdout or out.stderr).splitlines()[0] if (out.stdout or out.stderr) else "?"
+        return _iverilog_version
+
+
+def _run_one(name: str, files: list, version: str, timeout: int, force_compile: bool) -> TestResult:
+    res = TestResult(name=name, files=files)
+    flags = shlex.split(getattr(config, "IVERILOG_FLAGS", "-g2012"))
+    key = hashlib.sha256()
+    key.update(f"{version}\0{' '.join(flags)}\0{name}\0".encode())
+    for rel in files:
+        with open(os.path.join(config.WORK_DIR, rel), "rb") as f:
+            key.update(rel.encode() + b"\0" + hashlib.sha256(f.read()).digest())
+    cache = os.path.join(config.WORK_DIR, CACHE_NAME)
+    image = os.path.join(cache, f"{name}-{key.hexdigest()[:20]}.vvp")
+
+    if os.path.isfile(image) and not force_compile:
+        res.cached_compile = True
+    else:
+        os.makedirs(cache, exist_ok=True)
+        tmp = f"{image}.{os.getpid()}.{threading.get_ident()}.tmp"
+        t = time.monotonic()
+        try:
+            out = subprocess.run(
+                ["iverilog", *flags, "-s", name, "-o", tmp, *files],
+                cwd=config.WORK_DIR, capture_output=True, text=True, timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            res.verdict, res.detail = "COMPILE_ERROR", f"iverilog timed out after {timeout}s"
+            return res
+        res.compile_seconds = time.monotonic() - t
+        if out.returncode != 0:
+            res.verdict = "COMPILE_ERROR"
+            res.detail = (out.stderr or out.stdout).strip()
+            _remove(tmp)
+            return res
+        os.replace(tmp, image)
+
+    t = time.monotonic()
+    try:
+        out = subprocess.run(
+            ["vvp", "-n", image], cwd=config.WORK_DIR,
+            capture_output=True, text=True, timeout=timeout,
+        )
+        text, code = out.stdout + out.stderr, out.returncode
+    except subprocess.TimeoutExpired as exc:
+        text = (exc.stdout or b"").decode(errors="replace") if isinstance(exc.stdout, bytes) else (exc.stdout or "")
+        code = None
+    res.sim_seconds = time.monotonic() - t
+
+    log_rel = f"{LOG_DIR}/{name}.log".replace(os.sep, "/")
+    log_full = os.path.join(config.WORK_DIR, log_rel)
+    os.makedirs(os.path.dirname(log_full), exist_ok=True)
+    with open(log_full, "w", encoding="utf-8") as f:
+        f.write(text)
+    res.log = log_rel
+
+    parse_output(text, res)
+    if code is None:
+        res.verdict, res.detail = "TIMEOUT", f"simulation did not finish within {timeout}s (missing $finish?)"
+    elif code != 0 and res.verdict != "FAIL":
+        res.verdict, res.detail = "ERROR", f"vvp exited with code {code}"
+    return res
+
+
+_SUMMARY = re.compile(r"(\d+)\s+passed,\s*(\d+)\s+failed", re.I)
+_FAILED_OF = re.compile(r"(\d+)\s+failed\s+out\s+of\s+(\d+)", re.I)
+_FAIL_LINE = re.compile(r"\[FAIL\]|\bMISMATCH\b|\bmismatch\b|^ERROR\b|\bERROR:", re.M)
+
+
+def parse_output(text: str, res: TestResult) -> TestResult:
+    """Fill verdict, counts and the first failure lines of *res* from simulator output."""
+    fail_lines = [ln.strip() for ln in text.splitlines() if _FAIL_LINE.search(ln)]
+    res.mismatches = len(fail_lines)
+    res.failures = fail_lines[:_FAIL_LINES_SHOWN]
+
+    summaries = _SUMMARY.findall(text)
+    if summaries:
+        res.passed, res.failed = (int(x) for x in summaries[-1])
+    m = _FAILED_OF.search(text)
+    if m:
+        res.failed = int(m.group(1))
+        res.passed = int(m.group(2)) - res.failed
+
+    if "SOME TESTS FAILED" in text or res.mismatches or (res.failed or 0) > 0:
+        res.verdict = "FAIL"
+    elif "ALL TESTS PASSED" in text or "[PASS]" in text or re.search(r"\bPASS(ED)?\b", text):
+        res.verdict = "PASS"
+    else:
+        res.verdict = "UNKNOWN"
+        res.detail = "no PASS/FAIL markers in the output"
+    return res
+
+
+def format_results(results: list, elapsed: float) -> str:
+    counts = {}
+    for r in results:
+        counts[r.verdict] = counts.get(r.verdict, 0) + 1
+    serial = sum(r.compile_seconds + r.sim_seconds for r in results)
+    head = ", ".join(f"{n} {v}" for v, n in sorted(counts.items()))
+    lines = [
+        f"Regression: {len(results)} test(s) — {head} — {elapsed:.1f}s wall "
+        f"({serial:.1f}s of compile+sim, {sum(r.cached_compile for r in results)} cached compile(s))",
+        f"  {'test':<32} {'verdict':<13} {'passed':>7} {'failed':>7} {'mismatch':>8} {'sim s':>6}",
+    ]
+    for r in results:
+        lines.append(
+            f"  {r.name:<32} {r.verdict:<13} {_n(r.passed):>7} {_n(r.failed):>7} "
+            f"{r.mismatches:>8} {r.sim_seconds:>6.2f}"
+        )
+    for r in results:
+        if r.verdict == "PASS":
+            continue
+        lines.append(f"\n[{r.name}] {r.verdict}: {' '.join(r.files)}" + (f"  (log: {r.log})" if r.log else ""))
+        if r.detail:
+            lines.extend("    " + ln for ln in r.detail.splitlines()[:15])
+        lines.extend("    " + ln for ln in r.failures)
+        if r.mismatches > len(r.failures):
+            lines.append(f"    ... {r.mismatches - len(r.failures)} more failure line(s) in the log")
+    return "\n".join(lines)
+
+
+def _n(value) -> str:
+    return "-" if value is None else str(value)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,484 @@
+"""
+Detached remote jobs for long dc_shell / innovus runs.
+
+`run_remote_command` blocks the agent until the command exits or its
+timeout fires, and a timeout loses the whole run.  A job instead starts the
+command under `setsid nohup` on the remote host and returns immediately
+with a job id.  The command keeps running if the agent times out, crashes
+or restarts; the model polls it with `remote_job_status` and reads only the
+new part of its log with `tail_remote_job`.
+
+Remote layout (one directory per job):
+    REMOTE_WORK_DIR/.agent_jobs/<job_id>/run.sh      — env prelude + command
+    REMOTE_WORK_DIR/.agent_jobs/<job_id>/output.log  — combined stdout/stderr
+    REMOTE_WORK_DIR/.agent_jobs/<job_id>/exit_code   — written when it ends
+
+Local job records (id, pid, remote dir, tail offset) are kept in
+WORK_DIR/.remote_jobs.json so a restarted agent can pick its jobs back up.
+A job running a licensed EDA tool holds a slot of the shared license pool
+(tools/licenses.py) until it is seen to end.
+
+The log of such a job is also watched (tools/log_watch.py): every poll
+reads the bytes written since the previous one in the same round-trip and
+classifies them, and a fatal error — license, unresolved reference,
+missing netlist — cancels the job, which is then reported as "aborted"
+instead of running on until it exits by itself.
+"""
+
+import json
+import os
+import secrets
+import shlex
+import threading
+import time
+
+import config
+from tools import licenses, log_watch
+from tools.remote_tools import _check_config, _eda_env_script, _remote_base, _strip_ansi
+from tools.ssh_pool import get_pool
+
+REMOTE_JOB_TOOLS = [
+    {
+        "name": "submit_remote_job",
+        "description": (
+            "Start a long-running command (dc_shell, innovus -batch, ...) on the remote "
+            "EDA server as a detached background job and return a job id immediately. "
+            "The EDA environment is loaded as for run_remote_command. The job keeps "
+            "running even if the agent times out. Use remote_job_status and "
+            "tail_remote_job to follow it, cancel_remote_job to stop it."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "description": (
+                        "Shell command to run, e.g. "
+                        "'innovus -batch -source scripts/innovus_pnr_alu.tcl'"
+                    )
+                },
+                "cwd": {
+                    "type": "string",
+                    "description": "Remote working directory (default: REMOTE_WORK_DIR)."
+                }
+            },
+            "required": ["command"]
+        }
+    },
+    {
+        "name": "remote_job_status",
+        "description": (
+            "Check whether remote jobs are still running, their exit codes, runtime "
+            "and how much unread log output they have. Omit job_id to list all jobs."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id from submit_remote_job"}
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "tail_remote_job",
+        "description": (
+            "Return only the log output a remote job has written since the last "
+            "tail_remote_job call for that job (at most max_bytes). Cheap to call "
+            "repeatedly while a job runs."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id from submit_remote_job"},
+                "max_bytes": {
+                    "type": "integer",
+                    "description": "Maximum bytes to return (default 16000)."
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Read from this byte offset instead of the last position (0 = start of log)."
+                },
+                "latest": {
+                    "type": "boolean",
+                    "description": (
+                        "If more than max_bytes are unread, skip ahead and return the most "
+                        "recent max_bytes instead of the oldest. Default false."
+                    )
+                }
+            },
+            "required": ["job_id"]
+        }
+    },
+    {
+        "name": "cancel_remote_job",
+        "description": "Stop a running remote job (SIGTERM to its process group, then SIGKILL).",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id from submit_remote_job"}
+            },
+            "required": ["job_id"]
+        }
+    }
+]
+
+# See FILE_TOOL_ACCESS in tools/file_tools.py.
+REMOTE_JOB_TOOL_ACCESS = {
+    "submit_remote_job": {"remote": "write"},
+    "remote_job_status": {"remote": "read"},
+    "tail_remote_job":   {"remote": "read"},
+    "cancel_remote_job": {"remote": "write"},
+}
+
+STATE_NAME = ".remote_jobs.json"
+DEFAULT_TAIL_BYTES = 16000
+_WATCH_BYTES = 4 << 20          # most new log bytes classified per poll
+
+_lock = threading.Lock()
+_jobs = {}     # state path -> {job_id -> dict}, loaded lazily from STATE_NAME
+
+
+def execute_remote_job_tool(tool_name: str, tool_input: dict) -> str:
+    if not _check_config():
+        return (
+            "ERROR: Remote server not configured. "
+            "Please set REMOTE_HOST, REMOTE_USER in config.py first."
+        )
+
+    if tool_name == "submit_remote_job":
+        return _submit(tool_input["command"], tool_input.get("cwd"))
+    elif tool_name == "remote_job_status":
+        return _status(tool_input.get("job_id"))
+    elif tool_name == "tail_remote_job":
+        return _tail(
+            tool_input["job_id"],
+            tool_input.get("max_bytes", DEFAULT_TAIL_BYTES),
+            tool_input.get("offset"),
+            tool_input.get("latest", False),
+        )
+    elif tool_name == "cancel_remote_job":
+        return _cancel(tool_input["job_id"])
+    return f"ERROR: Unknown remote job tool '{tool_name}'"
+
+
+# ── Public helpers (used by other tools) ──────────────────────────────────────
+
+def submit(command: str, cwd: str = None, label: str = "", wait_license: bool = True) -> dict:
+    """
+    Launch *command* detached on the remote host and return its job record.
+
+    A command that runs a licensed EDA tool first takes a slot in the shared
+    license pool (tools/licenses.py), waiting for one unless *wait_license*
+    is False, in which case licenses.Unavailable is raised.
+    """
+    job_id = time.strftime("%Y%m%d-%H%M%S") + "-" + secrets.token_hex(3)
+    licensed = licenses.acquire_job(job_id, command, lambda: poll(job_id)["state"] != "running",
+                                    wait=wait_license)
+    try:
+        job = _launch(job_id, command, cwd, label)
+    except BaseException:
+        licenses.release(job_id)
+        raise
+    job["licensed"] = licensed
+    job["watch"] = {"offset": 0} if log_watch.watches(command) else None
+    with _lock:
+        _load()[job_id] = job
+        _save()
+    return dict(job)
+
+
+def _launch(job_id: str, command: str, cwd: str, label: str) -> dict:
+    job_dir = f"{_remote_base()}/.agent_jobs/{job_id}"
+    cwd = cwd or _remote_base()
+
+    script = (
+        "#!/bin/bash\n"
+        f"JOB_DIR={shlex.quote(job_dir)}\n"
+        + _eda_env_script() +
+        "echo PREP_DONE_OK\n"
+        f"cd {shlex.quote(cwd)} || {{ echo 255 > \"$JOB_DIR/exit_code\"; exit 255; }}\n"
+        # Subshell so an `exit` inside the command still records its code.
+        f"(\n{command}\n)\n"
+        "rc=$?\n"
+        "echo $rc > \"$JOB_DIR/exit_code.tmp\" && mv \"$JOB_DIR/exit_code.tmp\" \"$JOB_DIR/exit_code\"\n"
+        "exit $rc\n"
+    )
+
+    pool = get_pool()
+    with pool.ssh() as ssh:
+        _run(ssh, f"mkdir -p {shlex.quote(job_dir)}")
+    with pool.sftp() as sftp:
+        with sftp.open(job_dir + "/run.sh", "w") as f:
+            f.write(script)
+    with pool.ssh() as ssh:
+        # setsid makes the job its own process group (pgid == pid) so cancel
+        # can signal everything it spawned; nohup + redirects detach it from
+        # this channel so closing the channel doesn't kill it.
+        out = _run(
+            ssh,
+            f"cd {shlex.quote(job_dir)} || exit 1; "
+            "setsid nohup bash --login run.sh > output.log 2>&1 < /dev/null & echo $!",
+        )
+    pid = int(out.strip().splitlines()[-1])
+
+    return {
+        "job_id": job_id,
+        "command": command,
+        "cwd": cwd,
+        "label": label,
+        "remote_dir": job_dir,
+        "pid": pid,
+        "submitted": time.time(),
+        "finished": None,
+        "state": "running",
+        "exit_code": None,
+        "offset": 0,
+    }
+
+
+def poll(job_id: str) -> dict:
+    """Refresh and return the job record (state, exit_code, log_size)."""
+    job = _get(job_id)
+    fatal = None
+    if job["state"] == "running":
+        q = shlex.quote(job["remote_dir"])
+        # Liveness first: a job that exits between the two checks then
+        # still shows its exit code instead of looking lost.
+        command = (
+            f"kill -0 {job['pid']} 2>/dev/null && echo ALIVE || echo DEAD; "
+            f"cat {q}/exit_code 2>/dev/null || echo NONE; "
+            f"stat -c %s {q}/output.log 2>/dev/null || echo 0"
+        )
+        watch = job.get("watch")
+        if watch is not None:
+            command += f"; tail -c +{watch['offset'] + 1} {q}/output.log 2>/dev/null | head -c {_WATCH_BYTES}"
+        with get_pool().ssh() as ssh:
+            out = _run(ssh, command, raw=True)
+        lines = out.split(b"\n", 3)
+        alive_line, exit_line, size_line = [l.decode("utf-8", "replace") for l in (lines + [b""] * 3)[:3]]
+        job["log_size"] = int(size_line or 0)
+        if watch is not None and len(lines) > 3 and lines[3]:
+            watcher = log_watch.LogWatcher(watch)
+            fatal = watcher.feed(lines[3].decode("utf-8", errors="replace"))
+            job["watch"] = {**watcher.state(), "offset": watch["offset"] + len(lines[3])}
+        if exit_line.strip().lstrip("-").isdigit():
+            job["state"] = "finished"
+            job["exit_code"] = int(exit_line)
+            job["finished"] = time.time()
+        elif alive_line.strip() != "ALIVE":
+            job["state"] = "lost"
+            job["finished"] = time.time()
+        if job["state"] != "running":
+            licenses.release(job_id)
+        with _lock:
+            _save()
+        if fatal is not None and job["state"] == "running" and log_watch.abort_enabled():
+            cancel(job_id)
+            job["state"] = "aborted"
+            with _lock:
+                _save()
+    elif "log_size" not in job:
+        with get_pool().sftp() as sftp:
+            job["log_size"] = sftp.stat(job["remote_dir"] + "/output.log").st_size
+    return dict(job)
+
+
+def read_log(job_id: str, offset: int = None, max_bytes: int = DEFAULT_TAIL_BYTES, latest: bool = False):
+    """
+    Read the job log from *offset* (default: last position) and advance it.
+
+    Returns (text, start, end, size).
+    """
+    job = _get(job_id)
+    path = job["remote_dir"] + "/output.log"
+    start = job["offset"] if offset is None else max(0, int(offset))
+    max_bytes = max(1, int(max_bytes))
+    with get_pool().sftp() as sftp:
+        size = sftp.stat(path).st_size
+        if latest and size - start > max_bytes:
+            start = size - max_bytes
+        start = min(start, size)
+        data = b""
+        if size > start:
+            with sftp.open(path, "rb") as f:
+                f.seek(start)
+                data = f.read(min(max_bytes, size - start))
+    end = start + len(data)
+    job["offset"] = end
+    job["log_size"] = size
+    with _lock:
+        _save()
+    return _strip_ansi(data.decode("utf-8", errors="replace")), start, end, size
+
+
+def cancel(job_id: str) -> dict:
+    job = _get(job_id)
+    if job["state"] == "running":
+        pid = job["pid"]
+        q = shlex.quote(job["remote_dir"])
+        with get_pool().ssh() as ssh:
+            _run(
+                ssh,
+                f"kill -TERM -- -{pid} 2>/dev/null; "
+                f"for i in 1 2 3 4 5; do kill -0 {pid} 2>/dev/null || break; sleep 1; done; "
+                f"kill -KILL -- -{pid} 2>/dev/null; "
+                f"[ -f {q}/exit_code ] || echo cancelled > {q}/exit_code; true",
+            )
+        job["state"] = "cancelled"
+        job["finished"] = time.time()
+        licenses.release(job_id)
+        with _lock:
+            _save()
+    return dict(job)
+
+
+def list_jobs() -> list:
+    with _lock:
+        return [dict(j) for j in _load().values()]
+
+
+def adopt(jobs: list) -> int:
+    """
+    Re-register job records saved elsewhere (a session checkpoint) after a
+    restart: records missing from the local state are added back, and
+    running licensed jobs take their license slot again.  Returns how many
+    jobs are still running.
+    """
+    running = 0
+    with _lock:
+        known = _load()
+        for job in jobs:
+            known.setdefault(job["job_id"], dict(job))
+        _save()
+    for job in jobs:
+        if job["state"] != "running":
+            continue
+        running += 1
+        if job.get("licensed"):
+            job_id = job["job_id"]
+            try:
+                licenses.get_pool().acquire(job_id, label=f"job {job_id}", wait=False,
+                                            check=lambda job_id=job_id: poll(job_id)["state"] != "running")
+            except licenses.Unavailable:
+                pass             # over the cap already; the slot count catches up as jobs end
+    return running
+
+
+# ── Tool handlers ─────────────────────────────────────────────────────────────
+
+def _submit(command: str, cwd: str = None) -> str:
+    try:
+        job = submit(command, cwd)
+        return (
+            f"OK: Submitted job {job['job_id']} (pid {job['pid']}) in {job['cwd']}\n"
+            f"  log: {job['remote_dir']}/output.log\n"
+            f"Use tail_remote_job / remote_job_status with job_id='{job['job_id']}'."
+        )
+    except Exception as exc:
+        return f"ERROR (submit_remote_job): {exc}"
+
+
+def _status(job_id: str = None) -> str:
+    try:
+        ids = [job_id] if job_id else [j["job_id"] for j in list_jobs()]
+        if not ids:
+            return "No remote jobs submitted."
+        lines = []
+        for jid in ids:
+            job = poll(jid)
+            lines.append(_format_status(job))
+            if job_id and job.get("watch") and job["watch"].get("entries"):
+                lines.append(log_watch.LogWatcher(job["watch"]).format())
+        return "\n".join(lines)
+    except Exception as exc:
+        return f"ERROR (remote_job_status): {exc}"
+
+
+def _tail(job_id: str, max_bytes: int, offset: int = None, latest: bool = False) -> str:
+    try:
+        job = poll(job_id)
+        text, start, end, size = read_log(job_id, offset, max_bytes, latest)
+        header = f"[{job_id}: {job['state']}"
+        if job["exit_code"] is not None:
+            header += f", exit {job['exit_code']}"
+        header += f"; log bytes {start}-{end} of {size}"
+        if size > end:
+            header += f", {size - end} more unread"
+        header += "]"
+        if job["state"] == "aborted":
+            header += "\n" + log_watch.LogWatcher(job["watch"]).format()
+        if not text:
+            return header + "\n(no new output)"
+        return header + "\n" + text
+    except Exception as exc:
+        return f"ERROR (tail_remote_job): {exc}"
+
+
+def _cancel(job_id: str) -> str:
+    try:
+        job = cancel(job_id)
+        return f"OK: Job {job_id} is {job['state']}"
+    except Exception as exc:
+        return f"ERROR (cancel_remote_job): {exc}"
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _format_status(job: dict) -> str:
+    end = job["finished"] or time.time()
+    runtime = end - job["submitted"]
+    parts = [f"{job['job_id']}: {job['state']}"]
+    if job["exit_code"] is not None:
+        parts.append(f"exit {job['exit_code']}")
+    parts.append(f"{runtime:.0f}s")
+    size = job.get("log_size", 0)
+    parts.append(f"log {size} bytes ({max(0, size - job['offset'])} unread)")
+    if job.get("watch") and job["watch"].get("entries"):
+        parts.append("log watch: " + log_watch.LogWatcher(job["watch"]).brief())
+    label = job.get("label") or job["command"]
+    if len(label) > 80:
+        label = label[:80] + "..."
+    return ", ".join(parts) + f" — {label}"
+
+
+def _run(ssh, command: str, timeout: int = 60, raw: bool = False):
+    _, stdout, stderr = ssh.exec_command(command, timeout=timeout)
+    out = stdout.read()
+    status = stdout.channel.recv_exit_status()
+    if status != 0:
+        err = stderr.read().decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"'{command[:60]}' exited {status}: {err}")
+    return out if raw else out.decode("utf-8", errors="replace")
+
+
+def _get(job_id: str) -> dict:
+    with _lock:
+        job = _load().get(job_id)
+    if job is None:
+        raise KeyError(f"unknown job '{job_id}'")
+    return job
+
+
+def _state_path() -> str:
+    return os.path.join(config.WORK_DIR, STATE_NAME)
+
+
+def _load() -> dict:
+    path = _state_path()
+    jobs = _jobs.get(path)
+    if jobs is None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                jobs = json.load(f)
+        except (OSError, ValueError):
+            jobs = {}
+        _jobs[path] = jobs
+    return jobs
+
+
+def _save() -> None:
+    path = _state_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_load(), f, indent=1)
+    os.replace(tmp, path)
@@ -0,0 +1,224 @@
+"""
+Long-lived remote login shells with the EDA environment loaded once.
+
+The original `run_remote_command` path uploads a temp script and starts a
+fresh `bash --login` for every call, re-sourcing ~/.eda_env or re-running
+`module load design-compiler-2015.06-64` / `cadence-innovus211` over NFS
+each time.  A RemoteShell instead opens one `bash --login -s` channel per
+connection, loads the environment once, and then feeds it commands:
+
+    ( <command>
+    ) < /dev/null 2>&1 &            # own process group (set -m)
+    echo __IC_PID_<id> $!
+    wait $!
+    printf '\\n__IC_DONE_<id> %s\\n' $?
+
+Everything before the DONE sentinel is the command's output; the number
+after it is the exit code.  Each command runs in a subshell, so a `cd` or
+`exit` inside it cannot disturb the session, and on timeout only that
+command's process group is killed — the shell (and its loaded environment)
+stays usable.  The same happens when the caller's on_output callback asks
+for the command to stop (tools/log_watch.py, on a fatal EDA error).
+
+Configuration in config.py (optional):
+    REMOTE_PERSISTENT_SHELL — set False to always use the temp-script path
+    REMOTE_SHELL_MAX        — concurrent shells per process (default: 2)
+"""
+
+import atexit
+import re
+import select
+import threading
+import time
+import uuid
+
+import config
+from runtime import telemetry
+from tools.ssh_pool import get_pool
+
+_READY = "__IC_ENV_READY__"
+
+
+class ShellError(RuntimeError):
+    """The shell channel died or never became ready."""
+
+
+class RemoteShell:
+    def __init__(self, env_script: str, start_timeout: int = 120):
+        self._pool = get_pool()
+        self._conn = self._pool.checkout()
+        try:
+            self._chan = self._conn.client.get_transport().open_session()
+            self._chan.set_combine_stderr(True)
+            self._chan.exec_command("bash --login -s")
+            start = time.monotonic()
+            with telemetry.span("remote.env_load") as span:
+                self._send(env_script + "set -m\n" + f"echo {_READY}\n")
+                out, found = self._read_until(re.compile(re.escape(_READY) + r"\n"), start_timeout)
+                span["loaded"] = found
+        except Exception:
+            self._pool.checkin(self._conn, broken=True)
+            raise
+        if not found:
+            self.close(broken=True)
+            raise ShellError(f"EDA environment did not load within {start_timeout}s:\n{out[-2000:]}")
+        self.env_output = out.split(_READY, 1)[0].strip()
+        self.env_seconds = time.monotonic() - start
+        self.started = time.time()
+        self.commands_run = 0
+        self.busy = False
+
+    @property
+    def alive(self) -> bool:
+        return not (self._chan.closed or self._chan.exit_status_ready())
+
+    def run(self, command: str, timeout: int = 400, on_output=None):
+        """
+        Run *command* and return (output, exit_code, timed_out).
+
+        *on_output*, if given, is called with each decoded chunk as it
+        arrives; if it returns true, the command is stopped.  On timeout or
+        stop the command's process group is killed and the exit code is
+        whatever the shell reports for the killed job.
+        """
+        tag = uuid.uuid4().hex[:12]
+        pid_re = re.compile(rf"__IC_PID_{tag} (\d+)\n")
+        done_re = re.compile(rf"\n__IC_DONE_{tag} (-?\d+)\n")
+        self._send(
+            f"(\n{command}\n) < /dev/null 2>&1 &\n"
+            f"echo __IC_PID_{tag} $!\n"
+            "wait $!\n"
+            f"printf '\\n__IC_DONE_{tag} %s\\n' $?\n"
+        )
+        self.commands_run += 1
+
+        out, found = self._read_until(done_re, timeout, on_output, pid_re)
+        timed_out = found is False
+        if not found:
+            pid = pid_re.search(out)
+            if pid is None:
+                # Stopped on output that arrived before the PID line.
+                out, _ = self._read_until(pid_re, 5, prefix=out)
+                pid = pid_re.search(out)
+            if pid:
+                self.kill(int(pid.group(1)))
+            # Keep passing output on while the job dies, but it cannot be stopped twice.
+            drain = (lambda chunk: on_output(chunk) and False) if on_output else None
+            more, found = self._read_until(done_re, 15, drain, pid_re, prefix=out)
+            out = more
+            if not found:
+                raise ShellError("shell did not recover after killing a command")
+
+        match = done_re.search(out)
+        exit_code = int(match.group(1))
+        body = pid_re.sub("", out[:match.start()])
+        return body, exit_code, timed_out
+
+    def kill(self, pid: int):
+        """Terminate the process group of a running command."""
+        with self._pool.ssh() as ssh:
+            _, stdout, _ = ssh.exec_command(
+                f"kill -TERM -- -{pid} 2>/dev/null; sleep 2; kill -KILL -- -{pid} 2>/dev/null; true",
+                timeout=30,
+            )
+            stdout.channel.recv_exit_status()
+
+    def close(self, broken: bool = False):
+        try:
+            if not self._chan.closed:
+                self._chan.send("exit\n")
+            self._chan.close()
+        except Exception:
+            pass
+        self._pool.checkin(self._conn, broken=broken)
+
+    # ── Internal helpers ─────────────────────────────────────────────────────
+
+    def _send(self, text: str):
+        self._chan.sendall(text.encode())
+
+    def _read_until(self, pattern, timeout, on_output=None, hide=None, prefix=""):
+        """
+        Read until *pattern* matches the accumulated output (True), *timeout*
+        expires (False) or *on_output* returns true (None).
+        """
+        buf = prefix
+        deadline = time.monotonic() + timeout
+        while True:
+            match = pattern.search(buf)
+            if match:
+                return buf, True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return buf, False
+            if self._chan.recv_ready():
+                chunk = self._chan.recv(65536).decode("utf-8", errors="replace")
+                buf += chunk
+                if on_output is not None and on_output(hide.sub("", chunk) if hide is not None else chunk):
+                    return buf, None
+                continue
+            if self._chan.closed or self._chan.exit_status_ready():
+                raise ShellError("remote shell exited unexpectedly")
+            select.select([self._chan], [], [], min(remaining, 1.0))
+
+
+# ── Shell pool ────────────────────────────────────────────────────────────────
+
+_shells = []
+_starting = 0
+_cond = threading.Condition()
+
+
+def enabled() -> bool:
+    return bool(getattr(config, "REMOTE_PERSISTENT_SHELL", True))
+
+
+def acquire(env_script: str) -> RemoteShell:
+    """Borrow an idle shell, starting one if fewer than REMOTE_SHELL_MAX exist."""
+    global _starting
+    limit = max(1, int(getattr(config, "REMOTE_SHELL_MAX", 2)))
+    with _cond:
+        while True:
+            for shell in [s for s in _shells if not s.busy and not s.alive]:
+                _shells.remove(shell)
+                shell.close(broken=True)
+            for shell in _shells:
+                if not shell.busy:
+                    shell.busy = True
+                    return shell
+            if len(_shells) + _starting < limit:
+                _starting += 1
+                break
+            _cond.wait(timeout=1.0)
+    shell = None
+    try:
+        shell = RemoteShell(env_script)
+        shell.busy = True
+        return shell
+    finally:
+        with _cond:
+            _starting -= 1
+            if shell is not None:
+                _shells.append(shell)
+            _cond.notify_all()
+
+
+def release(shell: RemoteShell, broken: bool = False):
+    with _cond:
+        shell.busy = False
+        if broken or not shell.alive:
+            if shell in _shells:
+                _shells.remove(shell)
+            shell.close(broken=broken)
+        _cond.notify_all()
+
+
+def close_all():
+    with _cond:
+        shells = list(_shells)
+        _shells.clear()
+    for shell in shells:
+        shell.close()
+
+
+atexit.register(close_all)
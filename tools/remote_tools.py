@@ -8,6 +8,12 @@ Configuration in config.py:
     REMOTE_PASSWORD     — password (if not using key auth)
     REMOTE_WORK_DIR     — working directory on the remote server
     REMOTE_PREP_COURSE  — course label for `prep` (default: "ECE260B_WI26_A00")
+    REMOTE_PORT         — SSH port (default: 22)
+
+SSH connections and SFTP channels are borrowed from the process-wide pool
+in tools/ssh_pool.py, so the handshake is paid once per session rather than
+once per tool call.  Commands run in a persistent login shell that loads the
+EDA environment once (tools/remote_shell.py).
 
 All EDA commands are run inside an interactive PTY session so that
 `prep -l <COURSE>` can load the ACMS module environment (Innovus, etc.)
@@ -16,10 +22,16 @@ the EDA binaries live on an NFS mount that is only activated by `prep`.
 """
 
 import os
+import posixpath
 import re
+import shlex
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import config
+from runtime import telemetry
+from tools import archive_transfer, licenses, log_watch, remote_shell, result_mirror, sync_engine
+from tools.ssh_pool import get_pool
 
 REMOTE_TOOLS = [
     {
@@ -28,12 +40,104 @@ REMOTE_TOOLS = [
             "Sync the entire local project to the remote server in one call. "
             "Uploads all design files (Verilog, TCL, SDC, etc.) to REMOTE_WORK_DIR, "
             "creating subdirectories as needed. Skips credentials, git, and build artifacts. "
+            "Only files whose content changed since the last sync are sent, so it is cheap "
+            "to call repeatedly. "
             "Always call this before running dc_shell or innovus on the remote server "
             "to make sure the server has the latest files."
         ),
         "input_schema": {
             "type": "object",
-            "properties": {},
+            "properties": {
+                "force": {
+                    "type": "boolean",
+                    "description": (
+                        "Re-upload every file even if unchanged (use if the remote "
+                        "directory was modified or deleted outside the agent). Default false."
+                    )
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["auto", "sftp", "archive"],
+                    "description": (
+                        "Transfer mode: 'sftp' sends files individually in parallel, "
+                        "'archive' streams one compressed tar, 'auto' (default) picks "
+                        "the archive when many files changed."
+                    )
+                }
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "download_directory",
+        "description": (
+            "Download a whole remote directory (e.g. results/innovus_alu) in one call. "
+            "Many small files are streamed as a single compressed tar over one SSH channel; "
+            "a few files are fetched in parallel over SFTP. Much faster than repeated "
+            "download_from_remote calls for report directories."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "remote_dir": {
+                    "type": "string",
+                    "description": (
+                        "Remote directory: absolute, or relative to REMOTE_WORK_DIR, "
+                        "e.g. 'results/innovus_alu'"
+                    )
+                },
+                "local_dir": {
+                    "type": "string",
+                    "description": "Local destination directory relative to project root, e.g. 'results/innovus_alu'"
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["auto", "sftp", "archive"],
+                    "description": "Transfer mode (default 'auto')."
+                }
+            },
+            "required": ["remote_dir", "local_dir"]
+        }
+    },
+    {
+        "name": "download_results",
+        "description": (
+            "Bring a remote results directory up to date locally in one call — use this after "
+            "each synthesis / P&R run instead of several download_from_remote calls. Files whose "
+            "local copy has the same size and modification time are skipped; the rest are fetched "
+            "in parallel, largest first. A large DEF/GDS/netlist transfer that was interrupted "
+            "resumes where it stopped on the next call."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "remote_dir": {
+                    "type": "string",
+                    "description": (
+                        "Remote directory: absolute, or relative to REMOTE_WORK_DIR "
+                        "(default 'results'), e.g. 'results/innovus_alu'"
+                    )
+                },
+                "local_dir": {
+                    "type": "string",
+                    "description": (
+                        "Local destination relative to project root (default: the same relative "
+                        "path as remote_dir, or results/<name> for an absolute one)"
+                    )
+                },
+                "include": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only files matching these globs, e.g. ['*.rpt', '*.def'] (default: all)"
+                },
+                "checksum": {
+                    "type": "boolean",
+                    "description": (
+                        "Compare md5 checksums for files whose size matches but timestamp differs, "
+                        "instead of re-downloading them (default false)"
+                    )
+                }
+            },
             "required": []
         }
     },
@@ -44,7 +148,10 @@ REMOTE_TOOLS = [
             "Automatically loads EDA tools (Innovus, Design Compiler, etc.) "
             "via `prep -l <COURSE>` before running your command, so you can "
             "call `innovus`, `dc_shell`, `xrun`, etc. directly. "
-            "Returns prep output, command stdout/stderr, and exit code."
+            "Returns prep output, command stdout/stderr, and exit code. "
+            "EDA tool output is watched as it arrives: a fatal error (license, unresolved "
+            "reference, syntax error, missing file, aborted script) stops the run at once, "
+            "and a [log watch] section lists errors and warnings with their line numbers."
         ),
         "input_schema": {
             "type": "object",
@@ -105,6 +212,16 @@ REMOTE_TOOLS = [
     }
 ]
 
+# See FILE_TOOL_ACCESS in tools/file_tools.py.
+REMOTE_TOOL_ACCESS = {
+    "sync_to_remote":       {"local": "read",  "remote": "write"},
+    "download_directory":   {"local": "write:local_dir",  "remote": "read"},
+    "download_results":     {"local": "write:local_dir",  "remote": "read"},
+    "run_remote_command":   {"remote": "write"},
+    "upload_to_remote":     {"local": "read:local_path",  "remote": "write"},
+    "download_from_remote": {"local": "write:local_path", "remote": "read"},
+}
+
 
 def execute_remote_tool(tool_name: str, tool_input: dict) -> str:
     if not _check_config():
@@ -114,7 +231,16 @@ def execute_remote_tool(tool_name: str, tool_input: dict) -> str:
         )
 
     if tool_name == "sync_to_remote":
-        return _sync_to_remote()
+        return _sync_to_remote(tool_input.get("force", False), tool_input.get("mode", "auto"))
+    elif tool_name == "download_directory":
+        return _download_directory(
+            tool_input["remote_dir"], tool_input["local_dir"], tool_input.get("mode", "auto")
+        )
+    elif tool_name == "download_results":
+        return _download_results(
+            tool_input.get("remote_dir", "results"), tool_input.get("local_dir"),
+            tool_input.get("include"), bool(tool_input.get("checksum", False)),
+        )
     elif tool_name == "run_remote_command":
         return _run_remote_command(tool_input["command"])
     elif tool_name == "upload_to_remote":
@@ -139,6 +265,8 @@ def _strip_ansi(text: str) -> str:
 
 
 def _get_ssh_client():
+    # Imported on first connection, not at module load: paramiko and
+    # cryptography cost ~0.2 s, and local-only sessions never need them.
     try:
         import paramiko
     except ImportError:
@@ -149,10 +277,12 @@ def _get_ssh_client():
 
     key_path = getattr(config, "REMOTE_KEY", "")
     password = getattr(config, "REMOTE_PASSWORD", "")
+    port     = int(getattr(config, "REMOTE_PORT", 22) or 22)
 
     if key_path:
         ssh.connect(
             hostname=config.REMOTE_HOST,
+            port=port,
             username=config.REMOTE_USER,
             key_filename=os.path.expanduser(key_path),
             timeout=30,
@@ -160,6 +290,7 @@ def _get_ssh_client():
     else:
         ssh.connect(
             hostname=config.REMOTE_HOST,
+            port=port,
             username=config.REMOTE_USER,
             password=password,
             timeout=30,
@@ -167,67 +298,64 @@ def _get_ssh_client():
     return ssh
 
 
-def _sync_to_remote() -> str:
+def _remote_base() -> str:
+    return getattr(config, "REMOTE_WORK_DIR", f"/home/{config.REMOTE_USER}/ic_agent")
+
+
+def _exec(ssh, command: str, timeout: int = 60) -> int:
+    """Run a short housekeeping command and wait for it to finish."""
+    _, stdout, _ = ssh.exec_command(command, timeout=timeout)
+    return stdout.channel.recv_exit_status()
+
+
+def _eda_env_script() -> str:
     """
-    Walk the local project and upload every source file to REMOTE_WORK_DIR.
+    Bash snippet that loads the EDA environment (dc_shell, innovus, ...).
 
-    Uploaded extensions: .v  .sv  .tcl  .sdc  .py (not config.py)  .txt  .md
-    Skipped paths: .git/  __pycache__/  .env  config.py  results/  *.gitkeep
+    Two strategies, tried in order:
+
+    1. Source ~/.eda_env (captured once from a Desktop session by running
+       tools/capture_eda_env.sh after `prep -l ECE260B_WI26_A00`).
+       This is the most reliable path because it carries the exact PATH
+       and license vars from a known-good session.
+
+    2. Fall back to re-initialising the module system and loading the
+       individual EDA modules (works when the NFS is already mounted,
+       e.g. on CentOS7 nodes, but fails on Debian nodes that only
+       mount /software/ECE and /software/nonrdist64 during Desktop login).
+    """
+    prep_course = getattr(config, "REMOTE_PREP_COURSE", "ECE260B_WI26_A00")
+    return (
+        "export TERM=xterm\n"
+        "if [ -f ~/.eda_env ]; then\n"
+        "  . ~/.eda_env\n"
+        "  echo 'EDA_ENV: loaded ~/.eda_env'\n"
+        "else\n"
+        "  . /usr/share/modules/init/bash 2>/dev/null\n"
+        "  export ACMS_MODULES=/public/Modules\n"
+        "  export MODULEPATH=/public/Modules/cse-modulefiles:"
+        "/public/Modules/acms-modulefiles:"
+        f"/home/linux/ieng6/{prep_course}/public/modulefiles\n"
+        "  module load design-compiler-2015.06-64 2>&1\n"
+        "  module load cadence-innovus211 2>&1\n"
+        f"  export PDK_DIR=/home/linux/ieng6/{prep_course}/public/PDKdata\n"
+        "  echo 'EDA_ENV: loaded via module system'\n"
+        "fi\n"
+    )
+
+
+def _sync_to_remote(force: bool = False, mode: str = "auto") -> str:
     """
-    UPLOAD_EXTS = {".v", ".sv", ".tcl", ".sdc", ".txt", ".md"}
-    SKIP_NAMES  = {"config.py", ".env", ".gitkeep"}
-    SKIP_DIRS   = {".git", "__pycache__", "results", ".claude"}
+    Upload every changed source file to REMOTE_WORK_DIR.
 
-    remote_base = getattr(config, "REMOTE_WORK_DIR",
-                          f"/home/{config.REMOTE_USER}/ic_agent")
+    Uploaded extensions: .v  .sv  .tcl  .sdc  .txt  .md
+    Skipped paths: .git/  __pycache__/  .env  config.py  results/  *.gitkeep
 
+    Change detection, batched mkdir and parallel or archive uploads live in
+    tools/sync_engine.py.
+    """
     try:
-        ssh  = _get_ssh_client()
-        sftp = ssh.open_sftp()
-
-        # Ensure remote base directory exists
-        ssh.exec_command(f"mkdir -p {remote_base}")
-        time.sleep(0.5)
-
-        uploaded = []
-        skipped  = []
-
-        for root, dirs, files in os.walk(config.WORK_DIR):
-            # Prune skip dirs in-place so os.walk doesn't descend into them
-            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-
-            for fname in files:
-                ext = os.path.splitext(fname)[1].lower()
-                if fname in SKIP_NAMES:
-                    skipped.append(fname)
-                    continue
-                if ext not in UPLOAD_EXTS:
-                    skipped.append(fname)
-                    continue
-
-                local_abs  = os.path.join(root, fname)
-                rel_path   = os.path.relpath(local_abs, config.WORK_DIR)
-                remote_abs = remote_base + "/" + rel_path.replace(os.sep, "/")
-                remote_dir = os.path.dirname(remote_abs)
-
-                # Create remote subdirectory if needed
-                ssh.exec_command(f"mkdir -p {remote_dir}")
-                time.sleep(0.1)
-
-                sftp.put(local_abs, remote_abs)
-                uploaded.append(rel_path)
-
-        sftp.close()
-        ssh.close()
-
-        lines = [f"Synced to {remote_base}"]
-        lines.append(f"  Uploaded ({len(uploaded)}):")
-        for f in sorted(uploaded):
-            lines.append(f"    {f}")
-        if skipped:
-            lines.append(f"  Skipped  ({len(skipped)}): {', '.join(sorted(set(skipped)))}")
-        return "\n".join(lines)
-
+        return sync_engine.sync(_remote_base(), force=force, mode=mode).format()
     except Exception as exc:
         return f"ERROR (sync_to_remote): {exc}"
 
@@ -236,6 +364,86 @@ def _run_remote_command(command: str, timeout: int = 400) -> str:
     """
     Run *command* on the remote server under the full ACMS EDA environment.
 
+    Commands normally go to a persistent login shell that loaded the EDA
+    environment once (tools/remote_shell.py).  If that shell cannot be
+    started, or REMOTE_PERSISTENT_SHELL is False, fall back to a one-shot
+    temp script (_run_via_script).
+
+    A command that starts a licensed EDA tool first waits (up to *timeout*)
+    for a slot in the shared license pool (tools/licenses.py), and its
+    output is classified as it arrives (tools/log_watch.py): a fatal error
+    stops the run at once instead of at exit or timeout.
+    """
+    try:
+        with licenses.hold(command, timeout=timeout):
+            if remote_shell.enabled():
+                try:
+                    shell = remote_shell.acquire(_eda_env_script())
+                except Exception as exc:
+                    print(f"[remote] persistent shell unavailable ({exc}); using one-shot script")
+                else:
+                    return _run_in_shell(shell, command, timeout)
+            return _run_via_script(command, timeout)
+    except licenses.Unavailable as exc:
+        return f"ERROR (run_remote_command): {exc}"
+
+
+def _run_in_shell(shell, command: str, timeout: int) -> str:
+    watcher = log_watch.LogWatcher() if log_watch.watches(command) else None
+    abort = log_watch.abort_enabled()
+    start = time.monotonic()
+    stopped = None                       # seconds into the run when a fatal error stopped it
+
+    def on_output(chunk):
+        nonlocal stopped
+        if watcher.feed(chunk) is not None and abort:
+            stopped = time.monotonic() - start
+            return True
+        return False
+
+    broken = False
+    try:
+        with telemetry.span("remote.command", mode="shell") as span:
+            body, exit_code, timed_out = shell.run(command, timeout=timeout,
+                                                   on_output=on_output if watcher else None)
+            span.update(exit_code=exit_code, timed_out=timed_out)
+            if stopped is not None:
+                span["aborted"] = watcher.fatal["cls"]
+    except Exception as exc:
+        broken = True
+        return f"ERROR (run_remote_command): {exc}"
+    finally:
+        remote_shell.release(shell, broken=broken)
+
+    if shell.commands_run == 1:
+        env_section = shell.env_output
+    else:
+        env_section = (
+            f"(persistent shell: environment loaded once in {shell.env_seconds:.1f}s, "
+            f"{shell.commands_run - 1} earlier command(s) reused it)"
+        )
+    parts = []
+    if env_section:
+        parts.append(f"[env setup]\n{_strip_ansi(env_section)}")
+    parts.append(f"[command output]\n{_strip_ansi(body).strip()}")
+    if watcher is not None:
+        watcher.close()
+        if watcher.entries:
+            parts.append(watcher.format())
+    if stopped is not None:
+        fatal = watcher.fatal
+        parts.append(f"[STOPPED: fatal {fatal['cls']} at output line {fatal['line']}; "
+                     f"run killed after {stopped:.0f}s — fix this first]")
+    if timed_out:
+        parts.append(f"[TIMEOUT: killed after {timeout}s — use submit_remote_job for long runs]")
+    parts.append(f"[EXIT_CODE:{exit_code}]")
+    return "\n\n".join(parts)
+
+
+def _run_via_script(command: str, timeout: int = 400) -> str:
+    """
+    Run *command* in a fresh login shell via a temporary script.
+
     Strategy: write a temporary bash script and execute it with
     `bash --login`, which forces bash to read /etc/profile.
     /etc/profile on ieng6 defines the `prep` function and loads the ACMS
@@ -251,63 +459,38 @@ def _run_remote_command(command: str, timeout: int = 400) -> str:
     ts = int(time.time())
     script_path = f"/tmp/{config.REMOTE_USER}_ic_run_{ts}.sh"
 
-    prep_course = getattr(config, "REMOTE_PREP_COURSE", "ECE260B_WI26_A00")
-
-    # Load EDA environment.  Two strategies, tried in order:
-    #
-    # 1. Source ~/.eda_env (captured once from a Desktop session by running
-    #    tools/capture_eda_env.sh after `prep -l ECE260B_WI26_A00`).
-    #    This is the most reliable path because it carries the exact PATH
-    #    and license vars from a known-good session.
-    #
-    # 2. Fall back to re-initialising the module system and loading the
-    #    individual EDA modules (works when the NFS is already mounted,
-    #    e.g. on CentOS7 nodes, but fails on Debian nodes that only
-    #    mount /software/ECE and /software/nonrdist64 during Desktop login).
     script = (
-        "export TERM=xterm\n"
-        "if [ -f ~/.eda_env ]; then\n"
-        "  . ~/.eda_env\n"
-        "  echo 'EDA_ENV: loaded ~/.eda_env'\n"
-        "else\n"
-        "  . /usr/share/modules/init/bash 2>/dev/null\n"
-        "  export ACMS_MODULES=/public/Modules\n"
-        "  export MODULEPATH=/public/Modules/cse-modulefiles:"
-        "/public/Modules/acms-modulefiles:"
-        f"/home/linux/ieng6/{prep_course}/public/modulefiles\n"
-        "  module load design-compiler-2015.06-64 2>&1\n"
-        "  module load cadence-innovus211 2>&1\n"
-        f"  export PDK_DIR=/home/linux/ieng6/{prep_course}/public/PDKdata\n"
-        "  echo 'EDA_ENV: loaded via module system'\n"
-        "fi\n"
+        _eda_env_script() +
         "echo PREP_DONE_OK\n"
         f"{command} 2>&1\n"
         "echo EXIT_CODE:$?\n"
     )
 
     try:
-        ssh  = _get_ssh_client()
-        sftp = ssh.open_sftp()
-        sftp.putfo(io.BytesIO(script.encode()), script_path)
-        sftp.close()
-
-        # bash --login reads /etc/profile.d/*.sh (including modules.sh)
-        stdin, stdout, stderr = ssh.exec_command(
-            f"bash --login {script_path}",
-            get_pty=True,
-            timeout=timeout,
-        )
-
-        raw_out  = stdout.read().decode("utf-8", errors="replace")
-        raw_err  = stderr.read().decode("utf-8", errors="replace")
-        exit_val = stdout.channel.recv_exit_status()
-
-        # Clean up temp script
-        try:
-            ssh.exec_command(f"rm -f {script_path}")
-        except Exception:
-            pass
-        ssh.close()
+        pool = get_pool()
+        with pool.sftp() as sftp:
+            sftp.putfo(io.BytesIO(script.encode()), script_path)
+
+        with pool.ssh() as ssh:
+            # bash --login reads /etc/profile.d/*.sh (including modules.sh);
+            # the environment loads inside this span on every call.
+            with telemetry.span("remote.command", mode="script") as span:
+                stdin, stdout, stderr = ssh.exec_command(
+                    f"bash --login {script_path}",
+                    get_pty=True,
+                    timeout=timeout,
+                )
+
+                raw_out  = stdout.read().decode("utf-8", errors="replace")
+                raw_err  = stderr.read().decode("utf-8", errors="replace")
+                exit_val = stdout.channel.recv_exit_status()
+                span["exit_code"] = exit_val
+
+            # Clean up temp script
+            try:
+                ssh.exec_command(f"rm -f {script_path}")
+            except Exception:
+                pass
 
         combined = _strip_ansi(raw_out + (f"\n[stderr] {raw_err}" if raw_err.strip() else ""))
 
@@ -334,6 +517,12 @@ def _run_remote_command(command: str, timeout: int = 400) -> str:
         if prep_section:
             parts.append(f"[env setup]\n{prep_section}")
         parts.append(f"[command output]\n{cmd_section}")
+        if log_watch.watches(command):
+            # Classified after the fact: this fallback path cannot stop the run early.
+            watcher = log_watch.LogWatcher()
+            watcher.feed(cmd_section + "\n")
+            if watcher.entries:
+                parts.append(watcher.format())
         parts.append(f"[{exit_line or f'EXIT_CODE:{exit_val}'}]")
         return "\n\n".join(parts)
 
@@ -347,20 +536,18 @@ def _upload_file(local_path: str, remote_path: str) -> str:
         if not os.path.exists(local_full):
             return f"ERROR: Local file '{local_path}' not found"
 
-        ssh = _get_ssh_client()
-        sftp = ssh.open_sftp()
+        pool = get_pool()
 
         # Ensure remote directory exists
         remote_dir = os.path.dirname(remote_path)
         try:
-            ssh.exec_command(f"mkdir -p {remote_dir}")
-            time.sleep(0.5)
+            with pool.ssh() as ssh:
+                _exec(ssh, f"mkdir -p {remote_dir}")
         except Exception:
             pass
 
-        sftp.put(local_full, remote_path)
-        sftp.close()
-        ssh.close()
+        with pool.sftp() as sftp:
+            sftp.put(local_full, remote_path)
         return f"OK: Uploaded '{local_path}' → {remote_path}"
     except Exception as exc:
         return f"ERROR (upload): {exc}"
@@ -371,11 +558,107 @@ def _download_file(remote_path: str, local_path: str) -> str:
         local_full = os.path.join(config.WORK_DIR, local_path)
         os.makedirs(os.path.dirname(local_full), exist_ok=True)
 
-        ssh = _get_ssh_client()
-        sftp = ssh.open_sftp()
-        sftp.get(remote_path, local_full)
-        sftp.close()
-        ssh.close()
+        with telemetry.span("remote.download", mode="sftp", files=1), get_pool().sftp() as sftp:
+            sftp.get(remote_path, local_full)
         return f"OK: Downloaded {remote_path} → '{local_path}'"
     except Exception as exc:
         return f"ERROR (download): {exc}"
+
+
+def _download_directory(remote_dir: str, local_dir: str, mode: str = "auto") -> str:
+    """
+    Mirror *remote_dir* into *local_dir*.
+
+    One `find` round-trip lists the files; the archive stream is used when
+    there are many of them (see tools/archive_transfer.py), otherwise they
+    are fetched over parallel SFTP channels.
+    """
+    if not remote_dir.startswith("/"):
+        remote_dir = _remote_base() + "/" + remote_dir
+    remote_dir = remote_dir.rstrip("/")
+    work = os.path.realpath(config.WORK_DIR)
+    local_full = os.path.realpath(os.path.join(work, local_dir))
+    if local_full != work and not local_full.startswith(work + os.sep):
+        return f"ERROR (download_directory): '{local_dir}' is outside the project"
+    start = time.monotonic()
+    try:
+        pool = get_pool()
+
+        with pool.ssh() as ssh:
+            _, stdout, stderr = ssh.exec_command(
+                f"find {shlex.quote(remote_dir)} -type f -printf '%P\\t%s\\n'", timeout=60
+            )
+            listing = stdout.read().decode("utf-8", errors="replace")
+            if stdout.channel.recv_exit_status() != 0:
+                err = stderr.read().decode("utf-8", errors="replace").strip()
+                return f"ERROR (download_directory): {err or 'cannot list ' + remote_dir}"
+            entries = []
+            for line in listing.splitlines():
+                rel, _, size = line.rpartition("\t")
+                if rel:
+                    entries.append((rel, int(size)))
+            if not entries:
+                return f"OK: {remote_dir} contains no files"
+
+            wire = None
+            if mode == "archive" or (mode == "auto" and archive_transfer.prefer_archive(len(entries))):
+                mode = "archive"
+                files, wire = archive_transfer.download_archive(ssh, remote_dir, local_full)
+            else:
+                mode = "sftp"
+
+        if mode == "sftp":
+            files = _get_files_parallel(remote_dir, local_full, entries)
+
+        total = sum(size for _, size in files)
+        elapsed = time.monotonic() - start
+        telemetry.record("remote.download", elapsed, mode=mode, files=len(files), bytes=total)
+        detail = f"{total} bytes" + (f", {wire} compressed" if wire is not None else "")
+        lines = [f"OK: Downloaded {remote_dir} → '{local_dir}' ({mode}, {len(files)} files, {detail}, {elapsed:.2f}s)"]
+        for rel, size in sorted(files):
+            lines.append(f"    {rel}  ({size} bytes)")
+        return "\n".join(lines)
+    except Exception as exc:
+        return f"ERROR (download_directory): {exc}"
+
+
+def _download_results(remote_dir: str = "results", local_dir: str = None, include=None,
+                      checksum: bool = False) -> str:
+    """Delta mirror of *remote_dir* into *local_dir*; see tools/result_mirror.py."""
+    if local_dir is None:
+        local_dir = ("results/" + posixpath.basename(remote_dir.rstrip("/"))) if remote_dir.startswith("/") \
+            else remote_dir
+    if not remote_dir.startswith("/"):
+        remote_dir = _remote_base() + "/" + remote_dir
+    work = os.path.realpath(config.WORK_DIR)
+    local_full = os.path.realpath(os.path.join(work, local_dir))
+    if local_full != work and not local_full.startswith(work + os.sep):
+        return f"ERROR (download_results): '{local_dir}' is outside the project"
+    if isinstance(include, str):
+        include = [include]
+    try:
+        result = result_mirror.mirror(remote_dir.rstrip("/"), local_full, include=include, checksum=checksum)
+    except Exception as exc:
+        return f"ERROR (download_results): {exc}"
+    result.local_dir = local_dir          # report the path the model asked for
+    text = result.format()
+    if result.failed and not result.fetched and not result.unchanged:
+        return "ERROR (download_results): every transfer failed\n" + text
+    return text
+
+
+def _get_files_parallel(remote_dir: str, local_full: str, entries):
+    """Fetch (rel_path, size) *entries* over several pooled SFTP channels."""
+    pool = get_pool()
+
+    def get(entry):
+        rel, size = entry
+        dest = os.path.join(local_full, rel)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with pool.sftp() as sftp:
+            sftp.get(remote_dir + "/" + rel, dest)
+        return entry
+
+    workers = max(1, min(int(getattr(config, "SYNC_PARALLEL_CHANNELS", 4)), len(entries)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(get, entries))
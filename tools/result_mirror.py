@@ -0,0 +1,219 @@
+"""
+Delta-aware, resumable mirror of a remote results directory for
+`download_results`.
+
+After every P&R the agent used to pull timing, power, DEF and netlist
+files one `download_from_remote` call at a time, re-fetching files it
+already had.  mirror() instead:
+
+  1. lists the remote tree once (`find -printf` path, size, mtime),
+  2. skips every file whose local copy has the same size and mtime —
+     downloaded files get the remote mtime, so the next mirror of an
+     unchanged run transfers nothing.  With checksum=True, files whose
+     size matches but mtime does not are compared by remote md5sum (one
+     round-trip for all of them) before being fetched;
+  3. fetches the rest over several pooled SFTP channels at once, largest
+     first so one big DEF does not trail behind the small reports.
+
+Each file is written to `<name>.<size>-<mtime>.part` and renamed into
+place when complete.  If a transfer dies — dropped connection, timeout,
+the agent killed — the next mirror finds the part for the same remote
+version and continues from its length instead of starting the multi-MB
+DEF or GDS over.  A part left over from an older version is discarded.
+
+Local files that no longer exist remotely are left alone.
+
+Configuration in config.py (optional):
+    SYNC_PARALLEL_CHANNELS — concurrent SFTP downloads (default: 4)
+"""
+
+import fnmatch
+import glob
+import hashlib
+import os
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from runtime import telemetry
+from tools.ssh_pool import get_pool
+from tools.sync_engine import _fmt_bytes
+
+_CHUNK = 1 << 20
+_PART = ".part"
+
+
+class MirrorResult:
+    def __init__(self, remote_dir: str, local_dir: str):
+        self.remote_dir = remote_dir
+        self.local_dir = local_dir
+        self.fetched = []           # (rel, size, resumed_from)
+        self.unchanged = []         # rel paths
+        self.verified = 0           # unchanged by checksum rather than size + mtime
+        self.filtered = 0           # excluded by the include patterns
+        self.failed = {}            # rel -> error text
+        self.bytes_fetched = 0      # bytes actually transferred
+        self.bytes_unchanged = 0
+        self.elapsed = 0.0
+
+    def format(self) -> str:
+        lines = [f"Mirrored {self.remote_dir} → '{self.local_dir}' ({self.elapsed:.2f}s)"]
+        lines.append(f"  Downloaded ({len(self.fetched)}, {_fmt_bytes(self.bytes_fetched)}):")
+        for rel, size, resumed in sorted(self.fetched):
+            note = f", resumed at {_fmt_bytes(resumed)}" if resumed else ""
+            lines.append(f"    {rel}  ({_fmt_bytes(size)}{note})")
+        if self.unchanged:
+            how = f"; {self.verified} by checksum" if self.verified else ""
+            lines.append(f"  Unchanged ({len(self.unchanged)}, {_fmt_bytes(self.bytes_unchanged)} not re-fetched{how})")
+        if self.filtered:
+            lines.append(f"  Not matching include: {self.filtered}")
+        if self.failed:
+            lines.append(f"  FAILED ({len(self.failed)}; rerun to resume):")
+            for rel, err in sorted(self.failed.items()):
+                lines.append(f"    {rel}: {err}")
+        return "\n".join(lines)
+
+
+def mirror(remote_dir: str, local_dir: str, include=None, checksum: bool = False) -> MirrorResult:
+    """
+    Bring *local_dir* (absolute) up to date with *remote_dir* (absolute).
+
+    *include* is a list of glob patterns matched against the relative path
+    and the file name; only matching files are considered.
+    """
+    start = time.monotonic()
+    result = MirrorResult(remote_dir, local_dir)
+    pool = get_pool()
+
+    with pool.ssh() as ssh:
+        remote = _list(ssh, remote_dir)
+        if include:
+            kept = {rel: v for rel, v in remote.items() if _included(rel, include)}
+            result.filtered = len(remote) - len(kept)
+            remote = kept
+
+        todo, suspect = [], []
+        for rel, (size, mtime) in sorted(remote.items()):
+            try:
+                st = os.stat(os.path.join(local_dir, rel))
+            except OSError:
+                todo.append(rel)
+                continue
+            if st.st_size == size and int(st.st_mtime) == int(mtime):
+                result.unchanged.append(rel)
+                result.bytes_unchanged += size
+            elif checksum and st.st_size == size:
+                suspect.append(rel)
+            else:
+                todo.append(rel)
+
+        if suspect:
+            sums = _remote_md5(ssh, remote_dir, suspect)
+            for rel in suspect:
+                path = os.path.join(local_dir, rel)
+                if sums.get(rel) and sums[rel] == _local_md5(path):
+                    mtime = remote[rel][1]
+                    os.utime(path, (mtime, mtime))      # skip the checksum next time
+                    result.unchanged.append(rel)
+                    result.bytes_unchanged += remote[rel][0]
+                    result.verified += 1
+                else:
+                    todo.append(rel)
+
+    if todo:
+        todo.sort(key=lambda rel: -remote[rel][0])
+        workers = max(1, min(int(getattr(config, "SYNC_PARALLEL_CHANNELS", 4)), len(todo)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {rel: executor.submit(_fetch, pool, remote_dir, local_dir, rel, *remote[rel])
+                       for rel in todo}
+            for rel, fut in futures.items():
+                try:
+                    resumed = fut.result()
+                except Exception as exc:
+                    result.failed[rel] = str(exc) or type(exc).__name__
+                    continue
+                size = remote[rel][0]
+                result.fetched.append((rel, size, resumed))
+                result.bytes_fetched += size - resumed
+
+    result.elapsed = time.monotonic() - start
+    telemetry.record("remote.download", result.elapsed, mode="mirror",
+                     files=len(result.fetched), bytes=result.bytes_fetched)
+    return result
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _list(ssh, remote_dir: str) -> dict:
+    """{rel: (size, mtime)} of every file under *remote_dir*."""
+    _, stdout, stderr = ssh.exec_command(
+        f"find {shlex.quote(remote_dir)} -type f -printf '%P\\t%s\\t%T@\\n'", timeout=60
+    )
+    listing = stdout.read().decode("utf-8", errors="replace")
+    if stdout.channel.recv_exit_status() != 0:
+        err = stderr.read().decode("utf-8", errors="replace").strip()
+        raise RuntimeError(err or f"cannot list {remote_dir}")
+    files = {}
+    for line in listing.splitlines():
+        parts = line.rsplit("\t", 2)
+        if len(parts) == 3 and parts[0]:
+            files[parts[0]] = (int(parts[1]), float(parts[2]))
+    return files
+
+
+def _included(rel: str, patterns) -> bool:
+    name = rel.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def _remote_md5(ssh, remote_dir: str, rels) -> dict:
+    stdin, stdout, _ = ssh.exec_command(f"cd {shlex.quote(remote_dir)} && xargs -0 md5sum --", timeout=300)
+    stdin.write("\0".join(rels))
+    stdin.channel.shutdown_write()
+    sums = {}
+    for line in stdout.read().decode("utf-8", errors="replace").splitlines():
+        digest, _, rel = line.partition("  ")
+        if rel:
+            sums[rel] = digest
+    stdout.channel.recv_exit_status()
+    return sums
+
+
+def _local_md5(path: str) -> str:
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _fetch(pool, remote_dir: str, local_dir: str, rel: str, size: int, mtime: float) -> int:
+    """Download one file via its part file; return the byte offset it resumed from."""
+    dest = os.path.join(local_dir, rel)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    part = f"{dest}.{size}-{int(mtime)}{_PART}"
+    for stale in glob.glob(glob.escape(dest) + ".*-*" + _PART):
+        if stale != part:
+            os.remove(stale)
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    if offset > size:
+        os.remove(part)
+        offset = 0
+
+    if offset < size:
+        with pool.sftp() as sftp, sftp.open(remote_dir + "/" + rel, "rb") as src, open(part, "ab") as out:
+            src.seek(offset)
+            src.prefetch(size)               # pipeline the reads from offset to the end
+            remaining = size - offset
+            while remaining > 0:
+                data = src.read(min(_CHUNK, remaining))
+                if not data:
+                    raise IOError(f"remote file shrank at {size - remaining} of {size} bytes")
+                out.write(data)
+                remaining -= len(data)
+    else:
+        open(part, "ab").close()             # empty file, or a part completed before the rename
+    os.utime(part, (mtime, mtime))
+    os.replace(part, dest)
+    return offset
@@ -0,0 +1,273 @@
+"""
+Content-addressed cache of synthesis and P&R results.
+
+A dc_shell or innovus run is a pure function of its inputs: the TCL script,
+the RTL / netlist / SDC files it reads and the tool version.  The cache key
+is a SHA-256 over exactly those, so rerunning a flow whose inputs did not
+change restores the previous artifacts locally instead of spending minutes
+of remote compute.
+
+    spec = analyze_script("scripts/dc_synthesis_alu.tcl")
+    key  = cache_key(spec, tool_version)
+    if lookup(key): restore(key)
+    else:           ...run...; store(key, spec, tool_version)
+
+`analyze_script` reads the script statically: `set VAR value` lines are
+expanded, every project path it mentions (designs/, scripts/, tb/,
+results/) is classified as an output if it appears in a write command
+(write -output, write_sdc, saveNetlist, defOut, redirect, -outfile,
+-report, >) or lives under results/, and as an input otherwise.
+
+Entries live in RUN_CACHE_DIR/<key>/ (files/ mirrors the project layout,
+plus meta.json) and are evicted least-recently-used beyond the size and
+count limits.
+
+Configuration in config.py (optional):
+    RUN_CACHE             — set False to always run the flow
+    RUN_CACHE_DIR         — cache location (default: WORK_DIR/.run_cache)
+    RUN_CACHE_MAX_ENTRIES — entries kept (default: 32)
+    RUN_CACHE_MAX_BYTES   — total size kept (default: 1 GB)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+import config
+
+_PROJECT_PATH = re.compile(r"(?<![\w/.$-])((?:designs|scripts|tb|results)/[\w.\-/]*\w)")
+_SET = re.compile(r'^\s*set\s+(\w+)\s+(?:"([^"]*)"|\{([^}]*)\}|(\S+))', re.M)
+_WRITE_LINE = re.compile(
+    r"(\bwrite\b.*-output|\bwrite_sdc\b|\bwrite_sdf\b|\bwrite_def\b|\bwrite_netlist\b|"
+    r"\bsaveNetlist\b|\bdefOut\b|\bredirect\b|-outfile\b|-report\b|>|\bfile\s+mkdir\b)"
+)
+
+_lock = threading.Lock()
+
+
+@dataclass
+class FlowSpec:
+    script: str
+    tool: str                                   # "dc" or "innovus"
+    inputs: List[str] = field(default_factory=list)
+    output_files: List[str] = field(default_factory=list)
+    output_dirs: List[str] = field(default_factory=list)
+
+
+def enabled() -> bool:
+    return bool(getattr(config, "RUN_CACHE", True))
+
+
+def cache_dir() -> str:
+    return getattr(config, "RUN_CACHE_DIR", "") or os.path.join(config.WORK_DIR, ".run_cache")
+
+
+# ── Script analysis ───────────────────────────────────────────────────────────
+
+def detect_tool(script_text: str, script: str = "") -> str:
+    if re.search(r"\b(compile_ultra|compile|elaborate|analyze)\b", script_text) and "init_design" not in script_text:
+        return "dc"
+    if re.search(r"\b(init_design|place_design|route_design|placeDesign|routeDesign)\b", script_text):
+        return "innovus"
+    return "innovus" if "innovus" in os.path.basename(script) else "dc"
+
+
+def analyze_script(script: str) -> FlowSpec:
+    """Classify the project files *script* (relative to WORK_DIR) reads and writes."""
+    with open(os.path.join(config.WORK_DIR, script), "r", encoding="utf-8") as f:
+        text = f.read()
+    # Join backslash-continued lines so a write command and its -output meet.
+    expanded = re.sub(r"\\\n\s*", " ", _expand_vars(text))
+
+    inputs, out_files, out_dirs = set(), set(), set()
+    for line in expanded.splitlines():
+        code = line.split("#", 1)[0] if not line.lstrip().startswith("puts") else ""
+        paths = _PROJECT_PATH.findall(code)
+        if not paths:
+            continue
+        writes = bool(_WRITE_LINE.search(code))
+        for path in paths:
+            if path.startswith("results/"):
+                out_dirs.add("/".join(path.split("/")[:2]))
+            elif writes:
+                out_files.add(path)
+            else:
+                inputs.add(path)
+
+    inputs -= out_files
+    inputs = {p for p in inputs if os.path.isfile(os.path.join(config.WORK_DIR, p))}
+    return FlowSpec(
+        script=script,
+        tool=detect_tool(text, script),
+        inputs=sorted(inputs | {script}),
+        output_files=sorted(out_files),
+        output_dirs=sorted(out_dirs),
+    )
+
+
+def cache_key(spec: FlowSpec, tool_version: str) -> str:
+    h = hashlib.sha256()
+    h.update(f"{spec.tool}\0{tool_version}\0{spec.script}\0".encode())
+    for rel in spec.inputs:
+        h.update(rel.encode() + b"\0" + _file_hash(os.path.join(config.WORK_DIR, rel)).encode() + b"\0")
+    return h.hexdigest()[:24]
+
+
+# ── Entries ───────────────────────────────────────────────────────────────────
+
+def lookup(key: str):
+    """meta dict of the entry for *key*, or None."""
+    path = os.path.join(cache_dir(), key, "meta.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def restore(key: str) -> list:
+    """Copy the cached artifacts of *key* back into WORK_DIR; return their paths."""
+    meta = lookup(key)
+    if meta is None:
+        raise KeyError(key)
+    root = os.path.join(cache_dir(), key, "files")
+    restored = []
+    for rel in meta["outputs"]:
+        src = os.path.join(root, rel)
+        dst = os.path.join(config.WORK_DIR, rel)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copy2(src, dst)
+        restored.append(rel)
+    meta["last_used"] = time.time()
+    meta["hits"] = meta.get("hits", 0) + 1
+    _write_meta(key, meta)
+    return restored
+
+
+def store(key: str, spec: FlowSpec, tool_version: str, extra: dict = None) -> dict:
+    """Copy the flow's current local outputs into the cache under *key*."""
+    outputs = []
+    for rel in spec.output_files:
+        if os.path.isfile(os.path.join(config.WORK_DIR, rel)):
+            outputs.append(rel)
+    for rel_dir in spec.output_dirs:
+        base = os.path.join(config.WORK_DIR, rel_dir)
+        for root, _, names in os.walk(base):
+            for name in names:
+                outputs.append(os.path.relpath(os.path.join(root, name), config.WORK_DIR).replace(os.sep, "/"))
+
+    entry = os.path.join(cache_dir(), key)
+    tmp = entry + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    size = 0
+    for rel in outputs:
+        dst = os.path.join(tmp, "files", rel)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copy2(os.path.join(config.WORK_DIR, rel), dst)
+        size += os.path.getsize(dst)
+    now = time.time()
+    meta = {
+        "key": key,
+        "tool": spec.tool,
+        "tool_version": tool_version,
+        "script": spec.script,
+        "inputs": {rel: _file_hash(os.path.join(config.WORK_DIR, rel)) for rel in spec.inputs},
+        "outputs": sorted(outputs),
+        "bytes": size,
+        "created": now,
+        "last_used": now,
+        "hits": 0,
+        **(extra or {}),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    with _lock:
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+    enforce_limits()
+    return meta
+
+
+def list_entries() -> list:
+    """meta dicts of all entries, most recently used first."""
+    root = cache_dir()
+    if not os.path.isdir(root):
+        return []
+    entries = []
+    for key in os.listdir(root):
+        if key.endswith(".tmp"):
+            continue
+        meta = lookup(key)
+        if meta is not None:
+            entries.append(meta)
+    entries.sort(key=lambda m: m.get("last_used", 0), reverse=True)
+    return entries
+
+
+def evict(key: str = None, script: str = None) -> int:
+    """Remove one entry, every entry for *script*, or (no arguments) everything."""
+    removed = 0
+    for meta in list_entries():
+        if (key and not meta["key"].startswith(key)) or (script and meta["script"] != script):
+            continue
+        with _lock:
+            shutil.rmtree(os.path.join(cache_dir(), meta["key"]), ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def enforce_limits() -> int:
+    """Drop least-recently-used entries beyond RUN_CACHE_MAX_ENTRIES / RUN_CACHE_MAX_BYTES."""
+    max_entries = int(getattr(config, "RUN_CACHE_MAX_ENTRIES", 32))
+    max_bytes = int(getattr(config, "RUN_CACHE_MAX_BYTES", 1 << 30))
+    entries = list_entries()
+    total = sum(m.get("bytes", 0) for m in entries)
+    removed = 0
+    while entries and (len(entries) > max_entries or total > max_bytes):
+        meta = entries.pop()
+        total -= meta.get("bytes", 0)
+        with _lock:
+            shutil.rmtree(os.path.join(cache_dir(), meta["key"]), ignore_errors=True)
+        removed += 1
+    return removed
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _expand_vars(text: str) -> str:
+    values = {}
+    for m in _SET.finditer(text):
+        values[m.group(1)] = next(g for g in m.groups()[1:] if g is not None)
+    for _ in range(3):      # values may reference earlier variables
+        values = {k: _substitute(v, values) for k, v in values.items()}
+    return _substitute(text, values)
+
+
+def _substitute(text: str, values: dict) -> str:
+    return re.sub(
+        r"\$\{(\w+)\}|\$(\w+)",
+        lambda m: values.get(m.group(1) or m.group(2), m.group(0)),
+        text,
+    )
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write_meta(key: str, meta: dict):
+    path = os.path.join(cache_dir(), key, "meta.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, path)
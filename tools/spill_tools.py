@@ -0,0 +1,54 @@
+"""
+Access to tool results that conversation compaction (runtime/compaction.py)
+moved out of the message history into results/.spill/.
+"""
+
+import os
+
+import config
+from runtime import compaction
+from tools import file_tools
+
+SPILL_TOOLS = [
+    {
+        "name": "fetch_spilled_output",
+        "description": (
+            "Read back an earlier tool result that was compacted out of the conversation. "
+            "Pass the handle shown in the '[compacted: ... handle ...]' note. Supports the same "
+            "start_line/end_line, tail and grep (with context) options as read_file."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "handle": {"type": "string", "description": "Handle from the compaction note"},
+                "start_line": {"type": "integer", "description": "First line to return (1-based)"},
+                "end_line": {"type": "integer", "description": "Last line to return (inclusive)"},
+                "tail": {"type": "integer", "description": "Return only the last N lines"},
+                "grep": {"type": "string", "description": "Regex; return only matching lines"},
+                "context": {"type": "integer", "description": "Lines of context around each grep match"}
+            },
+            "required": ["handle"]
+        }
+    }
+]
+
+SPILL_TOOL_ACCESS = {
+    "fetch_spilled_output": {"local": "read"},
+}
+
+
+def execute_spill_tool(tool_name: str, tool_input: dict) -> str:
+    if tool_name == "fetch_spilled_output":
+        return _fetch(tool_input)
+    return f"ERROR: Unknown spill tool '{tool_name}'"
+
+
+def _fetch(tool_input: dict) -> str:
+    handle = tool_input["handle"]
+    path = compaction.spill_path(handle)
+    if not os.path.isfile(path):
+        return f"ERROR: No spilled output with handle '{handle}'"
+    return file_tools.execute_file_tool("read_file", {
+        **{k: v for k, v in tool_input.items() if k != "handle"},
+        "path": os.path.relpath(path, config.WORK_DIR),
+    })
@@ -0,0 +1,347 @@
+"""
+Process-wide pool of authenticated SSH connections and SFTP channels.
+
+Opening a paramiko session to ieng6 costs one to three seconds (TCP,
+key exchange, authentication).  The remote tools used to pay that on every
+call; instead they now borrow a connection from this pool:
+
+    with get_pool().ssh() as ssh:
+        ssh.exec_command(...)
+
+    with get_pool().sftp() as sftp:
+        sftp.put(...)
+
+Connections are keyed by (host, port, user) so every tool in the process
+shares the same handshake.  A paramiko transport multiplexes many channels,
+so several borrowers may use one connection at a time; a new connection is
+only opened when every live one already carries SSH_POOL_CHANNELS_PER_CONN
+borrowers.
+
+Configuration in config.py (all optional):
+    SSH_POOL_MAX_CONNECTIONS     — max connections per host (default: 4)
+    SSH_POOL_CHANNELS_PER_CONN   — borrowers per connection before opening
+                                   another one (default: 4)
+    SSH_KEEPALIVE_INTERVAL       — seconds between keepalive packets (default: 30)
+    SSH_IDLE_TIMEOUT             — close connections idle this long (default: 600)
+    SSH_HEALTH_CHECK_INTERVAL    — probe connections idle longer than this
+                                   before handing them out (default: 60)
+"""
+
+import atexit
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+from runtime import telemetry
+
+# Errors that mean the underlying connection is gone and must be replaced.
+_CONNECTION_ERRORS = (EOFError, ConnectionError, socket.error, socket.timeout)
+
+
+def _is_connection_error(exc: BaseException) -> bool:
+    if isinstance(exc, _CONNECTION_ERRORS):
+        return True
+    try:
+        import paramiko
+    except ImportError:
+        return False
+    return isinstance(exc, paramiko.SSHException) and not isinstance(
+        exc, paramiko.AuthenticationException
+    )
+
+
+class _PooledConnection:
+    """One authenticated SSHClient plus the SFTP channels opened on it."""
+
+    def __init__(self, client):
+        self.client = client
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.borrowed = 0
+        self.idle_sftp = []
+        self.dead = False
+
+    def is_alive(self) -> bool:
+        if self.dead:
+            return False
+        transport = self.client.get_transport()
+        return bool(transport and transport.is_active() and transport.is_authenticated())
+
+    def probe(self) -> bool:
+        """Cheap round-trip check for connections that have been idle a while."""
+        if not self.is_alive():
+            return False
+        try:
+            self.client.get_transport().send_ignore()
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        self.dead = True
+        for sftp in self.idle_sftp:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+        self.idle_sftp = []
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class SSHPool:
+    """
+    Thread-safe pool of SSH connections with keepalive, health checks,
+    automatic reconnect and idle eviction.
+
+    *connect* is a zero-argument factory returning a connected
+    paramiko.SSHClient; it is called whenever the pool needs a new
+    connection.
+    """
+
+    def __init__(self, connect, max_connections=4, channels_per_conn=4,
+                 keepalive=30, idle_timeout=600, health_check_interval=60):
+        self._connect = connect
+        self.max_connections = max(1, max_connections)
+        self.channels_per_conn = max(1, channels_per_conn)
+        self.keepalive = keepalive
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+
+        self._conns = {}                      # key -> [_PooledConnection]
+        self._opening = {}                    # key -> connects in progress (count toward the cap)
+        self._cond = threading.Condition()
+        self._reaper = None
+        self._closed = False
+        self.stats = {"connects": 0, "reuses": 0, "reconnects": 0, "evictions": 0}
+
+    # ── Borrowing ────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def ssh(self):
+        """Borrow a connected paramiko.SSHClient."""
+        conn = self._acquire()
+        try:
+            yield conn.client
+        except BaseException as exc:
+            if _is_connection_error(exc):
+                self._discard(conn)
+            raise
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def sftp(self):
+        """Borrow an open SFTP channel; it is kept open for the next borrower."""
+        conn = self._acquire()
+        sftp = None
+        try:
+            with self._cond:
+                sftp = conn.idle_sftp.pop() if conn.idle_sftp else None
+            if sftp is None or sftp.sock.closed:
+                sftp = conn.client.open_sftp()
+            yield sftp
+        except BaseException as exc:
+            if _is_connection_error(exc):
+                self._discard(conn)
+            elif sftp is not None:
+                # Protocol state of this channel is unknown — don't reuse it.
+                try:
+                    sftp.close()
+                except Exception:
+                    pass
+                sftp = None
+            raise
+        finally:
+            if sftp is not None:
+                with self._cond:
+                    if not conn.dead and len(conn.idle_sftp) < self.channels_per_conn:
+                        conn.idle_sftp.append(sftp)
+                        sftp = None
+                if sftp is not None:
+                    try:
+                        sftp.close()
+                    except Exception:
+                        pass
+            self._release(conn)
+
+    def checkout(self):
+        """
+        Take a long-lived lease on a connection (e.g. for a persistent shell).
+
+        The connection is not evicted while leased; hand it back with
+        checkin(), passing broken=True if it failed.
+        """
+        return self._acquire()
+
+    def checkin(self, conn, broken: bool = False):
+        if broken:
+            self._discard(conn)
+        self._release(conn)
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    def close_all(self):
+        """Close every pooled connection (called automatically at exit)."""
+        with self._cond:
+            conns = [c for lst in self._conns.values() for c in lst]
+            self._conns.clear()
+            self._closed = True
+            self._cond.notify_all()
+        for conn in conns:
+            conn.close()
+
+    def evict_idle(self) -> int:
+        """Close connections nobody has used for idle_timeout seconds."""
+        now = time.monotonic()
+        evicted = []
+        with self._cond:
+            for key, lst in self._conns.items():
+                keep = []
+                for conn in lst:
+                    if conn.borrowed == 0 and (
+                        conn.dead or now - conn.last_used > self.idle_timeout
+                    ):
+                        evicted.append(conn)
+                    else:
+                        keep.append(conn)
+                self._conns[key] = keep
+            self.stats["evictions"] += len(evicted)
+        for conn in evicted:
+            conn.close()
+        return len(evicted)
+
+    def describe(self) -> str:
+        with self._cond:
+            live = sum(len(lst) for lst in self._conns.values())
+            busy = sum(c.borrowed for lst in self._conns.values() for c in lst)
+        s = self.stats
+        return (
+            f"{live} connection(s), {busy} channel(s) in use; "
+            f"connects={s['connects']} reuses={s['reuses']} "
+            f"reconnects={s['reconnects']} evictions={s['evictions']}"
+        )
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _key(self):
+        return (
+            getattr(config, "REMOTE_HOST", ""),
+            int(getattr(config, "REMOTE_PORT", 22) or 22),
+            getattr(config, "REMOTE_USER", ""),
+        )
+
+    def _acquire(self) -> _PooledConnection:
+        key = self._key()
+        with self._cond:
+            self._closed = False
+            while True:
+                lst = self._conns.setdefault(key, [])
+                stale = [c for c in lst if c.borrowed == 0 and not c.is_alive()]
+                for conn in stale:
+                    lst.remove(conn)
+                    self.stats["reconnects"] += 1
+                    conn.close()
+
+                candidates = [c for c in lst if not c.dead and c.borrowed < self.channels_per_conn]
+                if candidates:
+                    conn = min(candidates, key=lambda c: c.borrowed)
+                    conn.borrowed += 1
+                    break
+                if len(lst) + self._opening.get(key, 0) < self.max_connections:
+                    self._opening[key] = self._opening.get(key, 0) + 1
+                    conn = None
+                    break
+                self._cond.wait(timeout=1.0)
+
+            if conn is not None:
+                self.stats["reuses"] += 1
+
+        if conn is not None:
+            # Health-check connections that sat idle long enough for a NAT
+            # or the server to drop them without us noticing.
+            if time.monotonic() - conn.last_used > self.health_check_interval and not conn.probe():
+                self._discard(conn)
+                self._release(conn)
+                with self._cond:
+                    self.stats["reconnects"] += 1
+                return self._acquire()
+            return conn
+
+        return self._open(key)
+
+    def _open(self, key) -> _PooledConnection:
+        """Connect outside the lock; the slot was reserved in _opening by _acquire."""
+        try:
+            with telemetry.span("ssh.connect", host=getattr(config, "REMOTE_HOST", "")):
+                client = self._connect()
+            transport = client.get_transport()
+            if transport is not None and self.keepalive:
+                transport.set_keepalive(self.keepalive)
+        except BaseException:
+            with self._cond:
+                self._opening[key] -= 1
+                self._cond.notify_all()
+            raise
+        conn = _PooledConnection(client)
+        conn.borrowed = 1
+        with self._cond:
+            self._opening[key] -= 1
+            self._conns.setdefault(key, []).append(conn)
+            self.stats["connects"] += 1
+        self._start_reaper()
+        return conn
+
+    def _release(self, conn: _PooledConnection):
+        with self._cond:
+            conn.borrowed = max(0, conn.borrowed - 1)
+            conn.last_used = time.monotonic()
+            self._cond.notify_all()
+
+    def _discard(self, conn: _PooledConnection):
+        with self._cond:
+            for lst in self._conns.values():
+                if conn in lst:
+                    lst.remove(conn)
+            self._cond.notify_all()
+        conn.close()
+
+    def _start_reaper(self):
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        interval = max(5.0, min(60.0, self.idle_timeout / 4))
+
+        def reap():
+            while not self._closed:
+                time.sleep(interval)
+                self.evict_idle()
+
+        self._reaper = threading.Thread(target=reap, name="ssh-pool-reaper", daemon=True)
+        self._reaper.start()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SSHPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from tools.remote_tools import _get_ssh_client
+
+            _pool = SSHPool(
+                _get_ssh_client,
+                max_connections=getattr(config, "SSH_POOL_MAX_CONNECTIONS", 4),
+                channels_per_conn=getattr(config, "SSH_POOL_CHANNELS_PER_CONN", 4),
+                keepalive=getattr(config, "SSH_KEEPALIVE_INTERVAL", 30),
+                idle_timeout=getattr(config, "SSH_IDLE_TIMEOUT", 600),
+                health_check_interval=getattr(config, "SSH_HEALTH_CHECK_INTERVAL", 60),
+            )
+            atexit.register(_pool.close_all)
+        return _pool
@@ -0,0 +1,520 @@
+"""
+Parallel design-space exploration sweeps on the remote server.
+
+Instead of the serial "relax the clock 10 %, rerun, read the report" loop,
+`run_sweep` takes a parameter grid, builds one variant per grid point and
+runs them as concurrent detached remote jobs (tools/remote_jobs.py):
+
+    REMOTE_WORK_DIR/.sweeps/<sweep_id>/<variant>/   copy of designs/ + scripts/
+                                                    with the knobs applied
+
+Knobs (applied to the variant's copies of the scripts):
+    clock_period      — `create_clock -period` (and -waveform) in the SDC
+                        files the flow reads
+    core_utilization  — the utilization argument of `floorPlan -r`
+    aspect_ratio      — the aspect-ratio argument of `floorPlan -r`
+    compile_effort    — DC compile command: ultra, ultra_retime, high,
+                        medium or low
+
+At most MAX_PARALLEL_LICENSES variants run at once — fewer when other runs
+hold slots of the shared license pool (tools/licenses.py); the rest queue
+and start as licenses free up.  Finished variants' report directories are downloaded
+to results/sweeps/<sweep_id>/<variant>/ and parsed with qor_parsers into one
+table ranked by timing closure first, then the chosen objective.  Sweep
+state lives in WORK_DIR/.remote_sweeps.json, so `sweep_status` can pick a
+sweep back up after run_sweep returned (or the agent restarted).
+
+Configuration in config.py (optional):
+    MAX_PARALLEL_LICENSES — concurrent variants (default: 2)
+    SWEEP_MAX_VARIANTS    — largest grid accepted (default: 16)
+    SWEEP_POLL_INTERVAL   — seconds between job polls (default: 15)
+"""
+
+import itertools
+import json
+import os
+import re
+import secrets
+import shlex
+import threading
+import time
+
+import config
+from tools import licenses, log_watch, remote_jobs
+from tools.flow_tools import _TOOL_COMMANDS
+from tools.remote_tools import (
+    _check_config, _download_directory, _remote_base, _sync_to_remote,
+)
+from tools.ssh_pool import get_pool
+
+SWEEP_TOOLS = [
+    {
+        "name": "run_sweep",
+        "description": (
+            "Run a design-space exploration sweep on the remote server: every combination of the "
+            "given parameter values becomes a variant in its own run directory, variants run as "
+            "concurrent remote jobs (limited by the license count), and the result is one table of "
+            "WNS / TNS / area / utilization / power / DRC per variant, ranked best first. "
+            "Knobs: clock_period (ns, edits create_clock in the SDC), core_utilization and "
+            "aspect_ratio (floorPlan -r in the Innovus script), compile_effort "
+            "(ultra | ultra_retime | high | medium | low, the DC compile command). "
+            "Give synth_script, pnr_script or both (synthesis then P&R in each variant)."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "grid": {
+                    "type": "object",
+                    "description": (
+                        "Knob -> list of values, e.g. "
+                        "{\"clock_period\": [4.0, 4.5, 5.0], \"core_utilization\": [0.5, 0.6]}"
+                    )
+                },
+                "synth_script": {
+                    "type": "string",
+                    "description": "DC script, e.g. 'scripts/dc_synthesis_alu.tcl'"
+                },
+                "pnr_script": {
+                    "type": "string",
+                    "description": "Innovus script, e.g. 'scripts/innovus_pnr_alu.tcl'"
+                },
+                "objective": {
+                    "type": "string",
+                    "enum": ["area", "power", "wns"],
+                    "description": "Tie-break among variants that meet timing (default: area)"
+                },
+                "wait": {
+                    "type": "integer",
+                    "description": (
+                        "Seconds to wait for the sweep before returning a partial table "
+                        "(default: 3600). Use sweep_status to collect the rest later."
+                    )
+                }
+            },
+            "required": ["grid"]
+        }
+    },
+    {
+        "name": "sweep_status",
+        "description": (
+            "Advance a sweep started by run_sweep (start queued variants, collect finished ones) and "
+            "return its ranked table. Optionally wait up to 'wait' seconds for it to finish. "
+            "Omit sweep_id to list sweeps."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "sweep_id": {"type": "string", "description": "Sweep id from run_sweep"},
+                "wait": {"type": "integer", "description": "Seconds to wait for completion (default: 0)"},
+                "cancel": {"type": "boolean", "description": "Cancel every running or queued variant"}
+            },
+            "required": []
+        }
+    }
+]
+
+SWEEP_TOOL_ACCESS = {
+    "run_sweep":    {"local": "write", "remote": "write", "qor_history": "write"},
+    "sweep_status": {"local": "write", "remote": "write", "qor_history": "write"},
+}
+
+STATE_NAME = ".remote_sweeps.json"
+KNOBS = ("clock_period", "core_utilization", "aspect_ratio", "compile_effort")
+
+_COMPILE_COMMANDS = {
+    "ultra": "compile_ultra -no_autoungroup",
+    "ultra_retime": "compile_ultra -no_autoungroup -retime",
+    "high": "compile -map_effort high -area_effort high",
+    "medium": "compile -map_effort medium -area_effort medium",
+    "low": "compile -map_effort low -area_effort low",
+}
+
+_lock = threading.Lock()
+_sweeps = {}     # state path -> {sweep_id -> dict}, loaded lazily from STATE_NAME
+
+
+def execute_sweep_tool(tool_name: str, tool_input: dict) -> str:
+    if not _check_config():
+        return (
+            "ERROR: Remote server not configured. "
+            "Please set REMOTE_HOST, REMOTE_USER in config.py first."
+        )
+    if tool_name == "run_sweep":
+        return _run_sweep(
+            tool_input["grid"],
+            tool_input.get("synth_script"),
+            tool_input.get("pnr_script"),
+            tool_input.get("objective", "area"),
+            int(tool_input.get("wait", 3600)),
+        )
+    elif tool_name == "sweep_status":
+        return _sweep_status(
+            tool_input.get("sweep_id"),
+            int(tool_input.get("wait", 0)),
+            bool(tool_input.get("cancel", False)),
+        )
+    return f"ERROR: Unknown sweep tool '{tool_name}'"
+
+
+# ── Public helpers ────────────────────────────────────────────────────────────
+
+def start(grid: dict, synth_script: str = None, pnr_script: str = None, objective: str = "area") -> dict:
+    """Prepare every variant on the remote host and launch the first batch."""
+    from tools import run_cache
+    if not synth_script and not pnr_script:
+        raise ValueError("give synth_script, pnr_script or both")
+    unknown = set(grid) - set(KNOBS)
+    if unknown:
+        raise ValueError(f"unknown knob(s) {', '.join(sorted(unknown))}; use {', '.join(KNOBS)}")
+    names = sorted(grid)
+    values = [v if isinstance(v, list) else [v] for v in (grid[n] for n in names)]
+    points = [dict(zip(names, combo)) for combo in itertools.product(*values)]
+    limit = int(getattr(config, "SWEEP_MAX_VARIANTS", 16))
+    if not points:
+        raise ValueError("empty grid")
+    if len(points) > limit:
+        raise ValueError(f"grid has {len(points)} variants; SWEEP_MAX_VARIANTS is {limit}")
+
+    stages = []
+    if synth_script:
+        stages.append(run_cache.analyze_script(synth_script))
+    if pnr_script:
+        stages.append(run_cache.analyze_script(pnr_script))
+    sweep_id = time.strftime("%Y%m%d-%H%M%S") + "-" + secrets.token_hex(2)
+
+    # Files a knob may edit: the scripts plus the SDC files each stage reads
+    # that an earlier stage of the same variant does not produce.
+    produced, editable = set(), []
+    for spec in stages:
+        for rel in [spec.script] + [p for p in spec.inputs if p.endswith(".sdc")]:
+            if rel not in produced and rel not in editable:
+                editable.append(rel)
+        produced.update(spec.output_files)
+    originals = {}
+    for rel in editable:
+        with open(os.path.join(config.WORK_DIR, rel), "r", encoding="utf-8") as f:
+            originals[rel] = f.read()
+
+    variants = []
+    for i, params in enumerate(points):
+        name = f"v{i:02d}"
+        files = _apply_knobs(dict(originals), params, stages, f"{sweep_id}-{name}")
+        variants.append({"name": name, "params": params, "files": files,
+                         "state": "queued", "job_id": None, "qor": None, "error": None})
+
+    sync = _sync_to_remote()
+    if sync.startswith("ERROR"):
+        raise RuntimeError(sync)
+
+    root = f"{_remote_base()}/.sweeps/{sweep_id}"
+    base = shlex.quote(_remote_base())
+    pool = get_pool()
+    with pool.ssh() as ssh:
+        dirs = " ".join(shlex.quote(f"{root}/{v['name']}") for v in variants)
+        copies = "; ".join(
+            f"cp -r {base}/designs {base}/scripts {shlex.quote(root + '/' + v['name'])}/" for v in variants
+        )
+        remote_jobs._run(ssh, f"mkdir -p {dirs} && {{ {copies}; }}", timeout=300)
+    with pool.sftp() as sftp:
+        for v in variants:
+            for rel, text in v.pop("files").items():
+                with sftp.open(f"{root}/{v['name']}/{rel}", "w") as f:
+                    f.write(text)
+
+    sweep = {
+        "sweep_id": sweep_id,
+        "grid": grid,
+        "stages": [{"tool": s.tool, "script": s.script, "output_dirs": s.output_dirs} for s in stages],
+        "objective": objective,
+        "remote_dir": root,
+        "created": time.time(),
+        "variants": variants,
+    }
+    with _lock:
+        _load()[sweep_id] = sweep
+        _save()
+    advance(sweep_id)
+    return sweep
+
+
+def advance(sweep_id: str) -> dict:
+    """Poll running variants, collect finished ones and start queued ones."""
+    sweep = _get(sweep_id)
+    for v in sweep["variants"]:
+        if v["state"] != "running":
+            continue
+        job = remote_jobs.poll(v["job_id"])
+        if job["state"] == "running":
+            continue
+        v["state"] = "done" if job["state"] == "finished" and job["exit_code"] == 0 else "failed"
+        if v["state"] == "failed":
+            v["error"] = f"job {job['state']}" + (f", exit {job['exit_code']}" if job["exit_code"] is not None else "")
+            if job["state"] == "aborted":
+                v["error"] += ": " + log_watch.LogWatcher(job["watch"]).brief()
+        v["runtime"] = (job["finished"] or time.time()) - job["submitted"]
+        _collect(sweep, v)
+
+    limit = max(1, int(getattr(config, "MAX_PARALLEL_LICENSES", 2)))
+    running = sum(v["state"] == "running" for v in sweep["variants"])
+    for v in sweep["variants"]:
+        if running >= limit:
+            break
+        if v["state"] != "queued":
+            continue
+        try:
+            job = remote_jobs.submit(_variant_command(sweep, v), cwd=f"{sweep['remote_dir']}/{v['name']}",
+                                     label=f"sweep {sweep_id} {v['name']} {v['params']}", wait_license=False)
+        except licenses.Unavailable:
+            break              # the shared pool is full: start it on a later poll
+        v["job_id"] = job["job_id"]
+        v["state"] = "running"
+        running += 1
+    with _lock:
+        _save()
+    return sweep
+
+
+def cancel(sweep_id: str) -> dict:
+    sweep = _get(sweep_id)
+    for v in sweep["variants"]:
+        if v["state"] == "running":
+            remote_jobs.cancel(v["job_id"])
+        if v["state"] in ("running", "queued"):
+            v["state"] = "cancelled"
+    with _lock:
+        _save()
+    return sweep
+
+
+def finished(sweep: dict) -> bool:
+    return all(v["state"] not in ("queued", "running") for v in sweep["variants"])
+
+
+def format_sweep(sweep: dict) -> str:
+    variants = ranked(sweep)
+    counts = {}
+    for v in sweep["variants"]:
+        counts[v["state"]] = counts.get(v["state"], 0) + 1
+    knobs = sorted(sweep["grid"])
+    lines = [
+        f"Sweep {sweep['sweep_id']} ({' → '.join(s['script'] for s in sweep['stages'])}; "
+        f"objective {sweep['objective']}): " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())),
+        "  rank variant " + " ".join(f"{k:>16}" for k in knobs)
+        + f" {'WNS':>8} {'TNS':>8} {'area':>9} {'util':>6} {'power mW':>9} {'DRC':>4} {'time':>6}  state",
+    ]
+    for rank, v in enumerate(variants, 1):
+        q = v.get("qor") or {}
+        lines.append(
+            f"  {rank:>4} {v['name']:<7} " + " ".join(f"{str(v['params'].get(k)):>16}" for k in knobs)
+            + f" {_fmt(q.get('wns'), '+.3f'):>8} {_fmt(q.get('tns'), '.3f'):>8} {_fmt(q.get('cell_area'), '.1f'):>9}"
+            f" {_fmt(q.get('utilization'), '.1%'):>6} {_fmt(q.get('power_total'), '.5f'):>9}"
+            f" {_fmt(q.get('drc_violations'), 'd'):>4} {_fmt(v.get('runtime'), '.0f'):>5}s  {v['state']}"
+            + (f" ({v['error']})" if v.get("error") else "")
+        )
+    best = variants[0] if variants and variants[0].get("qor") else None
+    if best:
+        lines.append(f"Best: {best['name']} {best['params']} — reports in results/sweeps/{sweep['sweep_id']}/{best['name']}/")
+    if not finished(sweep):
+        lines.append(f"Still running: call sweep_status with sweep_id='{sweep['sweep_id']}' to collect the rest.")
+    return "\n".join(lines)
+
+
+def ranked(sweep: dict) -> list:
+    """Variants ordered: timing met, then the objective; unfinished and failed last."""
+    objective = sweep.get("objective", "area")
+
+    def key(v):
+        q = v.get("qor") or {}
+        wns = q.get("wns")
+        if wns is None:
+            return (2, 0.0, 0.0)
+        met = 0 if wns >= 0 else 1
+        if objective == "wns" or met:
+            return (met, -wns, 0.0)
+        value = q.get("power_total") if objective == "power" else q.get("cell_area")
+        return (met, value if value is not None else float("inf"), -wns)
+
+    return sorted(sweep["variants"], key=key)
+
+
+# ── Tool handlers ─────────────────────────────────────────────────────────────
+
+def _run_sweep(grid: dict, synth_script: str, pnr_script: str, objective: str, wait: int) -> str:
+    try:
+        sweep = start(grid, synth_script, pnr_script, objective)
+        return _wait_and_format(sweep["sweep_id"], wait)
+    except (ValueError, FileNotFoundError) as exc:
+        return f"ERROR: {exc}"
+    except Exception as exc:
+        return f"ERROR (run_sweep): {exc}"
+
+
+def _sweep_status(sweep_id: str = None, wait: int = 0, cancel_all: bool = False) -> str:
+    try:
+        if not sweep_id:
+            with _lock:
+                sweeps = list(_load().values())
+            if not sweeps:
+                return "No sweeps started."
+            return "\n".join(
+                f"{s['sweep_id']}: {len(s['variants'])} variant(s), "
+                f"{sum(v['state'] == 'done' for v in s['variants'])} done — grid {s['grid']}"
+                for s in sweeps
+            )
+        if cancel_all:
+            return format_sweep(cancel(sweep_id))
+        return _wait_and_format(sweep_id, wait)
+    except KeyError as exc:
+        return f"ERROR: {exc.args[0]}"
+    except Exception as exc:
+        return f"ERROR (sweep_status): {exc}"
+
+
+def _wait_and_format(sweep_id: str, wait: int) -> str:
+    deadline = time.monotonic() + max(0, wait)
+    interval = max(1.0, float(getattr(config, "SWEEP_POLL_INTERVAL", 15)))
+    sweep = advance(sweep_id)
+    while not finished(sweep) and time.monotonic() < deadline:
+        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        sweep = advance(sweep_id)
+    return format_sweep(sweep)
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _apply_knobs(files: dict, params: dict, stages: list, tag: str) -> dict:
+    """Return *files* (rel -> text) edited for one grid point; only changed files are kept."""
+    edited = dict(files)
+    scripts = {s.tool: s.script for s in stages}
+    for knob, value in params.items():
+        if knob == "clock_period":
+            period = float(value)
+            if period <= 0:
+                raise ValueError("clock_period must be positive")
+            hits = 0
+            for rel in [r for r in edited if r.endswith(".sdc")]:
+                text, n = re.subn(r"^(\s*create_clock\b[^\n]*)$",
+                                  lambda m: _set_period(m.group(1), period), edited[rel], flags=re.M)
+                edited[rel] = text
+                hits += n
+            if not hits:
+                raise ValueError("clock_period: no create_clock in the flow's SDC files")
+        elif knob in ("core_utilization", "aspect_ratio"):
+            rel = scripts.get("innovus")
+            if not rel:
+                raise ValueError(f"{knob} needs pnr_script")
+            index = 1 if knob == "core_utilization" else 0
+            pattern = re.compile(r"^(\s*floorPlan\b[^\n]*?-r\s+)(\S+)\s+(\S+)", re.M)
+            if not pattern.search(edited[rel]):
+                raise ValueError(f"{knob}: no 'floorPlan ... -r' in {rel}")
+
+            def repl(m, index=index, value=float(value)):
+                args = [m.group(2), m.group(3)]
+                args[index] = f"{value:g}"
+                return m.group(1) + " ".join(args)
+            edited[rel] = pattern.sub(repl, edited[rel], count=1)
+        elif knob == "compile_effort":
+            rel = scripts.get("dc")
+            if not rel:
+                raise ValueError("compile_effort needs synth_script")
+            command = _COMPILE_COMMANDS.get(str(value))
+            if command is None:
+                raise ValueError(f"compile_effort must be one of {', '.join(_COMPILE_COMMANDS)}")
+            text, n = re.subn(r"^(\s*)(compile_ultra|compile)\b[^\n]*$",
+                              lambda m: m.group(1) + command, edited[rel], count=1, flags=re.M)
+            if not n:
+                raise ValueError(f"compile_effort: no compile command in {rel}")
+            edited[rel] = text
+    for rel in list(edited):
+        # Scripts that write scratch files to a fixed /tmp path would race
+        # across concurrent variants; give each variant its own.
+        if rel.endswith(".tcl"):
+            edited[rel] = re.sub(r'(?<=["\s{])/tmp/', f"/tmp/{tag}-", edited[rel])
+    return {rel: text for rel, text in edited.items() if text != files[rel]}
+
+
+def _set_period(line: str, period: float) -> str:
+    line = re.sub(r"-period\s+\S+", f"-period {period:g}", line)
+    return re.sub(r"-waveform\s*\{\s*0\s+[^}\s]+\s*\}", f"-waveform {{0 {period / 2:g}}}", line)
+
+
+def _variant_command(sweep: dict, v: dict) -> str:
+    steps = []
+    for stage in sweep["stages"]:
+        command, log_name, _ = _TOOL_COMMANDS[stage["tool"]]
+        out_dir = stage["output_dirs"][0] if stage["output_dirs"] else "results"
+        steps.append(
+            f"mkdir -p {shlex.quote(out_dir)} && "
+            f"{command.format(script=shlex.quote(stage['script']))} > {shlex.quote(out_dir + '/' + log_name)} 2>&1"
+        )
+    return " && ".join(steps)
+
+
+def _collect(sweep: dict, v: dict):
+    """Download the variant's report directories, parse the last stage's QoR and record each stage's."""
+    from tools import qor_history, qor_parsers
+    local_root = os.path.join("results", "sweeps", sweep["sweep_id"], v["name"])
+    qor = None
+    for stage in sweep["stages"]:
+        for rel_dir in stage["output_dirs"]:
+            local = f"{local_root}/{os.path.basename(rel_dir)}"
+            result = _download_directory(f"{sweep['remote_dir']}/{v['name']}/{rel_dir}", local)
+            full = os.path.join(config.WORK_DIR, local)
+            if result.startswith("ERROR") or not os.path.isdir(full) or not qor_parsers.detect_stage(full):
+                continue
+            try:
+                qor = qor_parsers.parse_directory(full)
+            except Exception as exc:
+                v["error"] = f"QoR parse failed: {exc}"
+                continue
+            qor.source = local
+            qor_history.record(qor, full, "sweep", script=stage["script"], params=v["params"])
+    if qor is not None:
+        v["qor"] = {
+            k: getattr(qor, k) for k in (
+                "stage", "wns", "tns", "violating_paths", "cell_area", "utilization",
+                "power_total", "drc_violations", "clock_period",
+            )
+        }
+
+
+def _fmt(value, spec: str) -> str:
+    if value is None:
+        return "-"
+    try:
+        return format(value, spec)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _get(sweep_id: str) -> dict:
+    with _lock:
+        sweep = _load().get(sweep_id)
+    if sweep is None:
+        raise KeyError(f"unknown sweep '{sweep_id}'")
+    return sweep
+
+
+def _state_path() -> str:
+    return os.path.join(config.WORK_DIR, STATE_NAME)
+
+
+def _load() -> dict:
+    path = _state_path()
+    sweeps = _sweeps.get(path)
+    if sweeps is None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                sweeps = json.load(f)
+        except (OSError, ValueError):
+            sweeps = {}
+        _sweeps[path] = sweeps
+    return sweeps
+
+
+def _save() -> None:
+    path = _state_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_load(), f, indent=1)
+    os.replace(tmp, path)
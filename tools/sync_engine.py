@@ -0,0 +1,275 @@
+"""
+Incremental, content-hashed project sync for `sync_to_remote`.
+
+A manifest in WORK_DIR/.remote_sync_manifest.json records, per remote
+target, the content hash of every file as it was last uploaded.  A sync
+then only has to:
+
+  1. walk WORK_DIR and hash the candidate files (hashes are cached against
+     size + mtime, so unchanged files are not even re-read),
+  2. create every missing remote directory in one batched `mkdir -p`,
+  3. upload the changed files over several pooled SFTP channels at once,
+     or — when many files changed, e.g. on a first sync — as a single
+     compressed tar stream (tools/archive_transfer.py).
+
+After a one-line RTL edit that is one hash, one mkdir round-trip and one
+put.  Pass force=True to ignore the manifest (e.g. after the remote tree was
+wiped by hand).
+
+Configuration in config.py (optional):
+    SYNC_PARALLEL_CHANNELS  — concurrent SFTP uploads (default: 4)
+"""
+
+import hashlib
+import json
+import os
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from runtime import telemetry
+from tools import archive_transfer
+from tools.ssh_pool import get_pool
+
+UPLOAD_EXTS = {".v", ".sv", ".tcl", ".sdc", ".txt", ".md"}
+SKIP_NAMES  = {"config.py", ".env", ".gitkeep"}
+SKIP_DIRS   = {".git", "__pycache__", "results", ".claude", ".run_cache", ".sim_cache"}
+
+MANIFEST_NAME = ".remote_sync_manifest.json"
+_MANIFEST_VERSION = 1
+
+# Exponential moving-average weight for the per-file cost estimate.
+_EWMA = 0.3
+
+_lock = threading.Lock()
+
+
+class SyncResult:
+    """Outcome of one sync, plus the numbers needed to report savings."""
+
+    def __init__(self, remote_base):
+        self.remote_base = remote_base
+        self.uploaded = []          # rel paths
+        self.unchanged = []         # rel paths
+        self.skipped = []           # file names filtered out
+        self.failed = {}            # rel path -> error text
+        self.bytes_uploaded = 0
+        self.bytes_unchanged = 0
+        self.bytes_on_wire = None   # compressed size in archive mode
+        self.elapsed = 0.0
+        self.est_seconds_saved = 0.0
+        self.mode = "sftp"
+
+    def format(self) -> str:
+        lines = [f"Synced to {self.remote_base} ({self.mode}, {self.elapsed:.2f}s)"]
+        sent = _fmt_bytes(self.bytes_uploaded)
+        if self.bytes_on_wire is not None:
+            sent += f", {_fmt_bytes(self.bytes_on_wire)} compressed"
+        lines.append(f"  Uploaded ({len(self.uploaded)}, {sent}):")
+        for f in sorted(self.uploaded):
+            lines.append(f"    {f}")
+        if self.unchanged:
+            lines.append(
+                f"  Unchanged ({len(self.unchanged)}, {_fmt_bytes(self.bytes_unchanged)} not re-sent, "
+                f"~{self.est_seconds_saved:.1f}s saved)"
+            )
+        if self.failed:
+            lines.append(f"  FAILED ({len(self.failed)}):")
+            for f, err in sorted(self.failed.items()):
+                lines.append(f"    {f}: {err}")
+        if self.skipped:
+            lines.append(f"  Skipped  ({len(self.skipped)}): {', '.join(sorted(set(self.skipped)))}")
+        return "\n".join(lines)
+
+
+def collect_files(work_dir: str):
+    """
+    Return (files, skipped) where files is a sorted list of
+    (rel_path, abs_path) eligible for upload.
+    """
+    files, skipped = [], []
+    for root, dirs, names in os.walk(work_dir):
+        # Prune skip dirs in-place so os.walk doesn't descend into them
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for fname in names:
+            ext = os.path.splitext(fname)[1].lower()
+            if fname in SKIP_NAMES or ext not in UPLOAD_EXTS:
+                skipped.append(fname)
+                continue
+            local_abs = os.path.join(root, fname)
+            rel_path = os.path.relpath(local_abs, work_dir).replace(os.sep, "/")
+            files.append((rel_path, local_abs))
+    files.sort()
+    return files, skipped
+
+
+def sync(remote_base: str, force: bool = False, mode: str = "auto") -> SyncResult:
+    """
+    Upload every project file that changed since the last sync to *remote_base*.
+
+    *mode* is "sftp" (per-file, parallel), "archive" (one tar.gz stream) or
+    "auto", which picks the archive once enough files need sending.
+    """
+    if mode not in ("auto", "sftp", "archive"):
+        raise ValueError(f"unknown sync mode '{mode}'")
+    # One sync at a time per process: the manifest is read-modify-written.
+    with _lock:
+        return _sync_locked(remote_base, force, mode)
+
+
+def _sync_locked(remote_base: str, force: bool, mode: str) -> SyncResult:
+    start = time.monotonic()
+    result = SyncResult(remote_base)
+    work_dir = config.WORK_DIR
+    with telemetry.span("sync.scan") as span:
+        files, result.skipped = collect_files(work_dir)
+
+        manifest = load_manifest(work_dir)
+        target = manifest["targets"].setdefault(_target_key(remote_base), {"files": {}})
+        remote_state = target["files"]
+
+        changed = []
+        for rel, abs_path in files:
+            digest, size = _hash_cached(manifest["local"], rel, abs_path)
+            if not force and remote_state.get(rel) == digest:
+                result.unchanged.append(rel)
+                result.bytes_unchanged += size
+            else:
+                changed.append((rel, abs_path, digest, size))
+        span.update(files=len(files), changed=len(changed))
+
+    if changed:
+        upload_start = time.monotonic()
+        with telemetry.span("remote.upload", files=len(changed)) as span:
+            if mode == "archive" or (mode == "auto" and archive_transfer.prefer_archive(len(changed))):
+                result.mode = "archive"
+                _upload_archive(remote_base, changed, remote_state, result)
+            else:
+                _upload_changed(remote_base, changed, remote_state, result)
+            span.update(mode=result.mode, bytes=sum(size for *_, size in changed))
+        if result.uploaded:
+            per_file = (time.monotonic() - upload_start) / len(result.uploaded)
+            prev = target.get("sec_per_file")
+            target["sec_per_file"] = per_file if prev is None else (1 - _EWMA) * prev + _EWMA * per_file
+    else:
+        result.mode = "up to date"
+    result.est_seconds_saved = len(result.unchanged) * target.get("sec_per_file", 0.0)
+    target["synced_at"] = time.time()
+
+    # Forget local files that no longer exist.
+    present = {rel for rel, _ in files}
+    for rel in [r for r in manifest["local"] if r not in present]:
+        del manifest["local"][rel]
+
+    save_manifest(work_dir, manifest)
+    result.elapsed = time.monotonic() - start
+    return result
+
+
+def mkdirs(ssh, remote_dirs) -> None:
+    """Create all *remote_dirs* in a single round-trip."""
+    remote_dirs = sorted(set(remote_dirs))
+    if not remote_dirs:
+        return
+    cmd = "mkdir -p " + " ".join(shlex.quote(d) for d in remote_dirs)
+    _, stdout, stderr = ssh.exec_command(cmd, timeout=60)
+    if stdout.channel.recv_exit_status() != 0:
+        raise RuntimeError(f"mkdir failed: {stderr.read().decode('utf-8', errors='replace').strip()}")
+
+
+# ── Manifest ──────────────────────────────────────────────────────────────────
+
+def load_manifest(work_dir: str) -> dict:
+    path = os.path.join(work_dir, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == _MANIFEST_VERSION:
+            data.setdefault("local", {})
+            data.setdefault("targets", {})
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": _MANIFEST_VERSION, "local": {}, "targets": {}}
+
+
+def save_manifest(work_dir: str, manifest: dict) -> None:
+    path = os.path.join(work_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp, path)
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────────
+
+def _target_key(remote_base: str) -> str:
+    host = getattr(config, "REMOTE_HOST", "")
+    port = getattr(config, "REMOTE_PORT", 22)
+    user = getattr(config, "REMOTE_USER", "")
+    return f"{user}@{host}:{port}:{remote_base}"
+
+
+def _hash_cached(local_cache: dict, rel: str, abs_path: str):
+    """Return (sha256, size), reusing the cached hash if size+mtime match."""
+    st = os.stat(abs_path)
+    entry = local_cache.get(rel)
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["sha256"], st.st_size
+    h = hashlib.sha256()
+    with open(abs_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    local_cache[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+    return digest, st.st_size
+
+
+def _upload_changed(remote_base, changed, remote_state, result):
+    pool = get_pool()
+    remote_dirs = {remote_base}
+    for rel, _, _, _ in changed:
+        remote_dirs.add(os.path.dirname(remote_base + "/" + rel))
+    with pool.ssh() as ssh:
+        mkdirs(ssh, remote_dirs)
+
+    def put(item):
+        rel, abs_path, digest, size = item
+        with pool.sftp() as sftp:
+            sftp.put(abs_path, remote_base + "/" + rel)
+        return item
+
+    workers = max(1, min(int(getattr(config, "SYNC_PARALLEL_CHANNELS", 4)), len(changed)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(put, item) for item in changed]
+        for fut, item in zip(futures, changed):
+            rel, _, digest, size = item
+            try:
+                fut.result()
+            except Exception as exc:
+                result.failed[rel] = str(exc)
+                remote_state.pop(rel, None)
+                continue
+            remote_state[rel] = digest
+            result.uploaded.append(rel)
+            result.bytes_uploaded += size
+
+
+def _upload_archive(remote_base, changed, remote_state, result):
+    with get_pool().ssh() as ssh:
+        result.bytes_on_wire = archive_transfer.upload_archive(
+            ssh, remote_base, [(rel, abs_path) for rel, abs_path, _, _ in changed]
+        )
+    for rel, _, digest, size in changed:
+        remote_state[rel] = digest
+        result.uploaded.append(rel)
+        result.bytes_uploaded += size
+
+
+def _fmt_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024.0